@@ -13,13 +13,23 @@ from fairscape_cli.commands.schema_commands import schema
 from fairscape_cli.commands.augment_commands import augment_group
 from fairscape_cli.commands.track import track
 from fairscape_cli.commands.interpret import interpret_group
+from fairscape_cli.utils.hash_cache import set_hash_cache_enabled
+from fairscape_cli.utils.serialization import set_compact_output
 
 @click.group(invoke_without_command=True)
+@click.option('--compact', is_flag=True, default=False,
+              help='Write JSON metadata without indentation (smaller files, faster writes).')
+@click.option('--no-hash-cache', is_flag=True, default=False,
+              help='Hash every file from disk instead of reusing cached MD5/SHA-256 digests.')
 @click.pass_context
-def cli(ctx):
+def cli(ctx, compact, no_hash_cache):
     """FAIRSCAPE CLI
      A utility for packaging objects and validating metadata for FAIRSCAPE
      """
+    if compact:
+        set_compact_output(True)
+    if no_hash_cache:
+        set_hash_cache_enabled(False)
     if ctx.invoked_subcommand is None:
         ctx.info_name = ctx.find_root().info_name or 'cli'
         click.echo(ctx.get_help())
@@ -2,8 +2,11 @@ import click
 import pathlib
 import json
 from fairscape_cli.models.rocrate import (
+    ApplyGraphUpdates,
     UpdateEntitiesInGraph
 )
+from fairscape_cli.models.crate_document import CrateDocument
+from fairscape_cli.utils.graph_stream import iter_graph_entities
 from fairscape_cli.entailments.inverse import augment_rocrate_with_inverses, EVI_NAMESPACE
 from fairscape_cli.entailments.find_outputs import (
     extract_datasets_from_graph,
@@ -21,6 +24,11 @@ from fairscape_cli.entailments.summary_stats import (
     read_table,
 )
 
+# Keys the summary-stats selection pass reads from each streamed entity.
+SUMMARY_STATS_FIELDS = [
+    "about", "additionalType", "format", "fileFormat", "contentUrl", "hasSummaryStatistics",
+]
+
 @click.group('augment')
 def augment_group():
     """Commands to augment and modify existing RO-Crate metadata."""
@@ -28,37 +36,66 @@ def augment_group():
 
 @augment_group.command('update-entities')
 @click.argument('rocrate-path', type=click.Path(exists=True, path_type=pathlib.Path))
-@click.option('--query', 'query_str', required=True, help="MongoDB-style query as a JSON string to select entities.")
-@click.option('--update', 'update_str', required=True, help="MongoDB-style update operation as a JSON string.")
+@click.option('--query', 'query_str', required=False, help="MongoDB-style query as a JSON string to select entities.")
+@click.option('--update', 'update_str', required=False, help="MongoDB-style update operation as a JSON string.")
+@click.option('--batch', 'batch_path', required=False, type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+              help='JSONL file of {"query": ..., "update": ...} operations, applied in order in a single pass.')
 @click.pass_context
 def update_entities_command(
     ctx,
     rocrate_path: pathlib.Path,
     query_str: str,
-    update_str: str
+    update_str: str,
+    batch_path: pathlib.Path
 ):
     """
     Selects and updates entities within an RO-Crate using MongoDB-like query
     and update operations on the '@graph'.
+
+    Supported: equality, $eq, $ne, $in, $nin, $exists, $regex, $and/$or in
+    queries; $set, $unset, $push and $addToSet in updates.
     """
     try:
-        try:
-            query_dict = json.loads(query_str)
-        except json.JSONDecodeError as e:
-            click.echo(f"Error: Invalid JSON in --query string: {e}", err=True)
-            ctx.exit(1)
-        
-        try:
-            update_dict = json.loads(update_str)
-        except json.JSONDecodeError as e:
-            click.echo(f"Error: Invalid JSON in --update string: {e}", err=True)
-            ctx.exit(1)
-        
-        success, message = UpdateEntitiesInGraph(
-            rocrate_path,
-            query_dict,
-            update_dict
-        )
+        if batch_path is not None:
+            if query_str is not None or update_str is not None:
+                click.echo("Error: Use either --batch or --query/--update, not both.", err=True)
+                ctx.exit(1)
+            operations = []
+            with batch_path.open('r') as batch_file:
+                for line_number, line in enumerate(batch_file, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        click.echo(f"Error: Invalid JSON on line {line_number} of {batch_path}: {e}", err=True)
+                        ctx.exit(1)
+                    if not isinstance(record, dict) or 'query' not in record or 'update' not in record:
+                        click.echo(f"Error: Line {line_number} of {batch_path} needs 'query' and 'update' keys.", err=True)
+                        ctx.exit(1)
+                    operations.append((record['query'], record['update']))
+            success, message = ApplyGraphUpdates(rocrate_path, operations)
+        else:
+            if query_str is None or update_str is None:
+                click.echo("Error: --query and --update are required unless --batch is given.", err=True)
+                ctx.exit(1)
+            try:
+                query_dict = json.loads(query_str)
+            except json.JSONDecodeError as e:
+                click.echo(f"Error: Invalid JSON in --query string: {e}", err=True)
+                ctx.exit(1)
+
+            try:
+                update_dict = json.loads(update_str)
+            except json.JSONDecodeError as e:
+                click.echo(f"Error: Invalid JSON in --update string: {e}", err=True)
+                ctx.exit(1)
+
+            success, message = UpdateEntitiesInGraph(
+                rocrate_path,
+                query_dict,
+                update_dict
+            )
         
         if success:
             click.echo(message)
@@ -246,25 +283,23 @@ def summary_stats_command(
         click.echo(f"Error: RO-Crate metadata file not found at {metadata_path}", err=True)
         ctx.exit(1)
 
-    with metadata_path.open("r") as f:
-        metadata = json.load(f)
-
-    graph = metadata.get("@graph") or []
-    if not graph:
-        click.echo("Error: RO-Crate metadata has no @graph", err=True)
-        ctx.exit(1)
-
-    root_dataset = graph[1] if len(graph) > 1 else None
-    new_entities: list = []
-    updated_count = 0
+    # Select and compute from a streamed pass so only the matched Datasets
+    # are held in memory; the crate itself is loaded once, to write.
+    root_id = None
+    saw_entities = False
+    computed: list = []
     skipped: list = []
 
-    for entity in graph:
+    for entity in iter_graph_entities(metadata_path, fields=SUMMARY_STATS_FIELDS):
+        saw_entities = True
+        if entity.get("@id") == "ro-crate-metadata.json" and isinstance(entity.get("about"), dict):
+            root_id = entity["about"].get("@id")
+            continue
         if not is_dataset(entity):
             continue
         if entity_id and entity.get("@id") != entity_id:
             continue
-        if entity is root_dataset:
+        if entity.get("@id") == root_id:
             continue
         if not is_tabular_entity(entity):
             skipped.append((entity.get("@id"), "not tabular"))
@@ -288,35 +323,45 @@ def summary_stats_command(
 
         rows, cols = int(df.shape[0]), int(df.shape[1])
         size_str = human_size(size_bytes)
-        per_column = compute_stats(df)
-
-        entity["rowCount"] = rows
-        entity["columnCount"] = cols
-        entity["contentSize"] = size_str
-        entity.setdefault("sampleSize", rows)
-
-        stats_entity = build_summary_dataset(entity, rows, cols, size_str, per_column)
-        entity["hasSummaryStatistics"] = {"@id": stats_entity["@id"]}
-        new_entities.append(stats_entity)
-        updated_count += 1
+        computed.append((entity["@id"], rows, cols, size_str, compute_stats(df)))
         click.echo(f"  ✓ {entity['@id']} ← {rows} rows × {cols} cols, {size_str} (source: {source_desc})")
 
+    if not saw_entities:
+        click.echo("Error: RO-Crate metadata has no @graph", err=True)
+        ctx.exit(1)
+
+    updated_count = len(computed)
     if not updated_count:
         click.echo("No Datasets updated.")
         for eid, reason in skipped:
             click.echo(f"  - {eid}: {reason}")
         return
 
-    if new_entities and root_dataset is not None:
-        root_dataset.setdefault("hasPart", []).extend([{"@id": e["@id"]} for e in new_entities])
-        graph.extend(new_entities)
-
     if dry_run:
-        click.echo(f"\nDRY RUN — would update {updated_count} dataset(s) and add {len(new_entities)} SummaryStats entit{'y' if len(new_entities) == 1 else 'ies'}.")
+        click.echo(f"\nDRY RUN — would update {updated_count} dataset(s) and add {updated_count} SummaryStats entit{'y' if updated_count == 1 else 'ies'}.")
         return
 
-    with metadata_path.open("w") as f:
-        json.dump(metadata, f, indent=2)
+    new_entities: list = []
+    try:
+        with CrateDocument(metadata_path) as crate_document:
+            for source_id, rows, cols, size_str, per_column in computed:
+                entity = crate_document.get(source_id)
+                entity["rowCount"] = rows
+                entity["columnCount"] = cols
+                entity["contentSize"] = size_str
+                entity.setdefault("sampleSize", rows)
+
+                stats_entity = build_summary_dataset(entity, rows, cols, size_str, per_column)
+                entity["hasSummaryStatistics"] = {"@id": stats_entity["@id"]}
+                crate_document.mark_dirty(source_id)
+                # --overwrite recomputes an existing SummaryStats entity in place.
+                if not crate_document.update(stats_entity):
+                    new_entities.append(stats_entity)
+            crate_document.append(new_entities)
+    except Exception as e:
+        click.echo(f"Error writing {metadata_path}: {type(e).__name__} - {e}", err=True)
+        ctx.exit(1)
+
     click.echo(f"\nUpdated {updated_count} dataset(s); appended {len(new_entities)} SummaryStats entit{'y' if len(new_entities) == 1 else 'ies'} to {metadata_path}.")
     if skipped:
         click.echo("Skipped:")
@@ -4,6 +4,8 @@ import os
 import traceback
 from pathlib import Path
 import json
+import random
+from collections import Counter
 from typing import Optional, List, Tuple
 from datetime import datetime
 
@@ -14,27 +16,37 @@ from fairscape_cli.interpret.local_sink import LocalResultSink
 from fairscape_graph_tools.evidence_graph_builder import EvidenceGraphBuilder
 from fairscape_cli.utils.build_utils import (
     process_all_subcrates,
-    process_croissant,
-    process_datasheet,
     process_preview,
-    process_release_merkle_tree,
+    process_release_artifacts,
     process_subcrate,
     ensure_subcrates_linked,
+    compact_crate_journals,
 )
 from fairscape_cli.datasheet_builder.linkml.convert_rocrate import GenerateLinkML
-from fairscape_cli.utils.merkle import generate_merkle_tree, generate_release_merkle_tree
+from fairscape_cli.utils.merkle import (
+    changed_byte_ranges,
+    generate_merkle_tree,
+    generate_release_merkle_tree,
+    MERKLE_TREE_FORMATS,
+    check_merkle_tree,
+    inclusion_proof,
+    merkle_tree_format,
+    read_merkle_tree,
+    verify_file,
+    write_merkle_tree,
+)
+from fairscape_cli.utils.merkle_binary import binary_path_for
 
 from fairscape_cli.models import (
     GenerateROCrate,
     LinkSubcrates,
-    collect_subcrate_metadata,
-    collect_subcrate_aggregated_metrics
+    ReleaseScan,
 )
 from fairscape_cli.models.rocrate import _extract_content_size_bytes, format_content_size_bytes
 
 from fairscape_models.rocrate import ROCrateV1_2, ROCrateMetadataElem
 from fairscape_cli.datasheet_builder import get_default_template_dir
-from fairscape_cli.utils.serialization import prune_none, write_json_atomic
+from fairscape_cli.utils.serialization import write_json_atomic
 from fairscape_cli.utils.rocrate_helpers import get_root_entity_dict
 from fairscape_models.conversion.converter import ROCToTargetConverter
 from fairscape_models.conversion.mapping.croissant import MAPPING_CONFIGURATION as CROISSANT_MAPPING
@@ -112,8 +124,12 @@ def build_group():
 @click.option('--additional-properties', required=False, type=str, help="JSON string with additional property values.")
 @click.option('--custom-properties', required=False, type=str, help='JSON string with additional properties for the parent crate.')
 @click.option('--skip-subcrate-processing', is_flag=True, default=False, help="Skip automatic processing of subcrates.")
-@click.option('--force-reprocess', is_flag=True, default=False, help="Force re-processing of all subcrates, ignoring evi:processed flag.")
+@click.option('--force-reprocess', is_flag=True, default=False, help="Force re-running every build step, ignoring ro-crate-build-manifest.json and cached ro-crate-metrics.json sidecars.")
 @click.option('--published', is_flag=True, default=False, help="Are the arks live for the release.")
+@click.option('--jobs', type=click.IntRange(min=1), default=1, show_default=True, help="Worker processes used to process sub-crates and to read and aggregate their metrics.")
+@click.option('--explain', is_flag=True, default=False, help="Print why each build step ran or was skipped.")
+@click.option('--shared-assets', is_flag=True, default=False, help="Write the evidence graph scripts once to the release root (content-hashed file names) and load them from every sub-crate's ro-crate-prov-graph.html instead of inlining them.")
+@click.option('--merkle-chunk-mib', type=click.IntRange(min=1), default=None, help="Hash files larger than this many MiB as Merkle sub-trees of fixed-size chunks, hashed in parallel, so corruption can be located to a byte range.")
 @click.pass_context
 def build_release(
     ctx,
@@ -177,6 +193,10 @@ def build_release(
     skip_subcrate_processing: bool,
     force_reprocess: bool,
     published: bool,
+    jobs: int,
+    explain: bool,
+    shared_assets: bool,
+    merkle_chunk_mib: Optional[int],
 ):
     """
     Create a 'release' RO-Crate in RELEASE_DIRECTORY, adding Croissant RAI metadata and linking sub-RO-Crates.
@@ -193,12 +213,17 @@ def build_release(
     
     if not release_directory.exists():
         release_directory.mkdir(parents=True, exist_ok=True)
+
+    # One walk of the release; sub-crate metadata is parsed once, after processing.
+    release_scan = ReleaseScan(release_directory, jobs=jobs, use_sidecars=not force_reprocess)
+    compact_crate_journals(release_directory, scan=release_scan)
     
     if not skip_subcrate_processing:
         click.echo("\n=== Processing subcrates ===")
-        subcrate_results = process_all_subcrates(release_directory, published=published, force_reprocess=force_reprocess)
+        subcrate_results = process_all_subcrates(release_directory, published=published, force_reprocess=force_reprocess, scan=release_scan, jobs=jobs, explain=explain, shared_assets=shared_assets,
+                                                merkle_chunk_size=merkle_chunk_mib * 1024 * 1024 if merkle_chunk_mib else None)
     
-    subcrate_metadata = collect_subcrate_metadata(release_directory)
+    subcrate_metadata = release_scan.subcrate_metadata()
 
     if author is None:
         combined_authors = subcrate_metadata['authors']
@@ -213,7 +238,9 @@ def build_release(
             combined_keywords.append(keyword)
 
     # Collect aggregated metrics for AI-Ready scoring
-    aggregated_metrics = collect_subcrate_aggregated_metrics(release_directory)
+    aggregated_metrics = release_scan.aggregated_metrics()
+    if release_scan.sidecar_hits:
+        click.echo(f"Reused cached metrics for {release_scan.sidecar_hits} of {len(release_scan)} sub-crate(s)")
 
     parent_params = {
         "guid": guid,
@@ -355,7 +382,7 @@ def build_release(
         click.echo(f"ERROR: Failed to initialize parent RO-Crate: {e}")
         ctx.exit(1)
 
-    linked_ids = ensure_subcrates_linked(release_directory)
+    linked_ids = ensure_subcrates_linked(release_directory, scan=release_scan)
     if linked_ids:
         click.echo(f"Successfully linked {len(linked_ids)} sub-crate(s):")
         for sub_id in linked_ids:
@@ -365,23 +392,7 @@ def build_release(
 
     click.echo("\n=== Processing release artifacts ===")
     
-    click.echo("Generating release Croissant...")
-    if process_croissant(release_directory):
-        click.echo("  ✓ Release Croissant generated")
-    else:
-        click.echo("  WARNING: Failed to generate release Croissant")
-    
-    click.echo("Generating release datasheet...")
-    if process_datasheet(release_directory, published=published):
-        click.echo("  ✓ Release datasheet generated")
-    else:
-        click.echo("  WARNING: Failed to generate release datasheet")
-
-    click.echo("Generating release Merkle tree...")
-    if process_release_merkle_tree(release_directory):
-        click.echo("  ✓ Release Merkle tree generated")
-    else:
-        click.echo("  WARNING: No subcrate Merkle trees found; release Merkle tree skipped")
+    process_release_artifacts(release_directory, published=published, force_reprocess=force_reprocess, scan=release_scan, explain=explain)
 
     click.echo(f"\n✓ Release process finished successfully for: {parent_crate_guid}")
 
@@ -392,9 +403,10 @@ def build_release(
 @click.option('--published', is_flag=True, default=False, help="Indicate if the crate is considered published (may affect template rendering).")
 @click.option('--pdf', is_flag=True, default=False, help="Also generate a PDF version of the datasheet (requires playwright).")
 @click.option('--skip-subcrate-processing', is_flag=True, default=False, help="Skip automatic processing of subcrates.")
-@click.option('--force-reprocess', is_flag=True, default=False, help="Force re-processing of all subcrates, ignoring evi:processed flag.")
+@click.option('--force-reprocess', is_flag=True, default=False, help="Force re-running every subcrate build step, ignoring ro-crate-build-manifest.json.")
+@click.option('--jobs', type=click.IntRange(min=1), default=1, show_default=True, help="Worker processes used to process sub-crates.")
 @click.pass_context
-def build_datasheet(ctx, rocrate_path, output, template_dir, published, pdf, skip_subcrate_processing, force_reprocess):
+def build_datasheet(ctx, rocrate_path, output, template_dir, published, pdf, skip_subcrate_processing, force_reprocess, jobs):
     """Generate an HTML datasheet for an RO-Crate."""
 
     if rocrate_path.is_dir():
@@ -415,16 +427,19 @@ def build_datasheet(ctx, rocrate_path, output, template_dir, published, pdf, ski
 
     template_dir = template_dir if template_dir else get_default_template_dir()
 
+    subcrate_scan = ReleaseScan(crate_dir, collect_metrics=False)
+    compact_crate_journals(crate_dir, scan=subcrate_scan)
+
     # Link subcrates if needed
     click.echo("Checking subcrate links...")
-    linked_ids = ensure_subcrates_linked(crate_dir)
+    linked_ids = ensure_subcrates_linked(crate_dir, scan=subcrate_scan)
     if linked_ids:
         click.echo(f"Linked {len(linked_ids)} sub-crate(s)")
 
     # Process subcrates if needed
     if not skip_subcrate_processing:
         click.echo("\n=== Processing subcrates ===")
-        process_all_subcrates(crate_dir, published=published, force_reprocess=force_reprocess)
+        process_all_subcrates(crate_dir, published=published, force_reprocess=force_reprocess, scan=subcrate_scan, jobs=jobs)
 
     # generating link ml for release ROCrate
     click.echo(f"\nGenerating Link-ML for {metadata_file}")
@@ -516,6 +531,7 @@ def generate_evidence_graph(
     
     # Determine output paths
     crate_dir = metadata_file.parent
+    compact_crate_journals(crate_dir)
     if not output_file:
         output_file = crate_dir / "provenance-graph.json"
     
@@ -567,7 +583,7 @@ def generate_evidence_graph(
                     "@id": str(html_output_path)
                 }
 
-            write_json_atomic(metadata_file, prune_none(metadata))
+            write_json_atomic(metadata_file, metadata, prune=True)
 
             click.echo(f"Added hasEvidenceGraph reference to {ark_id} in RO-Crate metadata")
         except Exception as e:
@@ -599,6 +615,7 @@ def build_croissant(ctx, rocrate_path, output):
         ctx.exit(1)
 
     output_path = output if output else crate_dir / "croissant.json"
+    compact_crate_journals(crate_dir)
 
     click.echo(f"Converting RO-Crate to Croissant: {metadata_file}")
     click.echo(f"Outputting to: {output_path}")
@@ -611,8 +628,7 @@ def build_croissant(ctx, rocrate_path, output):
         croissant_converter = ROCToTargetConverter(source_crate, CROISSANT_MAPPING)
         croissant_result = croissant_converter.convert()
         
-        with open(output_path, 'w') as f:
-            json.dump(croissant_result.model_dump(by_alias=True, exclude_none=True), f, indent=2)
+        write_json_atomic(output_path, croissant_result.model_dump(by_alias=True, exclude_none=True))
         
         click.echo(f"Croissant conversion completed successfully: {output_path}")
     except Exception as e:
@@ -645,6 +661,7 @@ def build_preview_command(ctx, rocrate_path: pathlib.Path, published: bool):
         click.echo(f"ERROR: Metadata file not found: {metadata_file}", err=True)
         ctx.exit(1)
 
+    compact_crate_journals(crate_dir)
     click.echo(f"Generating preview for: {crate_dir}")
 
     if process_preview(crate_dir, published=published):
@@ -659,8 +676,10 @@ def build_preview_command(ctx, rocrate_path: pathlib.Path, published: bool):
 @click.option('--release-directory', type=click.Path(exists=True, path_type=pathlib.Path), default=None,
               help="Parent release directory (used for relative paths in evidence graphs).")
 @click.option('--published', is_flag=True, default=False, help="Indicate if the crate is considered published.")
+@click.option('--merkle-chunk-mib', type=click.IntRange(min=1), default=None, help="Hash files larger than this many MiB as Merkle sub-trees of fixed-size chunks, hashed in parallel, so corruption can be located to a byte range.")
 @click.pass_context
-def build_subcrate_command(ctx, subcrate_path: pathlib.Path, release_directory: Optional[pathlib.Path], published: bool):
+def build_subcrate_command(ctx, subcrate_path: pathlib.Path, release_directory: Optional[pathlib.Path], published: bool,
+                           merkle_chunk_mib: Optional[int]):
     """
     Process a subcrate with all augmentation and build steps.
 
@@ -691,9 +710,11 @@ def build_subcrate_command(ctx, subcrate_path: pathlib.Path, release_directory:
         click.echo(f"ERROR: Metadata file not found: {metadata_file}", err=True)
         ctx.exit(1)
 
+    compact_crate_journals(crate_dir)
     click.echo(f"\n=== Processing subcrate: {crate_dir.name} ===")
 
-    results = process_subcrate(crate_dir, release_directory=release_directory, published=published)
+    results = process_subcrate(crate_dir, release_directory=release_directory, published=published,
+                               merkle_chunk_size=merkle_chunk_mib * 1024 * 1024 if merkle_chunk_mib else None)
 
     # Summary
     click.echo(f"\n=== Summary ===")
@@ -713,19 +734,8 @@ def build_subcrate_command(ctx, subcrate_path: pathlib.Path, release_directory:
         click.echo(f"\nSubcrate processing completed successfully.")
 
 
-@build_group.command('validate')
-@click.argument('rocrate-path', type=click.Path(exists=True, path_type=pathlib.Path))
-@click.option('--release', is_flag=True, default=False,
-              help="Validate a release-level Merkle tree (uses subcrate root hashes as leaves).")
-@click.pass_context
-def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool):
-    """
-    Validate RO-Crate file integrity against its saved Merkle tree.
-
-    Recomputes the SHA-256 Merkle tree from the RO-Crate's current files
-    and compares the result to the root hash stored in ro-crate-merkle-tree.json.
-    Exits 0 if the tree matches, 1 if it does not or if an error occurs.
-    """
+def _load_stored_merkle_tree(ctx, rocrate_path: pathlib.Path) -> Optional[Tuple[pathlib.Path, dict]]:
+    """Resolve a crate directory and read its ro-crate-merkle-tree.json, reporting errors and exiting 1."""
     # Resolve to crate directory
     if rocrate_path.is_dir():
         crate_dir = rocrate_path
@@ -734,7 +744,7 @@ def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool):
     else:
         click.echo("ERROR: Input must be an RO-Crate directory or ro-crate-metadata.json.", err=True)
         ctx.exit(1)
-        return
+        return None
 
     # Load stored tree
     merkle_file = crate_dir / "ro-crate-merkle-tree.json"
@@ -742,20 +752,120 @@ def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool):
         click.echo(f"ERROR: No Merkle tree found at {merkle_file}", err=True)
         click.echo("Run 'build subcrate' or 'build release' first to generate one.", err=True)
         ctx.exit(1)
-        return
+        return None
 
     try:
-        with open(merkle_file) as f:
-            stored_tree = json.load(f)
+        stored_tree = read_merkle_tree(merkle_file)
     except Exception as e:
         click.echo(f"ERROR: Could not read {merkle_file}: {e}", err=True)
         ctx.exit(1)
-        return
+        return None
 
-    stored_root = stored_tree.get("rootHash")
-    if not stored_root:
+    if not stored_tree.get("rootHash"):
         click.echo("ERROR: Stored Merkle tree has no rootHash field.", err=True)
         ctx.exit(1)
+        return None
+    return crate_dir, stored_tree
+
+
+@build_group.command('validate')
+@click.argument('rocrate-path', type=click.Path(exists=True, path_type=pathlib.Path))
+@click.option('--release', is_flag=True, default=False,
+              help="Validate a release-level Merkle tree (uses subcrate root hashes as leaves).")
+@click.option('--file', 'content_url', type=str, default=None,
+              help="Verify only the file with this contentUrl: hash it and check it against the stored root.")
+@click.option('--quick', is_flag=True, default=False,
+              help="Compare each file's size and mtime with those recorded in the tree; hash only files with none recorded.")
+@click.option('--sample', 'sample_percent', type=click.FloatRange(0, 100), default=None,
+              help="Rehash a random PERCENT of the files plus every file whose size or mtime changed.")
+@click.option('--full', is_flag=True, default=False,
+              help="Recompute the whole tree from every file (the default).")
+@click.option('--seed', type=int, default=None, help="Random seed for --sample.")
+@click.pass_context
+def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool, content_url: Optional[str],
+                            quick: bool, sample_percent: Optional[float], full: bool, seed: Optional[int]):
+    """
+    Validate RO-Crate file integrity against its saved Merkle tree.
+
+    Recomputes the SHA-256 Merkle tree from the RO-Crate's current files
+    and compares the result to the root hash stored in ro-crate-merkle-tree.json.
+    With --file, only that file is hashed and checked against the stored root
+    through its inclusion proof.
+
+    \b
+    Cheaper tiers for routine sweeps:
+      --quick       compare recorded sizes/mtimes (hashing only files with none recorded)
+      --sample P    also rehash P% of the files, plus every file whose stat changed
+      --full        rehash everything (default)
+    Each tier lists the files it verified and how (stat or sha256).
+    Exits 0 if the tree matches, 1 if it does not or if an error occurs.
+    """
+    if release and content_url:
+        click.echo("ERROR: --file cannot be combined with --release.", err=True)
+        ctx.exit(1)
+        return
+    if quick + (sample_percent is not None) + full > 1:
+        click.echo("ERROR: Choose only one of --quick, --sample and --full.", err=True)
+        ctx.exit(1)
+        return
+    if (quick or sample_percent is not None) and (release or content_url):
+        click.echo("ERROR: --quick and --sample check a crate's files; they cannot be combined with --release or --file.", err=True)
+        ctx.exit(1)
+        return
+
+    loaded = _load_stored_merkle_tree(ctx, rocrate_path)
+    if loaded is None:
+        return
+    crate_dir, stored_tree = loaded
+    stored_root = stored_tree["rootHash"]
+
+    if content_url:
+        click.echo(f"Validating: {crate_dir} ({content_url})")
+        try:
+            result = verify_file(crate_dir, stored_tree, content_url)
+        except Exception as e:
+            click.echo(f"ERROR: Failed to verify {content_url}: {e}", err=True)
+            ctx.exit(1)
+            return
+
+        if result.ok:
+            click.echo(f"OK  File verified: {result.content_url}")
+            click.echo(f"    Leaf hash: {result.computed_hash}")
+            click.echo(f"    Root hash: {result.root_hash}")
+        else:
+            click.echo(f"FAIL File does not match the Merkle tree: {result.content_url}")
+            click.echo(f"    Stored:   {result.stored_hash}")
+            click.echo(f"    Computed: {result.computed_hash or '(file not found)'}")
+            for start, end in result.byte_ranges or ():
+                click.echo(f"    bytes {start}-{end - 1}")
+            ctx.exit(1)
+        return
+
+    if quick or sample_percent is not None:
+        tier = "quick" if quick else f"sample {sample_percent:g}%"
+        click.echo(f"Validating: {crate_dir} ({tier})")
+        try:
+            result = check_merkle_tree(crate_dir, stored_tree, sample_percent=sample_percent,
+                                       rng=random.Random(seed) if seed is not None else None)
+        except Exception as e:
+            click.echo(f"ERROR: Failed to check files: {e}", err=True)
+            ctx.exit(1)
+            return
+
+        for check in result.files:
+            click.echo(f"    {check.status.upper():<9} {check.method:<6} {check.content_url}")
+        counts = Counter(check.method for check in result.files if check.status != "missing")
+        summary = ", ".join(f"{counts[method]} by {method}" for method in ("sha256", "stat") if counts[method])
+        summary = summary or "no files verified"
+
+        if not result.tree_consistent:
+            click.echo("    Stored leaves do not lead to the stored root hash")
+        if result.ok:
+            click.echo(f"OK  Merkle tree valid ({tier}: {summary})")
+            click.echo(f"    Root hash: {stored_root}")
+        else:
+            click.echo(f"FAIL Merkle tree INVALID ({tier}: {summary})")
+            ctx.exit(1)
         return
 
     # Recompute tree
@@ -764,7 +874,7 @@ def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool):
         if release:
             computed_tree = generate_release_merkle_tree(crate_dir)
         else:
-            computed_tree = generate_merkle_tree(crate_dir)
+            computed_tree = generate_merkle_tree(crate_dir, chunk_size=stored_tree.get("chunkSize"))
     except Exception as e:
         click.echo(f"ERROR: Failed to compute Merkle tree: {e}", err=True)
         ctx.exit(1)
@@ -780,6 +890,7 @@ def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool):
     if stored_root == computed_root:
         click.echo(f"OK  Merkle tree valid")
         click.echo(f"    Root hash: {computed_root}")
+        click.echo(f"    Verified:  {computed_tree['leafCount']} files by sha256")
     else:
         click.echo(f"FAIL Merkle tree INVALID")
         click.echo(f"    Stored:   {stored_root}")
@@ -787,11 +898,11 @@ def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool):
 
         # Report which leaves changed
         stored_leaves = {
-            leaf["contentUrl"]: leaf["sha256"]
+            leaf["contentUrl"]: leaf
             for leaf in stored_tree.get("leaves", [])
         }
         computed_leaves = {
-            leaf["contentUrl"]: leaf["sha256"]
+            leaf["contentUrl"]: leaf
             for leaf in computed_tree.get("leaves", [])
         }
 
@@ -803,7 +914,83 @@ def validate_merkle_command(ctx, rocrate_path: pathlib.Path, release: bool):
                 click.echo(f"    ADDED:   {url}")
             elif c is None:
                 click.echo(f"    REMOVED: {url}")
-            elif s != c:
+            elif s["sha256"] != c["sha256"]:
                 click.echo(f"    CHANGED: {url}")
+                # Chunked files: narrow the change down to byte ranges
+                for start, end in changed_byte_ranges(s, c) or ():
+                    click.echo(f"             bytes {start}-{end - 1}")
 
         ctx.exit(1)
+
+
+@build_group.command('merkle-proof')
+@click.argument('rocrate-path', type=click.Path(exists=True, path_type=pathlib.Path))
+@click.argument('content-url', type=str)
+@click.option('--output', type=click.Path(path_type=pathlib.Path), default=None,
+              help="Write the proof to this file instead of printing it.")
+@click.pass_context
+def merkle_proof_command(ctx, rocrate_path: pathlib.Path, content_url: str, output: Optional[pathlib.Path]):
+    """
+    Emit a Merkle inclusion proof for one file of an RO-Crate.
+
+    The proof is read from the stored ro-crate-merkle-tree.json without
+    hashing any file: it lists the sibling hashes from the file's leaf up to
+    the root, so anyone holding the file and the crate's root hash can verify
+    it with O(log n) hashes.
+    """
+    loaded = _load_stored_merkle_tree(ctx, rocrate_path)
+    if loaded is None:
+        return
+    _, stored_tree = loaded
+
+    try:
+        proof = inclusion_proof(stored_tree, content_url)
+    except ValueError as e:
+        click.echo(f"ERROR: {e}", err=True)
+        ctx.exit(1)
+        return
+
+    if output:
+        write_json_atomic(output, proof)
+        click.echo(f"Merkle proof written to: {output}")
+    else:
+        click.echo(json.dumps(proof, indent=2))
+
+
+@build_group.command('merkle-convert')
+@click.argument('rocrate-path', type=click.Path(exists=True, path_type=pathlib.Path))
+@click.option('--to', 'tree_format', type=click.Choice(MERKLE_TREE_FORMATS), required=True,
+              help="Storage format to convert the Merkle tree to.")
+@click.pass_context
+def merkle_convert_command(ctx, rocrate_path: pathlib.Path, tree_format: str):
+    """
+    Convert a stored Merkle tree between the JSON and binary formats.
+
+    The binary format keeps a small ro-crate-merkle-tree.json header (with
+    the rootHash) and stores the levels and leaves as raw 32-byte digests in
+    ro-crate-merkle-tree.bin. Builds keep whichever format a crate has, and
+    'build validate' reads both.
+    """
+    loaded = _load_stored_merkle_tree(ctx, rocrate_path)
+    if loaded is None:
+        return
+    crate_dir, stored_tree = loaded
+    merkle_file = crate_dir / "ro-crate-merkle-tree.json"
+
+    current_format = merkle_tree_format(merkle_file)
+    if current_format == tree_format:
+        click.echo(f"Merkle tree is already stored as {tree_format}: {merkle_file}")
+        return
+
+    try:
+        write_merkle_tree(merkle_file, stored_tree, tree_format)
+    except Exception as e:
+        click.echo(f"ERROR: Could not write {merkle_file}: {e}", err=True)
+        ctx.exit(1)
+        return
+
+    size = merkle_file.stat().st_size
+    binary_path = binary_path_for(merkle_file)
+    if binary_path.exists():
+        size += binary_path.stat().st_size
+    click.echo(f"Converted Merkle tree from {current_format} to {tree_format} ({format_content_size_bytes(size)})")
@@ -9,6 +9,9 @@ from datetime import datetime
 from fairscape_cli.models.rocrate import (
     GenerateROCrate, ReadROCrateMetadata, AppendCrate, CopyToROCrate, ROCrate
 )
+from fairscape_cli.models.crate_document import compact_crate_journal, read_crate_metadata
+from fairscape_cli.utils.crate_index import build_crate_index, index_path_for
+from fairscape_cli.utils.serialization import write_json_atomic
 from fairscape_cli.models.dataset import GenerateDataset
 from fairscape_cli.models.software import GenerateSoftware
 from fairscape_cli.models.computation import GenerateComputation
@@ -280,16 +283,17 @@ def _resolve_metadata_path(rocrate_path: pathlib.Path) -> pathlib.Path:
     return rocrate_path
 
 
-def _deep_coverage_metrics(release_dir):
+def _deep_coverage_metrics(release_dir, jobs=None, write_sidecars=True):
     """Walk every sub-crate under release_dir and return v2 coverage metrics
     keyed by Evidence attribute name. The crate file is NOT modified — these
     are passed to the scorer and echoed into the AI-Ready score document, so a
     release scores against its full sub-crate content without storing coverage
-    fields on the RO-Crate itself.
+    fields on the RO-Crate itself. Sub-crates re-read along the way get a
+    fresh ro-crate-metrics.json cache unless write_sidecars is False.
     """
     from fairscape_cli.models.rocrate import collect_subcrate_aggregated_metrics
 
-    m = collect_subcrate_aggregated_metrics(release_dir)
+    m = collect_subcrate_aggregated_metrics(release_dir, jobs=jobs, write_sidecars=write_sidecars)
     return {
         "dataset_count": m.dataset_count,
         "software_count": m.software_count,
@@ -320,16 +324,19 @@ def _deep_coverage_metrics(release_dir):
 @click.option('--grader-version', 'grader_version', type=click.Choice(['v1', 'v2']), default='v1',
               show_default=True, help="Which AI-Ready grader to run. v2 is the harsher deterministic grader.")
 @click.option('--deep', is_flag=True, default=False,
-              help="Release crates only: walk every sub-crate from disk to compute fresh coverage metrics before scoring (extra compute, does not modify the crate). Recommended for v2 on a release directory.")
+              help="Release crates only: walk every sub-crate from disk to compute fresh coverage metrics before scoring (extra compute). The release's own metadata is not modified, but each sub-crate that has to be re-read gets a fresh ro-crate-metrics.json cache; pass --no-write-cache to leave sub-crates untouched. Recommended for v2 on a release directory.")
+@click.option('--jobs', type=click.IntRange(min=1), default=1, show_default=True,
+              help="With --deep: worker processes that read sub-crates in parallel.")
+@click.option('--no-write-cache', 'no_write_cache', is_flag=True, default=False,
+              help="With --deep: reuse current ro-crate-metrics.json caches but do not write or refresh any.")
 @click.option('--json', 'json_out', type=click.Path(path_type=pathlib.Path), default=None,
               help="Write the full score as JSON to this path instead of a summary table.")
-def score(rocrate_path, grader_version, deep, json_out):
+def score(rocrate_path, grader_version, deep, jobs, no_write_cache, json_out):
     """Compute the deterministic AI-Ready score for an RO-Crate."""
     ctx = click.get_current_context()
     metadata_path = _resolve_metadata_path(rocrate_path)
     try:
-        with metadata_path.open("r") as f:
-            crate_dict = json.load(f)
+        crate_dict = read_crate_metadata(metadata_path)
     except Exception as exc:
         click.echo(f"ERROR reading RO-Crate metadata at {metadata_path}: {exc}", err=True)
         ctx.exit(code=1)
@@ -339,7 +346,7 @@ def score(rocrate_path, grader_version, deep, json_out):
         release_dir = rocrate_path if rocrate_path.is_dir() else metadata_path.parent
         click.echo(f"Walking sub-crates under {release_dir} for deep coverage metrics ...", err=True)
         try:
-            aggregate_metrics = _deep_coverage_metrics(release_dir)
+            aggregate_metrics = _deep_coverage_metrics(release_dir, jobs=jobs, write_sidecars=not no_write_cache)
         except Exception as exc:
             click.echo(f"WARNING: deep metric collection failed ({exc}); scoring inline graph only.", err=True)
 
@@ -355,7 +362,7 @@ def score(rocrate_path, grader_version, deep, json_out):
         ctx.exit(code=1)
 
     if json_out is not None:
-        json_out.write_text(result.model_dump_json(indent=2))
+        write_json_atomic(json_out, result.model_dump(mode="json"))
         click.echo(f"Wrote {grader_version} AI-Ready score to {json_out}")
         return
 
@@ -370,6 +377,51 @@ def score(rocrate_path, grader_version, deep, json_out):
         click.echo(result.model_dump_json(indent=2))
 
 
+@rocrate_group.command('compact')
+@click.argument('rocrate-path', type=click.Path(exists=True, path_type=pathlib.Path))
+@click.pass_context
+def compact(ctx, rocrate_path):
+    """Fold ro-crate-metadata.journal.jsonl back into ro-crate-metadata.json.
+
+    Journal mode (FAIRSCAPE_CRATE_JOURNAL=1) appends each write to the journal
+    instead of rewriting the metadata file; this rewrites the file once and
+    removes the journal.
+    """
+    metadata_path = _resolve_metadata_path(rocrate_path)
+    try:
+        applied = compact_crate_journal(metadata_path)
+    except Exception as exc:
+        click.echo(f"ERROR compacting RO-Crate journal: {exc}", err=True)
+        ctx.exit(code=1)
+
+    if applied:
+        click.echo(f"Compacted {applied} journal record(s) into {metadata_path}")
+    else:
+        click.echo(f"No journal to compact for {metadata_path}")
+
+
+@rocrate_group.command('index')
+@click.argument('rocrate-path', type=click.Path(exists=True, path_type=pathlib.Path))
+@click.pass_context
+def index(ctx, rocrate_path):
+    """Build the ro-crate-metadata.idx sidecar for O(1) entity lookups.
+
+    The index maps each @id to its byte span in ro-crate-metadata.json.
+    Once it exists, metadata writes keep it up to date and single-entity
+    updates (e.g. UpdateCrate, subcrate linking) seek to the entity instead
+    of parsing the whole file.
+    """
+    metadata_path = _resolve_metadata_path(rocrate_path)
+    try:
+        compact_crate_journal(metadata_path)
+        crate_index = build_crate_index(metadata_path)
+    except Exception as exc:
+        click.echo(f"ERROR building RO-Crate index: {exc}", err=True)
+        ctx.exit(code=1)
+
+    click.echo(f"Indexed {len(crate_index['entities'])} entities in {index_path_for(metadata_path)}")
+
+
 @rocrate_group.group('register')
 def register():
     """Add a metadata record to the RO-Crate for a Dataset, Software, or Computation (metadata only)."""
@@ -25,6 +25,7 @@ from fairscape_cli.tracking.metadata_generator import create_metadata_generator
 @click.option('--execution-name', type=str, default=None, help='Name for this execution (default: script filename)')
 @click.option('--reference-crate', 'reference_crates', multiple=True, type=click.Path(exists=True, path_type=pathlib.Path), help='Reference RO-Crate(s) to look up existing ARKs for input files')
 @click.option('--start-clean', is_flag=True, default=False, help='Clear existing @graph entries (except root) before tracking')
+@click.option('--journal', is_flag=True, default=False, help='Append new entities to ro-crate-metadata.journal.jsonl instead of rewriting the metadata file (fold back with "rocrate compact")')
 @click.argument('script_args', nargs=-1, type=click.UNPROCESSED)
 @click.pass_context
 def track(
@@ -39,6 +40,7 @@ def track(
     execution_name: str,
     reference_crates: Tuple[pathlib.Path, ...],
     start_clean: bool,
+    journal: bool,
     script_args: Tuple[str, ...]
 ):
     """Track execution of a Python script and generate provenance metadata.
@@ -157,7 +159,8 @@ def track(
         manual_inputs=list(manual_inputs),
         use_llm=use_llm,
         reference_crates=list(reference_crates),
-        start_clean=start_clean
+        start_clean=start_clean,
+        journal=journal
     )
     
     try:
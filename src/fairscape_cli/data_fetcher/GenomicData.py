@@ -102,8 +102,8 @@ class Outputs(BaseModel):
 from fairscape_cli.data_fetcher.cell_line_api import get_cell_line_entity
 from fairscape_cli.data_fetcher.bioproject_fetcher import fetch_bioproject_data
 
-from fairscape_cli.models.rocrate import GenerateROCrate, AppendCrate
-from fairscape_cli.utils.serialization import prune_none
+from fairscape_cli.models.rocrate import GenerateROCrate
+from fairscape_cli.models.crate_document import CrateDocument
 from fairscape_cli.models.dataset import GenerateDataset
 from fairscape_cli.models.experiment import GenerateExperiment
 from fairscape_cli.models.instrument import GenerateInstrument
@@ -323,47 +323,19 @@ class GenomicData(BaseModel):
         models_to_append = [elem for elem in all_elements_to_append if hasattr(elem, 'model_dump')]
         dicts_to_append = [elem for elem in all_elements_to_append if not hasattr(elem, 'model_dump')]
 
-        if models_to_append:
-             AppendCrate(cratePath=output_path, elements=models_to_append)
-
-        if dicts_to_append:
-            metadata_file_path = output_path / "ro-crate-metadata.json"
-            with metadata_file_path.open("r+") as f:
-                crate_json = json.load(f)
-                existing_ids = {item.get("@id") for item in crate_json["@graph"]}
-                root_dataset_node = crate_json["@graph"][1]
-
-                for entity_dict in dicts_to_append:
-                    entity_id = entity_dict.get("@id")
-                    if entity_id and entity_id not in existing_ids:
-                        crate_json["@graph"].append(entity_dict)
-                        existing_ids.add(entity_id)
-                        if not any(part.get("@id") == entity_id for part in root_dataset_node.get("hasPart",[])):
-                             if "hasPart" not in root_dataset_node: root_dataset_node["hasPart"] = []
-                             root_dataset_node["hasPart"].append({"@id": entity_id})
-
-                f.seek(0)
-                json.dump(prune_none(crate_json), f, indent=2)
-                f.truncate()
-
-
-        metadata_file_path = output_path / "ro-crate-metadata.json"
-        with metadata_file_path.open("r+") as f:
-            crate_json_final = json.load(f)
-            graph = crate_json_final["@graph"]
-            updated = False
-            for i, item in enumerate(graph):
-                item_id = item.get("@id")
-                matching_exp_obj = next((exp for acc, exp in experiment_fairscape_objects.items() if exp.guid == item_id and exp.generated), None)
-                if matching_exp_obj:
-                    graph[i]["generated"] = [gen for gen in matching_exp_obj.generated]
-                    updated = True
-
-            if updated:
-                f.seek(0)
-                json.dump(prune_none(crate_json_final), f, indent=2)
-                f.truncate()
+        with CrateDocument(output_path) as crate_document:
+            crate_document.append(models_to_append)
+            # Plain-dict entities (e.g. cell lines) may repeat across samples.
+            crate_document.append(
+                entity_dict for entity_dict in dicts_to_append
+                if entity_dict.get("@id") and entity_dict["@id"] not in crate_document
+            )
 
+            for exp_obj in experiment_fairscape_objects.values():
+                entity = crate_document.get(exp_obj.guid)
+                if entity is not None and exp_obj.generated:
+                    entity["generated"] = [gen for gen in exp_obj.generated]
+                    crate_document.mark_dirty(exp_obj.guid)
 
         return crate_root_guid
 
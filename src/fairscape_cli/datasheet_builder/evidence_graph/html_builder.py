@@ -5,14 +5,26 @@ application JavaScript in evidence_graph.js next to it. React, ReactDOM and
 dagre are vendored under templates/evidence_graph/vendor/ and inlined into the
 output, so the generated file is a single offline-shareable HTML document with
 no CDN dependency.
+
+With `shared_assets_dir` the vendor bundle and the application JavaScript are
+instead written once into that directory under content-hashed names
+(`write_shared_assets`) and each page loads them with a relative
+<script src>, which keeps the page small when a release has many of them.
+The scripts and the compiled template are read once per process.
 """
 import argparse
+import functools
+import hashlib
 import json
 import logging
+import os
 from pathlib import Path
+from typing import Dict, Tuple
 
 from jinja2 import Environment, FileSystemLoader
 
+from fairscape_cli.utils.serialization import open_atomic
+
 logger = logging.getLogger(__name__)
 
 TEMPLATE_DIR = Path(__file__).parent.parent / 'templates' / 'evidence_graph'
@@ -28,7 +40,57 @@ def _inline_script_safe(js: str) -> str:
     return js.replace('</script', '<\\/script')
 
 
-def generate_evidence_graph_html(rocrate_path, output_path=None):
+@functools.lru_cache(maxsize=None)
+def _scripts() -> Tuple[str, str]:
+    """(vendor bundle, application JS), read once per process."""
+    vendor_js = ';\n'.join(
+        (TEMPLATE_DIR / name).read_text(encoding='utf-8') for name in VENDOR_FILES
+    )
+    app_js = (TEMPLATE_DIR / 'evidence_graph.js').read_text(encoding='utf-8')
+    return vendor_js, app_js
+
+
+@functools.lru_cache(maxsize=None)
+def _inline_scripts() -> Tuple[str, str]:
+    vendor_js, app_js = _scripts()
+    return _inline_script_safe(vendor_js), _inline_script_safe(app_js)
+
+
+@functools.lru_cache(maxsize=None)
+def _template():
+    # autoescape stays off: everything injected is our own JS or the
+    # pre-escaped JSON built in generate_evidence_graph_html.
+    env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)), autoescape=False)
+    return env.get_template('evidence_graph.html.j2')
+
+
+@functools.lru_cache(maxsize=None)
+def shared_asset_names() -> Dict[str, str]:
+    """File names of the shared scripts, e.g. {'vendor': 'evidence-graph-vendor.<hash>.js', 'app': ...}."""
+    vendor_js, app_js = _scripts()
+    return {
+        kind: f"evidence-graph-{kind}.{hashlib.sha256(js.encode('utf-8')).hexdigest()[:16]}.js"
+        for kind, js in (('vendor', vendor_js), ('app', app_js))
+    }
+
+
+def write_shared_assets(directory) -> Dict[str, Path]:
+    """Write the shared scripts into `directory` unless already there; returns their paths by kind."""
+    directory = Path(directory)
+    vendor_js, app_js = _scripts()
+    paths = {}
+    for kind, js in (('vendor', vendor_js), ('app', app_js)):
+        path = directory / shared_asset_names()[kind]
+        # The name is derived from the content, so an existing file is current.
+        if not path.is_file():
+            directory.mkdir(parents=True, exist_ok=True)
+            with open_atomic(path) as f:
+                f.write(js.encode('utf-8'))
+        paths[kind] = path
+    return paths
+
+
+def generate_evidence_graph_html(rocrate_path, output_path=None, shared_assets_dir=None):
     """
     Generate a standalone HTML file containing an interactive React
     visualization of the evidence graph extracted from an RO-Crate.
@@ -37,6 +99,8 @@ def generate_evidence_graph_html(rocrate_path, output_path=None):
         rocrate_path: Path to the RO-Crate metadata.json file
         output_path: Path where the HTML output should be saved
             (default: same path as input with .html extension)
+        shared_assets_dir: If given, load the scripts from shared files in
+            this directory (written if missing) instead of inlining them
 
     Returns:
         Path to the generated HTML file as str, or None on failure.
@@ -61,24 +125,26 @@ def generate_evidence_graph_html(rocrate_path, output_path=None):
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    vendor_js = ';\n'.join(
-        (TEMPLATE_DIR / name).read_text(encoding='utf-8') for name in VENDOR_FILES
-    )
-    app_js = (TEMPLATE_DIR / 'evidence_graph.js').read_text(encoding='utf-8')
-
     # Escaping '<' keeps the JSON valid JS while preventing a '</script>' (or
     # '<!--') inside metadata values from terminating the script tag.
     graph_json = json.dumps(rocrate_data).replace('<', '\\u003c')
 
-    # autoescape stays off: everything injected is our own JS or the
-    # pre-escaped JSON above.
-    env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)), autoescape=False)
-    template = env.get_template('evidence_graph.html.j2')
-    html_content = template.render(
+    scripts = {}
+    if shared_assets_dir is not None:
+        try:
+            asset_paths = write_shared_assets(shared_assets_dir)
+        except OSError:
+            logger.error("Error writing shared evidence graph assets to %s", shared_assets_dir, exc_info=True)
+            return None
+        for kind, path in asset_paths.items():
+            scripts[f'{kind}_src'] = Path(os.path.relpath(path, output_path.parent)).as_posix()
+    else:
+        scripts['vendor_js'], scripts['app_js'] = _inline_scripts()
+
+    html_content = _template().render(
         title='Evidence Graph Visualization',
-        vendor_js=_inline_script_safe(vendor_js),
         graph_json=graph_json,
-        app_js=_inline_script_safe(app_js),
+        **scripts,
     )
 
     try:
@@ -12,7 +12,7 @@ from fairscape_models.rocrate import ROCrateV1_2
 from fairscape_models.conversion.mapping.subcrate_utils import normalize_formats
 from fairscape_models.conversion.mapping.AIReady import score_rocrate
 from fairscape_models.conversion.models.AIReady import AIReadyScore
-from fairscape_cli.utils.serialization import model_dump_pruned
+from fairscape_cli.utils.serialization import model_dump_pruned, write_json_atomic
 from fairscape_cli.utils.rocrate_helpers import get_root_entity
 
 
@@ -192,8 +192,7 @@ class SummarySectionGenerator:
     def save_aiready_score(self, raw_score: AIReadyScore, output_path: Path) -> None:
         """Save the AI-Ready score to a JSON file."""
         score_dict = model_dump_pruned(raw_score)
-        with open(output_path, 'w') as f:
-            json.dump(score_dict, f, indent=2)
+        write_json_atomic(output_path, score_dict)
 
     def generate(self, crate: ROCrateV1_2, output_dir: Optional[Path] = None) -> str:
         """Generate the summary section HTML.
@@ -1,7 +1,6 @@
 import pathlib
 import json
 from typing import List, Dict, Tuple, Set, Any
-from fairscape_cli.utils.serialization import prune_none
 
 def extract_datasets_from_graph(graph: List[Dict]) -> List[Tuple[str, bool]]:
     """
@@ -121,6 +120,10 @@ def calculate_inputs_outputs(graph: List[Dict]) -> Tuple[List[Dict[str, str]], L
 def add_inputs_outputs_to_rocrate(rocrate_path: pathlib.Path) -> Tuple[bool, str]:
     """
     Add EVI:inputs and EVI:outputs to the root dataset entity of an RO-Crate.
+
+    Inside an open CrateDocument session for the crate (as during `build`)
+    the session's root is updated; otherwise the metadata is loaded and
+    written once here, and only if the inputs or outputs changed.
     
     Args:
         rocrate_path: Path to the RO-Crate directory
@@ -128,49 +131,43 @@ def add_inputs_outputs_to_rocrate(rocrate_path: pathlib.Path) -> Tuple[bool, str
     Returns:
         Tuple of (success, message)
     """
+    from fairscape_cli.models.crate_document import CrateDocument
+
     metadata_path = rocrate_path / "ro-crate-metadata.json"
     
     if not metadata_path.exists():
         return False, f"RO-Crate metadata file not found at {metadata_path}"
     
     try:
-        with open(metadata_path, 'r') as f:
-            metadata = json.load(f)
-        
-        graph = metadata.get("@graph", [])
-        if not graph:
-            return False, "RO-Crate metadata has no @graph"
-        
-        inputs, outputs = calculate_inputs_outputs(graph)
-        
-        root_dataset = None
-        root_index = -1
-        for i, entity in enumerate(graph):
-            entity_type = entity.get("@type")
-            if isinstance(entity_type, list):
-                entity_type = entity_type[-1]
-            if "https://w3id.org/EVI#ROCrate" in entity_type:
-                if entity.get("@id") != "ro-crate-metadata.json":
-                    root_dataset = entity
-                    root_index = i
-                    break
-            elif entity_type == "Dataset":
-                if entity.get("@id") != "ro-crate-metadata.json":
-                    root_dataset = entity
-                    root_index = i
-                    break
-        
-        if root_dataset is None:
-            return False, "Could not find root dataset entity in RO-Crate"
-        
-        root_dataset["https://w3id.org/EVI#inputs"] = inputs
-        root_dataset["https://w3id.org/EVI#outputs"] = outputs
-        
-        graph[root_index] = root_dataset
-        metadata["@graph"] = graph
-        
-        with open(metadata_path, 'w') as f:
-            json.dump(prune_none(metadata), f, indent=2)
+        with CrateDocument.open(metadata_path) as crate:
+            graph = crate.graph
+            if not graph:
+                return False, "RO-Crate metadata has no @graph"
+            
+            inputs, outputs = calculate_inputs_outputs(graph)
+            
+            root_dataset = None
+            for entity in graph:
+                entity_type = entity.get("@type")
+                if isinstance(entity_type, list):
+                    entity_type = entity_type[-1]
+                if "https://w3id.org/EVI#ROCrate" in entity_type:
+                    if entity.get("@id") != "ro-crate-metadata.json":
+                        root_dataset = entity
+                        break
+                elif entity_type == "Dataset":
+                    if entity.get("@id") != "ro-crate-metadata.json":
+                        root_dataset = entity
+                        break
+            
+            if root_dataset is None:
+                return False, "Could not find root dataset entity in RO-Crate"
+            
+            if (root_dataset.get("https://w3id.org/EVI#inputs") != inputs
+                    or root_dataset.get("https://w3id.org/EVI#outputs") != outputs):
+                root_dataset["https://w3id.org/EVI#inputs"] = inputs
+                root_dataset["https://w3id.org/EVI#outputs"] = outputs
+                crate.mark_dirty(root_dataset.get("@id"))
         
         input_count = len(inputs)
         output_count = len(outputs)
@@ -1,12 +1,26 @@
 import pathlib
 import json
-from fairscape_cli.utils.serialization import prune_none
-from typing import List, Tuple, Dict, Any
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple, Dict, Any, Set
 from rdflib import Graph, URIRef
 from rdflib.namespace import OWL
 
+from fairscape_cli.utils.hash_cache import file_digest
+from fairscape_cli.utils.serialization import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
 EVI_NAMESPACE = "https://w3id.org/EVI#"
 
+ONTOLOGY_CACHE_DIR_ENV_VAR = "FAIRSCAPE_ONTOLOGY_CACHE_DIR"
+INVERSE_TABLE_VERSION = 1
+
+InversePairs = Tuple[Tuple[URIRef, URIRef], ...]
+
+# Compiled inverse tables by ontology SHA-256, shared by every crate a process augments.
+_inverse_tables: Dict[str, InversePairs] = {}
+
 def get_json_key_from_uri(uri_ref: URIRef, base_namespace: str = EVI_NAMESPACE) -> str:
     """
     Converts an RDF URI to a simple JSON key by stripping the base namespace.
@@ -52,6 +66,211 @@ def add_or_update_json_link(
             entity[prop_key] = [link_obj_to_add]
 
 
+def load_inverse_pairs(ontology_path: pathlib.Path) -> List[Tuple[URIRef, URIRef]]:
+    """
+    Parse an OWL ontology and return its owl:inverseOf property pairs,
+    each pair listed once.
+
+    Raises whatever rdflib raises if the ontology cannot be parsed.
+    """
+    ont_graph = Graph()
+    ont_graph.parse(str(ontology_path), format="xml")
+
+    inverse_pairs: List[Tuple[URIRef, URIRef]] = []
+    query = """
+        PREFIX owl: <http://www.w3.org/2002/07/owl#>
+        SELECT ?prop1 ?prop2 WHERE { ?prop1 owl:inverseOf ?prop2 . }
+    """
+    for row in ont_graph.query(query):
+        prop1, prop2 = row["prop1"], row["prop2"]
+        if str(prop1) < str(prop2):
+             inverse_pairs.append((prop1, prop2))
+        elif (prop2,prop1) not in inverse_pairs :
+             inverse_pairs.append((prop1, prop2))
+    return inverse_pairs
+
+
+def ontology_cache_dir() -> pathlib.Path:
+    """Where compiled ontology tables are kept: ``$XDG_CACHE_HOME/fairscape/ontologies``
+    (default ``~/.cache``), or ``FAIRSCAPE_ONTOLOGY_CACHE_DIR``."""
+    override = os.environ.get(ONTOLOGY_CACHE_DIR_ENV_VAR)
+    if override:
+        return pathlib.Path(override).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(cache_home) / "fairscape" / "ontologies"
+
+
+def _read_inverse_table(table_path: pathlib.Path, digest: str) -> Optional[InversePairs]:
+    try:
+        with open(table_path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != INVERSE_TABLE_VERSION or data.get("ontologySha256") != digest:
+            return None
+        return tuple((URIRef(prop1), URIRef(prop2)) for prop1, prop2 in data["inversePairs"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def compiled_inverse_pairs(ontology_path: pathlib.Path) -> InversePairs:
+    """
+    `load_inverse_pairs`, compiled once per ontology content.
+
+    Parsing the ontology with rdflib costs far more than augmenting a crate,
+    so the table is keyed by the file's SHA-256 and kept both in memory and
+    as JSON under `ontology_cache_dir()`; later calls, processes and runs
+    load it from there. If the cache cannot be written the table is still
+    returned.
+    """
+    digest = file_digest(ontology_path, "sha256")
+    table = _inverse_tables.get(digest)
+    if table is not None:
+        return table
+
+    table_path = ontology_cache_dir() / f"inverse-pairs-{digest}.json"
+    table = _read_inverse_table(table_path, digest)
+    if table is None:
+        table = tuple(load_inverse_pairs(ontology_path))
+        try:
+            table_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(table_path, {
+                "version": INVERSE_TABLE_VERSION,
+                "ontologySha256": digest,
+                "inversePairs": [[str(prop1), str(prop2)] for prop1, prop2 in table],
+            })
+        except OSError as exc:
+            logger.warning(f"Could not cache inverse properties at {table_path}: {exc}")
+    _inverse_tables[digest] = table
+    return table
+
+
+def _linked_ids(value: Any) -> Set[Any]:
+    """The @ids a property value already links to, as `add_or_update_json_link` compares them."""
+    items = value if isinstance(value, list) else [value]
+    linked = set()
+    for item in items:
+        if isinstance(item, dict):
+            try:
+                linked.add(item.get("@id"))
+            except TypeError:
+                # An unhashable @id never equals an entity's @id.
+                pass
+    return linked
+
+
+def _add_inverse_link(
+    entity: Dict[str, Any],
+    prop_key: str,
+    link_id_to_add: str,
+    linked: Optional[Set[Any]]
+) -> Tuple[bool, Set[Any]]:
+    """
+    `add_or_update_json_link`, using `linked` (the @ids entity[prop_key]
+    links to, or None if not known yet) instead of scanning the value.
+
+    Returns whether the entity changed, and the updated id set.
+    """
+    link_obj_to_add = {"@id": link_id_to_add}
+
+    if prop_key not in entity:
+        entity[prop_key] = [link_obj_to_add]
+        return True, {link_id_to_add}
+
+    current_val = entity[prop_key]
+    if isinstance(current_val, dict):
+        if current_val.get("@id") == link_id_to_add:
+            return False, _linked_ids(current_val)
+        entity[prop_key] = [current_val, link_obj_to_add]
+        return True, _linked_ids(current_val) | {link_id_to_add}
+    if isinstance(current_val, list):
+        if linked is None:
+            linked = _linked_ids(current_val)
+        if link_id_to_add in linked:
+            return False, linked
+        current_val.append(link_obj_to_add)
+        linked.add(link_id_to_add)
+        return True, linked
+
+    entity[prop_key] = [link_obj_to_add]
+    return True, {link_id_to_add}
+
+
+def link_inverses_in_graph(
+    graph: List[Dict[str, Any]],
+    inverse_pairs: Sequence[Tuple[URIRef, URIRef]],
+    default_namespace_prefix: str = EVI_NAMESPACE
+) -> Tuple[int, Set[str]]:
+    """
+    Ensure both sides of every inverse property pair are present on the
+    entities of an RO-Crate @graph, editing the entity dicts in place.
+
+    Pairs are applied in order, and within a pair the entities in graph
+    order, forward property before inverse, so links are appended in the
+    same order as a pair-by-pair, entity-by-entity scan would add them.
+    One pass over the graph finds the entities carrying each property;
+    each pair then only visits those, collects its links and adds them,
+    checking for existing links against per-entity id sets.
+
+    Returns (number of modifications, @ids of the modified entities).
+    """
+    entity_map: Dict[str, Dict[str, Any]] = {
+        entity['@id']: entity
+        for entity in graph
+        if isinstance(entity, dict) and '@id' in entity
+    }
+    entities = list(entity_map.values())
+    positions = {entity_id: index for index, entity_id in enumerate(entity_map)}
+
+    # Determine JSON keys. Prioritize default_namespace_prefix.
+    key_pairs = [
+        (get_json_key_from_uri(prop1_uri, default_namespace_prefix),
+         get_json_key_from_uri(prop2_uri, default_namespace_prefix))
+        for prop1_uri, prop2_uri in inverse_pairs
+    ]
+    carriers: Dict[str, Set[int]] = {key: set() for pair in key_pairs for key in pair}
+    for index, entity in enumerate(entities):
+        for key in entity:
+            if key in carriers:
+                carriers[key].add(index)
+
+    linked: Dict[Tuple[str, str], Set[Any]] = {}
+    modified_count = 0
+    modified_ids: Set[str] = set()
+
+    for json_prop1_key, json_prop2_key in key_pairs:
+        edges: List[Tuple[str, str, str]] = []
+        for index in sorted(carriers[json_prop1_key] | carriers[json_prop2_key]):
+            source_entity = entities[index]
+            source_entity_id = source_entity.get("@id")
+            if not source_entity_id:
+                continue
+            for key, inverse_key in ((json_prop1_key, json_prop2_key), (json_prop2_key, json_prop1_key)):
+                if key not in source_entity:
+                    continue
+                values = source_entity[key]
+                if not isinstance(values, list):
+                    values = [values]
+                for val_obj in values:
+                    if isinstance(val_obj, dict) and "@id" in val_obj and val_obj["@id"] in entity_map:
+                        edges.append((val_obj["@id"], inverse_key, source_entity_id))
+
+        # Links added while applying a pair only ever mirror links already
+        # collected for it, so collecting before applying loses nothing.
+        for target_id, inverse_key, source_entity_id in edges:
+            target_entity = entity_map[target_id]
+            index_key = (target_id, inverse_key)
+            created = inverse_key not in target_entity
+            changed, linked[index_key] = _add_inverse_link(
+                target_entity, inverse_key, source_entity_id, linked.get(index_key)
+            )
+            if changed:
+                modified_count += 1
+                modified_ids.add(target_id)
+                if created:
+                    carriers[inverse_key].add(positions[target_id])
+
+    return modified_count, modified_ids
+
+
 def augment_rocrate_with_inverses(
     rocrate_path: pathlib.Path,
     ontology_path: pathlib.Path,
@@ -62,6 +281,11 @@ def augment_rocrate_with_inverses(
     ontology and ensuring both sides of the relationship are present in the
     RO-Crate's JSON-LD metadata.
 
+    Inside an open CrateDocument session for the crate (as during `build`)
+    the session's graph is edited and written, and validated, when the
+    session ends; otherwise the metadata is loaded and written once here
+    without schema validation.
+
     Args:
         rocrate_path: Path to the 'ro-crate-metadata.json' file or its parent directory.
         ontology_path: Path to the OWL ontology file (e.g., EVI.owl).
@@ -70,6 +294,8 @@ def augment_rocrate_with_inverses(
     Returns:
         True if augmentation was successful (or no changes needed), False otherwise.
     """
+    from fairscape_cli.models.crate_document import VALIDATION_NONE, CrateDocument
+
     if not ontology_path.is_file():
         return False
 
@@ -86,118 +312,31 @@ def augment_rocrate_with_inverses(
         print(f"Error: 'ro-crate-metadata.json' not found at {metadata_file_path}")
         return False
 
-    # 1. Load EVI ontology
-    ont_graph = Graph()
+    # 1. Load EVI ontology and identify inverse property pairs
     try:
-        ont_graph.parse(str(ontology_path), format="xml") 
+        inverse_pairs = compiled_inverse_pairs(ontology_path)
     except Exception as e:
         print(f"Error parsing ontology {ontology_path}: {e}")
         return False
 
-    # 2. Identify inverse property pairs from the ontology
-    inverse_pairs: List[Tuple[URIRef, URIRef]] = []
-    query = """
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        SELECT ?prop1 ?prop2 WHERE { ?prop1 owl:inverseOf ?prop2 . }
-    """
-    for row in ont_graph.query(query):
-        prop1, prop2 = row["prop1"], row["prop2"]
-        if str(prop1) < str(prop2):
-             inverse_pairs.append((prop1, prop2))
-        elif (prop2,prop1) not in inverse_pairs :
-             inverse_pairs.append((prop1, prop2))
-
-
     if not inverse_pairs:
         print("No owl:inverseOf property pairs found in the ontology.")
         return True
 
-    # 3. Load RO-Crate JSON
+    # 2. Augment the crate's graph; the session writes it if anything changed
     try:
-        with open(metadata_file_path, 'r') as f:
-            json_data = json.load(f)
+        with CrateDocument.open(metadata_file_path, validation=VALIDATION_NONE, ensure_ascii=False) as crate:
+            modified_count, modified_ids = link_inverses_in_graph(
+                crate.graph, inverse_pairs, default_namespace_prefix
+            )
+            for entity_id in modified_ids:
+                crate.mark_dirty(entity_id)
     except Exception as e:
-        print(f"Error loading RO-Crate JSON from {metadata_file_path}: {e}")
+        print(f"Error augmenting RO-Crate JSON at {metadata_file_path}: {e}")
         return False
 
-    if "@graph" not in json_data or not isinstance(json_data["@graph"], list):
-        print("Error: RO-Crate JSON does not have a valid '@graph' list.")
-        return False
-
-    entity_map: Dict[str, Dict[str, Any]] = {
-        entity['@id']: entity
-        for entity in json_data['@graph']
-        if isinstance(entity, dict) and '@id' in entity
-    }
-
-    modified_count = 0
-
-    # 4. Iterate and augment based on inverse pairs
-    for prop1_uri, prop2_uri in inverse_pairs:
-        # Determine JSON keys. Prioritize default_namespace_prefix.
-        json_prop1_key = get_json_key_from_uri(prop1_uri, default_namespace_prefix)
-        json_prop2_key = get_json_key_from_uri(prop2_uri, default_namespace_prefix)
-
-        for entity_id, source_entity in list(entity_map.items()):
-            source_entity_id = source_entity.get("@id")
-            if not source_entity_id:
-                continue
-
-            # Check forward direction (prop1_uri exists on source_entity)
-            if json_prop1_key in source_entity:
-                values = source_entity[json_prop1_key]
-                if not isinstance(values, list):
-                    values = [values] 
-
-                for val_obj in values:
-                    if isinstance(val_obj, dict) and "@id" in val_obj:
-                        target_id = val_obj["@id"]
-                        if target_id in entity_map:
-                            target_entity = entity_map[target_id]
-                            original_target_prop_val = target_entity.get(json_prop2_key)
-                            if original_target_prop_val is not None:
-                                original_target_prop_val = json.dumps(original_target_prop_val, sort_keys=True)
-
-                            add_or_update_json_link(target_entity, json_prop2_key, source_entity_id)
-
-                            new_target_prop_val = target_entity.get(json_prop2_key)
-                            if new_target_prop_val is not None:
-                                new_target_prop_val = json.dumps(new_target_prop_val, sort_keys=True)
-
-                            if original_target_prop_val != new_target_prop_val:
-                                modified_count +=1
-
-            # Check reverse direction (prop2_uri exists on source_entity)
-            if json_prop2_key in source_entity:
-                values = source_entity[json_prop2_key]
-                if not isinstance(values, list):
-                    values = [values] 
-
-                for val_obj in values:
-                    if isinstance(val_obj, dict) and "@id" in val_obj:
-                        target_id = val_obj["@id"]
-                        if target_id in entity_map:
-                            target_entity = entity_map[target_id]
-                            original_target_prop_val = target_entity.get(json_prop1_key)
-                            if original_target_prop_val is not None:
-                                original_target_prop_val = json.dumps(original_target_prop_val, sort_keys=True)
-
-                            add_or_update_json_link(target_entity, json_prop1_key, source_entity_id)
-
-                            new_target_prop_val = target_entity.get(json_prop1_key)
-                            if new_target_prop_val is not None:
-                                new_target_prop_val = json.dumps(new_target_prop_val, sort_keys=True)
-
-                            if original_target_prop_val != new_target_prop_val:
-                                modified_count +=1
     if modified_count > 0:
-        try:
-            with open(metadata_file_path, 'w') as f:
-                json.dump(prune_none(json_data), f, indent=2, ensure_ascii=False)
-            print(f"RO-Crate '{metadata_file_path}' augmented with inverse properties. {modified_count} modifications made.")
-        except Exception as e:
-            print(f"Error saving augmented RO-Crate JSON to {metadata_file_path}: {e}")
-            return False
+        print(f"RO-Crate '{metadata_file_path}' augmented with inverse properties. {modified_count} modifications made.")
     else:
         print(f"No inverse properties needed to be added or RO-Crate '{metadata_file_path}' is already consistent.")
 
@@ -16,12 +16,15 @@ from __future__ import annotations
 import logging
 import pathlib
 import re
-from typing import Any, Iterable
+from typing import TYPE_CHECKING, Any, Iterable, NamedTuple
 
 from fairscape_graph_tools.pipeline.graph_utils import _is_rocrate_root, flexible_ark_query
 
 from fairscape_cli.models.rocrate import ReadROCrateMetadata
 
+if TYPE_CHECKING:
+    from fairscape_cli.interpret.release_index import ReleaseGraphIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,17 +38,76 @@ def _as_dict(item: Any) -> dict:
     return item
 
 
+class CrateNodes(NamedTuple):
+    """One crate's @graph, flattened and id-keyed.
+
+    `nodes` keeps the first entry for each @id (the metadata descriptor
+    excluded), `dataset_stats` the statistics of those nodes that carry
+    any, and `root_id`/`root_name` describe the first RO-Crate root node.
+    """
+    crate_dir: pathlib.Path
+    nodes: dict[str, dict]
+    dataset_stats: dict[str, dict]
+    root_id: str | None
+    root_name: str
+    graph_size: int
+
+
+def read_crate_nodes(crate_path: pathlib.Path) -> CrateNodes:
+    """Read and flatten one crate (a directory or its ro-crate-metadata.json)."""
+    crate_path = pathlib.Path(crate_path)
+    crate_dir = (
+        crate_path.parent
+        if crate_path.is_file()
+        else crate_path
+    )
+    metadata = ReadROCrateMetadata(crate_path)
+    graph = metadata.get("@graph", []) or []
+
+    nodes: dict[str, dict] = {}
+    dataset_stats: dict[str, dict] = {}
+    root_id: str | None = None
+    root_name = ""
+    for item in graph:
+        node = _as_dict(item)
+        node_id = node.get("@id")
+        if not node_id or node_id == "ro-crate-metadata.json":
+            continue
+        if node_id in nodes:
+            continue
+        nodes[node_id] = node
+
+        if root_id is None and _is_rocrate_root(node):
+            root_id = node_id
+            root_name = node.get("name", "") or ""
+
+        desc = node.get("descriptiveStatistics")
+        split = node.get("splitStatistics")
+        if desc or split:
+            dataset_stats[node_id] = {
+                "descriptiveStatistics": desc or {},
+                "splitStatistics": split or {},
+            }
+
+    return CrateNodes(crate_dir, nodes, dataset_stats, root_id, root_name, len(graph))
+
+
 class LocalGraphSource:
     """GraphSource that indexes primary + reference RO-Crate @graphs.
 
     Collisions (same @id in multiple crates) resolve to the first-loaded
     node -- the primary crate wins, then references in the order given.
+
+    With a `release_index` (see `fairscape_cli.interpret.release_index`)
+    the references are every other crate of that index, served from it
+    instead of being read again; only the primary crate is read here.
     """
 
     def __init__(
         self,
         primary_path: pathlib.Path,
         reference_paths: Iterable[pathlib.Path] = (),
+        release_index: ReleaseGraphIndex | None = None,
     ):
         self.primary_path = pathlib.Path(primary_path)
         self.reference_paths = [pathlib.Path(p) for p in reference_paths]
@@ -56,9 +118,17 @@ class LocalGraphSource:
         self.primary_root_id: str | None = None
         self.primary_root_name: str = ""
 
-        self._load_crate(self.primary_path, is_primary=True)
-        for ref in self.reference_paths:
-            self._load_crate(ref, is_primary=False)
+        if release_index is not None:
+            if self.reference_paths:
+                raise ValueError("reference_paths and release_index are mutually exclusive")
+            primary = read_crate_nodes(self.primary_path)
+            self.primary_root_id = primary.root_id
+            self.primary_root_name = primary.root_name
+            self._index, self._crate_dir, self._dataset_stats = release_index.views(primary)
+        else:
+            self._load_crate(self.primary_path, is_primary=True)
+            for ref in self.reference_paths:
+                self._load_crate(ref, is_primary=False)
 
         if self.primary_root_id is None:
             raise ValueError(
@@ -68,37 +138,21 @@ class LocalGraphSource:
 
     def _load_crate(self, crate_path: pathlib.Path, *, is_primary: bool = False) -> None:
         """Flatten one crate's @graph into the merged index."""
-        crate_dir = (
-            crate_path.parent
-            if crate_path.is_file()
-            else crate_path
-        )
-        metadata = ReadROCrateMetadata(crate_path)
-        graph = metadata.get("@graph", []) or []
-        for item in graph:
-            node = _as_dict(item)
-            node_id = node.get("@id")
-            if not node_id or node_id == "ro-crate-metadata.json":
-                continue
+        crate = read_crate_nodes(crate_path)
+        for node_id, node in crate.nodes.items():
             if node_id in self._index:
                 continue
             self._index[node_id] = node
-            self._crate_dir[node_id] = crate_dir
-
-            if is_primary and self.primary_root_id is None and _is_rocrate_root(node):
-                self.primary_root_id = node_id
-                self.primary_root_name = node.get("name", "") or ""
+            self._crate_dir[node_id] = crate.crate_dir
+            if node_id in crate.dataset_stats:
+                self._dataset_stats[node_id] = crate.dataset_stats[node_id]
 
-            desc = node.get("descriptiveStatistics")
-            split = node.get("splitStatistics")
-            if desc or split:
-                self._dataset_stats[node_id] = {
-                    "descriptiveStatistics": desc or {},
-                    "splitStatistics": split or {},
-                }
+        if is_primary and self.primary_root_id is None and crate.root_id is not None:
+            self.primary_root_id = crate.root_id
+            self.primary_root_name = crate.root_name
 
         logger.info(
-            f"Loaded {len(graph)} nodes from {crate_path} "
+            f"Loaded {crate.graph_size} nodes from {crate_path} "
             f"(index size: {len(self._index)})"
         )
 
@@ -115,9 +169,11 @@ class LocalGraphSource:
             return None
         pattern = query["@id"]["$regex"]
         regex = re.compile(pattern)
-        for candidate_id, node in self._index.items():
+        # Match on the ids alone: a release index hands out each node it is
+        # asked for as a copy.
+        for candidate_id in self._index:
             if regex.match(candidate_id):
-                return node
+                return self._index[candidate_id]
         return None
 
     def find_many(self, ark_ids: Iterable[str]) -> dict[str, dict]:
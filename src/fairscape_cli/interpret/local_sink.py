@@ -16,7 +16,6 @@ sidecar.
 
 from __future__ import annotations
 
-import json
 import logging
 import pathlib
 from typing import List
@@ -25,6 +24,8 @@ from fairscape_graph_tools.models.annotated_computation import AnnotatedComputat
 from fairscape_graph_tools.models.annotated_evidence_graph import AnnotatedEvidenceGraph
 from fairscape_graph_tools.models.evidence_graph import EvidenceGraph
 
+from fairscape_cli.utils.serialization import write_json_atomic
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,8 +58,7 @@ class LocalResultSink:
 
         if self.condensed_output_path is not None:
             self.condensed_output_path.parent.mkdir(parents=True, exist_ok=True)
-            with self.condensed_output_path.open("w") as f:
-                json.dump(condensed_metadata, f, indent=2, default=str)
+            write_json_atomic(self.condensed_output_path, condensed_metadata, default=str)
             logger.info(
                 f"Wrote condensed RO-Crate {condensed_id} to "
                 f"{self.condensed_output_path}"
@@ -74,8 +74,7 @@ class LocalResultSink:
         payload = evidence_graph.model_dump(by_alias=True, mode="json", exclude_none=True)
 
         self.output_path.parent.mkdir(parents=True, exist_ok=True)
-        with self.output_path.open("w") as f:
-            json.dump(payload, f, indent=2, default=str)
+        write_json_atomic(self.output_path, payload, default=str)
 
         logger.info(
             f"Wrote EvidenceGraph {evidence_graph.guid} to {self.output_path} "
@@ -92,8 +91,7 @@ class LocalResultSink:
         payload = aeg.model_dump(by_alias=True, mode="json")
 
         self.output_path.parent.mkdir(parents=True, exist_ok=True)
-        with self.output_path.open("w") as f:
-            json.dump(payload, f, indent=2, default=str)
+        write_json_atomic(self.output_path, payload, default=str)
 
         logger.info(
             f"Wrote AnnotatedEvidenceGraph {aeg.guid} to {self.output_path} "
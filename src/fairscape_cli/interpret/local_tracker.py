@@ -12,7 +12,6 @@ reason a pipeline fails.
 from __future__ import annotations
 
 import datetime
-import json
 import logging
 import pathlib
 import sys
@@ -20,6 +19,8 @@ from typing import TextIO
 
 import click
 
+from fairscape_cli.utils.serialization import dumps_json
+
 logger = logging.getLogger(__name__)
 
 
@@ -103,8 +104,8 @@ class InMemoryTaskTracker:
         if self.debug_llm_path is not None:
             try:
                 self.debug_llm_path.parent.mkdir(parents=True, exist_ok=True)
-                with self.debug_llm_path.open("a") as f:
-                    f.write(json.dumps(entry, default=str))
+                with self.debug_llm_path.open("a", encoding="utf-8") as f:
+                    f.write(dumps_json(entry, indent=None, default=str))
                     f.write("\n")
             except Exception as e:
                 logger.warning(
@@ -0,0 +1,190 @@
+"""ReleaseGraphIndex -- one entity index over all sub-crates of a release.
+
+`build release` generates an evidence graph per sub-crate, and each may
+resolve entities from any sibling. Handing every `LocalGraphSource` all
+other sub-crates as `reference_paths` re-reads and re-validates the
+whole release once per sub-crate. The index reads each sub-crate once
+and re-reads it only when its metadata (or journal) changes on disk, so
+a sibling rewritten earlier in the build is still seen as it is now.
+
+`LocalGraphSource(primary, release_index=index)` reads just the primary
+crate and serves the references through read-only views of the index,
+with the same precedence as passing them in order: the primary wins,
+then the first other crate holding an @id.
+
+`shared(crate_paths)` keeps one index per process, so every sub-crate a
+process builds uses it. With `build release --jobs` each worker fills its
+own on first use (a worker forked from a process that already filled one
+inherits it), which is one read per crate and worker instead of one per
+pair of crates.
+"""
+
+from __future__ import annotations
+
+import bisect
+import copy
+import logging
+import os
+import pathlib
+from collections.abc import Mapping
+from typing import Any, Callable, Iterable, Iterator
+
+from fairscape_cli.interpret.local_graph import CrateNodes, read_crate_nodes
+from fairscape_cli.models.crate_document import journal_path_for, resolve_metadata_path
+
+logger = logging.getLogger(__name__)
+
+_shared: ReleaseGraphIndex | None = None
+
+
+def _stat_key(path: pathlib.Path) -> tuple | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _crate_fingerprint(crate_path: pathlib.Path) -> tuple:
+    return (_stat_key(resolve_metadata_path(crate_path)), _stat_key(journal_path_for(crate_path)))
+
+
+class ReleaseGraphIndex:
+    """Id-keyed nodes of a list of crates, kept current with their files.
+
+    `crate_paths` are crate directories in reference order. Crates are
+    read on first use, not on construction.
+    """
+
+    def __init__(self, crate_paths: Iterable[pathlib.Path]):
+        self.crate_paths = [pathlib.Path(p) for p in crate_paths]
+        self._positions = {os.path.realpath(p): i for i, p in enumerate(self.crate_paths)}
+        self._crates: list[CrateNodes | None] = [None] * len(self.crate_paths)
+        self._fingerprints: list[tuple | None] = [None] * len(self.crate_paths)
+        # @id -> positions of the crates holding it, ascending.
+        self._holders: dict[str, list[int]] = {}
+        self.loads = 0
+
+    @classmethod
+    def shared(cls, crate_paths: Iterable[pathlib.Path]) -> ReleaseGraphIndex:
+        """This process's index for `crate_paths`, created on first request."""
+        global _shared
+        crate_paths = [pathlib.Path(p) for p in crate_paths]
+        if _shared is None or _shared.crate_paths != crate_paths:
+            _shared = cls(crate_paths)
+        return _shared
+
+    def position(self, crate_path: pathlib.Path) -> int | None:
+        crate_path = pathlib.Path(crate_path)
+        if crate_path.name == "ro-crate-metadata.json":
+            crate_path = crate_path.parent
+        return self._positions.get(os.path.realpath(crate_path))
+
+    def refresh(self) -> ReleaseGraphIndex:
+        """(Re)read every crate whose files changed since it was last read."""
+        for position, crate_path in enumerate(self.crate_paths):
+            fingerprint = _crate_fingerprint(crate_path)
+            if self._crates[position] is not None and fingerprint == self._fingerprints[position]:
+                continue
+            self._load(position, read_crate_nodes(crate_path), fingerprint)
+        return self
+
+    def _load(self, position: int, crate: CrateNodes, fingerprint: tuple) -> None:
+        previous = self._crates[position]
+        if previous is not None:
+            for node_id in previous.nodes:
+                holders = self._holders[node_id]
+                holders.remove(position)
+                if not holders:
+                    del self._holders[node_id]
+        for node_id in crate.nodes:
+            bisect.insort(self._holders.setdefault(node_id, []), position)
+        self._crates[position] = crate
+        self._fingerprints[position] = fingerprint
+        self.loads += 1
+        logger.info(f"Indexed {crate.graph_size} nodes from {self.crate_paths[position]}")
+
+    def holder(self, node_id: str, exclude: int | None = None) -> CrateNodes | None:
+        """The first crate holding `node_id`, skipping position `exclude`."""
+        for position in self._holders.get(node_id, ()):
+            if position != exclude:
+                return self._crates[position]
+        return None
+
+    def views(self, primary: CrateNodes) -> tuple[Mapping, Mapping, Mapping]:
+        """(nodes, crate dirs, dataset stats) of `primary` merged over the other crates.
+
+        The index is refreshed first. `primary` is read by the caller, so an
+        open CrateDocument session's edits are seen; its own entry in the
+        index is left out.
+
+        Nodes of the other crates are handed out as copies: the evidence
+        graph pipeline condenses the nodes it fetches in place, and the
+        index outlives this view.
+        """
+        self.refresh()
+        exclude = self.position(primary.crate_dir)
+
+        def node_value(crate: CrateNodes, node_id: str) -> dict:
+            if crate is primary:
+                return crate.nodes[node_id]
+            return copy.deepcopy(crate.nodes[node_id])
+
+        return (
+            _MergedView(self, primary, exclude, node_value),
+            _MergedView(self, primary, exclude, lambda crate, node_id: crate.crate_dir),
+            _MergedView(self, primary, exclude, lambda crate, node_id: crate.dataset_stats[node_id],
+                        lambda crate, node_id: node_id in crate.dataset_stats),
+        )
+
+
+class _MergedView(Mapping):
+    """A LocalGraphSource index map over a primary crate and a ReleaseGraphIndex."""
+
+    def __init__(
+        self,
+        index: ReleaseGraphIndex,
+        primary: CrateNodes,
+        exclude: int | None,
+        value: Callable[[CrateNodes, str], Any],
+        has: Callable[[CrateNodes, str], bool] = lambda crate, node_id: True,
+    ):
+        self._index = index
+        self._primary = primary
+        self._exclude = exclude
+        self._value = value
+        self._has = has
+
+    def _crate_for(self, node_id: str) -> CrateNodes | None:
+        if node_id in self._primary.nodes:
+            return self._primary
+        return self._index.holder(node_id, self._exclude)
+
+    def __getitem__(self, node_id: str) -> Any:
+        crate = self._crate_for(node_id)
+        if crate is None or not self._has(crate, node_id):
+            raise KeyError(node_id)
+        return self._value(crate, node_id)
+
+    def __contains__(self, node_id: object) -> bool:
+        crate = self._crate_for(node_id)
+        return crate is not None and self._has(crate, node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        # Primary first, then each other crate in order -- the insertion
+        # order of the merged dict LocalGraphSource would have built.
+        seen = set()
+        crates = [self._primary] + [
+            crate for position, crate in enumerate(self._index._crates)
+            if position != self._exclude and crate is not None
+        ]
+        for crate in crates:
+            for node_id in crate.nodes:
+                if node_id in seen:
+                    continue
+                seen.add(node_id)
+                if self._has(crate, node_id):
+                    yield node_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -19,13 +19,14 @@ def parse_magic_arguments(line: str) -> argparse.Namespace:
     parser.add_argument('--keywords', nargs='+', default=["jupyter", "computation"])
     parser.add_argument('--input', nargs='+', default=[], dest='manual_inputs')
     parser.add_argument('--no-llm', action='store_true', help='Disable LLM descriptions')
+    parser.add_argument('--journal', action='store_true', help='Append to the RO-Crate journal instead of rewriting metadata')
     
     args_list = line.split()
     
     try:
         args = parser.parse_args(args_list)
     except SystemExit:
-        print("Usage: %%fairscape track [--rocrate-path PATH] [--author AUTHOR] [--keywords KW1 KW2] [--input FILE1 FILE2] [--no-llm]")
+        print("Usage: %%fairscape track [--rocrate-path PATH] [--author AUTHOR] [--keywords KW1 KW2] [--input FILE1 FILE2] [--no-llm] [--journal]")
         raise
     
     return args
@@ -58,6 +59,7 @@ def fairscape(line, cell):
         --keywords KW1 KW2     Keywords for metadata (default: from RO-Crate or ["jupyter", "computation"])
         --input FILE1 FILE2    Manual input files to track
         --no-llm               Disable LLM-based description generation
+        --journal              Append to ro-crate-metadata.journal.jsonl instead of rewriting metadata
     """
     args = parse_magic_arguments(line)
     
@@ -88,7 +90,8 @@ def fairscape(line, cell):
         author=args.author,
         keywords=args.keywords,
         manual_inputs=args.manual_inputs,
-        use_llm=use_llm
+        use_llm=use_llm,
+        journal=args.journal
     )
     
     try:
@@ -19,6 +19,8 @@ from fairscape_cli.models.rocrate import (
         collect_subcrate_aggregated_metrics,
         AggregatedMetrics
 )
+from fairscape_cli.models.release_scan import ReleaseScan
+from fairscape_cli.models.crate_document import CrateConflictError, CrateDocument, compact_crate_journal
 from fairscape_cli.models.bagit import BagIt
 from fairscape_cli.models.pep import PEPtoROCrateMapper
 
@@ -38,10 +40,14 @@ __all__ = [
     'AppendCrate',
     'CopyToROCrate',
     'UpdateCrate',
+    'CrateDocument',
+    'compact_crate_journal',
+    'CrateConflictError',
     'BagIt',
     'PEPtoROCrateMapper',
     'LinkSubcrates',
     'collect_subcrate_metadata',
     'collect_subcrate_aggregated_metrics',
-    'AggregatedMetrics'
+    'AggregatedMetrics',
+    'ReleaseScan'
 ]
@@ -1,6 +1,5 @@
 import pathlib
 import shutil
-import hashlib
 import os
 from pydantic import (
     BaseModel,
@@ -10,6 +9,9 @@ from pydantic import (
 from typing import (
     Optional
 )
+from fairscape_cli.models.crate_document import JOURNAL_FILENAME, compact_crate_journals
+from fairscape_cli.utils.crate_lock import LOCK_FILENAME
+from fairscape_cli.utils.hashing import hash_files
 from fairscape_cli.utils.serialization import model_dump_pruned
 
 
@@ -57,8 +59,16 @@ class BagIt(BaseModel):
     
     def create_payload_directory(self):
         """Create BagIt payload directory and populate objects from RO-Crate.
+
+        Pending journal records are folded into the metadata first, so the
+        payload carries the crate as it is read.
         """
-        shutil.copytree(self.rocrate_path, self.bagit_path / 'data', dirs_exist_ok = True)
+        compact_crate_journals(self.rocrate_path)
+        shutil.copytree(
+            self.rocrate_path, self.bagit_path / 'data', dirs_exist_ok = True,
+            # The lock and journal sidecars are local state, not payload.
+            ignore=shutil.ignore_patterns(LOCK_FILENAME, JOURNAL_FILENAME)
+        )
 
     
 
@@ -101,107 +111,67 @@ class BagIt(BaseModel):
 
 
     
-    def create_payload_manifest_sha256(self):
-        """Create checksum for each payload file for checking data integrity.
+    def _write_manifests(self, prefix: str, paths, algorithms, jobs=None, progress=None):
+        """Hash `paths` once for all `algorithms` and write one manifest per algorithm.
+
+        The bag's own files are read, never answered from the checksum cache,
+        so a manifest describes the bytes in the bag.
+        """
+        digests = hash_files(paths, algorithms, jobs=jobs, progress=progress, use_cache=False)
+        for algorithm in algorithms:
+            manifest_path = self.bagit_path / f'{prefix}-{algorithm}.txt'
+            with manifest_path.open(mode="w") as manifest_file:
+                for path, digest in zip(paths, digests):
+                    manifest_file.write('%s %s\n' % (digest[algorithm], os.path.relpath(path, self.bagit_path)))
+
+    def create_payload_manifests(self, algorithms=('md5', 'sha256', 'sha512'), jobs=None, progress=None):
+        """Create payload manifests for several algorithms in a single read of each file.
         """
         payload_dir = self.bagit_path / 'data'
-        payload_manifest_path = self.bagit_path / 'manifest-sha256.txt'
-        
+        paths = [path for path in pathlib.Path(payload_dir).rglob("*") if path.is_file()]
+        self._write_manifests('manifest', paths, algorithms, jobs, progress)
 
-        with payload_manifest_path.open(mode="w") as payload_manifest_file:
-            for path in pathlib.Path(payload_dir).rglob("*"):
-                if path.is_file():                    
-                    sha256_hash = hashlib.sha256()                   
-                    with open(path,"rb") as f:
-                        for byte_block in iter(lambda: f.read(4096),b""):
-                            sha256_hash.update(byte_block)                        
-                        payload_manifest_file.write('%s %s\n' % (sha256_hash.hexdigest(), os.path.relpath(path, self.bagit_path)))
-                        
+    def create_tag_manifests(self, algorithms=('md5', 'sha256', 'sha512'), jobs=None, progress=None):
+        """Create tag manifests for several algorithms in a single read of each tag file.
+        """
+        exclude_payload_dir = 'data'
+        paths = [
+            path for path in pathlib.Path(self.bagit_path).rglob("*")
+            if exclude_payload_dir not in path.parts
+            and path.is_file() and not path.name.startswith('tagmanifest-')
+        ]
+        self._write_manifests('tagmanifest', paths, algorithms, jobs, progress)
 
+    def create_bag(self, algorithms=('md5', 'sha256', 'sha512'), jobs=None, progress=None):
+        """Build the complete bag from the RO-Crate.
 
-    def create_payload_manifest_sha512(self):
-        
-        payload_dir = self.bagit_path / 'data'
-        payload_manifest_path = self.bagit_path / 'manifest-sha512.txt'
-        
+        Payload and tag manifests for every algorithm are written from one
+        read of each file; tag manifests come last so they cover the payload
+        manifests.
+        """
+        self.create_bagit_directory()
+        self.create_bagit_declaration()
+        self.create_payload_directory()
+        self.create_bagit_metadata()
+        self.create_payload_manifests(algorithms, jobs=jobs, progress=progress)
+        self.create_tag_manifests(algorithms, jobs=jobs, progress=progress)
 
-        with payload_manifest_path.open(mode="w") as payload_manifest_file:
-            for path in pathlib.Path(payload_dir).rglob("*"):
-                if path.is_file(): 
-                    sha512_hash = hashlib.sha512()                   
-                    with open(path,"rb") as f:
-                        for byte_block in iter(lambda: f.read(4096),b""):
-                            sha512_hash.update(byte_block)                        
-                        payload_manifest_file.write('%s %s\n' % (sha512_hash.hexdigest(), os.path.relpath(path, self.bagit_path)))
-                        
+    def create_payload_manifest_sha256(self):
+        """Create checksum for each payload file for checking data integrity.
+        """
+        self.create_payload_manifests(('sha256',))
 
+    def create_payload_manifest_sha512(self):
+        self.create_payload_manifests(('sha512',))
 
     def create_payload_manifest_md5(self):
-        
-        payload_dir = self.bagit_path / 'data'
-        payload_manifest_path = self.bagit_path / 'manifest-md5.txt'
-        
-
-        with payload_manifest_path.open(mode="w") as payload_manifest_file:
-            for path in pathlib.Path(payload_dir).rglob("*"):
-                if path.is_file(): 
-                    md5_hash = hashlib.md5()                  
-                    with open(path,"rb") as f:
-                        for byte_block in iter(lambda: f.read(4096),b""):
-                            md5_hash.update(byte_block)                        
-                        payload_manifest_file.write('%s %s\n' % (md5_hash.hexdigest(), os.path.relpath(path, self.bagit_path)))
+        self.create_payload_manifests(('md5',))
 
-    
     def create_tag_manifest_md5(self):
-        
-        exclude_payload_dir = 'data'
-        tag_manifest_path = self.bagit_path / 'tagmanifest-md5.txt'
-        
+        self.create_tag_manifests(('md5',))
 
-        with tag_manifest_path.open(mode="w") as tag_manifest_file:
-            for path in pathlib.Path(self.bagit_path).rglob("*"):
-               if exclude_payload_dir not in path.parts: 
-                #print(path.stem, path.name, path)
-                if path.is_file() and not path.name.startswith('tagmanifest-'): 
-                    md5_hash = hashlib.md5()                  
-                    with open(path,"rb") as f:
-                        for byte_block in iter(lambda: f.read(4096),b""):
-                            md5_hash.update(byte_block)                        
-                        tag_manifest_file.write('%s %s\n' % (md5_hash.hexdigest(), os.path.relpath(path, self.bagit_path)))
-
-    
     def create_tag_manifest_sha256(self):
-        
-        exclude_payload_dir = 'data'
-        tag_manifest_path = self.bagit_path / 'tagmanifest-sha256.txt'
-        
-        with tag_manifest_path.open(mode="w") as tag_manifest_file:
-            for path in pathlib.Path(self.bagit_path).rglob("*"):
-               if exclude_payload_dir not in path.parts: 
-                #print(path.stem, path.name, path)
-                if path.is_file() and not path.name.startswith('tagmanifest-'):  
-                    sha256_hash = hashlib.sha256()                  
-                    with open(path,"rb") as f:
-                        for byte_block in iter(lambda: f.read(4096),b""):
-                            sha256_hash.update(byte_block)                        
-                        tag_manifest_file.write('%s %s\n' % (sha256_hash.hexdigest(), os.path.relpath(path, self.bagit_path)))
-
+        self.create_tag_manifests(('sha256',))
 
     def create_tag_manifest_sha512(self):
-        
-        exclude_payload_dir = 'data'
-        tag_manifest_path = self.bagit_path / 'tagmanifest-sha512.txt'
-        
-        with tag_manifest_path.open(mode="w") as tag_manifest_file:
-            for path in pathlib.Path(self.bagit_path).rglob("*"):
-               if exclude_payload_dir not in path.parts: 
-                print(path.stem, path.name, path)
-                if path.is_file() and not path.name.startswith('tagmanifest-'):  
-                    sha512_hash = hashlib.sha512()                  
-                    with open(path,"rb") as f:
-                        for byte_block in iter(lambda: f.read(4096),b""):
-                            sha512_hash.update(byte_block)                        
-                        tag_manifest_file.write('%s %s\n' % (sha512_hash.hexdigest(), os.path.relpath(path, self.bagit_path)))
-
-    
-                        
+        self.create_tag_manifests(('sha512',))
@@ -0,0 +1,733 @@
+"""In-memory editing session for an RO-Crate's ro-crate-metadata.json.
+
+`AppendCrate`, `UpdateCrate` and `ROCrate.registerObject` used to re-read,
+re-validate and rewrite the whole metadata file on every call, which turns a
+loop of registrations into quadratic I/O. A `CrateDocument` loads the file
+once, keeps an `@id -> entity` map, the root entity and the root's `hasPart`
+ids in memory, accepts any number of appends/updates, and writes the file
+once (atomically) when the outermost `with` block exits.
+
+While a document is open, the module-level helpers in `models.rocrate`
+(`AppendCrate`, `UpdateCrate`, `ReadROCrateMetadata`) route to it, so existing
+callers batch automatically when wrapped:
+
+    with CrateDocument(crate_path):
+        for path in files:
+            AppendCrate(crate_path, [GenerateDataset(...)])
+
+Validation is incremental by default: only entities appended, updated or
+flagged via `mark_dirty` are validated on flush, plus the structural
+invariants an edit can break (metadata descriptor and root present, unique
+`@id`s for new entities, new `hasPart` references resolve). The rest of the
+graph was valid when written; a full `ROCrateV1_2` pass is left to
+`fairscape rocrate validate`, `flush(full=True)` or `validation="full"`.
+Schema-agnostic editors such as `augment link-inverses` open their own
+session with `validation="none"`, which writes without validating.
+
+In journal mode a flush appends one JSON line per changed entity to
+`ro-crate-metadata.journal.jsonl` instead of rewriting the metadata file, so a
+write costs O(entity) rather than O(crate). Loading (and therefore
+`ReadROCrateMetadata`) replays the journal over the canonical file;
+`compact_crate_journal` / `fairscape rocrate compact` folds it back in, as
+`publish` and BagIt do before packaging a crate. Journal mode is enabled per
+document (`journal=True`), by setting `FAIRSCAPE_CRATE_JOURNAL=1`, or
+implicitly while a journal file exists.
+
+Concurrent writers are coordinated through `utils.crate_lock`. By default a
+session holds the crate's advisory lock from load to flush. With
+`locking="optimistic"` (or FAIRSCAPE_CRATE_LOCKING=optimistic) the session
+loads without the lock and only takes it to flush: if the metadata file or
+journal changed since load, the fresh crate is reloaded and this session's
+appended/updated entities are re-applied on top of it before writing, so
+parallel registrations neither block each other nor lose entities.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel
+
+from fairscape_models.rocrate import ROCrateV1_2
+from fairscape_cli.utils.crate_lock import (
+    LOCKING_LOCK,
+    LOCKING_MODES,
+    LOCKING_OFF,
+    LOCKING_OPTIMISTIC,
+    crate_lock,
+    default_locking_mode,
+    maybe_crate_lock,
+)
+from fairscape_cli.utils.crate_index import (
+    build_crate_index,
+    index_enabled,
+    load_crate_index,
+    read_indexed_entity,
+    update_indexed_entity,
+)
+from fairscape_cli.utils.hash_cache import RACY_WINDOW_NS
+from fairscape_cli.utils.hashing import hash_file
+from fairscape_cli.utils.rocrate_helpers import get_root_entity_dict
+from fairscape_cli.utils.serialization import dumps_json, encode_json, open_atomic, prune_none, model_dump_pruned
+
+
+VALIDATION_INCREMENTAL = "incremental"
+VALIDATION_FULL = "full"
+VALIDATION_NONE = "none"
+
+JOURNAL_FILENAME = "ro-crate-metadata.journal.jsonl"
+JOURNAL_ENV_VAR = "FAIRSCAPE_CRATE_JOURNAL"
+JOURNAL_OP_APPEND = "append"
+JOURNAL_OP_UPDATE = "update"
+
+# Documents currently open via `with`, keyed by resolved metadata file path.
+_ACTIVE_DOCUMENTS: Dict[str, "CrateDocument"] = {}
+
+
+class CrateConflictError(RuntimeError):
+    """A concurrent change could not be merged into an optimistic session."""
+
+
+def resolve_metadata_path(cratePath: Union[pathlib.Path, str]) -> pathlib.Path:
+    """Accept either a crate directory or the metadata JSON file itself."""
+    cratePath = pathlib.Path(cratePath)
+    if cratePath.is_dir():
+        return cratePath / 'ro-crate-metadata.json'
+    return cratePath
+
+
+def journal_path_for(cratePath: Union[pathlib.Path, str]) -> pathlib.Path:
+    """Path of the append-only journal that sits next to the metadata file."""
+    return resolve_metadata_path(cratePath).with_name(JOURNAL_FILENAME)
+
+
+def journal_enabled_by_env() -> bool:
+    return os.environ.get(JOURNAL_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def read_journal_records(journal_path: Union[pathlib.Path, str]) -> List[Dict[str, Any]]:
+    """Read journal records in order.
+
+    A truncated final line (a write interrupted mid-record) is ignored; a
+    corrupt line anywhere else raises ValueError.
+    """
+    journal_path = pathlib.Path(journal_path)
+    if not journal_path.exists():
+        return []
+
+    with journal_path.open('r') as journal_file:
+        lines = [line for line in journal_file.read().split('\n') if line.strip()]
+
+    records = []
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as exc:
+            if line_number == len(lines):
+                break
+            raise ValueError(f"Corrupt journal record at {journal_path}:{line_number}: {exc}") from exc
+    return records
+
+
+def read_crate_metadata(cratePath: Union[pathlib.Path, str]) -> Dict[str, Any]:
+    """Read the raw metadata dict, with any pending journal records applied.
+
+    Inside an open session this is the session's live (unflushed) metadata.
+    """
+    metadata_path = resolve_metadata_path(cratePath)
+    crate_document = active_crate_document(metadata_path)
+    if crate_document is not None:
+        return crate_document.metadata
+    if not journal_path_for(metadata_path).exists():
+        with metadata_path.open('r') as metadata_file:
+            return json.load(metadata_file)
+    crate_document = CrateDocument(metadata_path)
+    crate_document.load()
+    return crate_document.metadata
+
+
+def compact_crate_journal(cratePath: Union[pathlib.Path, str]) -> int:
+    """Fold the crate's journal into ro-crate-metadata.json and remove it.
+
+    Returns the number of journal records applied (0 if there was no journal).
+    Replay is idempotent, so an interrupted compaction can simply be re-run.
+    """
+    metadata_path = resolve_metadata_path(cratePath)
+    if not journal_path_for(metadata_path).exists():
+        return 0
+    if active_crate_document(metadata_path) is not None:
+        raise RuntimeError(f"Cannot compact {metadata_path} while a CrateDocument session is open on it")
+
+    with maybe_crate_lock(metadata_path):
+        crate_document = CrateDocument(metadata_path, journal=False)
+        crate_document.load()
+        crate_document.write_full()
+    return crate_document.replayed_records
+
+
+def compact_crate_journals(directory: Union[pathlib.Path, str]) -> int:
+    """Compact the journal of every crate under `directory` (itself included).
+
+    Returns the total number of journal records applied.
+    """
+    return sum(
+        compact_crate_journal(journal_path.parent)
+        for journal_path in sorted(pathlib.Path(directory).rglob(JOURNAL_FILENAME))
+    )
+
+
+def update_in_place(
+    cratePath: Union[pathlib.Path, str],
+    element: Union[BaseModel, Dict[str, Any]]
+) -> bool:
+    """Update one entity through the ro-crate-metadata.idx sidecar.
+
+    Validates just the new entity (and any hasPart references it adds), then
+    splices it into the metadata file without parsing the rest of the crate.
+    Returns False when that is not possible (no fresh index, unknown @id, an
+    open session or journal mode) so the caller can use a CrateDocument.
+    """
+    metadata_path = resolve_metadata_path(cratePath)
+    if active_crate_document(metadata_path) is not None or CrateDocument(metadata_path).journal_mode:
+        return False
+
+    with maybe_crate_lock(metadata_path):
+        index = load_crate_index(metadata_path)
+        if index is None:
+            return False
+
+        element_data = _entity_dict(element)
+        previous = read_indexed_entity(metadata_path, element_data['@id'], index=index)
+        if previous is None:
+            return False
+
+        validate_entities([element_data])
+        added_refs = _has_part_ids(element_data) - _has_part_ids(previous)
+        dangling = [ref for ref in added_refs if ref not in index["entities"]]
+        if dangling:
+            raise ValueError(f"hasPart references entities missing from @graph: {', '.join(sorted(dangling))}")
+        return update_indexed_entity(metadata_path, element_data, index=index)
+
+
+def _file_fingerprint(
+    path: pathlib.Path,
+    stat: Optional[os.stat_result] = None,
+    content: Optional[bytes] = None,
+    racy: Optional[bool] = None
+) -> Optional[Tuple]:
+    """(inode, size, mtime_ns) of a file, or None if it does not exist.
+
+    A file modified within the last `RACY_WINDOW_NS` also gets its SHA-256:
+    an atomic rewrite can reuse the inode, keep the size and land in the
+    same mtime tick, so stat alone cannot tell it apart. `racy` forces
+    (True) or suppresses (False) the digest; `content` is hashed instead of
+    re-reading the file.
+    """
+    try:
+        if stat is None:
+            stat = path.stat()
+        fingerprint = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if racy is None:
+            racy = time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS
+        if racy:
+            digest = hashlib.sha256(content).hexdigest() if content is not None else hash_file(path)["sha256"]
+            fingerprint += (digest,)
+    except FileNotFoundError:
+        return None
+    return fingerprint
+
+
+def _has_part_ids(entity: Dict[str, Any]) -> Set[str]:
+    return {
+        part.get('@id') for part in entity.get('hasPart') or []
+        if isinstance(part, dict)
+    }
+
+
+def active_crate_document(cratePath: Union[pathlib.Path, str]) -> Optional["CrateDocument"]:
+    """Return the open CrateDocument for this crate, or None."""
+    key = str(resolve_metadata_path(cratePath).resolve())
+    crate_document = _ACTIVE_DOCUMENTS.get(key)
+    # A forked child inherits the registry but not the parent's session.
+    if crate_document is None or crate_document._owner_pid != os.getpid():
+        return None
+    return crate_document
+
+
+def validate_entities(entities: Iterable[Dict[str, Any]]) -> None:
+    """Validate raw @graph entities with the same per-type dispatch as ROCrateV1_2."""
+    ROCrateV1_2.validate_metadata_graph({"@graph": list(entities)})
+
+
+def _entity_dict(element: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+    if isinstance(element, BaseModel):
+        return model_dump_pruned(element, by_alias=True)
+    return prune_none(dict(element))
+
+
+class CrateDocument:
+    """Load-once, write-once view of an RO-Crate metadata file.
+
+    Re-entrant: nested `with` blocks on the same document (or on
+    `CrateDocument.open` for the same path) share one load and one write.
+    Nothing is written if the block exits with an exception.
+
+    `journal=None` (the default) journals when FAIRSCAPE_CRATE_JOURNAL is set
+    or a journal already exists for the crate; True/False force the mode.
+
+    `locking` is "lock", "optimistic" or "off"; None uses
+    FAIRSCAPE_CRATE_LOCKING (default "lock"). Locking applies to `with`
+    sessions; a bare `load()`/`flush()` pair is the caller's to protect.
+
+    `ensure_ascii` is passed to `encode_json` when the metadata file is
+    rewritten.
+    """
+
+    def __init__(
+        self,
+        cratePath: Union[pathlib.Path, str],
+        validation: str = VALIDATION_INCREMENTAL,
+        journal: Optional[bool] = None,
+        locking: Optional[str] = None,
+        ensure_ascii: bool = True
+    ):
+        if validation not in (VALIDATION_INCREMENTAL, VALIDATION_FULL, VALIDATION_NONE):
+            raise ValueError(f"Unknown validation mode: {validation}")
+        if locking is not None and locking not in LOCKING_MODES:
+            raise ValueError(f"Unknown locking mode: {locking}")
+        self.metadata_path = resolve_metadata_path(cratePath)
+        self.journal_path = journal_path_for(self.metadata_path)
+        self.validation = validation
+        self.journal = journal
+        self.locking = locking or default_locking_mode()
+        self.ensure_ascii = ensure_ascii
+        self.replayed_records = 0
+        self.rebased = 0
+        self.metadata: Dict[str, Any] = {}
+        self._entities: Dict[str, Dict[str, Any]] = {}
+        # @id -> index in @graph of the entity `_entities` holds for it.
+        self._positions: Dict[str, int] = {}
+        self._root: Optional[Dict[str, Any]] = None
+        self._has_part_ids: Set[str] = set()
+        self._dirty = False
+        self._depth = 0
+        # Incremental-validation bookkeeping, reset on every load/flush.
+        self._pending_ids: Set[str] = set()
+        self._duplicate_ids: Set[str] = set()
+        self._loaded_has_part_ids: Set[str] = set()
+        self._needs_full_validation = False
+        # (op, @id) pairs to journal on flush; None forces a full rewrite.
+        self._journal_ops: Optional[List[Tuple[str, str]]] = []
+        # On-disk state the in-memory graph was loaded from / last written as.
+        self._fingerprint: Optional[Tuple] = None
+        # Validated views of the graph, dropped on every change; None until built.
+        self._validated_graph: Optional[List[Any]] = None
+        self._model: Optional[ROCrateV1_2] = None
+        # @ids changed since _validated_graph was built (None: never built).
+        self._unvalidated_ids: Optional[Set[str]] = None
+        self._lock_context = None
+        self._owner_pid: Optional[int] = None
+
+    @classmethod
+    def open(
+        cls,
+        cratePath: Union[pathlib.Path, str],
+        validation: str = VALIDATION_INCREMENTAL,
+        journal: Optional[bool] = None,
+        locking: Optional[str] = None,
+        ensure_ascii: bool = True
+    ) -> "CrateDocument":
+        """Return the document already open for `cratePath`, or a new one.
+
+        The options only apply to a new document; an open one keeps its own.
+        """
+        return active_crate_document(cratePath) or cls(
+            cratePath, validation=validation, journal=journal, locking=locking, ensure_ascii=ensure_ascii
+        )
+
+    @property
+    def _key(self) -> str:
+        return str(self.metadata_path.resolve())
+
+    def __enter__(self) -> "CrateDocument":
+        if self._depth == 0:
+            if self.locking == LOCKING_LOCK:
+                self._lock_context = crate_lock(self.metadata_path)
+                self._lock_context.__enter__()
+            try:
+                self.load()
+            except BaseException:
+                self._release_lock()
+                raise
+            self._owner_pid = os.getpid()
+            _ACTIVE_DOCUMENTS[self._key] = self
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self._depth -= 1
+        if self._depth == 0:
+            _ACTIVE_DOCUMENTS.pop(self._key, None)
+            try:
+                if exc_type is None:
+                    self.flush()
+            finally:
+                self._release_lock()
+        return False
+
+    def _release_lock(self) -> None:
+        if self._lock_context is not None:
+            lock_context, self._lock_context = self._lock_context, None
+            lock_context.__exit__(None, None, None)
+
+    @property
+    def journal_mode(self) -> bool:
+        if self.journal is not None:
+            return self.journal
+        return journal_enabled_by_env() or self.journal_path.exists()
+
+    def load(self) -> None:
+        """(Re)read the metadata file, replay the journal and rebuild the indexes."""
+        # Fingerprint exactly what is read: the metadata file through its open
+        # descriptor, the journal before it is read, so a write racing the load
+        # always shows up as a change at flush time.
+        with self.metadata_path.open('rb') as metadata_file:
+            stat = os.fstat(metadata_file.fileno())
+            content = metadata_file.read()
+        metadata_fingerprint = _file_fingerprint(self.metadata_path, stat, content)
+        journal_fingerprint = _file_fingerprint(self.journal_path)
+        self.metadata = json.loads(content)
+        self._reindex()
+        records = read_journal_records(self.journal_path)
+        self._replay(records)
+        self.replayed_records = len(records)
+        self._reset_changes()
+        self._fingerprint = (metadata_fingerprint, journal_fingerprint)
+
+    def _changed_on_disk(self) -> bool:
+        """Whether the metadata file or journal differs from the loaded fingerprint."""
+        for path, loaded in zip((self.metadata_path, self.journal_path), self._fingerprint):
+            current = _file_fingerprint(path, racy=loaded is not None and len(loaded) > 3)
+            if current != loaded:
+                return True
+        return False
+
+    def _replay(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            op = record.get('op')
+            entity = record.get('entity')
+            if op not in (JOURNAL_OP_APPEND, JOURNAL_OP_UPDATE) or not isinstance(entity, dict):
+                raise ValueError(f"Unrecognised journal record in {self.journal_path}: {record!r}")
+            # Both ops upsert, so replaying records already folded into the
+            # metadata file (an interrupted compaction) is harmless.
+            if not self.update(entity):
+                self.append([entity])
+
+    def _reset_changes(self) -> None:
+        self._dirty = False
+        self._pending_ids = set()
+        self._duplicate_ids = set()
+        self._loaded_has_part_ids = set(self._has_part_ids)
+        self._needs_full_validation = False
+        self._journal_ops = []
+
+    def _record(self, op: Optional[str], entity_id: Optional[str] = None) -> None:
+        self._validated_graph = None
+        self._model = None
+        if self._unvalidated_ids is not None and entity_id is not None:
+            self._unvalidated_ids.add(entity_id)
+        if op is None:
+            self._journal_ops = None
+        elif self._journal_ops is not None:
+            self._journal_ops.append((op, entity_id))
+
+    def _reindex(self) -> None:
+        self._validated_graph = None
+        self._model = None
+        self._unvalidated_ids = None
+        graph = self.metadata.setdefault('@graph', [])
+        self._entities = {}
+        self._positions = {}
+        for position, entity in enumerate(graph):
+            if isinstance(entity, dict) and '@id' in entity:
+                self._entities[entity['@id']] = entity
+                self._positions[entity['@id']] = position
+        self._root = get_root_entity_dict(graph)
+        self._has_part_ids = set()
+        if self._root is not None:
+            self._has_part_ids = _has_part_ids(self._root)
+
+    @property
+    def graph(self) -> List[Dict[str, Any]]:
+        return self.metadata['@graph']
+
+    @property
+    def root(self) -> Optional[Dict[str, Any]]:
+        """The root data entity (mutable; changes are written on flush)."""
+        return self._root
+
+    @property
+    def has_part_ids(self) -> Set[str]:
+        return set(self._has_part_ids)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._entities
+
+    def __len__(self) -> int:
+        return len(self.graph)
+
+    def get(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Look up one entity dict by @id without scanning the graph."""
+        return self._entities.get(entity_id)
+
+    def mark_dirty(self, entity_id: Optional[str] = None) -> None:
+        """Flag in-place edits (e.g. to `root`) so they are written on flush.
+
+        Pass the edited entity's @id so incremental validation covers it;
+        without one the next flush falls back to full validation.
+        """
+        self._dirty = True
+        if entity_id is None:
+            self._needs_full_validation = True
+            self._record(None)
+        else:
+            self._pending_ids.add(entity_id)
+            self._record(JOURNAL_OP_UPDATE, entity_id)
+            if self._root is not None and entity_id == self._root.get('@id'):
+                self._has_part_ids = _has_part_ids(self._root)
+
+    def append(self, elements: Iterable[Union[BaseModel, Dict[str, Any]]]) -> List[str]:
+        """Add entities to @graph and reference them from the root's hasPart.
+
+        Returns the @ids appended, in order.
+        """
+        if self._root is not None:
+            self._root.setdefault('hasPart', [])
+
+        appended = []
+        for element in elements:
+            element_data = _entity_dict(element)
+            entity_id = element_data['@id']
+            if entity_id in self._entities:
+                self._duplicate_ids.add(entity_id)
+            self.graph.append(element_data)
+            self._entities[entity_id] = element_data
+            self._positions[entity_id] = len(self.graph) - 1
+            self._pending_ids.add(entity_id)
+            self._record(JOURNAL_OP_APPEND, entity_id)
+            if self._root is not None and entity_id not in self._has_part_ids:
+                self._root['hasPart'].append({"@id": entity_id})
+                self._has_part_ids.add(entity_id)
+            appended.append(entity_id)
+
+        if appended:
+            self._dirty = True
+        return appended
+
+    def update(self, element: Union[BaseModel, Dict[str, Any]]) -> bool:
+        """Replace the entity with the same @id. Returns False if it is absent."""
+        element_data = _entity_dict(element)
+        entity_id = element_data['@id']
+        existing = self._entities.get(entity_id)
+        if existing is None:
+            return False
+
+        position = self._positions.get(entity_id)
+        if position is None or position >= len(self.graph) or self.graph[position] is not existing:
+            # The graph list was edited behind the document's back; find it once.
+            position = next(index for index, entity in enumerate(self.graph) if entity is existing)
+        self.graph[position] = element_data
+        self._positions[entity_id] = position
+        self._entities[entity_id] = element_data
+        if existing is self._root:
+            self._reindex()
+        self._pending_ids.add(entity_id)
+        self._record(JOURNAL_OP_UPDATE, entity_id)
+        self._dirty = True
+        return True
+
+    def replace_graph(self, entities: List[Dict[str, Any]]) -> None:
+        """Swap in a whole new @graph (e.g. after a bulk rewrite) and reindex."""
+        self.metadata['@graph'] = entities
+        self._reindex()
+        # The next flush validates everything, superseding per-entity checks.
+        self._pending_ids = set()
+        self._duplicate_ids = set()
+        self._needs_full_validation = True
+        self._record(None)
+        self._dirty = True
+
+    def validated_graph(self) -> List[Any]:
+        """The @graph as fairscape_models entities, as `ReadROCrateMetadata` returns it.
+
+        Cached until the next change, so every reader in a session shares one
+        validation; entities it covered are not validated again on flush.
+        In-place edits must be followed by `mark_dirty` to drop the cache.
+        """
+        if self._validated_graph is None:
+            validated = {'@graph': list(self.graph)}
+            ROCrateV1_2.validate_metadata_graph(validated)
+            self._validated_graph = validated['@graph']
+            self._unvalidated_ids = set()
+        return self._validated_graph
+
+    def model(self) -> ROCrateV1_2:
+        """The crate as an `ROCrateV1_2`, built on `validated_graph` and cached with it."""
+        if self._model is None:
+            self._model = ROCrateV1_2(**{**self.metadata, '@graph': list(self.validated_graph())})
+        return self._model
+
+    def validate(self) -> ROCrateV1_2:
+        """Fully validate the whole graph."""
+        # Keyword expansion hands pydantic a fresh dict, so the graph's raw
+        # entity dicts are not replaced with model instances.
+        return ROCrateV1_2(**self.metadata)
+
+    def validate_changes(self) -> None:
+        """Validate pending entities and the invariants an edit can break."""
+        has_descriptor = 'ro-crate-metadata.json' in self._entities or any(
+            str(entity_id).endswith('ro-crate-metadata.json') for entity_id in self._entities
+        )
+        if not has_descriptor:
+            raise ValueError("RO-Crate metadata descriptor 'ro-crate-metadata.json' is missing from @graph")
+        if self._root is None:
+            raise ValueError("RO-Crate root data entity could not be found in @graph")
+
+        if self._duplicate_ids:
+            raise ValueError(f"Duplicate @id(s) in @graph: {', '.join(sorted(self._duplicate_ids))}")
+
+        dangling = [
+            entity_id for entity_id in self._has_part_ids - self._loaded_has_part_ids
+            if entity_id not in self._entities
+        ]
+        if dangling:
+            raise ValueError(f"hasPart references entities missing from @graph: {', '.join(sorted(dangling))}")
+
+        pending_ids = self._pending_ids
+        if self._unvalidated_ids is not None:
+            # The rest were validated, in their current state, by validated_graph().
+            pending_ids = pending_ids & self._unvalidated_ids
+        validate_entities(
+            self._entities[entity_id]
+            for entity_id in pending_ids
+            if entity_id in self._entities
+        )
+
+    def write_full(self) -> bytes:
+        """Atomically rewrite the metadata file and drop the now-folded journal.
+
+        Returns the bytes written.
+        """
+        payload = encode_json(self.metadata, prune=True, ensure_ascii=self.ensure_ascii)
+        with open_atomic(self.metadata_path) as metadata_file:
+            metadata_file.write(payload)
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        if index_enabled(self.metadata_path):
+            build_crate_index(self.metadata_path)
+        return payload
+
+    def _append_journal(self) -> None:
+        # One record per touched entity, in first-touched order, carrying its
+        # final state; an entity appended in this batch stays an append.
+        ops: Dict[str, str] = {}
+        for op, entity_id in self._journal_ops:
+            if ops.get(entity_id) != JOURNAL_OP_APPEND:
+                ops[entity_id] = op
+        lines = [
+            dumps_json({"op": op, "entity": self._entities[entity_id]}, indent=None, prune=True)
+            for entity_id, op in ops.items()
+            if entity_id in self._entities
+        ]
+        if not lines:
+            return
+        with self.journal_path.open('a', encoding='utf-8') as journal_file:
+            journal_file.write('\n'.join(lines) + '\n')
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def flush(self, full: Optional[bool] = None) -> None:
+        """Validate and persist the document if it has changed.
+
+        `full` overrides the document's validation mode for this flush. In
+        journal mode changes are appended to the journal unless a bulk edit
+        (`replace_graph`, `mark_dirty()` without an @id) needs a full rewrite.
+        """
+        if not self._dirty:
+            return
+        if self.locking != LOCKING_OPTIMISTIC or self._lock_context is not None:
+            self._flush_unlocked(full)
+            return
+        with crate_lock(self.metadata_path):
+            if self._fingerprint is not None and self._changed_on_disk():
+                self._rebase()
+            self._flush_unlocked(full)
+
+    def _flush_unlocked(self, full: Optional[bool]) -> None:
+        if full is None and self.validation != VALIDATION_NONE:
+            full = self.validation == VALIDATION_FULL or self._needs_full_validation
+        if full:
+            self.validate()
+        if full is not None:
+            self.validate_changes()
+        written = None
+        if self.journal_mode and self._journal_ops is not None:
+            self._append_journal()
+        else:
+            written = self.write_full()
+        self._reset_changes()
+        if self.locking != LOCKING_OPTIMISTIC:
+            # Only optimistic sessions compare against the disk at flush time.
+            self._fingerprint = None
+            return
+        # The lock is held, so the metadata file is either what was just
+        # written (fingerprinted from those bytes, not re-read) or, after a
+        # journal append, unchanged since it was loaded or last checked.
+        if written is not None or self._fingerprint is None:
+            metadata_fingerprint = _file_fingerprint(self.metadata_path, content=written)
+        else:
+            metadata_fingerprint = self._fingerprint[0]
+        self._fingerprint = (metadata_fingerprint, _file_fingerprint(self.journal_path))
+
+    def _rebase(self) -> None:
+        """Reload the crate written concurrently and re-apply this session's changes.
+
+        Each appended or updated entity is upserted in its final state, in
+        first-touched order. An update to the root keeps `hasPart` entries
+        the concurrent writer added. Bulk edits (`replace_graph`,
+        `mark_dirty()` without an @id) cannot be replayed entity by entity
+        and raise CrateConflictError.
+        """
+        if self._journal_ops is None:
+            raise CrateConflictError(
+                f"{self.metadata_path} changed on disk during a bulk edit; re-run the operation"
+            )
+        pending: Dict[str, Dict[str, Any]] = {}
+        for _, entity_id in self._journal_ops:
+            if entity_id not in pending and entity_id in self._entities:
+                pending[entity_id] = self._entities[entity_id]
+        validation_state = (self._needs_full_validation,)
+
+        self.load()
+        for entity_id, entity in pending.items():
+            fresh = self._entities.get(entity_id)
+            if fresh is not None and fresh is self._root:
+                entity = dict(entity)
+                merged = list(entity.get('hasPart') or [])
+                known = _has_part_ids(entity)
+                for part in fresh.get('hasPart') or []:
+                    if isinstance(part, dict) and part.get('@id') not in known:
+                        merged.append(part)
+                entity['hasPart'] = merged
+            if not self.update(entity):
+                self.append([entity])
+        self._needs_full_validation, = validation_state
+        self.rebased += 1
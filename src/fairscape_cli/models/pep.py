@@ -10,6 +10,7 @@ from fairscape_cli.models import (
     AppendCrate,
     CopyToROCrate
 )
+from fairscape_cli.models.crate_document import CrateDocument
 from fairscape_cli.models.guid_utils import GenerateDatetimeSquid
 from fairscape_cli.models.schema import infer_schema
 from fairscape_cli.config import NAAN
@@ -137,11 +138,13 @@ class PEPtoROCrateMapper:
         
         rocrate_id = crate["@id"]
         
-        if "sample_table" in self.config:
-            self._add_sample_path_to_rocrate(output_path, rocrate_id, final_metadata)
-        
-        if "subsample_table" in self.config:
-            self._add_subsample_paths_to_rocrate(output_path, rocrate_id, final_metadata)
+        # One load/write for all sample and subsample registrations.
+        with CrateDocument(output_path):
+            if "sample_table" in self.config:
+                self._add_sample_path_to_rocrate(output_path, rocrate_id, final_metadata)
+            
+            if "subsample_table" in self.config:
+                self._add_subsample_paths_to_rocrate(output_path, rocrate_id, final_metadata)
         
         return rocrate_id
     
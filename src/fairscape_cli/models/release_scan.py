@@ -0,0 +1,474 @@
+"""Single-walk scanner for the sub-crates of a release.
+
+`build release` needs the sub-crate hierarchy (to process and link
+sub-crates), each sub-crate's root dataset (authors, keywords, contentSize)
+and `AggregatedMetrics` over every sub-crate entity. Each of these used to
+walk the release and re-read the sub-crate metadata on its own; `ReleaseScan`
+walks the tree once with `os.scandir` and streams every sub-crate's
+ro-crate-metadata.json once:
+
+    scan = ReleaseScan(release_directory)
+    scan.subcrate_paths        # every sub-crate directory, in find_subcrates order
+    scan.top_level             # the top-most sub-crates, with .children below them
+    scan.subcrate_metadata()   # {'authors': [...], 'keywords': [...]}
+    scan.aggregated_metrics()  # AggregatedMetrics, including the total content size
+
+The directory walk happens on construction. Metadata files are parsed on
+first use of anything that needs them, so build steps that rewrite
+sub-crates (inverse linking, inputs/outputs) can run in between; call
+`refresh()` to re-parse after later modifications.
+
+With `jobs=N` the metadata files are parsed and their metrics accumulated in
+a pool of N worker processes. Each worker returns a partial result for one
+sub-crate, and a crate is only submitted once the crates nested inside it are
+done, because its size excludes them. The partial `AggregatedMetrics` are
+merged in scan order, so the result is identical to a serial scan.
+
+Metrics are accumulated over each entity as `ReadROCrateMetadata` would
+return it: validated with the `ROCrateV1_2` per-type dispatch and dumped by
+alias, so normalized @type lists and model defaults count exactly as they
+did when roll-ups read validated crates.
+
+Each parsed sub-crate gets a small `ro-crate-metrics.json` sidecar holding
+that partial result, keyed by the SHA-256 of its ro-crate-metadata.json, the
+root @ids of the crates nested in it and the installed fairscape-models
+version (whose models and detectors decide the counts). Later scans reuse a
+sidecar whose key still matches and only re-read stale crates, so
+re-releasing after a small edit re-reads just the edited sub-crates. The digest comes from the
+persistent checksum cache, so checking an unchanged crate does not read it.
+Pass `use_sidecars=False` to ignore and not write them, or
+`write_sidecars=False` to reuse current ones without writing any.
+"""
+import json
+import logging
+import os
+import pathlib
+from importlib.metadata import PackageNotFoundError, version as package_version
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Union
+
+from fairscape_models.rocrate import ROCrateV1_2
+from fairscape_cli.models.rocrate import (
+    AggregatedMetrics,
+    _accumulate_entity_metrics,
+    _extract_content_size_bytes,
+)
+from fairscape_cli.models.crate_document import journal_path_for
+from fairscape_cli.utils.graph_stream import entity_type_names, iter_graph_entities
+from fairscape_cli.utils.hash_cache import file_digest
+from fairscape_cli.utils.serialization import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILENAME = 'ro-crate-metadata.json'
+METRICS_SIDECAR_FILENAME = 'ro-crate-metrics.json'
+# Bump when the sidecar layout or the metric accumulation changes.
+METRICS_SIDECAR_VERSION = 2
+
+# Root dataset fields kept by a scan (and in sidecars).
+ROOT_FIELDS = ('@id', '@type', 'name', 'author', 'keywords', 'contentSize')
+
+
+def _models_version() -> Optional[str]:
+    try:
+        return package_version('fairscape-models')
+    except PackageNotFoundError:
+        return None
+
+
+MODELS_VERSION = _models_version()
+
+
+def _validated_entity_dict(entity: Dict[str, Any]) -> Dict[str, Any]:
+    """`entity` as `ReadROCrateMetadata(...)['@graph']` entries dump it.
+
+    An entity the models reject is counted as written.
+    """
+    try:
+        validated = ROCrateV1_2.validate_metadata_graph({'@graph': [entity]})['@graph'][0]
+    except Exception as e:
+        logger.debug(f"Counting unvalidated entity {entity.get('@id')!r} in metrics: {e}")
+        return entity
+    if hasattr(validated, 'model_dump'):
+        return validated.model_dump(by_alias=True)
+    return validated
+
+
+@dataclass
+class SubcrateInfo:
+    """One sub-crate found by a `ReleaseScan`."""
+
+    path: pathlib.Path
+    parent: Optional['SubcrateInfo'] = None
+    children: List['SubcrateInfo'] = field(default_factory=list)
+
+    # Filled in when the scan parses the metadata.
+    root_id: Optional[str] = None
+    root: Optional[Dict[str, Any]] = None
+    size_bytes: int = 0
+    metrics: Optional[AggregatedMetrics] = None
+    error: Optional[str] = None
+    from_sidecar: bool = False
+
+    @property
+    def metadata_file(self) -> pathlib.Path:
+        return self.path / METADATA_FILENAME
+
+
+class SubcrateRead(NamedTuple):
+    """What one pass over a sub-crate's metadata yields (picklable for worker processes)."""
+
+    root_id: Optional[str]
+    # The root dataset, projected to ROOT_FIELDS.
+    root: Optional[Dict[str, Any]]
+    # Summed contentSize of the entities other than the root and nested crate roots.
+    own_size: int
+    metrics: Optional[AggregatedMetrics]
+    from_sidecar: bool = False
+
+
+def read_subcrate(
+    metadata_file: pathlib.Path,
+    nested_ids: Set[str],
+    collect_metrics: bool = True
+) -> SubcrateRead:
+    """Stream one sub-crate's ro-crate-metadata.json once.
+
+    `nested_ids` are the root @ids of the crates nested directly inside it,
+    whose size is accounted for by those crates.
+    """
+    metrics = AggregatedMetrics() if collect_metrics else None
+
+    root_id = None
+    root = None
+    first_rocrate = None
+    second_entity = None
+    # Entities seen before the descriptor, kept until the root @id is known.
+    early: Dict[Any, Dict[str, Any]] = {}
+    early_sizes: Dict[Any, int] = {}
+    own_size = 0
+
+    for position, entity in enumerate(iter_graph_entities(metadata_file)):
+        if not isinstance(entity, dict):
+            continue
+        entity_id = entity.get('@id')
+        if entity_id == METADATA_FILENAME:
+            about = entity.get('about')
+            if root_id is None and isinstance(about, dict):
+                root_id = about.get('@id')
+                root = early.get(root_id)
+            continue
+
+        if position == 1:
+            second_entity = entity
+        if first_rocrate is None and 'ROCrate' in entity_type_names(entity):
+            first_rocrate = entity
+        if metrics is not None:
+            _accumulate_entity_metrics(metrics, _validated_entity_dict(entity))
+
+        size = _extract_content_size_bytes(entity.get('contentSize'))
+        if root_id is None:
+            early.setdefault(entity_id, entity)
+            if entity_id not in nested_ids:
+                early_sizes[entity_id] = early_sizes.get(entity_id, 0) + size
+            continue
+        if entity_id == root_id:
+            if root is None:
+                root = entity
+            continue
+        if entity_id not in nested_ids:
+            own_size += size
+
+    own_size += sum(size for entity_id, size in early_sizes.items() if entity_id != root_id)
+    if root is None and root_id is None:
+        root = first_rocrate or second_entity
+        root_id = root.get('@id') if root is not None else None
+    if root is not None:
+        root = {key: root[key] for key in ROOT_FIELDS if key in root}
+    return SubcrateRead(root_id, root, own_size, metrics)
+
+
+def metrics_sidecar_path(crate_path: pathlib.Path) -> pathlib.Path:
+    return pathlib.Path(crate_path) / METRICS_SIDECAR_FILENAME
+
+
+def _load_sidecar(sidecar: pathlib.Path, digest: str, nested_ids: Set[str]) -> Optional[SubcrateRead]:
+    """The cached read if the sidecar exists and matches the metadata digest."""
+    try:
+        with sidecar.open('r', encoding='utf-8') as f:
+            data = json.load(f)
+        if (
+            data.get('version') != METRICS_SIDECAR_VERSION
+            or data.get('metadataSha256') != digest
+            or data.get('fairscapeModelsVersion') != MODELS_VERSION
+            or set(data.get('nestedIds', [])) != nested_ids
+        ):
+            return None
+        metrics = AggregatedMetrics.from_dict(data['metrics']) if data.get('metrics') is not None else None
+        return SubcrateRead(data['rootId'], data['root'], data['ownSize'], metrics, from_sidecar=True)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.debug(f"Ignoring unreadable metrics sidecar {sidecar}: {e}")
+        return None
+
+
+def _write_sidecar(sidecar: pathlib.Path, digest: str, nested_ids: Set[str], read: SubcrateRead) -> None:
+    data = {
+        'version': METRICS_SIDECAR_VERSION,
+        'metadataSha256': digest,
+        'fairscapeModelsVersion': MODELS_VERSION,
+        'nestedIds': sorted(nested_ids),
+        'rootId': read.root_id,
+        'root': read.root,
+        'ownSize': read.own_size,
+        'metrics': read.metrics.to_dict(),
+    }
+    try:
+        write_json_atomic(sidecar, data)
+    except OSError as e:
+        logger.debug(f"Could not write metrics sidecar {sidecar}: {e}")
+
+
+def read_subcrate_cached(
+    metadata_file: pathlib.Path,
+    nested_ids: Set[str],
+    collect_metrics: bool = True,
+    use_sidecar: bool = True,
+    write_sidecar: bool = True
+) -> SubcrateRead:
+    """`read_subcrate`, answered from the crate's metrics sidecar when it is current.
+
+    A fresh read that collected metrics refreshes the sidecar unless
+    `write_sidecar` is False. Crates with a pending journal are always read,
+    and no sidecar is written for them.
+    """
+    metadata_file = pathlib.Path(metadata_file)
+    if not use_sidecar or journal_path_for(metadata_file).exists():
+        return read_subcrate(metadata_file, nested_ids, collect_metrics)
+
+    sidecar = metrics_sidecar_path(metadata_file.parent)
+    digest = file_digest(metadata_file, 'sha256')
+    cached = _load_sidecar(sidecar, digest, nested_ids)
+    if cached is not None and (cached.metrics is not None or not collect_metrics):
+        return cached if collect_metrics else cached._replace(metrics=None)
+
+    read = read_subcrate(metadata_file, nested_ids, collect_metrics)
+    # Only record the result if the file did not change while it was read.
+    if write_sidecar and collect_metrics and file_digest(metadata_file, 'sha256') == digest:
+        _write_sidecar(sidecar, digest, nested_ids, read)
+    return read
+
+
+class ReleaseScan:
+    """The sub-crates below a release directory, read once.
+
+    Args:
+        release_directory: The release (or any parent crate) directory. Its
+            own ro-crate-metadata.json is not part of the scan.
+        collect_metrics: Accumulate `AggregatedMetrics` while parsing. Callers
+            that only need the hierarchy, roots or sizes can skip it.
+        jobs: Worker processes used to parse the metadata (None or 1: serial).
+        use_sidecars: Reuse and refresh per-sub-crate ro-crate-metrics.json
+            sidecars.
+        write_sidecars: With `use_sidecars`, also write sidecars for crates
+            that had to be re-read. False leaves the sub-crates untouched.
+    """
+
+    def __init__(
+        self,
+        release_directory: Union[pathlib.Path, str],
+        collect_metrics: bool = True,
+        jobs: Optional[int] = None,
+        use_sidecars: bool = True,
+        write_sidecars: bool = True
+    ):
+        self.release_directory = pathlib.Path(release_directory)
+        self.collect_metrics = collect_metrics
+        self.jobs = jobs
+        self.use_sidecars = use_sidecars
+        self.write_sidecars = write_sidecars
+        self.subcrates: List[SubcrateInfo] = []
+        self.top_level: List[SubcrateInfo] = []
+        self._parsed = False
+        if self.release_directory.is_dir():
+            self._walk(self.release_directory, None)
+
+    def _walk(self, directory: pathlib.Path, parent: Optional[SubcrateInfo]) -> None:
+        with os.scandir(directory) as entries:
+            subdirectories = [pathlib.Path(entry.path) for entry in entries if entry.is_dir()]
+        for subdirectory in subdirectories:
+            self._visit(subdirectory, parent)
+
+    def _visit(self, directory: pathlib.Path, parent: Optional[SubcrateInfo]) -> None:
+        subdirectories = []
+        has_metadata = False
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    subdirectories.append(pathlib.Path(entry.path))
+                elif entry.name == METADATA_FILENAME and entry.is_file():
+                    has_metadata = True
+
+        if has_metadata:
+            info = SubcrateInfo(path=directory, parent=parent)
+            self.subcrates.append(info)
+            (parent.children if parent is not None else self.top_level).append(info)
+            parent = info
+        for subdirectory in subdirectories:
+            self._visit(subdirectory, parent)
+
+    @property
+    def subcrate_paths(self) -> List[pathlib.Path]:
+        """Every sub-crate directory, parents before the crates nested in them."""
+        return [info.path for info in self.subcrates]
+
+    def __iter__(self) -> Iterator[SubcrateInfo]:
+        return iter(self.subcrates)
+
+    def __len__(self) -> int:
+        return len(self.subcrates)
+
+    def refresh(self) -> 'ReleaseScan':
+        """Discard parsed metadata so it is re-read on next use."""
+        self._parsed = False
+        return self
+
+    def parse(self, jobs: Optional[int] = None) -> 'ReleaseScan':
+        """Parse every sub-crate's metadata (once, until `refresh`).
+
+        Args:
+            jobs: Worker processes; None or 1 parses serially. Defaults to the
+                `jobs` the scan was created with.
+        """
+        if self._parsed:
+            return self
+        jobs = self.jobs if jobs is None else jobs
+        if jobs and jobs > 1 and len(self.subcrates) > 1:
+            self._parse_parallel(min(jobs, len(self.subcrates)))
+        else:
+            for info in self.top_level:
+                self._parse(info)
+        self._parsed = True
+        return self
+
+    def _nested_ids(self, info: SubcrateInfo) -> Set[str]:
+        return {child.root_id for child in info.children if child.root_id}
+
+    def _parse(self, info: SubcrateInfo) -> None:
+        # Nested crates first: their sizes and root ids feed the parent's size.
+        for child in info.children:
+            self._parse(child)
+        try:
+            read = read_subcrate_cached(
+                info.metadata_file, self._nested_ids(info), self.collect_metrics,
+                self.use_sidecars, self.write_sidecars
+            )
+        except (OSError, ValueError) as e:
+            self._record_error(info, e)
+        else:
+            self._record(info, read)
+
+    def _parse_parallel(self, jobs: int) -> None:
+        remaining = {id(info): len(info.children) for info in self.subcrates}
+        running: Dict[Future, SubcrateInfo] = {}
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            def submit(info: SubcrateInfo) -> None:
+                future = pool.submit(
+                    read_subcrate_cached, info.metadata_file, self._nested_ids(info),
+                    self.collect_metrics, self.use_sidecars, self.write_sidecars
+                )
+                running[future] = info
+
+            for info in self.subcrates:
+                if not info.children:
+                    submit(info)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    info = running.pop(future)
+                    try:
+                        read = future.result()
+                    except (OSError, ValueError) as e:
+                        self._record_error(info, e)
+                    else:
+                        self._record(info, read)
+                    parent = info.parent
+                    if parent is not None:
+                        remaining[id(parent)] -= 1
+                        if remaining[id(parent)] == 0:
+                            submit(parent)
+
+    def _record(self, info: SubcrateInfo, read: SubcrateRead) -> None:
+        declared = _extract_content_size_bytes(read.root.get('contentSize')) if read.root else 0
+        if declared > 0:
+            size_bytes = declared
+        else:
+            size_bytes = read.own_size + sum(child.size_bytes for child in info.children)
+        info.root_id = read.root_id
+        info.root = read.root
+        info.size_bytes = size_bytes
+        info.metrics = read.metrics
+        info.from_sidecar = read.from_sidecar
+        info.error = None
+
+    def _record_error(self, info: SubcrateInfo, error: Exception) -> None:
+        print(f"Error reading subcrate metadata {info.metadata_file}: {error}")
+        info.root_id, info.root, info.size_bytes, info.metrics = None, None, 0, None
+        info.from_sidecar = False
+        info.error = str(error)
+
+    def subcrate_metadata(self) -> Dict[str, List[str]]:
+        """Unique, sorted authors and keywords over every sub-crate root."""
+        self.parse()
+        authors = set()
+        keywords = set()
+        for info in self.subcrates:
+            if not info.root:
+                continue
+            author_value = info.root.get('author')
+            if isinstance(author_value, str):
+                for author in [a.strip() for a in author_value.split(',')]:
+                    if author:
+                        authors.add(author)
+            elif isinstance(author_value, (list, tuple)):
+                for author in author_value:
+                    if isinstance(author, str):
+                        authors.add(author)
+
+            keyword_values = info.root.get('keywords')
+            if isinstance(keyword_values, (list, tuple)):
+                for keyword in keyword_values:
+                    if keyword and isinstance(keyword, str):
+                        keywords.add(keyword)
+            elif isinstance(keyword_values, str):
+                for keyword in [k.strip() for k in keyword_values.split(',')]:
+                    if keyword:
+                        keywords.add(keyword)
+        return {
+            'authors': sorted(authors),
+            'keywords': sorted(keywords)
+        }
+
+    @property
+    def sidecar_hits(self) -> int:
+        """Sub-crates whose last parse was answered from a current metrics sidecar."""
+        return sum(1 for info in self.subcrates if info.from_sidecar)
+
+    def total_content_size_bytes(self) -> int:
+        """Hierarchy-aware content size: the sum over the top-most sub-crates."""
+        self.parse()
+        return sum(info.size_bytes for info in self.top_level)
+
+    def aggregated_metrics(self) -> AggregatedMetrics:
+        """AggregatedMetrics over every sub-crate entity, as a new object."""
+        if not self.collect_metrics:
+            raise ValueError("ReleaseScan was created with collect_metrics=False")
+        self.parse()
+        metrics = AggregatedMetrics()
+        for info in self.subcrates:
+            if info.metrics is not None:
+                metrics.merge(info.metrics)
+        metrics.total_content_size_bytes = self.total_content_size_bytes()
+        return metrics
@@ -1,10 +1,10 @@
 import json
+import logging
 import pathlib
 import shutil
-import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional, Union, List, Dict, Any, Set, Tuple
+from typing import Optional, Union, List, Dict, Any, Iterable, Set, Tuple
 
 from pydantic import Field, ConfigDict
 
@@ -14,7 +14,14 @@ from fairscape_cli.models.dataset import Dataset
 from fairscape_cli.models.computation import Computation
 from fairscape_cli.models.guid_utils import GenerateDatetimeSquid, clean_guid
 from fairscape_models.rocrate import ROCrateV1_2, ROCrateMetadataElem, ROCrateMetadataFileElem
-from fairscape_cli.utils.serialization import prune_none, model_dump_pruned
+from fairscape_cli.utils.serialization import model_dump_pruned, write_json_atomic
+from fairscape_cli.models.crate_document import CrateDocument, active_crate_document, read_crate_metadata, update_in_place
+from fairscape_cli.utils.crate_index import load_crate_index, read_indexed_entity, update_indexed_entity
+from fairscape_cli.utils.crate_lock import maybe_crate_lock
+from fairscape_cli.utils.graph_stream import iter_graph_entities, find_root_entity
+from fairscape_cli.utils.graph_query import GraphQueryEngine, GraphQueryError
+
+logger = logging.getLogger(__name__)
 
 def GenerateROCrate(
    path: pathlib.Path,
@@ -85,8 +92,7 @@ def GenerateROCrate(
        if not path.exists():
            path.mkdir(parents=True, exist_ok=True)
 
-   with roCrateMetadataPath.open(mode="w") as metadataFile:
-       json.dump(rocrate_dict, metadataFile, indent=2)
+   write_json_atomic(roCrateMetadataPath, rocrate_dict)
 
    return model_dump_pruned(root_dataset, by_alias=True)
 class ROCrate(ROCrateMetadataElem):
@@ -157,57 +163,54 @@ class ROCrate(ROCrateMetadataElem):
         )
         
         subcrate_metadata_path = full_subcrate_path / 'ro-crate-metadata.json'
-        with subcrate_metadata_path.open('r+') as f:
+        with subcrate_metadata_path.open('r') as f:
             subcrate_metadata = json.load(f)
-            root_dataset = subcrate_metadata['@graph'][1]
-            
-            root_dataset['isPartOf'] = [{"@id": parent_id}]
-            
-            f.seek(0)
-            f.truncate()
-            json.dump(subcrate_metadata, f, indent=2)
+        root_dataset = subcrate_metadata['@graph'][1]
+
+        root_dataset['isPartOf'] = [{"@id": parent_id}]
+
+        write_json_atomic(subcrate_metadata_path, subcrate_metadata)
         
-        with parent_metadata_path.open('r+') as f:
-            parent_metadata = json.load(f)
-            root_dataset = parent_metadata['@graph'][1]
+        with maybe_crate_lock(parent_metadata_path):
+            with parent_metadata_path.open('r') as f:
+                parent_metadata = json.load(f)
+                root_dataset = parent_metadata['@graph'][1]
             
-            if 'hasPart' not in root_dataset:
-                root_dataset['hasPart'] = []
+                if 'hasPart' not in root_dataset:
+                    root_dataset['hasPart'] = []
             
-            subcrate_ref = {
-                "@id": subcrate['@id'],
-                "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"],
-                "name": name,
-                "description": description,
-                "keywords": keywords,
-                "author": author,
-                "version": version,
-                "license": license,
-                "isPartOf": [{"@id": parent_id}],
-                "hasPart": [],
-                "contentUrl": f"file:///{str(subcrate_path / 'ro-crate-metadata.json')}",
-                "datePublished": datetime.now().isoformat()
-            }
+                subcrate_ref = {
+                    "@id": subcrate['@id'],
+                    "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"],
+                    "name": name,
+                    "description": description,
+                    "keywords": keywords,
+                    "author": author,
+                    "version": version,
+                    "license": license,
+                    "isPartOf": [{"@id": parent_id}],
+                    "hasPart": [],
+                    "contentUrl": f"file:///{str(subcrate_path / 'ro-crate-metadata.json')}",
+                    "datePublished": datetime.now().isoformat()
+                }
             
-            parent_metadata['@graph'].append(subcrate_ref)
+                parent_metadata['@graph'].append(subcrate_ref)
             
-            if not any(part.get('@id') == subcrate['@id'] for part in root_dataset['hasPart']):
-                root_dataset['hasPart'].append({"@id": subcrate['@id']})
+                if not any(part.get('@id') == subcrate['@id'] for part in root_dataset['hasPart']):
+                    root_dataset['hasPart'].append({"@id": subcrate['@id']})
             
-            if 'version' not in root_dataset:
-                root_dataset['version'] = getattr(self, 'version', "1.0")
-            if 'author' not in root_dataset:
-                root_dataset['author'] = getattr(self, 'author', "Unknown")
-            if 'license' not in root_dataset:
-                root_dataset['license'] = getattr(self, 'license', "https://creativecommons.org/licenses/by/4.0/")
-            if 'isPartOf' not in root_dataset:
-                root_dataset['isPartOf'] = []
+                if 'version' not in root_dataset:
+                    root_dataset['version'] = getattr(self, 'version', "1.0")
+                if 'author' not in root_dataset:
+                    root_dataset['author'] = getattr(self, 'author', "Unknown")
+                if 'license' not in root_dataset:
+                    root_dataset['license'] = getattr(self, 'license', "https://creativecommons.org/licenses/by/4.0/")
+                if 'isPartOf' not in root_dataset:
+                    root_dataset['isPartOf'] = []
                 
-            rocrate = ROCrateV1_2.model_validate(parent_metadata)
-            
-            f.seek(0)
-            f.truncate()
-            json.dump(model_dump_pruned(rocrate, by_alias=True), f, indent=2)
+                rocrate = ROCrateV1_2.model_validate(parent_metadata)
+
+            write_json_atomic(parent_metadata_path, rocrate.model_dump(by_alias=True), prune=True)
         
         return subcrate['@id']
 
@@ -263,33 +266,11 @@ class ROCrate(ROCrateMetadataElem):
         ROCrateV1_2(**rocrate_metadata)
 
         # Write to file
-        with ro_crate_metadata_path.open(mode="w") as metadata_file:
-            json.dump(prune_none(rocrate_metadata), metadata_file, indent=2)
+        write_json_atomic(ro_crate_metadata_path, rocrate_metadata, prune=True)
 
     def registerObject(self, model: Union[Dataset, Software, Computation]):
         """Add metadata to the graph of an ROCrate"""
-        metadata_path = self.path / 'ro-crate-metadata.json'
-
-        with metadata_path.open("r+") as rocrate_metadata_file:
-            rocrate_metadata = json.load(rocrate_metadata_file)
-            
-            # Add to the @graph
-            model_data = model_dump_pruned(model, by_alias=True)
-            rocrate_metadata['@graph'].append(model_data)
-            
-            # Add reference to root dataset's hasPart
-            root_dataset = rocrate_metadata['@graph'][1]  # Second element after descriptor
-            if 'hasPart' not in root_dataset:
-                root_dataset['hasPart'] = []
-            root_dataset['hasPart'].append({"@id": model_data["@id"]})
-
-            # Validate updated structure
-            ROCrateV1_2(**rocrate_metadata)
-            
-            # Write back to file
-            rocrate_metadata_file.seek(0)
-            rocrate_metadata_file.truncate()
-            json.dump(prune_none(rocrate_metadata), rocrate_metadata_file, indent=2)
+        AppendCrate(self.path, [model])
 
     def registerDataset(self, dataset: Dataset):
         self.registerObject(dataset)
@@ -307,41 +288,32 @@ def ReadROCrateMetadata(cratePath: pathlib.Path) -> Dict[str, Any]:
     else:
         metadata_path = cratePath / "ro-crate-metadata.json"
 
-    with metadata_path.open("r") as metadata_file:
-        crate_metadata = json.load(metadata_file)
-        validated_graph = ROCrateV1_2.validate_metadata_graph(crate_metadata)
+    crate_document = active_crate_document(metadata_path)
+    if crate_document is not None:
+        # Serve the open session's in-memory graph, validated once per change;
+        # the models are new objects, so the session's entity dicts are untouched.
+        crate_metadata = dict(crate_document.metadata)
+        crate_metadata['@graph'] = list(crate_document.validated_graph())
         return crate_metadata
 
+    crate_metadata = read_crate_metadata(metadata_path)
+    ROCrateV1_2.validate_metadata_graph(crate_metadata)
+    return crate_metadata
+
 def AppendCrate(
     cratePath: pathlib.Path,
     elements: List[Union[Dataset, Software, Computation]]
 ):
-    if cratePath.is_dir():
-        cratePath = cratePath / 'ro-crate-metadata.json'
+    """Append elements to the crate and reference them from the root's hasPart.
 
+    Inside an open `CrateDocument` for the same crate this only updates the
+    in-memory graph; otherwise the file is loaded, validated and written once.
+    """
     if not elements:
         return None
 
-    with cratePath.open("r+") as rocrate_metadata_file:
-        rocrate_metadata = json.load(rocrate_metadata_file)
-        
-        
-        root_dataset = rocrate_metadata['@graph'][1]  # Second element after descriptor
-        if 'hasPart' not in root_dataset:
-            root_dataset['hasPart'] = []
-            
-        for element in elements:
-            element_data = model_dump_pruned(element, by_alias=True)
-            rocrate_metadata['@graph'].append(element_data)
-            root_dataset['hasPart'].append({"@id": element_data["@id"]})
-        
-        # Validate updated structure
-        ROCrateV1_2(**rocrate_metadata)
-        
-        # Write back to file
-        rocrate_metadata_file.seek(0)
-        rocrate_metadata_file.truncate()
-        json.dump(prune_none(rocrate_metadata), rocrate_metadata_file, indent=2)
+    with CrateDocument.open(cratePath) as crate_document:
+        crate_document.append(elements)
 
 
 def CopyToROCrate(source_filepath: str, destination_filepath: str):
@@ -372,27 +344,15 @@ def UpdateCrate(
     cratePath: pathlib.Path,
     element: Union[Dataset, Software, Computation]
 ):
-    """Update an existing element in the RO-Crate metadata"""
-    if cratePath.is_dir():
-        cratePath = cratePath / 'ro-crate-metadata.json'
+    """Update an existing element in the RO-Crate metadata.
 
-    with cratePath.open("r+") as rocrate_metadata_file:
-        rocrate_metadata = json.load(rocrate_metadata_file)
-        
-        # Find and replace the element with matching @id
-        element_data = model_dump_pruned(element, by_alias=True)
-        for i, existing in enumerate(rocrate_metadata['@graph']):
-            if existing.get('@id') == element_data['@id']:
-                rocrate_metadata['@graph'][i] = element_data
-                break
-        
-        # Validate updated structure
-        ROCrateV1_2(**rocrate_metadata)
-        
-        # Write back to file
-        rocrate_metadata_file.seek(0)
-        rocrate_metadata_file.truncate()
-        json.dump(prune_none(rocrate_metadata), rocrate_metadata_file, indent=2)
+    With a fresh ro-crate-metadata.idx sidecar (and no open session) the
+    entity is spliced into the file in place; otherwise a CrateDocument is used.
+    """
+    if update_in_place(cratePath, element):
+        return
+    with CrateDocument.open(cratePath) as crate_document:
+        crate_document.update(element)
 
 # Root-dataset fields propagated from a parent crate into its subcrates by LinkSubcrates
 TRANSFERABLE_FIELDS = [
@@ -445,17 +405,29 @@ def _link_one_subcrate(
     subcrate_metadata_file: pathlib.Path,
     transferable_data: dict,
     parent_root_id: str,
-    base_path: pathlib.Path
+    base_path: pathlib.Path,
+    size_bytes: Optional[int] = None
 ) -> Optional[dict]:
     """Backfill transferable metadata + isPartOf into one subcrate.
 
+    `size_bytes` is the crate's content size when already known (from a
+    ReleaseScan); otherwise it is computed if the root needs a contentSize.
+
     Returns the subcrate root as a reference entry for the parent @graph,
     or None if the subcrate has no findable root dataset.
     """
-    with subcrate_metadata_file.open('r') as f:
-        subcrate_metadata = json.load(f)
-
-    _, subcrate_root, subcrate_root_index = _find_root_dataset(subcrate_metadata)
+    subcrate_metadata = None
+    index = load_crate_index(subcrate_metadata_file)
+    if index is not None:
+        # Seek straight to the descriptor and root instead of parsing the crate.
+        descriptor = read_indexed_entity(subcrate_metadata_file, 'ro-crate-metadata.json', index=index) or {}
+        root_ref = descriptor.get('about')
+        root_id = root_ref.get('@id') if isinstance(root_ref, dict) else None
+        subcrate_root = read_indexed_entity(subcrate_metadata_file, root_id, index=index) if root_id else None
+    else:
+        with subcrate_metadata_file.open('r') as f:
+            subcrate_metadata = json.load(f)
+        _, subcrate_root, subcrate_root_index = _find_root_dataset(subcrate_metadata)
     if not subcrate_root:
         return None
 
@@ -466,7 +438,8 @@ def _link_one_subcrate(
             modified = True
 
     if _is_blank(subcrate_root.get('contentSize')):
-        _, size_bytes = _crate_size_info(subcrate_metadata_file)
+        if size_bytes is None:
+            _, size_bytes = _crate_size_info(subcrate_metadata_file)
         if size_bytes > 0:
             subcrate_root['contentSize'] = format_content_size_bytes(size_bytes)
             modified = True
@@ -482,21 +455,32 @@ def _link_one_subcrate(
         subcrate_root['isPartOf'].append({'@id': parent_root_id})
         modified = True
 
-    if modified:
+    if modified and subcrate_metadata is None:
+        update_indexed_entity(subcrate_metadata_file, subcrate_root, index=index)
+    elif modified:
         subcrate_metadata['@graph'][subcrate_root_index] = subcrate_root
-        with subcrate_metadata_file.open('w') as f:
-            json.dump(prune_none(subcrate_metadata), f, indent=2)
+        write_json_atomic(subcrate_metadata_file, subcrate_metadata, prune=True)
 
     reference_dict = dict(subcrate_root)
     reference_dict['ro-crate-metadata'] = (subcrate_metadata_file.relative_to(base_path)).as_posix()
     return reference_dict
 
 
-def LinkSubcrates(parent_crate_path: pathlib.Path) -> List[str]:
+def LinkSubcrates(parent_crate_path: pathlib.Path, scan=None) -> List[str]:
+    """Link the top-most subcrates below parent_crate_path into the parent crate.
+
+    Pass a `ReleaseScan` of the parent to reuse its sub-crate hierarchy and
+    content sizes instead of walking and re-reading the tree.
+    """
     parent_metadata_file = parent_crate_path / 'ro-crate-metadata.json'
     if not parent_metadata_file.is_file():
         raise FileNotFoundError(f"Parent metadata file not found: {parent_metadata_file}")
 
+    with maybe_crate_lock(parent_metadata_file):
+        return _link_subcrates(parent_crate_path, parent_metadata_file, scan)
+
+
+def _link_subcrates(parent_crate_path: pathlib.Path, parent_metadata_file: pathlib.Path, scan=None) -> List[str]:
     with parent_metadata_file.open('r') as f:
         parent_metadata = json.load(f)
 
@@ -513,25 +497,39 @@ def LinkSubcrates(parent_crate_path: pathlib.Path) -> List[str]:
     sub_crate_references = []
     linked_sub_crate_ids = []
 
+    def link_subcrate(item: pathlib.Path, size_bytes: Optional[int] = None) -> bool:
+        subcrate_metadata_file = item / 'ro-crate-metadata.json'
+        with maybe_crate_lock(subcrate_metadata_file):
+            reference_dict = _link_one_subcrate(
+                subcrate_metadata_file, transferable_data, parent_root_id, parent_crate_path, size_bytes
+            )
+        if reference_dict is None:
+            print(f"WARNING: Could not find root dataset in subcrate: {item}")
+            return False
+        sub_crate_references.append(reference_dict)
+        linked_sub_crate_ids.append(reference_dict['@id'])
+        return True
+
     def find_and_process_subcrates(directory: pathlib.Path):
         for item in directory.iterdir():
             if not item.is_dir():
                 continue
-            subcrate_metadata_file = item / 'ro-crate-metadata.json'
-            if not subcrate_metadata_file.is_file():
+            if not (item / 'ro-crate-metadata.json').is_file():
                 find_and_process_subcrates(item)
                 continue
-            reference_dict = _link_one_subcrate(
-                subcrate_metadata_file, transferable_data, parent_root_id, parent_crate_path
-            )
-            if reference_dict is None:
-                print(f"WARNING: Could not find root dataset in subcrate: {item}")
+            if not link_subcrate(item):
                 find_and_process_subcrates(item)
                 return
-            sub_crate_references.append(reference_dict)
-            linked_sub_crate_ids.append(reference_dict['@id'])
 
-    find_and_process_subcrates(parent_crate_path)
+    def process_scanned_subcrates(subcrates):
+        for info in subcrates:
+            if not link_subcrate(info.path, info.size_bytes if info.error is None else None):
+                process_scanned_subcrates(info.children)
+
+    if scan is not None:
+        process_scanned_subcrates(scan.parse().top_level)
+    else:
+        find_and_process_subcrates(parent_crate_path)
 
     if sub_crate_references:
         parent_root_dataset.setdefault('hasPart', [])
@@ -546,8 +544,7 @@ def LinkSubcrates(parent_crate_path: pathlib.Path) -> List[str]:
             if sub_id not in existing_haspart_ids:
                 parent_root_dataset['hasPart'].append({'@id': sub_id})
 
-        with parent_metadata_file.open('w') as f:
-            json.dump(prune_none(parent_metadata), f, indent=2)
+        write_json_atomic(parent_metadata_file, parent_metadata, prune=True)
     else:
         print("No valid sub-crates found to link.")
 
@@ -558,55 +555,9 @@ def collect_subcrate_metadata(parent_crate_path: pathlib.Path) -> dict:
     Collects author and keyword metadata from all subcrates in the parent crate.
     Returns a dictionary with 'authors' (list of unique authors) and 'keywords' (list of unique keywords).
     """
-    parent_crate_path = pathlib.Path(parent_crate_path)
-    authors = set()
-    keywords = set()
-    processed_files = set()
-    
-    def process_directory(directory):
-        for path in directory.glob('**/ro-crate-metadata.json'):
-            if path.is_file() and str(path) not in processed_files:
-                processed_files.add(str(path))
-                
-                try:
-                    subcrate_metadata = ReadROCrateMetadata(path)
-                    root_dataset = None
-                    if '@graph' in subcrate_metadata and len(subcrate_metadata['@graph']) > 1:
-                        root_dataset = subcrate_metadata['@graph'][1]
-                    
-                    
-                    if root_dataset:
-                        if root_dataset.author:
-                            author_value = root_dataset.author
-                            if isinstance(author_value, str):
-                                for author in [a.strip() for a in author_value.split(',')]:
-                                    if author:
-                                        authors.add(author)
-                            elif isinstance(author_value, tuple) or isinstance(author_value, list):
-                                for author in author_value:
-                                    if isinstance(author, str):
-                                        authors.add(author)
-                        
-                        if root_dataset.keywords:
-                            keyword_values = root_dataset.keywords
-                            if isinstance(keyword_values, list) or isinstance(keyword_values, tuple):
-                                for keyword in keyword_values:
-                                    if keyword:
-                                        keywords.add(keyword)
-                            elif isinstance(keyword_values, str):
-                                for keyword in [k.strip() for k in keyword_values.split(',')]:
-                                    if keyword:
-                                        keywords.add(keyword)
-                except Exception as e:
-                    print(f"Error reading subcrate metadata {path}: {e}")
-                    continue
-    for dir_item in parent_crate_path.iterdir():
-        if dir_item.is_dir():
-            process_directory(dir_item)
-    return {
-        'authors': sorted(list(authors)),
-        'keywords': sorted(list(keywords))
-    }
+    from fairscape_cli.models.release_scan import ReleaseScan
+
+    return ReleaseScan(parent_crate_path, collect_metrics=False).subcrate_metadata()
 
 
 @dataclass
@@ -655,6 +606,37 @@ class AggregatedMetrics:
     tabular_with_schema: int = 0
     tabular_with_stats: int = 0
 
+    def merge(self, other: "AggregatedMetrics") -> "AggregatedMetrics":
+        """Add another crate's metrics into these: counts are summed, sets unioned, lists extended."""
+        for metric in fields(self):
+            value = getattr(other, metric.name)
+            if isinstance(value, set):
+                getattr(self, metric.name).update(value)
+            elif isinstance(value, list):
+                getattr(self, metric.name).extend(value)
+            else:
+                setattr(self, metric.name, getattr(self, metric.name) + value)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form of the metrics; sets become sorted lists."""
+        return {
+            metric.name: sorted(getattr(self, metric.name)) if isinstance(getattr(self, metric.name), set)
+            else getattr(self, metric.name)
+            for metric in fields(self)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AggregatedMetrics":
+        """Inverse of `to_dict`. Raises KeyError if a metric is missing."""
+        metrics = cls()
+        for metric in fields(cls):
+            value = data[metric.name]
+            if isinstance(getattr(metrics, metric.name), set):
+                value = set(value)
+            setattr(metrics, metric.name, value)
+        return metrics
+
 
 def _extract_content_size_bytes(size_str) -> int:
     """
@@ -711,13 +693,11 @@ def _crate_size_info(metadata_path: pathlib.Path) -> Tuple[Optional[str], int]:
         (root @id or None, size in bytes)
     """
     try:
-        with metadata_path.open('r') as f:
-            metadata = json.load(f)
+        root_id, root = find_root_entity(metadata_path, fields=['contentSize'])
     except Exception as e:
         print(f"Error reading crate metadata for size roll-up {metadata_path}: {e}")
         return None, 0
 
-    root_id, root, _ = _find_root_dataset(metadata)
     if root:
         declared = _extract_content_size_bytes(root.get('contentSize'))
         if declared > 0:
@@ -744,11 +724,15 @@ def _crate_size_info(metadata_path: pathlib.Path) -> Tuple[Optional[str], int]:
 
     recurse_nested(metadata_path.parent)
 
-    for entity in metadata.get('@graph', []):
-        entity_id = entity.get('@id')
-        if entity_id in counted_ids or entity_id in (root_id, 'ro-crate-metadata.json'):
-            continue
-        total += _extract_content_size_bytes(entity.get('contentSize'))
+    try:
+        for entity in iter_graph_entities(metadata_path, fields=['contentSize']):
+            entity_id = entity.get('@id')
+            if entity_id in counted_ids or entity_id in (root_id, 'ro-crate-metadata.json'):
+                continue
+            total += _extract_content_size_bytes(entity.get('contentSize'))
+    except Exception as e:
+        print(f"Error reading crate metadata for size roll-up {metadata_path}: {e}")
+        return None, 0
 
     return root_id, total
 
@@ -883,7 +867,9 @@ def _accumulate_entity_metrics(metrics: AggregatedMetrics, entity: Dict[str, Any
 
 
 def collect_subcrate_aggregated_metrics(
-    parent_crate_path: pathlib.Path
+    parent_crate_path: pathlib.Path,
+    jobs: Optional[int] = None,
+    write_sidecars: bool = True
 ) -> AggregatedMetrics:
     """
     Collect aggregated metrics from all subcrates for AI-Ready scoring.
@@ -896,77 +882,21 @@ def collect_subcrate_aggregated_metrics(
 
     Args:
         parent_crate_path: Path to the release directory containing sub-crates
+        jobs: Worker processes that parse sub-crates in parallel (None or 1:
+            serial); the result is identical either way
+        write_sidecars: Write ro-crate-metrics.json sidecars for sub-crates
+            that had to be re-read; False only reuses current ones
 
     Returns:
         AggregatedMetrics object with all roll-up properties
     """
-    parent_crate_path = pathlib.Path(parent_crate_path)
-    metrics = AggregatedMetrics()
-    processed_files = set()
-
-    def process_directory(directory: pathlib.Path):
-        """Recursively process directories to find and aggregate subcrate metadata."""
-        for path in directory.glob('**/ro-crate-metadata.json'):
-            if path.is_file() and str(path) not in processed_files:
-                processed_files.add(str(path))
-
-                subcrate_metadata = ReadROCrateMetadata(path)
-                graph = subcrate_metadata.get('@graph', [])
-
-                for entity in graph:
-                    # Convert pydantic to dict
-                    if hasattr(entity, 'model_dump'):
-                        entity = entity.model_dump(by_alias=True)
-
-                    if entity.get('@id') == 'ro-crate-metadata.json':
-                        continue
-
-                    _accumulate_entity_metrics(metrics, entity)
-
-    def accumulate_sizes(directory: pathlib.Path):
-        """Sum sizes of the top-most crates only; _crate_size_info handles nesting."""
-        for item in directory.iterdir():
-            if not item.is_dir():
-                continue
-            crate_metadata = item / 'ro-crate-metadata.json'
-            if crate_metadata.is_file():
-                _, size_bytes = _crate_size_info(crate_metadata)
-                metrics.total_content_size_bytes += size_bytes
-            else:
-                accumulate_sizes(item)
-
-    for dir_item in parent_crate_path.iterdir():
-        if dir_item.is_dir():
-            process_directory(dir_item)
-
-    accumulate_sizes(parent_crate_path)
+    from fairscape_cli.models.release_scan import ReleaseScan
 
-    return metrics
+    return ReleaseScan(parent_crate_path, jobs=jobs, write_sidecars=write_sidecars).aggregated_metrics()
 
 
 # MongoDB-style in-place updates of the @graph (used by the `augment` commands)
 
-def _transform_entities_for_mongo(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Transforms RO-Crate entities for MongoDB compatibility (adds _id)."""
-    transformed = []
-    for entity in entities:
-        if not isinstance(entity, dict):
-            continue
-        mongo_entity = entity.copy()
-        mongo_entity['_id'] = entity.get('@id', str(uuid.uuid4()))
-        transformed.append(mongo_entity)
-    return transformed
-
-def _transform_entities_from_mongo(mongo_entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Transforms entities back from MongoDB representation (removes temporary _id if needed)."""
-    original_entities = []
-    for mongo_entity in mongo_entities:
-        original_entity = mongo_entity.copy()
-        if '_id' in original_entity and original_entity.get('@id'):
-            del original_entity['_id']
-        original_entities.append(original_entity)
-    return original_entities
-
 def UpdateEntitiesInGraph(
     cratePath: pathlib.Path,
     query_dict: Dict[str, Any],
@@ -983,58 +913,66 @@ def UpdateEntitiesInGraph(
     Returns:
         A tuple (success_status, message_string).
     """
-    try:
-        import mongomock
-
-        if cratePath.is_dir():
-            metadata_filepath = cratePath / 'ro-crate-metadata.json'
-        else:
-            metadata_filepath = cratePath
-
-        crate_data = ReadROCrateMetadata(metadata_filepath)
-        original_graph_entities = [entity.model_dump(by_alias=True) for entity in crate_data.get('@graph', [])]
-
-        if not original_graph_entities:
-            return True, "RO-Crate @graph is empty. No entities to update."
-
-        collection = mongomock.MongoClient().db.collection
-
-        entities_for_mongo = _transform_entities_for_mongo(original_graph_entities)
-        
-        if entities_for_mongo:
-            try:
-                collection.insert_many(entities_for_mongo, ordered=False)
-            except Exception as e: 
-                print(f"Warning: mongomock bulk insert failed during update: {e}. This might indicate issues with source data like non-unique @ids.")
-                return False, f"MongoDB-style operation failed: {e}"
-            
+    return ApplyGraphUpdates(cratePath, [(query_dict, update_dict)])
 
-        try:
-            result = collection.update_many(query_dict, update_dict)
-            modified_count = result.modified_count
-            matched_count = result.matched_count
-        except Exception as e:
-            return False, f"MongoDB-style operation failed: {e}"
 
-        if modified_count == 0:
-            return True, f"No entities were modified. Matched: {matched_count}, Modified: {modified_count}."
+def ApplyGraphUpdates(
+    cratePath: pathlib.Path,
+    operations: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]
+) -> Tuple[bool, str]:
+    """
+    Applies a batch of (query, update) operations to the @graph in one pass.
 
-        updated_mongo_entities = list(collection.find({}))
+    The crate is loaded once, operations run in order against the in-memory
+    graph through `GraphQueryEngine` (so later operations see earlier
+    changes), only the changed entities are validated, and the file is
+    written once. Nothing is written if any operation fails.
 
-        final_graph_entities = _transform_entities_from_mongo(updated_mongo_entities)
-        crate_data['@graph'] = final_graph_entities
-        
-        try:
-            validated_crate = ROCrateV1_2.model_validate(crate_data)
-        except Exception as e:
-            return False, f"RO-Crate became invalid after update operations. Details: {e}"
+    Returns:
+        A tuple (success_status, message_string).
+    """
+    try:
+        metadata_filepath = cratePath / 'ro-crate-metadata.json' if cratePath.is_dir() else cratePath
 
-        with metadata_filepath.open(mode="w") as metadataFile:
-            json.dump(model_dump_pruned(validated_crate, by_alias=True), metadataFile, indent=2, ensure_ascii=False)
+        operation_count = 0
+        matched_count = 0
+        modified_ids: Dict[str, None] = {}
+        with CrateDocument.open(metadata_filepath, ensure_ascii=False) as crate_document:
+            if not crate_document.graph:
+                return True, "RO-Crate @graph is empty. No entities to update."
 
-        return True, f"Successfully processed entities. Matched: {matched_count}, Modified: {modified_count}."
-    
+            engine = GraphQueryEngine(crate_document.graph)
+            try:
+                for query_dict, update_dict in operations:
+                    operation_count += 1
+                    try:
+                        matched, modified = engine.update_many(query_dict, update_dict)
+                    except GraphQueryError as e:
+                        raise GraphQueryError(f"operation {operation_count}: {e}") from e
+                    matched_count += matched
+                    modified_ids.update(dict.fromkeys(modified))
+            except BaseException:
+                # The session may be shared with an enclosing one that will
+                # still flush; leave no partial edits behind for it.
+                engine.rollback()
+                raise
+
+            for entity_id in modified_ids:
+                crate_document.mark_dirty(entity_id)
+
+    except GraphQueryError as e:
+        return False, f"MongoDB-style operation failed: {e}"
+    except ValueError as e:
+        return False, f"RO-Crate became invalid after update operations. Details: {e}"
     except Exception as e:
-        import traceback
-        print(f"DEBUG: Unexpected error in UpdateEntitiesInGraph: {traceback.format_exc()}")
+        logger.debug("Unexpected error in ApplyGraphUpdates", exc_info=True)
         return False, f"An unexpected error occurred: {type(e).__name__} - {e}"
+
+    if not modified_ids:
+        return True, f"No entities were modified. Matched: {matched_count}, Modified: 0."
+    if operation_count == 1:
+        return True, f"Successfully processed entities. Matched: {matched_count}, Modified: {len(modified_ids)}."
+    return True, (
+        f"Successfully processed {operation_count} operations. "
+        f"Matched: {matched_count}, Modified: {len(modified_ids)}."
+    )
@@ -2,10 +2,10 @@ from pathlib import Path
 from typing import Set, Dict, List, Optional, Tuple
 import subprocess
 import pathlib
-import hashlib
 from pydantic import ValidationError
 
 from fairscape_cli.models.base import FairscapeBaseModel
+from fairscape_cli.utils.hash_cache import file_digest
 
 def setRelativeFilepath(cratePath, filePath):
     '''Modify the filepath specified in metadata to be relative to the crate'''
@@ -68,16 +68,29 @@ def run_command(command: str) -> Tuple[bool, str, str]:
         return False, "", str(e)
     
 def getEntityFromCrate(crate_instance, entity_id: str) -> Optional[FairscapeBaseModel]:
-    """Get entity from crate by ID"""
+    """Get entity from crate by ID
+
+    `crate_instance` may also be a crate path: the entity is then read with a
+    single seek via the ro-crate-metadata.idx sidecar when it is fresh, or
+    found by streaming the @graph otherwise.
+    """
+    if isinstance(crate_instance, (str, pathlib.Path)):
+        from fairscape_cli.utils.crate_index import load_crate_index, read_indexed_entity
+        from fairscape_cli.utils.graph_stream import iter_graph_entities
+
+        index = load_crate_index(crate_instance)
+        if index is not None:
+            return read_indexed_entity(crate_instance, entity_id, index=index)
+        return next(
+            (entity for entity in iter_graph_entities(crate_instance) if entity.get('@id') == entity_id),
+            None
+        )
+
     for entity in crate_instance.metadataGraph:
         if entity.guid == entity_id:
             return entity.dict()
     return None
 
 def calculate_md5(filepath: str) -> str:
-    """Calculate MD5 hash of a file"""
-    hash_md5 = hashlib.md5()
-    with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
\ No newline at end of file
+    """Calculate MD5 hash of a file, answering from the checksum cache when possible"""
+    return file_digest(filepath, "md5")
\ No newline at end of file
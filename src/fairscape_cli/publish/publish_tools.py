@@ -8,6 +8,12 @@ import csv
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 
+from fairscape_cli.models.crate_document import JOURNAL_FILENAME, compact_crate_journal, compact_crate_journals
+from fairscape_cli.utils.crate_lock import LOCK_FILENAME
+
+# Local sidecars that are never part of a published crate.
+_UNPUBLISHED_FILES = (LOCK_FILENAME, JOURNAL_FILENAME)
+
 def _load_authors_info(authors_csv_path: Optional[str]) -> Dict[str, Dict[str, str]]:
     authors_info = {}
     if authors_csv_path:
@@ -27,8 +33,21 @@ def _load_authors_info(authors_csv_path: Optional[str]) -> Dict[str, Dict[str, s
             click.echo(f"Warning: Error loading authors CSV '{authors_csv_path}': {e}", err=True)
     return authors_info
 
+def _compact_journals(rocrate_path: Path) -> None:
+    """Fold pending journal records into the metadata before publishing.
+
+    A directory has every crate below it compacted; a metadata file just its own.
+    """
+    if rocrate_path.is_dir():
+        applied = compact_crate_journals(rocrate_path)
+    else:
+        applied = compact_crate_journal(rocrate_path)
+    if applied:
+        click.echo(f"Compacted {applied} pending journal record(s) in '{rocrate_path}'.")
+
 def _read_rocrate_root(rocrate_path: Path) -> Optional[Dict]:
     try:
+        _compact_journals(rocrate_path)
         with open(rocrate_path, 'r', encoding='utf-8') as f:
             rocrate_data = json.load(f)
     except FileNotFoundError:
@@ -90,6 +109,8 @@ class FairscapePublisher(Publisher):
         with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for root, _, files in os.walk(directory_path):
                 for file in files:
+                    if file in _UNPUBLISHED_FILES:
+                        continue
                     file_path = os.path.join(root, file)
                     arcname = os.path.relpath(file_path, directory_path)
                     zipf.write(file_path, arcname)
@@ -130,6 +151,7 @@ class FairscapePublisher(Publisher):
         # Check if path is a directory, if so zip it
         if rocrate_path.is_dir():
             click.echo(f"Input path is a directory, zipping it first...")
+            _compact_journals(rocrate_path)
             zip_path = self._zip_directory(rocrate_path)
             try:
                 self._upload_zip(zip_path, token)
@@ -47,3 +47,4 @@ class ProvenanceConfig:
     use_llm: bool = False
     reference_crates: List[Path] = field(default_factory=list)
     start_clean: bool = False
+    journal: bool = False
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Set, Optional, Tuple
+from typing import Any, List, Dict, Set, Optional, Tuple
 import json
 import sys
 
 from fairscape_cli.models.rocrate import ReadROCrateMetadata, AppendCrate
+from fairscape_cli.models.crate_document import CrateDocument
 from fairscape_cli.models.dataset import GenerateDataset, Dataset
 from fairscape_cli.models.software import GenerateSoftware, Software
 from fairscape_cli.models.computation import GenerateComputation, Computation
@@ -17,7 +18,6 @@ from .metadata_generator import MetadataGenerator, FallbackMetadataGenerator, cr
 from .utils import collect_dataset_samples, format_samples_for_prompt
 
 from fairscape_cli.models.rocrate import GenerateROCrate
-from fairscape_cli.utils.serialization import prune_none
 from datetime import datetime
 
 
@@ -32,6 +32,7 @@ class ProvenanceTracker:
         self.metadata_generator = metadata_generator
         self.filepath_to_guid: Dict[str, str] = {}
         self.existing_guids: Set[str] = set()
+        self.entities_by_guid: Dict[str, Any] = {}
         self.crate_metadata = None
 
         self.reference_entities: Dict[str, tuple] = {}
@@ -72,25 +73,20 @@ class ProvenanceTracker:
             return
 
         try:
-            with metadata_path.open('r') as f:
-                crate_data = json.load(f)
+            with CrateDocument.open(metadata_path) as crate_document:
+                graph = crate_document.graph
+                if len(graph) <= 2:
+                    # Only metadata descriptor and root dataset, nothing to clear
+                    return
 
-            graph = crate_data.get('@graph', [])
-            if len(graph) <= 2:
-                # Only metadata descriptor and root dataset, nothing to clear
-                return
+                # Keep only first two elements: metadata descriptor and root dataset
+                kept = graph[:2]
 
-            # Keep only first two elements: metadata descriptor and root dataset
-            crate_data['@graph'] = graph[:2]
+                # Clear hasPart in root dataset
+                if len(kept) > 1 and 'hasPart' in kept[1]:
+                    kept[1]['hasPart'] = []
 
-            # Clear hasPart in root dataset
-            if len(crate_data['@graph']) > 1:
-                root_dataset = crate_data['@graph'][1]
-                if 'hasPart' in root_dataset:
-                    root_dataset['hasPart'] = []
-
-            with metadata_path.open('w') as f:
-                json.dump(prune_none(crate_data), f, indent=2)
+                crate_document.replace_graph(kept)
 
             print(f"Cleared existing @graph entries from {metadata_path}")
 
@@ -112,23 +108,24 @@ class ProvenanceTracker:
                     self.config.keywords = root_dataset.keywords
             
             for entity in self.crate_metadata['@graph']:
-                entity_guid = getattr(entity, 'guid', None)
-                if entity_guid:
-                    self.existing_guids.add(entity_guid)
-                
-                entity_types = getattr(entity, '@type', [])
-                if isinstance(entity_types, str):
-                    entity_types = [entity_types]
-                
-                content_url = getattr(entity, 'contentUrl', None)
-                if content_url and content_url.startswith('file://'):
-                    relative_path = content_url.replace('file:///', '').lstrip('/')
-                    filepath_full = (self.config.rocrate_path / relative_path).resolve()
-                    self.filepath_to_guid[str(filepath_full)] = entity_guid
+                self._index_entity(entity)
             
         except Exception as e:
             raise RuntimeError(f"Could not read RO-Crate at {self.config.rocrate_path}: {e}")
 
+    def _index_entity(self, entity):
+        """Record an entity's guid and local file path for input reuse lookups."""
+        entity_guid = getattr(entity, 'guid', None)
+        if entity_guid:
+            self.existing_guids.add(entity_guid)
+            self.entities_by_guid[entity_guid] = entity
+
+        content_url = getattr(entity, 'contentUrl', None)
+        if isinstance(content_url, str) and content_url.startswith('file://'):
+            relative_path = content_url.replace('file:///', '').lstrip('/')
+            filepath_full = (self.config.rocrate_path / relative_path).resolve()
+            self.filepath_to_guid[str(filepath_full)] = entity_guid
+
     def _load_reference_crates(self):
         """Load reference RO-Crates to look up existing ARKs for input files."""
         for ref_crate_path in self.config.reference_crates:
@@ -193,10 +190,7 @@ class ProvenanceTracker:
             if str(normalized_path) in self.filepath_to_guid:
                 existing_guid = self.filepath_to_guid[str(normalized_path)]
 
-                existing_dataset = next(
-                    (e for e in self.crate_metadata['@graph'] if getattr(e, 'guid', None) == existing_guid),
-                    None
-                )
+                existing_dataset = self.entities_by_guid.get(existing_guid)
                 if existing_dataset:
                     dataset_obj = Dataset.model_validate(existing_dataset)
                     input_datasets.append(dataset_obj)
@@ -440,7 +434,16 @@ class ProvenanceTracker:
         ]
 
         elements = [software] + new_datasets + output_datasets + [computation]
-        AppendCrate(cratePath=self.config.rocrate_path, elements=elements)
+        # Journal mode appends the new entities to ro-crate-metadata.journal.jsonl
+        # instead of rewriting the whole metadata file for every tracked run.
+        with CrateDocument.open(self.config.rocrate_path, journal=self.config.journal or None):
+            AppendCrate(cratePath=self.config.rocrate_path, elements=elements)
+
+        # Keep the loaded context current so later executions against the same
+        # tracker (e.g. inside one CrateDocument session) reuse these entities.
+        self.crate_metadata['@graph'].extend(elements)
+        for element in elements:
+            self._index_entity(element)
         
         return TrackingResult(
             computation_guid=computation.guid,
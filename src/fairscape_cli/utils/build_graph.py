@@ -0,0 +1,178 @@
+"""Content-hash build graph for the per-crate build steps.
+
+`build release` runs a fixed sequence of steps on every crate (inverse
+properties, inputs/outputs, evidence graph, Croissant, preview, Merkle tree,
+datasheet). Each step is a `BuildStep` that declares the files it writes;
+at build time the caller hands `CrateBuild.decide` the step's other inputs
+(parameters, the ontology, sibling crates, content files), and the step is
+re-run only if one of them changed since it last ran, a declared output went
+missing or was edited, or its previous run failed.
+
+Fingerprints are recorded in ``ro-crate-build-manifest.json`` next to the
+crate's metadata. Several steps rewrite ro-crate-metadata.json itself, so the
+file's digest cannot be an input as-is: the manifest also stores the digest
+the metadata had when the last build started (``sourceDigest``) and the one
+it was left with (``settledDigest``). If the file still has the settled
+digest it has not been touched since, and the steps see the source digest.
+Each metadata-writing step then hands the steps after it a token derived
+from the inputs that shape what it writes and from its result, so a change
+that alters an upstream step's contribution to the metadata re-runs
+everything downstream of it, and one that does not stays local.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from fairscape_cli.utils.hash_cache import file_digest
+from fairscape_cli.utils.serialization import write_json_atomic
+
+BUILD_MANIFEST_FILENAME = "ro-crate-build-manifest.json"
+BUILD_MANIFEST_VERSION = 1
+
+
+def fingerprint(value: Any) -> str:
+    """SHA-256 of the canonical JSON form of `value`."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class BuildStep:
+    """One node of the build graph.
+
+    `outputs` are file names relative to the crate directory.
+    `writes_metadata` marks steps that rewrite ro-crate-metadata.json, which
+    makes every later step depend on them; `metadata_inputs` names the
+    inputs that determine what such a step writes (None: all of them). An
+    `optional` step whose action returns False had nothing to build; that
+    result is kept until its inputs change instead of being retried like a
+    failure.
+    """
+    name: str
+    outputs: Tuple[str, ...] = ()
+    writes_metadata: bool = False
+    metadata_inputs: Optional[Tuple[str, ...]] = None
+    optional: bool = False
+
+
+@dataclass
+class StepDecision:
+    """Whether a step runs in this build, and why."""
+    step: BuildStep
+    run: bool
+    reason: str
+    inputs: Dict[str, str] = field(default_factory=dict)
+
+    def explain(self) -> str:
+        return f"{'run' if self.run else 'skip'}: {self.reason}"
+
+
+def _load_manifest(manifest_path: Path) -> Dict[str, Any]:
+    try:
+        with open(manifest_path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != BUILD_MANIFEST_VERSION:
+        return {}
+    return data
+
+
+def metadata_source_digest(crate_path: Path) -> str:
+    """Digest of the metadata a crate's current ro-crate-metadata.json was built from.
+
+    This is the file's own SHA-256 unless the file is exactly what the last
+    recorded build left behind, in which case it is that build's source digest.
+    """
+    metadata_file = crate_path / "ro-crate-metadata.json"
+    current = file_digest(metadata_file, "sha256")
+    manifest = _load_manifest(crate_path / BUILD_MANIFEST_FILENAME)
+    if manifest.get("settledDigest") == current and manifest.get("sourceDigest"):
+        return manifest["sourceDigest"]
+    return current
+
+
+class CrateBuild:
+    """Incremental run of one crate's build steps against its build manifest.
+
+    Call `decide` for every step in pipeline order, then either `record`
+    after running it or `skip`, and `save` once at the end.
+    """
+
+    def __init__(self, crate_path: Path, force: bool = False, source_digest: Optional[str] = None):
+        self.crate_path = crate_path
+        self.manifest_path = crate_path / BUILD_MANIFEST_FILENAME
+        self.force = force
+        self._manifest = _load_manifest(self.manifest_path)
+        self.steps: Dict[str, Dict[str, Any]] = dict(self._manifest.get("steps", {}))
+        self.source_digest = source_digest or metadata_source_digest(crate_path)
+        self._metadata_token = self.source_digest
+
+    def _output_problem(self, step: BuildStep, record: Dict[str, Any]) -> Optional[str]:
+        for name, digest in record.get("outputs", {}).items():
+            output = self.crate_path / name
+            if not output.is_file():
+                return f"output missing: {name}"
+            if file_digest(output, "sha256") != digest:
+                return f"output modified: {name}"
+        return None
+
+    def decide(self, step: BuildStep, **inputs: Any) -> StepDecision:
+        """Compare `step`'s inputs with its last recorded run."""
+        components = {"metadata": self._metadata_token}
+        components.update({key: fingerprint(value) for key, value in inputs.items()})
+        record = self.steps.get(step.name)
+
+        if self.force:
+            decision = StepDecision(step, True, "forced (--force-reprocess)", components)
+        elif record is None:
+            decision = StepDecision(step, True, "no previous build recorded", components)
+        else:
+            previous = record.get("inputs", {})
+            changed = sorted(key for key in set(previous) | set(components)
+                             if previous.get(key) != components.get(key))
+            if changed:
+                decision = StepDecision(step, True, f"inputs changed: {', '.join(changed)}", components)
+            elif not record.get("result") and not step.optional:
+                decision = StepDecision(step, True, "previous run failed", components)
+            else:
+                problem = self._output_problem(step, record)
+                decision = StepDecision(step, problem is not None, problem or "up to date", components)
+        return decision
+
+    def _advance(self, decision: StepDecision, result: bool) -> None:
+        step = decision.step
+        if not step.writes_metadata:
+            return
+        keys = step.metadata_inputs if step.metadata_inputs is not None else sorted(decision.inputs)
+        shaping = {key: decision.inputs.get(key) for key in keys if key != "metadata"}
+        self._metadata_token = fingerprint([self._metadata_token, step.name, shaping, bool(result)])
+
+    def skip(self, decision: StepDecision) -> None:
+        """Pass over a step that is up to date."""
+        self._advance(decision, self.steps.get(decision.step.name, {}).get("result", False))
+
+    def record(self, decision: StepDecision, result: bool) -> None:
+        """Remember the inputs, result and produced outputs of a step that just ran."""
+        outputs = {}
+        for name in decision.step.outputs:
+            output = self.crate_path / name
+            if output.is_file():
+                outputs[name] = file_digest(output, "sha256")
+        self.steps[decision.step.name] = {
+            "inputs": decision.inputs,
+            "result": bool(result),
+            "outputs": outputs,
+        }
+        self._advance(decision, result)
+
+    def save(self) -> None:
+        """Write the manifest, settling on the metadata as the steps left it."""
+        write_json_atomic(self.manifest_path, {
+            "version": BUILD_MANIFEST_VERSION,
+            "sourceDigest": self.source_digest,
+            "settledDigest": file_digest(self.crate_path / "ro-crate-metadata.json", "sha256"),
+            "steps": self.steps,
+        })
@@ -1,47 +1,29 @@
+import contextlib
+import io
 import json
 import pathlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 import click
-from fairscape_cli.utils.serialization import prune_none, write_json_atomic
+from fairscape_cli.utils.build_graph import BuildStep, CrateBuild, fingerprint, metadata_source_digest
+from fairscape_cli.utils.serialization import write_json_atomic
 from fairscape_cli.utils.rocrate_helpers import get_root_entity_dict
 
-def is_subcrate_processed(subcrate_path: Path) -> bool:
-    """Check if evi:processed is true on subcrate root entity."""
-    metadata_file = subcrate_path / "ro-crate-metadata.json"
-    try:
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
-        root = get_root_entity_dict(metadata.get('@graph', []))
-        if root is not None:
-            return root.get('evi:processed', False) is True
-    except Exception:
-        pass
-    return False
-
-def set_subcrate_processed(subcrate_path: Path) -> bool:
-    """Set evi:processed = true on subcrate root entity."""
-    metadata_file = subcrate_path / "ro-crate-metadata.json"
-    try:
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
-        root = get_root_entity_dict(metadata.get('@graph', []))
-        if root is not None:
-            root['evi:processed'] = True
-            write_json_atomic(metadata_file, metadata)
-            return True
-    except Exception:
-        pass
-    return False
+def ensure_subcrates_linked(crate_directory: Path, scan=None) -> List[str]:
+    """Link subcrates to parent if not already linked. Returns linked IDs.
 
-def ensure_subcrates_linked(crate_directory: Path) -> List[str]:
-    """Link subcrates to parent if not already linked. Returns linked IDs."""
+    `scan` is an optional ReleaseScan of crate_directory whose sub-crate
+    roots are reused instead of re-reading every sub-crate.
+    """
     metadata_file = crate_directory / "ro-crate-metadata.json"
     if not metadata_file.exists():
         return []
 
-    subcrates = find_subcrates(crate_directory)
-    if not subcrates:
+    if scan is None:
+        from fairscape_cli.models.release_scan import ReleaseScan
+        scan = ReleaseScan(crate_directory, collect_metrics=False)
+    if not scan.subcrates:
         return []
 
     # Check existing hasPart
@@ -51,48 +33,55 @@ def ensure_subcrates_linked(crate_directory: Path) -> List[str]:
     existing_ids = {p.get('@id') for p in root.get('hasPart', [])}
 
     # Check if any subcrate is missing from hasPart
-    needs_linking = False
-    for sc in subcrates:
-        sc_meta = sc / "ro-crate-metadata.json"
-        try:
-            with open(sc_meta, 'r') as f:
-                sc_data = json.load(f)
-            sc_root = get_root_entity_dict(sc_data.get('@graph', []))
-            sc_id = sc_root.get('@id') if sc_root else None
-            if sc_id and sc_id not in existing_ids:
-                needs_linking = True
-                break
-        except Exception:
-            continue
+    needs_linking = any(
+        info.root_id and info.root_id not in existing_ids
+        for info in scan.parse()
+    )
 
     if needs_linking:
         from fairscape_cli.models.rocrate import LinkSubcrates
-        return LinkSubcrates(parent_crate_path=crate_directory)
+        return LinkSubcrates(parent_crate_path=crate_directory, scan=scan)
     else:
         click.echo("All subcrates already linked.")
         return list(existing_ids)
 
+def compact_crate_journals(crate_directory: Path, scan=None) -> int:
+    """Fold pending ro-crate-metadata.journal.jsonl files into their metadata.
+
+    Covers the crate itself and every subcrate below it; build steps read
+    and rewrite ro-crate-metadata.json directly, so this runs first. Returns
+    the number of crates compacted. `scan` is an optional ReleaseScan of
+    crate_directory to take the sub-crate list from.
+    """
+    from fairscape_cli.models.crate_document import compact_crate_journal
+
+    subcrates = scan.subcrate_paths if scan is not None else find_subcrates(crate_directory)
+    compacted = 0
+    for crate_path in [crate_directory] + subcrates:
+        if not (crate_path / "ro-crate-metadata.json").exists():
+            continue
+        applied = compact_crate_journal(crate_path)
+        if applied:
+            click.echo(f"Compacted {applied} journal record(s) into {crate_path / 'ro-crate-metadata.json'}")
+            compacted += 1
+    return compacted
+
 def find_subcrates(release_directory: Path) -> List[Path]:
-   subcrates = []
-   
-   def search_directory(directory: Path):
-       for item in directory.iterdir():
-           if item.is_dir():
-               metadata_file = item / "ro-crate-metadata.json"
-               if metadata_file.exists():
-                   subcrates.append(item)
-               search_directory(item)
-   
-   search_directory(release_directory)
-   return subcrates
+    """Every sub-crate directory below release_directory, parents before nested crates."""
+    from fairscape_cli.models.release_scan import ReleaseScan
+
+    return ReleaseScan(release_directory, collect_metrics=False).subcrate_paths
+
+def default_ontology_path() -> Path:
+    """The EVI ontology shipped with the package, used to link inverse properties."""
+    import fairscape_cli
+    return Path(fairscape_cli.__file__).parent / "entailments" / "evi.xml"
 
 def process_link_inverses(subcrate_path: Path, ontology_path: Optional[Path] = None) -> bool:
     from fairscape_cli.entailments.inverse import augment_rocrate_with_inverses, EVI_NAMESPACE
     
     if ontology_path is None:
-        import fairscape_cli
-        package_root = Path(fairscape_cli.__file__).parent
-        ontology_path = package_root / "entailments" / "evi.xml"
+        ontology_path = default_ontology_path()
         
         if not ontology_path.exists():
             click.echo(f"  WARNING: Default ontology not found for {subcrate_path.name}")
@@ -122,11 +111,10 @@ def process_add_io(subcrate_path: Path) -> bool:
         return False
 
 def find_first_evi_output(subcrate_path: Path) -> Optional[str]:
-    metadata_file = subcrate_path / "ro-crate-metadata.json"
-    
+    from fairscape_cli.models.crate_document import read_crate_metadata
+
     try:
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
+        metadata = read_crate_metadata(subcrate_path)
         
         root_entity = get_root_entity_dict(metadata.get('@graph', []))
         if root_entity is not None:
@@ -148,11 +136,10 @@ def find_first_evi_output(subcrate_path: Path) -> Optional[str]:
         return None
     
 def has_local_evidence_graph(subcrate_path: Path) -> bool:
-    metadata_file = subcrate_path / "ro-crate-metadata.json"
-    
+    from fairscape_cli.models.crate_document import read_crate_metadata
+
     try:
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
+        metadata = read_crate_metadata(subcrate_path)
         
         root_entity = get_root_entity_dict(metadata.get('@graph', []))
         if root_entity is not None:
@@ -164,10 +151,18 @@ def has_local_evidence_graph(subcrate_path: Path) -> bool:
     except Exception:
         return False
 
-def process_evidence_graph(subcrate_path: Path, release_directory: Optional[Path] = None, reference_paths: Optional[List[Path]] = None, force: bool = False) -> bool:
+def process_evidence_graph(subcrate_path: Path, release_directory: Optional[Path] = None, reference_paths: Optional[List[Path]] = None, force: bool = False, release_index=None, shared_assets_dir: Optional[Path] = None) -> bool:
+    """Generate ro-crate-prov-graph.json/.html for the crate's first EVI output.
+
+    Entities are resolved from the crate and `reference_paths`, or, with a
+    `release_index` (a `ReleaseGraphIndex` over the release's subcrates),
+    from the crate and every other crate of that index. With
+    `shared_assets_dir` the HTML loads its scripts from shared files there.
+    """
     from fairscape_cli.datasheet_builder.evidence_graph.html_builder import generate_evidence_graph_html
     from fairscape_cli.interpret.local_graph import LocalGraphSource
     from fairscape_cli.interpret.local_sink import LocalResultSink
+    from fairscape_cli.models.crate_document import CrateDocument
     from fairscape_graph_tools.evidence_graph_builder import EvidenceGraphBuilder
 
     if not force and has_local_evidence_graph(subcrate_path):
@@ -182,7 +177,8 @@ def process_evidence_graph(subcrate_path: Path, release_directory: Optional[Path
     output_html = subcrate_path / "ro-crate-prov-graph.html"
 
     try:
-        source = LocalGraphSource(primary_path=metadata_file, reference_paths=reference_paths or ())
+        source = LocalGraphSource(primary_path=metadata_file, reference_paths=reference_paths or (),
+                                  release_index=release_index)
         resolved = source.find_entity(first_output)
         if resolved is None:
             click.echo(f"  ERROR: {first_output} not found in {subcrate_path.name}")
@@ -199,27 +195,26 @@ def process_evidence_graph(subcrate_path: Path, release_directory: Optional[Path
         )
 
         try:
-            result = generate_evidence_graph_html(str(output_json), str(output_html))
+            result = generate_evidence_graph_html(str(output_json), str(output_html),
+                                                  shared_assets_dir=shared_assets_dir)
             if not result:
                 click.echo(f"  WARNING: Failed to generate visualization for {subcrate_path.name}")
         except Exception:
             pass
         
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
-
-        root_entity = get_root_entity_dict(metadata.get('@graph', []))
-        if root_entity is not None:
-            if release_directory:
-                relative_path = output_html.relative_to(release_directory).as_posix()
-            else:
-                relative_path = output_html.name
-
-            root_entity['localEvidenceGraph'] = {
-                "@id": relative_path
-            }
-
-            write_json_atomic(metadata_file, prune_none(metadata))
+        with CrateDocument.open(metadata_file) as crate:
+            root_entity = crate.root
+            if root_entity is not None:
+                if release_directory:
+                    relative_path = output_html.relative_to(release_directory).as_posix()
+                else:
+                    relative_path = output_html.name
+
+                if root_entity.get('localEvidenceGraph') != {"@id": relative_path}:
+                    root_entity['localEvidenceGraph'] = {
+                        "@id": relative_path
+                    }
+                    crate.mark_dirty(root_entity.get('@id'))
 
         return True
         
@@ -228,23 +223,19 @@ def process_evidence_graph(subcrate_path: Path, release_directory: Optional[Path
         return False
 
 def process_croissant(crate_path: Path) -> bool:
-    from fairscape_models.rocrate import ROCrateV1_2
+    from fairscape_cli.models.crate_document import CrateDocument
     from fairscape_models.conversion.converter import ROCToTargetConverter
     from fairscape_models.conversion.mapping.croissant import MAPPING_CONFIGURATION as CROISSANT_MAPPING
     
-    metadata_file = crate_path / "ro-crate-metadata.json"
     output_path = crate_path / "ro-crate-croissant.json"
     
     try:
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
-        
-        source_crate = ROCrateV1_2(**metadata)
+        with CrateDocument.open(crate_path) as crate:
+            source_crate = crate.model()
         croissant_converter = ROCToTargetConverter(source_crate, CROISSANT_MAPPING)
         croissant_result = croissant_converter.convert()
         
-        with open(output_path, 'w') as f:
-            json.dump(croissant_result.model_dump(by_alias=True, exclude_none=True), f, indent=2)
+        write_json_atomic(output_path, croissant_result.model_dump(by_alias=True, exclude_none=True))
         
         return True
     except Exception as e:
@@ -277,14 +268,13 @@ def process_datasheet(crate_path: Path, published: bool = False) -> bool:
 
 def process_preview(crate_path: Path, published: bool = False) -> bool:
     """Generate ro-crate-preview.html for a single RO-Crate."""
-    from fairscape_models.rocrate import ROCrateV1_2
+    from fairscape_cli.models.crate_document import CrateDocument
     from fairscape_models.conversion.converter import ROCToTargetConverter
     from fairscape_models.conversion.mapping.FairscapeDatasheet import PREVIEW_MAPPING_CONFIGURATION
     from fairscape_models.conversion.mapping.subcrate_utils import enrich_preview_computations
     from fairscape_cli.datasheet_builder.rocrate.section_generators import PreviewGenerator
     from jinja2 import Environment, FileSystemLoader
 
-    metadata_file = crate_path / "ro-crate-metadata.json"
     output_path = crate_path / "ro-crate-preview.html"
 
     try:
@@ -298,10 +288,8 @@ def process_preview(crate_path: Path, published: bool = False) -> bool:
         )
         preview_generator = PreviewGenerator(env)
 
-        with open(metadata_file, 'r') as f:
-            crate_dict = json.load(f)
-
-        crate = ROCrateV1_2.model_validate(crate_dict)
+        with CrateDocument.open(crate_path) as crate_document:
+            crate = crate_document.model()
 
         converter = ROCToTargetConverter(
             source_crate=crate,
@@ -327,60 +315,70 @@ def process_preview(crate_path: Path, published: bool = False) -> bool:
         return False
 
 
-def process_merkle_tree(crate_path: Path) -> bool:
-    """Generate ro-crate-merkle-tree.json and annotate the root entity with the Merkle root hash."""
-    from fairscape_cli.utils.merkle import generate_merkle_tree
+def process_merkle_tree(crate_path: Path, regenerate: bool = False, chunk_size: Optional[int] = None) -> bool:
+    """Generate ro-crate-merkle-tree.json and annotate the root entity with the Merkle root hash.
+
+    An existing tree is brought up to date incrementally: only files whose
+    size or mtime differ from its leaves are rehashed. With `regenerate`,
+    every file is hashed again. With `chunk_size`, files larger than it are
+    hashed as chunk sub-trees (see `fairscape_cli.utils.merkle`); entities
+    backed by such files keep their existing sha256. The tree is written
+    in the storage format it already has (JSON unless converted to binary).
+    """
+    from fairscape_cli.models.crate_document import CrateDocument
+    from fairscape_cli.utils.merkle import (
+        JSON_FORMAT,
+        generate_merkle_tree,
+        load_merkle_tree,
+        merkle_tree_format,
+        write_merkle_tree,
+    )
 
     metadata_file = crate_path / "ro-crate-metadata.json"
     output_path = crate_path / "ro-crate-merkle-tree.json"
 
-
     try:
-        if output_path.exists():
-            with open(output_path, 'r') as f:
-                tree = json.load(f)
-        else:
-            tree = generate_merkle_tree(crate_path)
+        with CrateDocument.open(metadata_file) as crate:
+            previous = None if regenerate else load_merkle_tree(output_path)
+            tree = generate_merkle_tree(crate_path, previous=previous, chunk_size=chunk_size)
             if tree is None:
                 return False
-            else:
-                with open(output_path, 'w') as f:
-                    json.dump(tree, f, indent=2)
-
-        # Annotate root entity with the Merkle root hash
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
-
-
-        graph = metadata.get('@graph', [])
-        root_entity = get_root_entity_dict(graph)
-        if root_entity is not None:
-            root_entity['evi:merkleRootHash'] = tree['rootHash']
-
-        # Build a lookup from contentUrl to sha256 from the tree leaves
-        hash_by_url = {
-            leaf['contentUrl']: leaf['sha256']
-            for leaf in tree.get('leaves', [])
-        }
+            if tree != previous:
+                write_merkle_tree(output_path, tree, merkle_tree_format(output_path) or JSON_FORMAT)
+
+            # Annotate root entity with the Merkle root hash
+            root_entity = crate.root
+            if root_entity is not None and root_entity.get('evi:merkleRootHash') != tree['rootHash']:
+                root_entity['evi:merkleRootHash'] = tree['rootHash']
+                crate.mark_dirty(root_entity.get('@id'))
+
+            # Build a lookup from contentUrl to sha256 from the tree leaves
+            # (a chunked leaf holds its chunk tree's root, not the file's sha256)
+            hash_by_url = {
+                leaf['contentUrl']: leaf['sha256']
+                for leaf in tree.get('leaves', [])
+                if 'chunks' not in leaf
+            }
 
-        # Annotate individual dataset/software entities with their sha256
-        for entity in graph:
-            content_url = entity.get('contentUrl')
-            if content_url is None:
-                continue
-            # contentUrl can be a string or list
-            if isinstance(content_url, str):
-                if content_url in hash_by_url:
-                    entity['sha256'] = hash_by_url[content_url]
-            elif isinstance(content_url, list):
-                # For multi-file entities, add sha256 for each url that was hashed
-                hashes = [hash_by_url[url] for url in content_url if url in hash_by_url]
-                if len(hashes) == 1:
-                    entity['sha256'] = hashes[0]
-                elif hashes:
-                    entity['sha256'] = hashes
-
-        write_json_atomic(metadata_file, metadata)
+            # Annotate individual dataset/software entities with their sha256
+            for entity in crate.graph:
+                content_url = entity.get('contentUrl')
+                if content_url is None:
+                    continue
+                # contentUrl can be a string or list
+                sha256 = None
+                if isinstance(content_url, str):
+                    sha256 = hash_by_url.get(content_url)
+                elif isinstance(content_url, list):
+                    # For multi-file entities, add sha256 for each url that was hashed
+                    hashes = [hash_by_url[url] for url in content_url if url in hash_by_url]
+                    if len(hashes) == 1:
+                        sha256 = hashes[0]
+                    elif hashes:
+                        sha256 = hashes
+                if sha256 is not None and entity.get('sha256') != sha256:
+                    entity['sha256'] = sha256
+                    crate.mark_dirty(entity.get('@id'))
 
         return True
     except Exception as e:
@@ -390,7 +388,12 @@ def process_merkle_tree(crate_path: Path) -> bool:
 
 def process_release_merkle_tree(release_directory: Path) -> bool:
     """Generate ro-crate-merkle-tree.json for the release from subcrate root hashes."""
-    from fairscape_cli.utils.merkle import generate_release_merkle_tree
+    from fairscape_cli.utils.merkle import (
+        JSON_FORMAT,
+        generate_release_merkle_tree,
+        merkle_tree_format,
+        write_merkle_tree,
+    )
 
     metadata_file = release_directory / "ro-crate-metadata.json"
     output_path = release_directory / "ro-crate-merkle-tree.json"
@@ -400,8 +403,7 @@ def process_release_merkle_tree(release_directory: Path) -> bool:
         if tree is None:
             return False
 
-        with open(output_path, 'w') as f:
-            json.dump(tree, f, indent=2)
+        write_merkle_tree(output_path, tree, merkle_tree_format(output_path) or JSON_FORMAT)
 
         # Annotate release root entity with the Merkle root hash
         with open(metadata_file, 'r') as f:
@@ -410,7 +412,7 @@ def process_release_merkle_tree(release_directory: Path) -> bool:
         root_entity = get_root_entity_dict(metadata.get('@graph', []))
         if root_entity is not None:
             root_entity['evi:merkleRootHash'] = tree['rootHash']
-            write_json_atomic(metadata_file, prune_none(metadata))
+            write_json_atomic(metadata_file, metadata, prune=True)
 
         return True
     except Exception as e:
@@ -418,7 +420,7 @@ def process_release_merkle_tree(release_directory: Path) -> bool:
         return False
 
 
-def process_subcrate(subcrate_path: Path, release_directory: Optional[Path] = None, published: bool = False, reference_paths: Optional[List[Path]] = None, force: bool = False) -> Dict[str, Any]:
+def process_subcrate(subcrate_path: Path, release_directory: Optional[Path] = None, published: bool = False, reference_paths: Optional[List[Path]] = None, force: bool = False, merkle_chunk_size: Optional[int] = None) -> Dict[str, Any]:
     """
     Process a single subcrate with all augmentation and build steps.
 
@@ -428,7 +430,7 @@ def process_subcrate(subcrate_path: Path, release_directory: Optional[Path] = No
     3. Generate evidence graph
     4. Generate Croissant export
     5. Generate preview HTML
-    6. Generate Merkle tree
+    6. Generate Merkle tree (files over `merkle_chunk_size` bytes, if set, as chunk sub-trees)
 
     Returns a dict with results for each step.
     """
@@ -445,59 +447,311 @@ def process_subcrate(subcrate_path: Path, release_directory: Optional[Path] = No
 
     click.echo(f"Processing subcrate: {subcrate_path.name}")
 
-    # Step 1: Link inverses
-    click.echo(f"  - Linking inverses...")
-    if process_link_inverses(subcrate_path):
-        results['link_inverses'] = True
-        click.echo(f"    ✓ Inverses linked")
-    else:
-        results['errors'].append("Failed to link inverses")
+    from fairscape_cli.models.crate_document import CrateDocument
 
-    # Step 2: Add inputs/outputs
-    click.echo(f"  - Adding inputs/outputs...")
-    if process_add_io(subcrate_path):
-        results['add_io'] = True
-        click.echo(f"    ✓ Inputs/outputs added")
-    else:
-        results['errors'].append("Failed to add I/O")
+    # All steps work on one in-memory copy of the metadata, written once at the end.
+    try:
+        with CrateDocument.open(subcrate_path, journal=False):
+            # Step 1: Link inverses
+            click.echo(f"  - Linking inverses...")
+            if process_link_inverses(subcrate_path):
+                results['link_inverses'] = True
+                click.echo(f"    ✓ Inverses linked")
+            else:
+                results['errors'].append("Failed to link inverses")
 
-    # Step 3: Evidence graph
-    click.echo(f"  - Generating evidence graph...")
-    if process_evidence_graph(subcrate_path, release_directory, reference_paths, force=force):
-        results['evidence_graph'] = True
-        click.echo(f"    ✓ Evidence graph generated")
-    else:
-        click.echo(f"    - No EVI:outputs found or graph generation skipped")
+            # Step 2: Add inputs/outputs
+            click.echo(f"  - Adding inputs/outputs...")
+            if process_add_io(subcrate_path):
+                results['add_io'] = True
+                click.echo(f"    ✓ Inputs/outputs added")
+            else:
+                results['errors'].append("Failed to add I/O")
 
-    # Step 4: Croissant
-    click.echo(f"  - Generating Croissant...")
-    if process_croissant(subcrate_path):
-        results['croissant'] = True
-        click.echo(f"    ✓ Croissant generated")
-    else:
-        results['errors'].append("Failed to generate Croissant")
+            # Step 3: Evidence graph
+            click.echo(f"  - Generating evidence graph...")
+            if process_evidence_graph(subcrate_path, release_directory, reference_paths, force=force):
+                results['evidence_graph'] = True
+                click.echo(f"    ✓ Evidence graph generated")
+            else:
+                click.echo(f"    - No EVI:outputs found or graph generation skipped")
 
-    # Step 5: Preview
-    click.echo(f"  - Generating preview...")
-    if process_preview(subcrate_path, published):
-        results['preview'] = True
-        click.echo(f"    ✓ Preview generated")
-    else:
-        results['errors'].append("Failed to generate preview")
+            # Step 4: Croissant
+            click.echo(f"  - Generating Croissant...")
+            if process_croissant(subcrate_path):
+                results['croissant'] = True
+                click.echo(f"    ✓ Croissant generated")
+            else:
+                results['errors'].append("Failed to generate Croissant")
 
-    # Step 6: Merkle tree
-    click.echo(f"  - Generating Merkle tree...")
-    if process_merkle_tree(subcrate_path):
-        results['merkle_tree'] = True
-        click.echo(f"    ✓ Merkle tree generated")
-    else:
-        click.echo(f"    - No local files found or Merkle tree generation skipped")
+            # Step 5: Preview
+            click.echo(f"  - Generating preview...")
+            if process_preview(subcrate_path, published):
+                results['preview'] = True
+                click.echo(f"    ✓ Preview generated")
+            else:
+                results['errors'].append("Failed to generate preview")
+
+            # Step 6: Merkle tree
+            click.echo(f"  - Generating Merkle tree...")
+            if process_merkle_tree(subcrate_path, chunk_size=merkle_chunk_size):
+                results['merkle_tree'] = True
+                click.echo(f"    ✓ Merkle tree generated")
+            else:
+                click.echo(f"    - No local files found or Merkle tree generation skipped")
+    except Exception as e:
+        click.echo(f"  ERROR processing metadata: {e}")
+        results['errors'].append(f"Failed to process metadata: {e}")
 
     return results
 
 
-def process_all_subcrates(release_directory: Path, published: bool = False, force_reprocess: bool = False) -> Dict[str, Any]:
-    subcrates = find_subcrates(release_directory)
+PROCESSED_COUNTERS = ('link_inverses', 'add_io', 'evidence_graphs', 'croissants', 'previews', 'merkle_trees')
+
+# The per-subcrate build graph, in pipeline order.
+SUBCRATE_STEPS = (
+    BuildStep('link_inverses', writes_metadata=True),
+    BuildStep('add_io', writes_metadata=True, metadata_inputs=()),
+    BuildStep('evidence_graph', outputs=('ro-crate-prov-graph.json', 'ro-crate-prov-graph.html'),
+              writes_metadata=True, metadata_inputs=('location',), optional=True),
+    BuildStep('croissant', outputs=('ro-crate-croissant.json',)),
+    BuildStep('preview', outputs=('ro-crate-preview.html',)),
+    BuildStep('merkle_tree', outputs=('ro-crate-merkle-tree.json', 'ro-crate-merkle-tree.bin'), writes_metadata=True,
+              metadata_inputs=('content',), optional=True),
+)
+
+# Release-level steps run by build release after the subcrates are linked.
+RELEASE_STEPS = (
+    BuildStep('croissant', outputs=('ro-crate-croissant.json',)),
+    BuildStep('datasheet', outputs=('ro-crate-datasheet.html',)),
+    BuildStep('merkle_tree', outputs=('ro-crate-merkle-tree.json', 'ro-crate-merkle-tree.bin'), writes_metadata=True,
+              metadata_inputs=('subcrate_trees',), optional=True),
+)
+
+
+def _content_file_stats(crate_path: Path) -> List[List[Any]]:
+    """[contentUrl, size, mtime_ns] of every local file the crate's Merkle tree covers."""
+    from fairscape_cli.utils.graph_stream import iter_graph_entities
+    from fairscape_cli.utils.merkle import resolve_content_url
+
+    stats = []
+    for entity in iter_graph_entities(crate_path / "ro-crate-metadata.json", fields=["contentUrl"]):
+        content_url = entity.get("contentUrl")
+        for url in content_url if isinstance(content_url, list) else [content_url]:
+            filepath = resolve_content_url(url, crate_path)
+            if filepath is not None:
+                stat = filepath.stat()
+                stats.append([url, stat.st_size, stat.st_mtime_ns])
+    return sorted(stats)
+
+
+# Key of the release-wide fingerprint in the dict built by _release_source_digests.
+REFERENCES_KEY = 'references'
+
+
+def _release_source_digests(subcrates: List[Path], release_directory: Path) -> Dict[Any, str]:
+    """{subcrate: metadata_source_digest} plus, under REFERENCES_KEY, a fingerprint of them all.
+
+    Every subcrate's evidence graph may resolve entities from any other, so
+    that fingerprint is the evidence graph step's `references` input.
+    """
+    digests: Dict[Any, str] = {subcrate: metadata_source_digest(subcrate) for subcrate in subcrates}
+    digests[REFERENCES_KEY] = fingerprint(sorted(
+        (subcrate.relative_to(release_directory).as_posix(), digests[subcrate]) for subcrate in subcrates
+    ))
+    return digests
+
+
+def _subcrate_step_inputs(
+    subcrate: Path,
+    release_directory: Path,
+    published: bool,
+    references: str,
+    shared_assets: Optional[List[str]] = None,
+    merkle_chunk_size: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Inputs of each SUBCRATE_STEPS step besides the subcrate's own metadata."""
+    from fairscape_cli.utils.hash_cache import file_digest
+
+    ontology_path = default_ontology_path()
+    evidence_graph_inputs = {
+        'references': references,
+        'location': subcrate.relative_to(release_directory).as_posix(),
+    }
+    if shared_assets:
+        evidence_graph_inputs['shared_assets'] = shared_assets
+    merkle_tree_inputs = {'content': _content_file_stats(subcrate)}
+    if merkle_chunk_size:
+        merkle_tree_inputs['chunk_size'] = merkle_chunk_size
+    return {
+        'link_inverses': {'ontology': file_digest(ontology_path, 'sha256') if ontology_path.exists() else None},
+        'add_io': {},
+        'evidence_graph': evidence_graph_inputs,
+        'croissant': {},
+        'preview': {'published': published},
+        'merkle_tree': merkle_tree_inputs,
+    }
+
+
+def _process_listed_subcrate(
+    subcrate: Path,
+    subcrates: List[Path],
+    release_directory: Path,
+    published: bool,
+    force_reprocess: bool,
+    source_digests: Optional[Dict[Any, str]] = None,
+    explain: bool = False,
+    shared_assets: Optional[List[str]] = None,
+    merkle_chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run the out-of-date build steps on one subcrate of process_all_subcrates.
+
+    `source_digests` maps every listed subcrate to its `metadata_source_digest`
+    (see `_release_source_digests`); computed here if omitted. With `explain`,
+    the reason each step runs or is skipped is printed. `shared_assets` names
+    the evidence graph scripts shared from the release directory, if any;
+    `merkle_chunk_size` is passed to `process_merkle_tree` as `chunk_size`.
+
+    Returns {'skipped': bool, 'processed': {counter: bool}, 'errors': [...]}.
+    """
+    from fairscape_cli.interpret.release_index import ReleaseGraphIndex
+    from fairscape_cli.models.crate_document import CrateDocument
+
+    outcome = {'skipped': False, 'processed': dict.fromkeys(PROCESSED_COUNTERS, False), 'errors': []}
+    processed = outcome['processed']
+
+    if source_digests is None:
+        source_digests = _release_source_digests(subcrates, release_directory)
+    build = CrateBuild(subcrate, force=force_reprocess, source_digest=source_digests.get(subcrate))
+    step_inputs = _subcrate_step_inputs(subcrate, release_directory, published, source_digests[REFERENCES_KEY],
+                                        shared_assets, merkle_chunk_size)
+    subcrate_errors = outcome['errors']
+
+    # step name -> (counter, label, action, done message, failure message)
+    actions = {
+        'link_inverses': ('link_inverses', "Linking inverses", lambda: process_link_inverses(subcrate),
+                          "Inverses linked", "Failed to link inverses"),
+        'add_io': ('add_io', "Adding inputs/outputs", lambda: process_add_io(subcrate),
+                   "Inputs/outputs added", "Failed to add I/O"),
+        'evidence_graph': ('evidence_graphs', "Generating evidence graph",
+                           lambda: process_evidence_graph(subcrate, release_directory, force=True,
+                                                          release_index=ReleaseGraphIndex.shared(subcrates),
+                                                          shared_assets_dir=release_directory if shared_assets else None),
+                           "Evidence graph ready", "No EVI:outputs found or graph generation failed"),
+        'croissant': ('croissants', "Generating Croissant", lambda: process_croissant(subcrate),
+                      "Croissant generated", "Failed to generate Croissant"),
+        'preview': ('previews', "Generating preview", lambda: process_preview(subcrate, published),
+                    "Preview generated", "Failed to generate preview"),
+        'merkle_tree': ('merkle_trees', "Generating Merkle tree",
+                        lambda: process_merkle_tree(subcrate, regenerate=force_reprocess, chunk_size=merkle_chunk_size),
+                        "Merkle tree generated", "No local files found or Merkle tree generation skipped"),
+    }
+
+    # Lines for up-to-date steps are held back until a step has to run, so a
+    # subcrate with nothing to do prints a single "Skipping" line.
+    pending: List[str] = []
+    started = False
+    # The steps that run share one in-memory CrateDocument, opened when the
+    # first of them starts: the metadata is parsed and validated once and
+    # written once, when the session closes.
+    with contextlib.ExitStack() as session:
+        for step in SUBCRATE_STEPS:
+            decision = build.decide(step, **step_inputs[step.name])
+            counter, label, action, done_message, failure_message = actions[step.name]
+            lines = [f"    - {label}..."]
+            if explain:
+                lines.append(f"      ({decision.explain()})")
+
+            if not decision.run:
+                build.skip(decision)
+                pending.extend(lines + ["      = Up to date"])
+                continue
+
+            if not started:
+                click.echo(f"\n  Processing subcrate: {subcrate.name}")
+                started = True
+                try:
+                    session.enter_context(CrateDocument.open(subcrate, journal=False))
+                except Exception as e:
+                    click.echo(f"      ERROR reading metadata: {e}")
+                    subcrate_errors.append(f"{subcrate.name}: Failed to read metadata: {e}")
+                    return outcome
+            for line in pending + lines:
+                click.echo(line)
+            pending = []
+
+            result = action()
+            build.record(decision, result)
+            if result:
+                processed[counter] = True
+                click.echo(f"      ✓ {done_message}")
+            elif step.optional:
+                click.echo(f"      - {failure_message}")
+            else:
+                subcrate_errors.append(f"{subcrate.name}: {failure_message}")
+
+        try:
+            session.close()
+        except Exception as e:
+            click.echo(f"      ERROR writing metadata: {e}")
+            subcrate_errors.append(f"{subcrate.name}: Failed to write metadata: {e}")
+            return outcome
+
+    if not started:
+        click.echo(f"\n  Skipping subcrate: {subcrate.name} (up to date)")
+        if explain:
+            for line in pending:
+                click.echo(line)
+        outcome['skipped'] = True
+        return outcome
+
+    for line in pending:
+        click.echo(line)
+    build.save()
+    return outcome
+
+
+def _process_listed_subcrate_buffered(subcrate: Path, *args) -> Dict[str, Any]:
+    """`_process_listed_subcrate` in a worker process, with its output captured in outcome['log']."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        try:
+            outcome = _process_listed_subcrate(subcrate, *args)
+        except Exception as e:
+            click.echo(f"      ERROR processing {subcrate.name}: {e}")
+            outcome = {'skipped': False, 'processed': {}, 'errors': [f"{subcrate.name}: {e}"]}
+    outcome['log'] = buffer.getvalue()
+    return outcome
+
+
+def process_all_subcrates(
+    release_directory: Path,
+    published: bool = False,
+    force_reprocess: bool = False,
+    scan=None,
+    jobs: Optional[int] = None,
+    explain: bool = False,
+    shared_assets: bool = False,
+    merkle_chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run the out-of-date build steps on every subcrate and print a summary.
+
+    Each subcrate's ro-crate-build-manifest.json decides which steps re-run
+    (see `fairscape_cli.utils.build_graph`); `force_reprocess` runs them all
+    and `explain` prints why each step ran or was skipped. Subcrates with
+    nothing to do are counted as skipped.
+
+    With `jobs` > 1 the subcrates are processed on a pool of worker
+    processes. Each subcrate's output is buffered and printed as one block
+    when it finishes, and the counters are the same as in a serial run.
+
+    With `shared_assets` the evidence graph scripts are written once into
+    `release_directory` under content-hashed names and every evidence graph
+    page loads them from there instead of inlining them. With
+    `merkle_chunk_size`, content files larger than it are hashed as chunk
+    sub-trees in the Merkle trees.
+    """
+    subcrates = scan.subcrate_paths if scan is not None else find_subcrates(release_directory)
 
     results = {
         'total': len(subcrates),
@@ -519,66 +773,45 @@ def process_all_subcrates(release_directory: Path, published: bool = False, forc
 
     click.echo(f"\nProcessing {len(subcrates)} subcrate(s)...")
 
-    for subcrate in subcrates:
-        if not force_reprocess and is_subcrate_processed(subcrate):
-            click.echo(f"\n  Skipping subcrate: {subcrate.name} (already processed)")
+    # Taken before any subcrate is rebuilt, so every evidence graph sees the same references.
+    source_digests = _release_source_digests(subcrates, release_directory)
+    shared_asset_names = None
+    if shared_assets:
+        from fairscape_cli.datasheet_builder.evidence_graph.html_builder import write_shared_assets
+        shared_asset_names = sorted(path.name for path in write_shared_assets(release_directory).values())
+    step_args = (subcrates, release_directory, published, force_reprocess, source_digests, explain, shared_asset_names,
+                 merkle_chunk_size)
+    if jobs and jobs > 1 and len(subcrates) > 1:
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(subcrates)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(subcrates))) as pool:
+            futures = {
+                pool.submit(_process_listed_subcrate_buffered, subcrate, *step_args): position
+                for position, subcrate in enumerate(subcrates)
+            }
+            for future in as_completed(futures):
+                position = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    name = subcrates[position].name
+                    outcome = {'skipped': False, 'processed': {}, 'errors': [f"{name}: {e}"],
+                               'log': f"\n  ERROR processing subcrate {name}: {e}\n"}
+                click.echo(outcome['log'], nl=False)
+                outcomes[position] = outcome
+    else:
+        outcomes = [_process_listed_subcrate(subcrate, *step_args) for subcrate in subcrates]
+
+    for outcome in outcomes:
+        if outcome['skipped']:
             results['skipped'] += 1
             continue
-
-        click.echo(f"\n  Processing subcrate: {subcrate.name}")
-        subcrate_errors = []
-
-        click.echo(f"    - Linking inverses...")
-        if process_link_inverses(subcrate):
-            results['processed']['link_inverses'] += 1
-            click.echo(f"      ✓ Inverses linked")
-        else:
-            subcrate_errors.append(f"{subcrate.name}: Failed to link inverses")
-
-        click.echo(f"    - Adding inputs/outputs...")
-        if process_add_io(subcrate):
-            results['processed']['add_io'] += 1
-            click.echo(f"      ✓ Inputs/outputs added")
-        else:
-            subcrate_errors.append(f"{subcrate.name}: Failed to add I/O")
-
-        click.echo(f"    - Checking evidence graph...")
-        reference_subcrates = [s for s in subcrates if s != subcrate]
-        if process_evidence_graph(subcrate, release_directory, reference_subcrates, force=force_reprocess):
-            results['processed']['evidence_graphs'] += 1
-            click.echo(f"      ✓ Evidence graph ready")
-        else:
-            click.echo(f"      - No EVI:outputs found or graph generation failed")
-
-        click.echo(f"    - Generating Croissant...")
-        if process_croissant(subcrate):
-            results['processed']['croissants'] += 1
-            click.echo(f"      ✓ Croissant generated")
-        else:
-            subcrate_errors.append(f"{subcrate.name}: Failed to generate Croissant")
-
-        click.echo(f"    - Generating preview...")
-        if process_preview(subcrate, published):
-            results['processed']['previews'] += 1
-            click.echo(f"      ✓ Preview generated")
-        else:
-            subcrate_errors.append(f"{subcrate.name}: Failed to generate preview")
-
-        click.echo(f"    - Generating Merkle tree...")
-        if process_merkle_tree(subcrate):
-            results['processed']['merkle_trees'] += 1
-            click.echo(f"      ✓ Merkle tree generated")
-        else:
-            click.echo(f"      - No local files found or Merkle tree generation skipped")
-
-        results['errors'].extend(subcrate_errors)
-
-        if not subcrate_errors:
-            set_subcrate_processed(subcrate)
-            click.echo(f"      ✓ Marked as processed (evi:processed)")
+        for counter, done in outcome['processed'].items():
+            if done:
+                results['processed'][counter] += 1
+        results['errors'].extend(outcome['errors'])
 
     click.echo(f"\nSubcrate processing complete:")
-    click.echo(f"  - Skipped:          {results['skipped']}/{results['total']}")
+    click.echo(f"  - Up to date:       {results['skipped']}/{results['total']}")
     click.echo(f"  - Inverses linked:  {results['processed']['link_inverses']}/{results['total']}")
     click.echo(f"  - I/O added:        {results['processed']['add_io']}/{results['total']}")
     click.echo(f"  - Evidence graphs:  {results['processed']['evidence_graphs']}/{results['total']}")
@@ -592,3 +825,68 @@ def process_all_subcrates(release_directory: Path, published: bool = False, forc
             click.echo(f"  - {error}")
 
     return results
+
+
+def process_release_artifacts(
+    release_directory: Path,
+    published: bool = False,
+    force_reprocess: bool = False,
+    scan=None,
+    explain: bool = False
+) -> Dict[str, bool]:
+    """Build the release's own Croissant, datasheet and Merkle tree when out of date.
+
+    Run after the subcrates are processed and linked. Returns {step name: ready}.
+    """
+    from fairscape_cli.utils.hash_cache import file_digest
+
+    subcrates = scan.subcrate_paths if scan is not None else find_subcrates(release_directory)
+    subcrate_trees = sorted(
+        (child.name, file_digest(child / "ro-crate-merkle-tree.json", "sha256"))
+        for child in release_directory.iterdir()
+        if child.is_dir() and (child / "ro-crate-merkle-tree.json").is_file()
+    )
+    step_inputs = {
+        'croissant': {},
+        'datasheet': {
+            'published': published,
+            'subcrates': sorted(
+                (s.relative_to(release_directory).as_posix(), metadata_source_digest(s)) for s in subcrates
+            ),
+        },
+        'merkle_tree': {'subcrate_trees': subcrate_trees},
+    }
+    # step name -> (label, action, done message, warning)
+    actions = {
+        'croissant': ("Generating release Croissant...", lambda: process_croissant(release_directory),
+                      "Release Croissant generated", "Failed to generate release Croissant"),
+        'datasheet': ("Generating release datasheet...", lambda: process_datasheet(release_directory, published=published),
+                      "Release datasheet generated", "Failed to generate release datasheet"),
+        'merkle_tree': ("Generating release Merkle tree...", lambda: process_release_merkle_tree(release_directory),
+                        "Release Merkle tree generated", "No subcrate Merkle trees found; release Merkle tree skipped"),
+    }
+
+    build = CrateBuild(release_directory, force=force_reprocess)
+    ready = {}
+    for step in RELEASE_STEPS:
+        decision = build.decide(step, **step_inputs[step.name])
+        label, action, done_message, warning = actions[step.name]
+        click.echo(label)
+        if explain:
+            click.echo(f"  ({decision.explain()})")
+        if not decision.run:
+            build.skip(decision)
+            click.echo(f"  = Up to date")
+            ready[step.name] = True
+            continue
+
+        result = action()
+        build.record(decision, result)
+        ready[step.name] = result
+        if result:
+            click.echo(f"  ✓ {done_message}")
+        else:
+            click.echo(f"  WARNING: {warning}")
+
+    build.save()
+    return ready
@@ -0,0 +1,198 @@
+"""Byte-offset `@id` index sidecar for ro-crate-metadata.json.
+
+`ro-crate-metadata.idx` maps every @graph entity's `@id` to the byte span it
+occupies in the metadata file and its `@type`, together with the size and
+mtime of the metadata file it was built from:
+
+    {"version": 1, "size": 48213, "mtime_ns": 1718035200000000000,
+     "entities": {"ark:59852/dataset-a": [1042, 1873, "https://w3id.org/EVI#Dataset"], ...}}
+
+With a fresh index a single entity can be read with one seek, and replaced
+by splicing the new JSON into its span, instead of parsing the whole
+document. The sidecar is optional: it is created by `fairscape rocrate index`
+(or by any CrateDocument write when FAIRSCAPE_CRATE_INDEX=1) and then kept
+up to date by CrateDocument writes and the in-place updates here. Readers
+ignore an index whose recorded size/mtime no longer match the file, as
+happens after a write by any other code path.
+"""
+import json
+import os
+import pathlib
+from typing import Any, Dict, Optional, Union
+
+from fairscape_cli.utils.graph_stream import iter_graph_spans, latin1_to_text
+from fairscape_cli.utils.serialization import encode_json, open_atomic, write_json_atomic
+
+
+INDEX_FILENAME = "ro-crate-metadata.idx"
+INDEX_VERSION = 1
+INDEX_ENV_VAR = "FAIRSCAPE_CRATE_INDEX"
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _metadata_file(cratePath: Union[pathlib.Path, str]) -> pathlib.Path:
+    cratePath = pathlib.Path(cratePath)
+    if cratePath.is_dir():
+        return cratePath / 'ro-crate-metadata.json'
+    return cratePath
+
+
+def index_path_for(cratePath: Union[pathlib.Path, str]) -> pathlib.Path:
+    return _metadata_file(cratePath).with_name(INDEX_FILENAME)
+
+
+def index_enabled(cratePath: Union[pathlib.Path, str]) -> bool:
+    """Whether writers should maintain the sidecar for this crate."""
+    if os.environ.get(INDEX_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on"):
+        return True
+    return index_path_for(cratePath).exists()
+
+
+def _journal_pending(metadata_file: pathlib.Path) -> bool:
+    from fairscape_cli.models.crate_document import journal_path_for
+    return journal_path_for(metadata_file).exists()
+
+
+def _write_index(metadata_file: pathlib.Path, entities: Dict[str, list]) -> Dict[str, Any]:
+    stat = metadata_file.stat()
+    index = {
+        "version": INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "entities": entities,
+    }
+    write_json_atomic(index_path_for(metadata_file), index, indent=None)
+    return index
+
+
+def build_crate_index(cratePath: Union[pathlib.Path, str]) -> Dict[str, Any]:
+    """Scan the metadata file once and (re)write its index sidecar."""
+    metadata_file = _metadata_file(cratePath)
+    entities: Dict[str, list] = {}
+    for start, end, entity in iter_graph_spans(metadata_file):
+        if not isinstance(entity, dict) or not isinstance(entity.get('@id'), str):
+            continue
+        entities[latin1_to_text(entity['@id'])] = [start, end, latin1_to_text(entity.get('@type'))]
+    return _write_index(metadata_file, entities)
+
+
+def load_crate_index(cratePath: Union[pathlib.Path, str]) -> Optional[Dict[str, Any]]:
+    """Return the index if it exists and matches the metadata file, else None.
+
+    An index is never trusted while journal records are pending, since they
+    are not reflected in the metadata file's byte layout.
+    """
+    metadata_file = _metadata_file(cratePath)
+    index_file = index_path_for(metadata_file)
+    if not index_file.exists() or _journal_pending(metadata_file):
+        return None
+    try:
+        with index_file.open('r') as f:
+            index = json.load(f)
+        stat = metadata_file.stat()
+    except (OSError, ValueError):
+        return None
+    if (
+        index.get("version") != INDEX_VERSION
+        or index.get("size") != stat.st_size
+        or index.get("mtime_ns") != stat.st_mtime_ns
+    ):
+        return None
+    return index
+
+
+def _read_span(metadata_file: pathlib.Path, start: int, end: int) -> Dict[str, Any]:
+    with metadata_file.open('rb') as f:
+        f.seek(start)
+        return json.loads(f.read(end - start))
+
+
+def read_indexed_entity(
+    cratePath: Union[pathlib.Path, str],
+    entity_id: str,
+    index: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Read one entity by @id with a single seek.
+
+    Returns None if there is no fresh index or the @id is not in it.
+    """
+    metadata_file = _metadata_file(cratePath)
+    index = index or load_crate_index(metadata_file)
+    if index is None:
+        return None
+    entry = index["entities"].get(entity_id)
+    if entry is None:
+        return None
+    return _read_span(metadata_file, entry[0], entry[1])
+
+
+def _line_indent(metadata_file: pathlib.Path, start: int) -> Optional[str]:
+    """Whitespace between the previous newline and `start`, or None if compact."""
+    lookback = min(start, 4096)
+    with metadata_file.open('rb') as f:
+        f.seek(start - lookback)
+        preceding = f.read(lookback)
+    newline = preceding.rfind(b'\n')
+    if newline < 0:
+        return None
+    prefix = preceding[newline + 1:]
+    if prefix.strip():
+        return None
+    return prefix.decode('ascii')
+
+
+def _copy_range(source, target, length: int) -> None:
+    while length > 0:
+        chunk = source.read(min(_COPY_CHUNK_SIZE, length))
+        if not chunk:
+            break
+        target.write(chunk)
+        length -= len(chunk)
+
+
+def update_indexed_entity(
+    cratePath: Union[pathlib.Path, str],
+    entity: Dict[str, Any],
+    index: Optional[Dict[str, Any]] = None
+) -> bool:
+    """Replace one entity in place by splicing it into its indexed byte span.
+
+    The new entity is serialized with the indentation of the line it sits
+    on, the file is rewritten atomically by copying the bytes around the
+    span, and the index offsets after the span are shifted. Returns False
+    (without writing) when there is no fresh index or the @id is absent;
+    callers then fall back to a full CrateDocument write.
+    """
+    metadata_file = _metadata_file(cratePath)
+    index = index or load_crate_index(metadata_file)
+    if index is None:
+        return False
+    entity_id = entity.get('@id')
+    entry = index["entities"].get(entity_id)
+    if entry is None:
+        return False
+
+    start, end = entry[0], entry[1]
+    indent = _line_indent(metadata_file, start)
+    if indent is None:
+        new_bytes = encode_json(entity, indent=None, prune=True)
+    else:
+        new_bytes = encode_json(entity, prune=True).replace(b'\n', b'\n' + indent.encode('ascii'))
+
+    with open_atomic(metadata_file) as target, metadata_file.open('rb') as source:
+        _copy_range(source, target, start)
+        target.write(new_bytes)
+        source.seek(end)
+        _copy_range(source, target, index["size"] - end)
+
+    delta = len(new_bytes) - (end - start)
+    entities = index["entities"]
+    if delta:
+        for span in entities.values():
+            if span[0] > start:
+                span[0] += delta
+                span[1] += delta
+    entities[entity_id] = [start, start + len(new_bytes), entity.get('@type')]
+    _write_index(metadata_file, entities)
+    return True
@@ -0,0 +1,103 @@
+"""Advisory locking for concurrent writers of one RO-Crate.
+
+Several `fairscape rocrate register` / `track` processes may append to the
+same crate at once; without coordination their read-modify-write cycles
+overwrite each other. `crate_lock` serializes them with an exclusive
+`flock` on a sidecar file next to the metadata:
+
+    with crate_lock(crate_path):
+        ...read, modify and write ro-crate-metadata.json...
+
+The sidecar (`ro-crate-metadata.lock`) is locked rather than the metadata file
+itself because atomic writes replace the metadata file's inode. The lock is
+re-entrant within a process (nested `crate_lock` calls and threads of the
+same process are serialized by an in-process lock and share one flock), and
+is released automatically if the process dies. The sidecar stays in the
+crate directory, so BagIt payloads and `publish` zips leave it out (as
+they do the metadata journal, after compacting it).
+
+FAIRSCAPE_CRATE_LOCKING selects how `CrateDocument` uses it: ``lock`` (the
+default) holds the lock for a whole session, ``optimistic`` only while
+checking for concurrent changes and writing, and ``off`` disables locking.
+On platforms without `fcntl` the file lock is a no-op.
+"""
+import contextlib
+import os
+import pathlib
+import threading
+from typing import Dict, Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+LOCK_FILENAME = "ro-crate-metadata.lock"
+LOCKING_ENV_VAR = "FAIRSCAPE_CRATE_LOCKING"
+LOCKING_LOCK = "lock"
+LOCKING_OPTIMISTIC = "optimistic"
+LOCKING_OFF = "off"
+LOCKING_MODES = (LOCKING_LOCK, LOCKING_OPTIMISTIC, LOCKING_OFF)
+
+_registry_lock = threading.Lock()
+# Per lock file: [thread lock, depth, open fd or None, owner pid].
+_held: Dict[str, list] = {}
+
+
+def lock_path_for(cratePath: Union[pathlib.Path, str]) -> pathlib.Path:
+    cratePath = pathlib.Path(cratePath)
+    if cratePath.is_dir():
+        return cratePath / LOCK_FILENAME
+    return cratePath.with_name(LOCK_FILENAME)
+
+
+def default_locking_mode() -> str:
+    mode = os.environ.get(LOCKING_ENV_VAR, LOCKING_LOCK).strip().lower() or LOCKING_LOCK
+    if mode not in LOCKING_MODES:
+        raise ValueError(
+            f"Invalid {LOCKING_ENV_VAR}='{mode}'. Expected one of: {', '.join(LOCKING_MODES)}"
+        )
+    return mode
+
+
+@contextlib.contextmanager
+def crate_lock(cratePath: Union[pathlib.Path, str]) -> Iterator[None]:
+    """Hold the crate's exclusive advisory lock for the duration of the block."""
+    lock_path = lock_path_for(cratePath)
+    key = str(lock_path.resolve())
+    with _registry_lock:
+        entry = _held.get(key)
+        # A forked child starts with its own, unheld lock state.
+        if entry is None or entry[3] != os.getpid():
+            entry = _held[key] = [threading.RLock(), 0, None, os.getpid()]
+    thread_lock = entry[0]
+
+    with thread_lock:
+        if entry[1] == 0 and fcntl is not None:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                raise
+            entry[2] = fd
+        entry[1] += 1
+        try:
+            yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and entry[2] is not None:
+                fd, entry[2] = entry[2], None
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+
+@contextlib.contextmanager
+def maybe_crate_lock(cratePath: Union[pathlib.Path, str]) -> Iterator[None]:
+    """`crate_lock` unless FAIRSCAPE_CRATE_LOCKING=off."""
+    if default_locking_mode() == LOCKING_OFF:
+        yield
+        return
+    with crate_lock(cratePath):
+        yield
@@ -0,0 +1,330 @@
+"""In-process MongoDB-style query and update engine for an RO-Crate @graph.
+
+`augment update-entities` accepts MongoDB query/update documents. Rather than
+loading the graph into a mongomock collection, `GraphQueryEngine` evaluates
+the subset the CLI supports directly on the entity dicts:
+
+* queries: field equality (an array field matches if any element does),
+  ``$eq``, ``$ne``, ``$in``, ``$nin``, ``$exists``, ``$regex`` (with
+  ``$options``), and top-level ``$and`` / ``$or``; dotted paths reach into
+  nested objects and, as in MongoDB, into arrays of objects.
+* updates: ``$set``, ``$unset``, ``$push`` and ``$addToSet`` (both with
+  ``$each``).
+
+Hash indexes on ``@id`` and on each ``@type`` value narrow the candidates of
+queries that constrain those keys, so selecting a handful of entities does
+not scan the whole graph. Entities are updated in place; `update_many`
+reports the @ids it actually changed.
+"""
+import copy
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+QUERY_OPERATORS = ("$eq", "$ne", "$in", "$nin", "$exists", "$regex", "$options")
+UPDATE_OPERATORS = ("$set", "$unset", "$push", "$addToSet")
+
+_MISSING = object()
+
+
+class GraphQueryError(ValueError):
+    """A query or update document uses unsupported or invalid syntax."""
+
+
+def _type_values(entity: Dict[str, Any]) -> List[str]:
+    types = entity.get("@type")
+    if isinstance(types, list):
+        return [t for t in types if isinstance(t, str)]
+    return [types] if isinstance(types, str) else []
+
+
+class _Fanout(list):
+    """Several values reached through an array in a dotted path."""
+
+
+def _get_path(entity: Dict[str, Any], path: str) -> Any:
+    """Value at a dotted path, or _MISSING; arrays of objects are traversed like MongoDB."""
+    values = [entity]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    found.append(value[part])
+            elif isinstance(value, list):
+                found.extend(item[part] for item in value if isinstance(item, dict) and part in item)
+        if not found:
+            return _MISSING
+        values = found
+    return values[0] if len(values) == 1 else _Fanout(values)
+
+
+def _candidates(value: Any) -> List[Any]:
+    """Values a condition is tested against: the field itself and, for arrays, each element."""
+    if isinstance(value, _Fanout):
+        return [candidate for item in value for candidate in _candidates(item)]
+    if isinstance(value, list):
+        return [value] + value
+    return [value]
+
+
+def _compile_regex(pattern: Any, options: str) -> "re.Pattern":
+    flags = 0
+    for option in options or "":
+        if option == "i":
+            flags |= re.IGNORECASE
+        elif option == "m":
+            flags |= re.MULTILINE
+        elif option == "s":
+            flags |= re.DOTALL
+        elif option == "x":
+            flags |= re.VERBOSE
+        else:
+            raise GraphQueryError(f"Unsupported $regex option '{option}'")
+    try:
+        return re.compile(pattern, flags)
+    except (re.error, TypeError) as exc:
+        raise GraphQueryError(f"Invalid $regex {pattern!r}: {exc}") from exc
+
+
+def _is_operator_doc(condition: Any) -> bool:
+    return isinstance(condition, dict) and bool(condition) and all(
+        isinstance(key, str) and key.startswith("$") for key in condition
+    )
+
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if not _is_operator_doc(condition):
+        return value is not _MISSING and condition in _candidates(value)
+
+    for operator, operand in condition.items():
+        if operator == "$eq":
+            if value is _MISSING or operand not in _candidates(value):
+                return False
+        elif operator == "$ne":
+            if value is not _MISSING and operand in _candidates(value):
+                return False
+        elif operator == "$in":
+            if not isinstance(operand, list):
+                raise GraphQueryError("$in needs an array")
+            if value is _MISSING or not any(item in _candidates(value) for item in operand):
+                return False
+        elif operator == "$nin":
+            if not isinstance(operand, list):
+                raise GraphQueryError("$nin needs an array")
+            if value is not _MISSING and any(item in _candidates(value) for item in operand):
+                return False
+        elif operator == "$exists":
+            if bool(operand) != (value is not _MISSING):
+                return False
+        elif operator == "$regex":
+            regex = _compile_regex(operand, condition.get("$options", ""))
+            if value is _MISSING or not any(
+                isinstance(item, str) and regex.search(item) for item in _candidates(value)
+            ):
+                return False
+        elif operator == "$options":
+            if "$regex" not in condition:
+                raise GraphQueryError("$options without $regex")
+        else:
+            raise GraphQueryError(
+                f"Unsupported query operator '{operator}'. Supported: {', '.join(QUERY_OPERATORS)}"
+            )
+    return True
+
+
+def matches(entity: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Whether `entity` satisfies the MongoDB-style `query`."""
+    if not isinstance(query, dict):
+        raise GraphQueryError("A query must be a JSON object")
+    for key, condition in query.items():
+        if key in ("$and", "$or"):
+            if not isinstance(condition, list) or not condition:
+                raise GraphQueryError(f"{key} needs a non-empty array of queries")
+            results = (matches(entity, sub_query) for sub_query in condition)
+            if not (all(results) if key == "$and" else any(results)):
+                return False
+        elif key.startswith("$"):
+            raise GraphQueryError(f"Unsupported top-level query operator '{key}'")
+        elif not _match_condition(_get_path(entity, key), condition):
+            return False
+    return True
+
+
+def _check_field(path: str) -> List[str]:
+    parts = path.split(".")
+    if not path or any(not part or part.startswith("$") for part in parts):
+        raise GraphQueryError(f"Invalid field name '{path}' in update")
+    if parts[0] == "@id":
+        raise GraphQueryError("The @id of an entity cannot be modified")
+    return parts
+
+
+def _parent_for_write(entity: Dict[str, Any], parts: List[str]) -> Dict[str, Any]:
+    target = entity
+    for part in parts[:-1]:
+        child = target.setdefault(part, {})
+        if not isinstance(child, dict):
+            raise GraphQueryError(f"Cannot create field '{'.'.join(parts)}' inside a non-object value")
+        target = child
+    return target
+
+
+def _each(operand: Any) -> List[Any]:
+    if isinstance(operand, dict) and "$each" in operand:
+        if not isinstance(operand["$each"], list) or len(operand) != 1:
+            raise GraphQueryError("$each needs an array and no other modifiers")
+        return operand["$each"]
+    return [operand]
+
+
+def validate_update(update: Dict[str, Any]) -> None:
+    """Raise GraphQueryError unless `update` is a supported update document."""
+    if not isinstance(update, dict) or not update:
+        raise GraphQueryError("An update must be a non-empty JSON object of update operators")
+    for operator, fields in update.items():
+        if operator not in UPDATE_OPERATORS:
+            raise GraphQueryError(
+                f"Unsupported update operator '{operator}'. Supported: {', '.join(UPDATE_OPERATORS)}"
+            )
+        if not isinstance(fields, dict) or not fields:
+            raise GraphQueryError(f"{operator} needs a non-empty object of fields")
+        for path in fields:
+            _check_field(path)
+
+
+def apply_update(entity: Dict[str, Any], update: Dict[str, Any]) -> bool:
+    """Apply an update document to `entity` in place. Returns True if it changed."""
+    validate_update(update)
+    before = copy.deepcopy(entity)
+    try:
+        _apply_operators(entity, update)
+    except GraphQueryError:
+        # Leave the entity as it was rather than half-updated.
+        entity.clear()
+        entity.update(before)
+        raise
+    return entity != before
+
+
+def _apply_operators(entity: Dict[str, Any], update: Dict[str, Any]) -> None:
+    for operator, fields in update.items():
+        for path, operand in fields.items():
+            parts = _check_field(path)
+            if operator == "$unset":
+                parent = _get_path(entity, ".".join(parts[:-1])) if len(parts) > 1 else entity
+                if isinstance(parent, dict):
+                    parent.pop(parts[-1], None)
+                continue
+
+            parent = _parent_for_write(entity, parts)
+            key = parts[-1]
+            if operator == "$set":
+                parent[key] = copy.deepcopy(operand)
+                continue
+
+            current = parent.setdefault(key, [])
+            if not isinstance(current, list):
+                raise GraphQueryError(f"{operator} on '{path}' requires an array field")
+            for item in _each(operand):
+                if operator == "$push" or item not in current:
+                    current.append(copy.deepcopy(item))
+
+
+class GraphQueryEngine:
+    """Query/update a list of @graph entity dicts through @id and @type indexes."""
+
+    def __init__(self, entities: Iterable[Dict[str, Any]]):
+        self.entities: List[Dict[str, Any]] = [e for e in entities if isinstance(e, dict)]
+        self._by_id: Dict[str, Set[int]] = {}
+        self._by_type: Dict[str, Set[int]] = {}
+        for position, entity in enumerate(self.entities):
+            self._index(position, entity)
+        # Position -> entity as it was before its first update, for rollback().
+        self._originals: Dict[int, Dict[str, Any]] = {}
+
+    def _index(self, position: int, entity: Dict[str, Any]) -> None:
+        entity_id = entity.get("@id")
+        if isinstance(entity_id, str):
+            self._by_id.setdefault(entity_id, set()).add(position)
+        for type_value in _type_values(entity):
+            self._by_type.setdefault(type_value, set()).add(position)
+
+    def _unindex(self, position: int, entity: Dict[str, Any]) -> None:
+        for type_value in _type_values(entity):
+            self._by_type.get(type_value, set()).discard(position)
+
+    def _indexed_positions(self, index: Dict[str, Set[int]], condition: Any) -> Optional[Set[int]]:
+        """Positions that can satisfy `condition` on an indexed key, or None if not narrowable."""
+        if _is_operator_doc(condition):
+            if "$eq" in condition:
+                values = [condition["$eq"]]
+            elif isinstance(condition.get("$in"), list):
+                values = condition["$in"]
+            else:
+                return None
+        else:
+            values = [condition]
+        positions: Set[int] = set()
+        for value in values:
+            if isinstance(value, str):
+                positions |= index.get(value, set())
+            elif isinstance(value, list):
+                # Whole-array equality: every element must be present.
+                return None
+        return positions
+
+    def _plan(self, query: Dict[str, Any]) -> Iterable[int]:
+        candidates: Optional[Set[int]] = None
+        for key, index in (("@id", self._by_id), ("@type", self._by_type)):
+            if key not in query:
+                continue
+            positions = self._indexed_positions(index, query[key])
+            if positions is not None:
+                candidates = positions if candidates is None else candidates & positions
+        if candidates is None:
+            return range(len(self.entities))
+        return sorted(candidates)
+
+    def find(self, query: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield matching entities in @graph order."""
+        for position in self._plan(query):
+            if matches(self.entities[position], query):
+                yield self.entities[position]
+
+    def update_many(self, query: Dict[str, Any], update: Dict[str, Any]) -> Tuple[int, List[str]]:
+        """Apply `update` to every entity matching `query`.
+
+        Returns (matched count, @ids of the entities that changed).
+        """
+        validate_update(update)
+        matched = 0
+        modified: List[str] = []
+        for position in list(self._plan(query)):
+            entity = self.entities[position]
+            if not matches(entity, query):
+                continue
+            matched += 1
+            if position not in self._originals:
+                self._originals[position] = copy.deepcopy(entity)
+            self._unindex(position, entity)
+            try:
+                changed = apply_update(entity, update)
+            finally:
+                self._index(position, entity)
+            if changed:
+                modified.append(entity.get("@id"))
+        return matched, modified
+
+    def rollback(self) -> None:
+        """Restore every entity updated through this engine, in place.
+
+        The dicts keep their identity, so a CrateDocument (or any other
+        holder of the same @graph) sees the entities exactly as they were.
+        """
+        for position, original in self._originals.items():
+            entity = self.entities[position]
+            self._unindex(position, entity)
+            entity.clear()
+            entity.update(original)
+            self._index(position, entity)
+        self._originals = {}
@@ -0,0 +1,251 @@
+"""Streaming reader for the @graph of large ro-crate-metadata.json files.
+
+`ReadROCrateMetadata` loads the whole document and validates every entity
+into a pydantic model, which for release crates with millions of file
+entries costs gigabytes of RAM just to count datasets. `iter_graph_entities`
+instead decodes the document incrementally and yields one raw entity dict at
+a time, so memory stays bounded by the largest single entity:
+
+    for entity in iter_graph_entities(crate_dir, types=["Dataset"], fields=["contentUrl"]):
+        ...
+
+Only the standard library is used: the file is read in chunks and each
+@graph element is decoded with `json.JSONDecoder.raw_decode` as soon as it
+is complete.
+"""
+import json
+import pathlib
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from fairscape_models.rocrate import ROCrateV1_2
+
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _ChunkedJSONReader:
+    """Minimal pull parser over a text stream, one JSON value at a time."""
+
+    def __init__(self, handle, chunk_size: int):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        # Absolute offset (in characters read) of buffer[0].
+        self.base = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.handle.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop everything already consumed before growing the buffer.
+        if self.pos:
+            self.base += self.pos
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, allowed: str) -> str:
+        char = self.peek()
+        if not char or char not in allowed:
+            found = repr(char) if char else 'end of file'
+            raise ValueError(f"Malformed RO-Crate metadata: expected one of {allowed!r}, found {found}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        # An incomplete value is decoded again from its start after every
+        # read, so read geometrically more each time to keep a value much
+        # larger than chunk_size linear rather than quadratic.
+        read_size = self.chunk_size
+        while True:
+            try:
+                decoded, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill(read_size):
+                    read_size *= 2
+                    continue
+                raise
+            # A scalar ending exactly at the buffer edge may continue in the next chunk.
+            if end == len(self.buffer) and self._fill(read_size):
+                read_size *= 2
+                continue
+            self.pos = end
+            return decoded
+
+
+def _iter_raw_graph(handle, chunk_size: int, spans: bool = False) -> Iterator[Any]:
+    """Yield @graph elements, or (start, end, element) offsets if `spans`."""
+    reader = _ChunkedJSONReader(handle, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("Malformed RO-Crate metadata: object keys must be strings")
+        reader.expect(':')
+        if key == '@graph':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    if spans:
+                        reader.peek()
+                        start = reader.base + reader.pos
+                        element = reader.value()
+                        yield start, reader.base + reader.pos, element
+                    else:
+                        yield reader.value()
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            # @context and other top-level members are small; decode and discard.
+            reader.value()
+        if reader.expect(',}') == '}':
+            return
+
+
+def _resolve_metadata_file(path: Union[pathlib.Path, str]) -> pathlib.Path:
+    path = pathlib.Path(path)
+    if path.is_dir():
+        return path / 'ro-crate-metadata.json'
+    return path
+
+
+def entity_type_names(entity: Dict[str, Any]) -> List[str]:
+    """Local names of an entity's types, e.g. 'https://w3id.org/EVI#Dataset' -> 'Dataset'."""
+    type_val = entity.get('@type') or entity.get('metadataType') or []
+    if isinstance(type_val, str):
+        type_val = [type_val]
+    names = []
+    for type_name in type_val:
+        if isinstance(type_name, str):
+            names.append(re.split(r'[#/:]', type_name)[-1])
+    return names
+
+
+def iter_graph_entities(
+    path: Union[pathlib.Path, str],
+    types: Optional[Iterable[str]] = None,
+    fields: Optional[Iterable[str]] = None,
+    validate: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """Yield the raw @graph entities of a crate one at a time.
+
+    Args:
+        path: Crate directory or ro-crate-metadata.json file.
+        types: Only yield entities with one of these types, matched on the
+            local name ('Dataset' matches 'https://w3id.org/EVI#Dataset').
+        fields: Project each entity to these keys; '@id' and '@type' are
+            always kept.
+        validate: Validate each yielded entity with the same per-type model
+            dispatch as ROCrateV1_2 (raises pydantic's ValidationError).
+        chunk_size: Characters read from the file per chunk.
+
+    A crate with a pending ro-crate-metadata.journal.jsonl is read in full
+    with the journal replayed; compact it to stream again.
+    """
+    metadata_file = _resolve_metadata_file(path)
+    wanted_types = set(types) if types is not None else None
+    keep_fields = None
+    if fields is not None:
+        keep_fields = ['@id', '@type'] + [field for field in fields if field not in ('@id', '@type')]
+
+    for entity in _iter_source_entities(metadata_file, chunk_size):
+        if not isinstance(entity, dict):
+            continue
+        if wanted_types is not None and wanted_types.isdisjoint(entity_type_names(entity)):
+            continue
+        if validate:
+            ROCrateV1_2.validate_metadata_graph({'@graph': [entity]})
+        if keep_fields is not None:
+            entity = {key: entity[key] for key in keep_fields if key in entity}
+        yield entity
+
+
+def _iter_source_entities(metadata_file: pathlib.Path, chunk_size: int) -> Iterator[Any]:
+    from fairscape_cli.models.crate_document import journal_path_for, read_crate_metadata
+
+    if journal_path_for(metadata_file).exists():
+        yield from read_crate_metadata(metadata_file).get('@graph', [])
+        return
+
+    with metadata_file.open('r', encoding='utf-8') as metadata_handle:
+        yield from _iter_raw_graph(metadata_handle, chunk_size)
+
+
+def iter_graph_spans(
+    path: Union[pathlib.Path, str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Tuple[int, int, Any]]:
+    """Yield (byte start, byte end, entity) for each @graph element on disk.
+
+    The file is decoded as latin-1 so that character offsets are byte
+    offsets; non-ASCII strings in the yielded entities are therefore
+    mis-decoded and should be passed through `latin1_to_text` before use.
+    Pending journal records are not applied.
+    """
+    metadata_file = _resolve_metadata_file(path)
+    with metadata_file.open('r', encoding='latin-1', newline='') as metadata_handle:
+        yield from _iter_raw_graph(metadata_handle, chunk_size, spans=True)
+
+
+def latin1_to_text(value: Any) -> Any:
+    """Undo the latin-1 decoding of `iter_graph_spans` for a string (or list of strings)."""
+    if isinstance(value, str):
+        return value.encode('latin-1').decode('utf-8')
+    if isinstance(value, list):
+        return [latin1_to_text(item) for item in value]
+    return value
+
+
+def find_root_entity(
+    path: Union[pathlib.Path, str],
+    fields: Optional[Iterable[str]] = None
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Stream just far enough to find the root data entity.
+
+    The root is resolved via the metadata descriptor's `about` reference, as
+    in `rocrate_helpers.get_root_entity_dict`; the descriptor and root are
+    normally the first two entities, so this rarely reads past them.
+
+    Returns (root @id, root dict); either may be None.
+    """
+    fields = list(fields) + ['about'] if fields is not None else None
+    root_id = None
+    seen: Dict[str, Dict[str, Any]] = {}
+    for entity in iter_graph_entities(path, fields=fields):
+        entity_id = entity.get('@id')
+        if root_id is None:
+            if entity_id == 'ro-crate-metadata.json' and isinstance(entity.get('about'), dict):
+                root_id = entity['about'].get('@id')
+                if root_id in seen:
+                    return root_id, seen[root_id]
+            elif entity_id is not None:
+                # Only entities preceding the descriptor are retained.
+                seen[entity_id] = entity
+        elif entity_id == root_id:
+            return root_id, entity
+    return root_id, None
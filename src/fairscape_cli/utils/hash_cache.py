@@ -0,0 +1,199 @@
+"""Persistent file checksum cache.
+
+Dataset/software registration (MD5) and Merkle tree generation (SHA-256)
+hash the same payload files. `file_digest` answers from a SQLite cache
+keyed by the file's identity and version on disk,
+
+    (st_dev, st_ino, st_size, st_mtime_ns, algorithm) -> hex digest
+
+so a file is read at most once until it changes. On a miss the file is read
+once and MD5 and SHA-256 are both computed and stored, so registering a
+dataset also pre-computes the digest the Merkle tree needs.
+
+The cache lives at ``$XDG_CACHE_HOME/fairscape/hash-cache.sqlite3`` (default
+``~/.cache``), or at ``FAIRSCAPE_HASH_CACHE_PATH``. It is bypassed with
+``fairscape --no-hash-cache ...``, ``FAIRSCAPE_NO_HASH_CACHE=1`` or
+``set_hash_cache_enabled(False)``; if the database cannot be opened, files are
+simply hashed without caching.
+
+Digests are not cached for files modified within the last
+`RACY_WINDOW_NS`, since a write in the same mtime tick as the hash would
+otherwise go unnoticed.
+"""
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Union
+
+from fairscape_cli.utils.hashing import ProgressCallback, hash_file
+
+logger = logging.getLogger(__name__)
+
+HASH_CACHE_PATH_ENV_VAR = "FAIRSCAPE_HASH_CACHE_PATH"
+NO_HASH_CACHE_ENV_VAR = "FAIRSCAPE_NO_HASH_CACHE"
+HASH_CACHE_FILENAME = "hash-cache.sqlite3"
+
+# Digests computed together on every cache miss.
+CACHED_ALGORITHMS = ("md5", "sha256")
+
+RACY_WINDOW_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (dev, ino, algorithm)
+)
+"""
+
+_enabled_override: Optional[bool] = None
+# (pid, path, connection); reopened after a fork. Shared by worker threads under _lock.
+_connection: Optional[tuple] = None
+_lock = threading.RLock()
+
+
+def set_hash_cache_enabled(enabled: Optional[bool]) -> None:
+    """Force the cache on or off for this process; None restores the env default."""
+    global _enabled_override
+    _enabled_override = enabled
+
+
+def hash_cache_enabled() -> bool:
+    if _enabled_override is not None:
+        return _enabled_override
+    return os.environ.get(NO_HASH_CACHE_ENV_VAR, "").strip().lower() not in ("1", "true", "yes", "on")
+
+
+def hash_cache_path() -> pathlib.Path:
+    override = os.environ.get(HASH_CACHE_PATH_ENV_VAR)
+    if override:
+        return pathlib.Path(override).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(cache_home) / "fairscape" / HASH_CACHE_FILENAME
+
+
+def _open_cache() -> Optional[sqlite3.Connection]:
+    global _connection
+    path = hash_cache_path()
+    if _connection is not None:
+        pid, open_path, connection = _connection
+        if pid == os.getpid() and open_path == path:
+            return connection
+        if pid == os.getpid():
+            connection.close()
+        _connection = None
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(_SCHEMA)
+    except (OSError, sqlite3.Error) as exc:
+        logger.warning(f"Hash cache unavailable at {path}, hashing without it: {exc}")
+        set_hash_cache_enabled(False)
+        return None
+    _connection = (os.getpid(), path, connection)
+    return connection
+
+
+def close_hash_cache() -> None:
+    global _connection
+    with _lock:
+        if _connection is not None and _connection[0] == os.getpid():
+            _connection[2].close()
+        _connection = None
+
+
+def compute_digests(
+    filepath: Union[pathlib.Path, str],
+    algorithms: Iterable[str],
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, str]:
+    """Hash a file once for several algorithms (no caching)."""
+    return hash_file(filepath, tuple(algorithms), progress=progress)
+
+
+def _lookup(connection, stat: os.stat_result, algorithms: Iterable[str]) -> Dict[str, str]:
+    rows = connection.execute(
+        "SELECT algorithm, digest FROM file_digests "
+        "WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+        (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns),
+    ).fetchall()
+    wanted = set(algorithms)
+    return {algorithm: digest for algorithm, digest in rows if algorithm in wanted}
+
+
+def _store(connection, stat: os.stat_result, digests: Dict[str, str]) -> None:
+    connection.executemany(
+        "INSERT OR REPLACE INTO file_digests (dev, ino, size, mtime_ns, algorithm, digest) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, algorithm, digest)
+            for algorithm, digest in digests.items()
+        ],
+    )
+
+
+def _same_version(before: os.stat_result, after: os.stat_result) -> bool:
+    return (
+        before.st_dev == after.st_dev
+        and before.st_ino == after.st_ino
+        and before.st_size == after.st_size
+        and before.st_mtime_ns == after.st_mtime_ns
+    )
+
+
+def file_digests(
+    filepath: Union[pathlib.Path, str],
+    algorithms: Iterable[str] = CACHED_ALGORITHMS,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, str]:
+    """Hex digests of a file for each requested hashlib algorithm, via the cache.
+
+    Safe to call from several threads; `progress` is forwarded to the
+    hashing engine, and a cache hit reports the whole file size at once.
+    """
+    algorithms = tuple(algorithms)
+    with _lock:
+        connection = _open_cache() if hash_cache_enabled() else None
+    if connection is None:
+        return compute_digests(filepath, algorithms, progress)
+
+    stat = os.stat(filepath)
+    try:
+        with _lock:
+            found = _lookup(connection, stat, algorithms)
+    except sqlite3.Error as exc:
+        logger.warning(f"Hash cache lookup failed, hashing without it: {exc}")
+        return compute_digests(filepath, algorithms, progress)
+    if len(found) == len(set(algorithms)):
+        if progress is not None:
+            progress(filepath, stat.st_size)
+        return {algorithm: found[algorithm] for algorithm in algorithms}
+
+    to_compute = tuple(dict.fromkeys(algorithms + CACHED_ALGORITHMS))
+    digests = compute_digests(filepath, to_compute, progress)
+
+    after = os.stat(filepath)
+    if _same_version(stat, after) and time.time_ns() - after.st_mtime_ns > RACY_WINDOW_NS:
+        try:
+            with _lock:
+                _store(connection, after, digests)
+        except sqlite3.Error as exc:
+            logger.warning(f"Could not update hash cache: {exc}")
+    return {algorithm: digests[algorithm] for algorithm in algorithms}
+
+
+def file_digest(filepath: Union[pathlib.Path, str], algorithm: str) -> str:
+    """Hex digest of a file for one hashlib algorithm, via the cache."""
+    return file_digests(filepath, (algorithm,))[algorithm]
@@ -0,0 +1,150 @@
+"""Multi-digest file hashing engine.
+
+Every consumer that needs file digests (dataset registration, Merkle trees,
+BagIt manifests) goes through this module so that a file is read once no
+matter how many algorithms are wanted:
+
+    digests = hash_file(path, ("md5", "sha256"))
+    results = hash_files(paths, ("sha256",), jobs=8, progress=bar.update)
+    chunks = hash_file_chunks(path, 64 * 1024 * 1024, jobs=8)
+
+Files are read with `readinto` into a reusable buffer of `BUFFER_SIZE` bytes
+and each chunk is fed to every requested hashlib object. hashlib releases the
+GIL while hashing buffers of this size, so `hash_files` hashes several files
+concurrently on a thread pool and scales with the available cores and I/O.
+`hash_file_chunks` does the same within one large file, hashing fixed-size
+byte ranges of it in parallel.
+
+`hash_files` answers through the persistent checksum cache by default
+(`fairscape_cli.utils.hash_cache`); `hash_file` always reads the file.
+"""
+import hashlib
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+PathLike = Union[pathlib.Path, str]
+# Called with (path, bytes hashed since the previous call) as work progresses.
+ProgressCallback = Callable[[PathLike, int], None]
+
+SUPPORTED_ALGORITHMS = ("md5", "sha1", "sha256", "sha512", "blake2b")
+BUFFER_SIZE = 1024 * 1024
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+
+
+def _new_hashers(algorithms: Iterable[str]) -> Dict[str, Any]:
+    hashers = {}
+    for name in algorithms:
+        if name not in SUPPORTED_ALGORITHMS:
+            raise ValueError(
+                f"Unsupported digest algorithm '{name}'. "
+                f"Expected one of: {', '.join(SUPPORTED_ALGORITHMS)}"
+            )
+        hashers[name] = hashlib.new(name)
+    return hashers
+
+
+def hash_file(
+    filepath: PathLike,
+    algorithms: Sequence[str] = ("sha256",),
+    progress: Optional[ProgressCallback] = None,
+    buffer_size: int = BUFFER_SIZE
+) -> Dict[str, str]:
+    """Compute several hex digests of a file in a single read pass."""
+    hashers = _new_hashers(algorithms)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(filepath, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            chunk = view[:read]
+            for hasher in hashers.values():
+                hasher.update(chunk)
+            if progress is not None:
+                progress(filepath, read)
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+def hash_files(
+    filepaths: Iterable[PathLike],
+    algorithms: Sequence[str] = ("sha256",),
+    jobs: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    use_cache: bool = True
+) -> List[Dict[str, str]]:
+    """Hash many files concurrently; results are returned in input order.
+
+    Args:
+        filepaths: Files to hash.
+        algorithms: hashlib names, all computed in one pass per file.
+        jobs: Worker threads (default `DEFAULT_JOBS`; 1 hashes serially).
+        progress: Called from worker threads with (path, bytes); cache hits
+            report the whole file size at once.
+        use_cache: Consult and fill the persistent checksum cache.
+    """
+    filepaths = list(filepaths)
+    algorithms = tuple(algorithms)
+    _new_hashers(algorithms)
+
+    if use_cache:
+        from fairscape_cli.utils.hash_cache import file_digests
+
+        def digest_one(path):
+            return file_digests(path, algorithms, progress=progress)
+    else:
+        def digest_one(path):
+            return hash_file(path, algorithms, progress=progress)
+
+    jobs = DEFAULT_JOBS if jobs is None else max(1, jobs)
+    if jobs == 1 or len(filepaths) <= 1:
+        return [digest_one(path) for path in filepaths]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(filepaths))) as pool:
+        return list(pool.map(digest_one, filepaths))
+
+
+def hash_file_chunks(
+    filepath: PathLike,
+    chunk_size: int,
+    algorithm: str = "sha256",
+    jobs: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    buffer_size: int = BUFFER_SIZE
+) -> List[str]:
+    """Hex digest of every `chunk_size`-byte chunk of a file, hashed concurrently.
+
+    Chunk i covers bytes [i * chunk_size, (i + 1) * chunk_size); the last one
+    may be shorter, and an empty file has a single empty chunk. Each worker
+    thread reads its chunks through its own file handle. Not cached.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    _new_hashers((algorithm,))
+    size = os.stat(filepath).st_size
+    count = max(1, -(-size // chunk_size))
+
+    def digest_chunk(index: int) -> str:
+        hasher = hashlib.new(algorithm)
+        buffer = bytearray(min(buffer_size, chunk_size))
+        view = memoryview(buffer)
+        offset = index * chunk_size
+        end = min(offset + chunk_size, size)
+        with open(filepath, "rb", buffering=0) as f:
+            f.seek(offset)
+            while offset < end:
+                read = f.readinto(view[:min(len(buffer), end - offset)])
+                if not read:
+                    break
+                hasher.update(view[:read])
+                offset += read
+                if progress is not None:
+                    progress(filepath, read)
+        return hasher.hexdigest()
+
+    jobs = DEFAULT_JOBS if jobs is None else max(1, jobs)
+    if jobs == 1 or count == 1:
+        return [digest_chunk(index) for index in range(count)]
+    with ThreadPoolExecutor(max_workers=min(jobs, count)) as pool:
+        return list(pool.map(digest_chunk, range(count)))
@@ -3,21 +3,66 @@
 Builds a SHA-256 Merkle tree from all file-backed entities in an RO-Crate's
 @graph (those with a contentUrl pointing to a local file). The tree and its
 root hash can be used to verify the integrity of the crate's contents.
+
+Each leaf also records the file's size and mtime (``size``, ``mtimeNs``) as
+they were when it was hashed, so a tree can be brought up to date by
+rehashing only the files whose stat changed (`generate_merkle_tree(...,
+previous=tree)`) and recomputing only the interior nodes above them
+(`update_merkle_tree`).
+
+With a `chunk_size`, files larger than it are split into fixed-size chunks
+hashed in parallel (`hashing.hash_file_chunks`). The chunk hashes form a
+per-file sub-tree, stored on the leaf as ``chunks`` ({chunkSize, size,
+levels}), whose root is the leaf's ``sha256`` value. For such leaves that
+value is not the file's SHA-256, but a mismatch can be narrowed to the
+chunks, and so the byte ranges, that changed (`changed_byte_ranges`).
+
+The stored levels also answer single-file questions without rehashing the
+crate: `inclusion_proof` lists the O(log n) sibling hashes from a leaf to the
+root, and `verify_file` hashes one file and checks it against the root.
+`check_merkle_tree` is the cheap alternative to regenerating the whole tree:
+it compares the recorded leaf stats and optionally rehashes a sample.
+
+Trees are stored as JSON or, for very large crates, as a small JSON header
+with a binary sidecar (`fairscape_cli.utils.merkle_binary`);
+`read_merkle_tree` / `write_merkle_tree` handle both.
 """
 
 import hashlib
 import json
+import math
+import os
+import random
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fairscape_cli.utils.graph_stream import iter_graph_entities
+from fairscape_cli.utils.hash_cache import RACY_WINDOW_NS, file_digest
+from fairscape_cli.utils.hashing import ProgressCallback, hash_file, hash_file_chunks, hash_files
+from fairscape_cli.utils.merkle_binary import (
+    BINARY_FORMAT,
+    binary_path_for,
+    is_binary_header,
+    read_binary_merkle_tree,
+    write_binary_merkle_tree,
+)
+from fairscape_cli.utils.serialization import write_json_atomic
+
+MERKLE_TREE_FILENAME = "ro-crate-merkle-tree.json"
+JSON_FORMAT = "json"
+MERKLE_TREE_FORMATS = (JSON_FORMAT, BINARY_FORMAT)
+# A binary tree's JSON header is a few hundred bytes; anything larger is a JSON tree.
+_MAX_HEADER_SIZE = 64 * 1024
+
+# Per-leaf stat recorded next to the sha256 for incremental regeneration.
+LEAF_STAT_FIELDS = ("size", "mtimeNs")
+_LEAF_EXTRA_FIELDS = LEAF_STAT_FIELDS + ("chunks",)
 
 
 def sha256_file(filepath: Path) -> str:
-    """Compute the SHA-256 hex digest of a file, reading in chunks."""
-    h = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    """SHA-256 hex digest of a file, answered from the checksum cache when possible."""
+    return file_digest(filepath, "sha256")
 
 
 def sha256_concat(left: str, right: str) -> str:
@@ -26,11 +71,48 @@ def sha256_concat(left: str, right: str) -> str:
     return hashlib.sha256(combined).hexdigest()
 
 
+def _indexed_leaves(leaves: List[Dict]) -> List[Dict]:
+    indexed = []
+    for i, leaf in enumerate(leaves):
+        entry = {"index": i, "contentUrl": leaf["contentUrl"], "sha256": leaf["sha256"]}
+        for key in _LEAF_EXTRA_FIELDS:
+            if key in leaf:
+                entry[key] = leaf[key]
+        indexed.append(entry)
+    return indexed
+
+
+def merkle_levels(hashes: List[str]) -> List[List[str]]:
+    """All levels of the Merkle tree over `hashes` (at least one), leaves first.
+
+    An odd level is padded by duplicating its last node, and the stored level
+    includes the duplicate; the last level holds the root.
+    """
+    current_level = list(hashes)
+    levels = [list(current_level)]
+
+    while len(current_level) > 1:
+        # Duplicate last element if odd count
+        if len(current_level) % 2 != 0:
+            current_level.append(current_level[-1])
+            # Update stored level to include the duplicate
+            levels[-1] = list(current_level)
+
+        next_level = []
+        for i in range(0, len(current_level), 2):
+            next_level.append(sha256_concat(current_level[i], current_level[i + 1]))
+        current_level = next_level
+        levels.append(list(current_level))
+
+    return levels
+
+
 def build_merkle_tree(leaves: List[Dict]) -> dict:
     """Build a Merkle tree from a list of leaf dicts.
 
     Args:
-        leaves: List of {"contentUrl": str, "sha256": str} dicts, pre-sorted.
+        leaves: List of {"contentUrl": str, "sha256": str} dicts, pre-sorted,
+            optionally with the file's "size" and "mtimeNs" and its "chunks" tree.
 
     Returns:
         Dict with algorithm, rootHash, leafCount, leaves (indexed), and levels.
@@ -45,47 +127,171 @@ def build_merkle_tree(leaves: List[Dict]) -> dict:
             "levels": [[empty_hash]],
         }
 
-    indexed_leaves = [
-        {"index": i, "contentUrl": leaf["contentUrl"], "sha256": leaf["sha256"]}
-        for i, leaf in enumerate(leaves)
-    ]
+    indexed_leaves = _indexed_leaves(leaves)
 
-    # Single leaf: root hash is the leaf hash itself
-    if len(leaves) == 1:
-        return {
-            "algorithm": "SHA-256",
-            "rootHash": leaves[0]["sha256"],
-            "leafCount": 1,
-            "leaves": indexed_leaves,
-            "levels": [[leaves[0]["sha256"]]],
-        }
+    # A single leaf is its own root
+    levels = merkle_levels([leaf["sha256"] for leaf in leaves])
 
-    # Extract hashes for tree construction
-    current_level = [leaf["sha256"] for leaf in leaves]
-    levels = [list(current_level)]
+    return {
+        "algorithm": "SHA-256",
+        "rootHash": levels[-1][0],
+        "leafCount": len(leaves),
+        "leaves": indexed_leaves,
+        "levels": levels,
+    }
 
-    while len(current_level) > 1:
-        # Duplicate last element if odd count
-        if len(current_level) % 2 != 0:
-            current_level.append(current_level[-1])
-            # Update stored level to include the duplicate
-            levels[-1] = list(current_level)
 
-        next_level = []
-        for i in range(0, len(current_level), 2):
-            next_level.append(sha256_concat(current_level[i], current_level[i + 1]))
-        current_level = next_level
-        levels.append(list(current_level))
+def _level_lengths(leaf_count: int) -> List[int]:
+    """Stored length of each level of a tree with `leaf_count` leaves (odd levels carry a duplicate)."""
+    lengths = []
+    count = leaf_count
+    while count > 1:
+        count += count % 2
+        lengths.append(count)
+        count //= 2
+    lengths.append(1)
+    return lengths
+
+
+def update_merkle_tree(previous: dict, leaves: List[Dict]) -> dict:
+    """Rebuild `previous` for a new leaf list, recomputing only the nodes above changed leaves.
+
+    Returns the same tree as `build_merkle_tree(leaves)`. When `leaves` are
+    the leaves of `previous` (same contentUrls in the same order) and its
+    levels are consistent with them, only the interior nodes on the paths from
+    leaves whose sha256 changed to the root are rehashed; otherwise the tree
+    is built afresh.
+    """
+    old_leaves = previous.get("leaves") or []
+    levels = previous.get("levels") or []
+    if (
+        len(leaves) < 2
+        or len(old_leaves) != len(leaves)
+        or [len(level) for level in levels] != _level_lengths(len(leaves))
+        or any(old.get("contentUrl") != new["contentUrl"] or old.get("sha256") != levels[0][i]
+               for i, (old, new) in enumerate(zip(old_leaves, leaves)))
+    ):
+        return build_merkle_tree(leaves)
+
+    levels = [list(level) for level in levels]
+    changed = {i: leaf["sha256"] for i, leaf in enumerate(leaves) if levels[0][i] != leaf["sha256"]}
+    count = len(leaves)
+    for level in levels[:-1]:
+        for i, digest in changed.items():
+            level[i] = digest
+            if i == count - 1 and count % 2:
+                level[i + 1] = digest
+        changed = {
+            parent: sha256_concat(level[2 * parent], level[2 * parent + 1])
+            for parent in {i // 2 for i in changed}
+        }
+        count = (count + 1) // 2
+    for i, digest in changed.items():
+        levels[-1][i] = digest
 
     return {
         "algorithm": "SHA-256",
-        "rootHash": current_level[0],
+        "rootHash": levels[-1][0],
         "leafCount": len(leaves),
-        "leaves": indexed_leaves,
+        "leaves": _indexed_leaves(leaves),
         "levels": levels,
     }
 
 
+def chunk_tree(
+    filepath: Path,
+    chunk_size: int,
+    jobs: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None
+) -> dict:
+    """Merkle sub-tree over the `chunk_size`-byte chunks of one file, hashed concurrently.
+
+    Returns {"chunkSize", "size", "levels"}; levels[-1][0] is the sub-tree root.
+    """
+    size = os.stat(filepath).st_size
+    digests = hash_file_chunks(filepath, chunk_size, jobs=jobs, progress=progress)
+    return {"chunkSize": chunk_size, "size": size, "levels": merkle_levels(digests)}
+
+
+def changed_byte_ranges(stored_leaf: Dict, computed_leaf: Dict) -> Optional[List[Tuple[int, int]]]:
+    """Byte ranges [start, end) whose chunks differ between two versions of a chunked leaf.
+
+    Adjacent changed chunks are merged into one range. Returns None when
+    either leaf has no chunk tree or they were chunked with different sizes.
+    """
+    stored = stored_leaf.get("chunks")
+    computed = computed_leaf.get("chunks")
+    if not stored or not computed or stored.get("chunkSize") != computed.get("chunkSize"):
+        return None
+
+    chunk_size = computed["chunkSize"]
+    size = max(stored.get("size", 0), computed.get("size", 0))
+    stored_hashes = stored["levels"][0]
+    computed_hashes = computed["levels"][0]
+    count = -(-size // chunk_size)
+
+    ranges: List[Tuple[int, int]] = []
+    for index in range(count):
+        old = stored_hashes[index] if index * chunk_size < stored.get("size", 0) else None
+        new = computed_hashes[index] if index * chunk_size < computed.get("size", 0) else None
+        if old == new:
+            continue
+        start, end = index * chunk_size, min((index + 1) * chunk_size, size)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def read_merkle_tree(path: Path) -> dict:
+    """Read a stored tree in either format (for a binary tree, `path` is its JSON header).
+
+    Raises OSError if a file cannot be read and ValueError if it is malformed
+    or a binary sidecar does not match its header.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{Path(path).name} is not a Merkle tree")
+    if is_binary_header(data):
+        return read_binary_merkle_tree(path, data)
+    return data
+
+
+def load_merkle_tree(path: Path) -> Optional[dict]:
+    """Like `read_merkle_tree`, but None if the tree is missing or unreadable."""
+    try:
+        return read_merkle_tree(path)
+    except (OSError, ValueError):
+        return None
+
+
+def merkle_tree_format(path: Path) -> Optional[str]:
+    """Storage format of the tree at `path` ("json" or "binary"); None if there is none."""
+    try:
+        if os.stat(path).st_size > _MAX_HEADER_SIZE:
+            return JSON_FORMAT
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return BINARY_FORMAT if is_binary_header(data) else JSON_FORMAT
+
+
+def write_merkle_tree(path: Path, tree: dict, tree_format: str = JSON_FORMAT) -> None:
+    """Write `tree` to `path` in `tree_format`, removing a binary sidecar a JSON tree replaces."""
+    if tree_format == BINARY_FORMAT:
+        write_binary_merkle_tree(path, tree)
+        return
+    if tree_format != JSON_FORMAT:
+        raise ValueError(f"Unknown Merkle tree format '{tree_format}'. Expected one of: {', '.join(MERKLE_TREE_FORMATS)}")
+    write_json_atomic(path, tree)
+    binary_path = binary_path_for(path)
+    if binary_path.exists():
+        binary_path.unlink()
+
+
 def resolve_content_url(content_url: str, crate_dir: Path) -> Optional[Path]:
     """Resolve a contentUrl to a local file path.
 
@@ -118,22 +324,145 @@ def resolve_content_url(content_url: str, crate_dir: Path) -> Optional[Path]:
     return None
 
 
-def generate_merkle_tree(crate_dir: Path) -> Optional[dict]:
-    """Generate a Merkle tree for all local files in an RO-Crate.
+def _local_name(content_url: str) -> str:
+    stripped = content_url.strip()
+    for prefix in ("file:///", "file://", "./"):
+        if stripped.startswith(prefix):
+            return stripped[len(prefix):]
+    return stripped
+
+
+def find_leaf(tree: dict, content_url: str) -> Optional[Dict]:
+    """Leaf of `tree` for a contentUrl; "data.csv" also finds "file:///data.csv" and vice versa."""
+    leaves = tree.get("leaves") or []
+    for leaf in leaves:
+        if leaf.get("contentUrl") == content_url:
+            return leaf
+    name = _local_name(content_url)
+    for leaf in leaves:
+        if _local_name(leaf.get("contentUrl", "")) == name:
+            return leaf
+    return None
 
-    Reads ro-crate-metadata.json, finds entities with contentUrl fields,
-    hashes the referenced local files, and builds a Merkle tree.
 
-    Returns the tree dict, or None if no hashable files are found.
+def proof_root(leaf_hash: str, path: List[Dict]) -> str:
+    """Root hash reached by folding an inclusion proof's path into `leaf_hash`."""
+    digest = leaf_hash
+    for step in path:
+        if step["position"] == "left":
+            digest = sha256_concat(step["sibling"], digest)
+        else:
+            digest = sha256_concat(digest, step["sibling"])
+    return digest
+
+
+def verify_inclusion_proof(proof: dict, leaf_hash: str) -> bool:
+    """Whether `leaf_hash` leads to the proof's rootHash through its path."""
+    return proof_root(leaf_hash, proof["path"]) == proof["rootHash"]
+
+
+def inclusion_proof(tree: dict, content_url: str) -> dict:
+    """Proof that a file's leaf is part of `tree`, read from its stored levels.
+
+    Returns {"algorithm", "contentUrl", "leafIndex", "leafCount", "leafHash",
+    "rootHash", "path"}, where path lists one {"sibling", "position"} step per
+    level below the root ("left" if the sibling is hashed first). A chunked
+    leaf's proof also carries its "chunkSize": the leaf hash is the root of
+    the file's chunk tree.
+
+    Raises ValueError if no leaf has the contentUrl or the stored levels do
+    not lead from the leaf to the stored root.
     """
-    metadata_file = crate_dir / "ro-crate-metadata.json"
-    with open(metadata_file, "r") as f:
-        metadata = json.load(f)
+    leaf = find_leaf(tree, content_url)
+    if leaf is None:
+        raise ValueError(f"No leaf with contentUrl '{content_url}' in the Merkle tree")
+
+    index = leaf["index"]
+    levels = tree.get("levels") or []
+    path = []
+    try:
+        if levels[0][index] != leaf["sha256"]:
+            raise ValueError(f"Stored Merkle tree levels do not match leaf '{leaf['contentUrl']}'")
+        for level in levels[:-1]:
+            sibling = index ^ 1
+            path.append({"sibling": level[sibling], "position": "left" if sibling < index else "right"})
+            index //= 2
+    except IndexError:
+        raise ValueError("Stored Merkle tree levels are incomplete")
+
+    proof = {
+        "algorithm": tree.get("algorithm", "SHA-256"),
+        "contentUrl": leaf["contentUrl"],
+        "leafIndex": leaf["index"],
+        "leafCount": tree.get("leafCount"),
+        "leafHash": leaf["sha256"],
+        "rootHash": tree.get("rootHash"),
+        "path": path,
+    }
+    if "chunks" in leaf:
+        proof["chunkSize"] = leaf["chunks"]["chunkSize"]
+    if not verify_inclusion_proof(proof, leaf["sha256"]):
+        raise ValueError("Stored Merkle tree levels do not lead to its rootHash")
+    return proof
+
+
+class FileVerification(NamedTuple):
+    """Outcome of `verify_file`; computed_hash is None if the file is missing."""
+    content_url: str
+    ok: bool
+    stored_hash: str
+    computed_hash: Optional[str]
+    root_hash: str
+    byte_ranges: Optional[List[Tuple[int, int]]] = None
+
+
+def verify_file(
+    crate_dir: Path,
+    tree: dict,
+    content_url: str,
+    jobs: Optional[int] = None
+) -> FileVerification:
+    """Check one file of a crate against its stored tree without hashing the others.
+
+    The file is read (not answered from the checksum cache), re-chunked with
+    the stored chunk size if its leaf is chunked, and its hash must lead to
+    the stored root through the leaf's inclusion proof. For a mismatching
+    chunked file, byte_ranges lists the chunks that differ.
+
+    Raises ValueError as `inclusion_proof` does.
+    """
+    proof = inclusion_proof(tree, content_url)
+    leaf = find_leaf(tree, content_url)
+    filepath = resolve_content_url(leaf["contentUrl"], crate_dir)
 
-    graph = metadata.get("@graph", [])
-    leaves = []
+    computed = None
+    byte_ranges = None
+    if filepath is not None:
+        if "chunks" in leaf:
+            chunks = chunk_tree(filepath, leaf["chunks"]["chunkSize"], jobs=jobs)
+            computed = chunks["levels"][-1][0]
+            byte_ranges = changed_byte_ranges(leaf, {"chunks": chunks})
+        else:
+            computed = hash_file(filepath, ("sha256",))["sha256"]
+
+    ok = computed is not None and verify_inclusion_proof(proof, computed)
+    return FileVerification(leaf["contentUrl"], ok, leaf["sha256"], computed, proof["rootHash"],
+                            byte_ranges if not ok else None)
+
+
+def _local_files(crate_dir: Path) -> List[Tuple[str, Path]]:
+    """(contentUrl, path) of every local file the crate's metadata references."""
+    from fairscape_cli.models.crate_document import active_crate_document
 
-    for entity in graph:
+    metadata_file = crate_dir / "ro-crate-metadata.json"
+    crate_document = active_crate_document(metadata_file)
+    if crate_document is not None:
+        entities = crate_document.graph
+    else:
+        entities = iter_graph_entities(metadata_file, fields=["contentUrl"])
+    urls_and_paths = []
+
+    for entity in entities:
         content_url = entity.get("contentUrl")
         if content_url is None:
             continue
@@ -144,16 +473,221 @@ def generate_merkle_tree(crate_dir: Path) -> Optional[dict]:
         for url in urls:
             filepath = resolve_content_url(url, crate_dir)
             if filepath is not None:
-                file_hash = sha256_file(filepath)
-                leaves.append({"contentUrl": url, "sha256": file_hash})
+                urls_and_paths.append((url, filepath))
+    return urls_and_paths
 
-    if not leaves:
+
+def generate_merkle_tree(
+    crate_dir: Path,
+    jobs: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    previous: Optional[dict] = None,
+    chunk_size: Optional[int] = None
+) -> Optional[dict]:
+    """Generate a Merkle tree for all local files in an RO-Crate.
+
+    Streams ro-crate-metadata.json (or reads the open CrateDocument
+    session's graph), finds entities with contentUrl fields, hashes the
+    referenced local files concurrently (`jobs` threads, see `hash_files`),
+    and builds a Merkle tree.
+
+    With `previous` (an earlier tree of the same crate), a file whose size
+    and mtime match its recorded leaf keeps that leaf's sha256 instead of
+    being hashed, and only the interior nodes above changed leaves are
+    recomputed (see `update_merkle_tree`).
+
+    With `chunk_size`, files larger than it get a chunk sub-tree whose root
+    is their leaf value (see the module docstring), and the tree records the
+    setting as "chunkSize".
+
+    Returns the tree dict, or None if no hashable files are found.
+    """
+    urls_and_paths = _local_files(crate_dir)
+    if not urls_and_paths:
         return None
 
+    recorded = {}
+    if previous is not None:
+        recorded = {
+            leaf["contentUrl"]: leaf for leaf in previous.get("leaves", [])
+            if all(key in leaf for key in LEAF_STAT_FIELDS)
+        }
+
+    now = time.time_ns()
+    leaves = []
+    to_hash = []
+    to_chunk = []
+    racy = []
+    for url, filepath in urls_and_paths:
+        stat = os.stat(filepath)
+        leaf = {"contentUrl": url}
+        chunked = chunk_size is not None and stat.st_size > chunk_size
+        old = recorded.get(url)
+        if (
+            old is not None
+            and (old["size"], old["mtimeNs"]) == (stat.st_size, stat.st_mtime_ns)
+            and (old.get("chunks") or {}).get("chunkSize") == (chunk_size if chunked else None)
+        ):
+            leaf["sha256"] = old["sha256"]
+            if chunked:
+                leaf["chunks"] = old["chunks"]
+        elif chunked:
+            to_chunk.append((leaf, filepath))
+        else:
+            to_hash.append((leaf, filepath))
+        # A stat inside the racy window is not recorded yet: a write in the
+        # same mtime tick as the one hashed would go unnoticed.
+        if now - stat.st_mtime_ns > RACY_WINDOW_NS:
+            leaf["size"] = stat.st_size
+            leaf["mtimeNs"] = stat.st_mtime_ns
+        else:
+            racy.append((leaf, filepath, stat))
+        leaves.append(leaf)
+
+    digests = hash_files(
+        [filepath for _, filepath in to_hash], ("sha256",), jobs=jobs, progress=progress
+    )
+    for (leaf, _), digest in zip(to_hash, digests):
+        leaf["sha256"] = digest["sha256"]
+    for leaf, filepath in to_chunk:
+        leaf["chunks"] = chunk_tree(filepath, chunk_size, jobs=jobs, progress=progress)
+        leaf["sha256"] = leaf["chunks"]["levels"][-1][0]
+    _record_settled_stats(racy, jobs)
+
     # Sort by contentUrl for deterministic ordering
     leaves.sort(key=lambda x: x["contentUrl"])
 
-    return build_merkle_tree(leaves)
+    if previous is not None:
+        tree = update_merkle_tree(previous, leaves)
+    else:
+        tree = build_merkle_tree(leaves)
+    if chunk_size is not None:
+        tree["chunkSize"] = chunk_size
+    return tree
+
+
+def _record_settled_stats(racy: List[Tuple[Dict, Path, os.stat_result]], jobs: Optional[int]) -> None:
+    """Record the stat of racy leaves whose mtime has left the racy window since.
+
+    The file is read again now that a later write would change its mtime,
+    and the stat is recorded only if that read still gives the leaf's value
+    and the stat did not move; otherwise the leaf stays without a stat and
+    is hashed by the next regeneration or check.
+    """
+    now = time.time_ns()
+    settled = [
+        (leaf, filepath, stat) for leaf, filepath, stat in racy
+        if now - stat.st_mtime_ns > RACY_WINDOW_NS
+    ]
+    plain = [(leaf, filepath) for leaf, filepath, _ in settled if "chunks" not in leaf]
+    digests = hash_files([filepath for _, filepath in plain], ("sha256",), jobs=jobs, use_cache=False)
+    values = {id(leaf): digest["sha256"] for (leaf, _), digest in zip(plain, digests)}
+    for leaf, filepath, stat in settled:
+        value = values.get(id(leaf)) or _leaf_value(filepath, leaf, jobs)
+        current = os.stat(filepath)
+        if value == leaf["sha256"] and (current.st_size, current.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            leaf["size"] = stat.st_size
+            leaf["mtimeNs"] = stat.st_mtime_ns
+
+
+# LeafCheck statuses
+LEAF_OK = "ok"
+LEAF_CHANGED = "changed"
+LEAF_MISSING = "missing"
+LEAF_ADDED = "added"
+
+
+class LeafCheck(NamedTuple):
+    """How one file was checked by `check_merkle_tree`.
+
+    method is "stat" (recorded size/mtime compared) or "sha256" (file read
+    and hashed).
+    """
+    content_url: str
+    status: str
+    method: str
+
+
+class MerkleCheck(NamedTuple):
+    """Result of `check_merkle_tree`; tree_consistent says the stored leaves lead to the stored root."""
+    files: List[LeafCheck]
+    tree_consistent: bool
+
+    @property
+    def ok(self) -> bool:
+        return self.tree_consistent and all(check.status == LEAF_OK for check in self.files)
+
+
+def _leaf_value(filepath: Path, leaf: Dict, jobs: Optional[int]) -> str:
+    if "chunks" in leaf:
+        return chunk_tree(filepath, leaf["chunks"]["chunkSize"], jobs=jobs)["levels"][-1][0]
+    return hash_file(filepath, ("sha256",))["sha256"]
+
+
+def check_merkle_tree(
+    crate_dir: Path,
+    tree: dict,
+    sample_percent: Optional[float] = None,
+    jobs: Optional[int] = None,
+    rng: Optional[random.Random] = None
+) -> MerkleCheck:
+    """Check a crate's files against its stored tree without regenerating it.
+
+    Every file referenced by the metadata is stat'ed and compared with the
+    size and mtime recorded on its leaf; files added to or missing from the
+    crate are reported as such. A leaf without a recorded stat (trees built
+    before stats were recorded, files written just before the build) is
+    read and hashed (not through the checksum cache, on `jobs` threads).
+    With `sample_percent`, so are a random `sample_percent`% of the leaves
+    plus every leaf whose stat changed. In both cases the stored leaves must
+    lead to the stored root.
+    """
+    current: Dict[str, Path] = {}
+    for url, filepath in _local_files(crate_dir):
+        current.setdefault(url, filepath)
+    leaves = tree.get("leaves") or []
+    stored = {leaf["contentUrl"]: leaf for leaf in leaves}
+
+    checks: Dict[str, LeafCheck] = {}
+    unrecorded = []
+    stat_changed = []
+    stat_ok = []
+    for url, leaf in stored.items():
+        filepath = current.get(url)
+        if filepath is None:
+            checks[url] = LeafCheck(url, LEAF_MISSING, "stat")
+            continue
+        if not all(key in leaf for key in LEAF_STAT_FIELDS):
+            unrecorded.append(url)
+            continue
+        stat = os.stat(filepath)
+        if (leaf["size"], leaf["mtimeNs"]) == (stat.st_size, stat.st_mtime_ns):
+            stat_ok.append(url)
+            checks[url] = LeafCheck(url, LEAF_OK, "stat")
+        else:
+            stat_changed.append(url)
+            checks[url] = LeafCheck(url, LEAF_CHANGED, "stat")
+    for url in current:
+        if url not in stored:
+            checks[url] = LeafCheck(url, LEAF_ADDED, "stat")
+
+    to_hash = list(unrecorded)
+    if sample_percent is not None:
+        rng = rng or random.Random()
+        count = min(len(stat_ok), math.ceil(len(stored) * sample_percent / 100))
+        to_hash += stat_changed + rng.sample(stat_ok, count)
+    plain = [url for url in to_hash if "chunks" not in stored[url]]
+    digests = hash_files([current[url] for url in plain], ("sha256",), jobs=jobs, use_cache=False)
+    values = {url: digest["sha256"] for url, digest in zip(plain, digests)}
+    for url in to_hash:
+        if url not in values:
+            values[url] = _leaf_value(current[url], stored[url], jobs)
+        status = LEAF_OK if values[url] == stored[url]["sha256"] else LEAF_CHANGED
+        checks[url] = LeafCheck(url, status, "sha256")
+
+    hashes = [leaf["sha256"] for leaf in leaves]
+    root = merkle_levels(hashes)[-1][0] if hashes else hashlib.sha256(b"").hexdigest()
+    return MerkleCheck(sorted(checks.values()), root == tree.get("rootHash"))
 
 
 def generate_release_merkle_tree(release_dir: Path) -> Optional[dict]:
@@ -0,0 +1,225 @@
+"""Compact binary storage for Merkle trees.
+
+A JSON tree (`fairscape_cli.utils.merkle`) spells every digest of every level
+as a 64-character hex string, which for crates with millions of files makes
+ro-crate-merkle-tree.json hundreds of MB. In the binary format the file keeps
+only a small JSON header and the levels and leaves move to a sidecar next to
+it:
+
+    ro-crate-merkle-tree.json
+        {"algorithm": "SHA-256", "rootHash": "...", "leafCount": 3,
+         "format": "binary",
+         "binary": {"file": "ro-crate-merkle-tree.bin", "size": 245, "sha256": "..."}}
+        (plus "chunkSize" if the tree was built with one)
+
+    ro-crate-merkle-tree.bin (integers little-endian)
+        b"FSMERKLE", u32 version
+        levels: u32 level count L, u64 offsets[L + 1] (in digests), raw
+                32-byte digests of every level, leaves first
+        leaves, column by column: u64 count N, u64 name offsets[N + 1] and the
+            UTF-8 contentUrls, u8 flags[N], u64 sizes[N], i64 mtimeNs[N]
+            (flags & 1: the leaf has a recorded stat, else both are 0)
+        chunk trees, for each leaf with flags & 2 in order: u64 chunkSize,
+            u64 file size, the chunk tree's levels
+
+A leaf's sha256 is its entry in the first level. The columns decode with a
+few bulk conversions instead of one unpack per field. Readers that only need the
+root (the release tree, the build graph) still find it in the JSON header,
+and the header's sha256 of the sidecar ties the two files together.
+"""
+import hashlib
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fairscape_cli.utils.serialization import open_atomic, write_json_atomic
+
+BINARY_FORMAT = "binary"
+BINARY_MAGIC = b"FSMERKLE"
+BINARY_VERSION = 1
+DIGEST_SIZE = 32
+
+_FLAG_STAT = 1
+_FLAG_CHUNKS = 2
+
+
+def binary_path_for(tree_path: Path) -> Path:
+    """The sidecar holding the levels of the binary tree whose header is `tree_path`."""
+    return Path(tree_path).with_suffix(".bin")
+
+
+def is_binary_header(data: Any) -> bool:
+    return isinstance(data, dict) and data.get("format") == BINARY_FORMAT
+
+
+def _encode_array(typecode: str, values: Sequence[int]) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _encode_levels(levels: List[List[str]]) -> bytes:
+    offsets = [0, *accumulate(len(level) for level in levels)]
+    return b"".join((
+        struct.pack("<I", len(levels)),
+        _encode_array("Q", offsets),
+        bytes.fromhex("".join(digest for level in levels for digest in level)),
+    ))
+
+
+def encode_merkle_tree(tree: dict) -> bytes:
+    """The binary sidecar contents for a Merkle tree dict."""
+    leaves = tree.get("leaves", [])
+    names = [leaf["contentUrl"].encode("utf-8") for leaf in leaves]
+    flags = [
+        (_FLAG_STAT if "size" in leaf and "mtimeNs" in leaf else 0) | (_FLAG_CHUNKS if leaf.get("chunks") else 0)
+        for leaf in leaves
+    ]
+    parts = [
+        BINARY_MAGIC,
+        struct.pack("<I", BINARY_VERSION),
+        _encode_levels(tree["levels"]),
+        struct.pack("<Q", len(leaves)),
+        _encode_array("Q", [0, *accumulate(len(name) for name in names)]),
+        b"".join(names),
+        bytes(flags),
+        _encode_array("Q", [leaf["size"] if flag & _FLAG_STAT else 0 for leaf, flag in zip(leaves, flags)]),
+        _encode_array("q", [leaf["mtimeNs"] if flag & _FLAG_STAT else 0 for leaf, flag in zip(leaves, flags)]),
+    ]
+    for leaf, flag in zip(leaves, flags):
+        if flag & _FLAG_CHUNKS:
+            chunks = leaf["chunks"]
+            parts.append(struct.pack("<QQ", chunks["chunkSize"], chunks["size"]))
+            parts.append(_encode_levels(chunks["levels"]))
+    return b"".join(parts)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt: str) -> Tuple:
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def take(self, size: int) -> bytes:
+        if self.offset + size > len(self.data):
+            raise ValueError("Binary Merkle tree is truncated")
+        chunk = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return chunk
+
+    def column(self, typecode: str, count: int) -> List[int]:
+        column = array(typecode)
+        column.frombytes(self.take(count * column.itemsize))
+        if sys.byteorder != "little":
+            column.byteswap()
+        return column.tolist()
+
+    def levels(self) -> List[List[str]]:
+        (count,) = self.unpack("<I")
+        offsets = self.column("Q", count + 1)
+        if offsets[0] != 0 or any(b < a for a, b in zip(offsets, offsets[1:])):
+            raise ValueError("Binary Merkle tree has invalid level offsets")
+        digests = self.take(offsets[-1] * DIGEST_SIZE)
+        # hex() with a separator every DIGEST_SIZE bytes splits the digests in C
+        return [
+            digests[start * DIGEST_SIZE:end * DIGEST_SIZE].hex(" ", DIGEST_SIZE).split()
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+
+def decode_merkle_tree(data: bytes, header: Dict[str, Any]) -> dict:
+    """Rebuild the Merkle tree dict from a sidecar's contents and its JSON header."""
+    reader = _Reader(data)
+    try:
+        if reader.take(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError("Not a binary Merkle tree")
+        (version,) = reader.unpack("<I")
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported binary Merkle tree version {version}")
+        levels = reader.levels()
+        (leaf_count,) = reader.unpack("<Q")
+        name_offsets = reader.column("Q", leaf_count + 1)
+        blob = reader.take(name_offsets[-1])
+        text = blob.decode("utf-8")
+        if len(text) == len(blob):
+            names = [text[start:end] for start, end in zip(name_offsets, name_offsets[1:])]
+        else:
+            names = [blob[start:end].decode("utf-8") for start, end in zip(name_offsets, name_offsets[1:])]
+        flags = reader.take(leaf_count)
+        sizes = reader.column("Q", leaf_count)
+        mtimes = reader.column("q", leaf_count)
+
+        if leaf_count > len(levels[0]):
+            raise ValueError("Binary Merkle tree has more leaves than leaf digests")
+        leaves = [
+            {"index": index, "contentUrl": name, "sha256": digest, "size": size, "mtimeNs": mtime}
+            if flag & _FLAG_STAT else
+            {"index": index, "contentUrl": name, "sha256": digest}
+            for index, (name, digest, flag, size, mtime) in enumerate(zip(names, levels[0], flags, sizes, mtimes))
+        ]
+        for leaf, flag in zip(leaves, flags):
+            if flag & _FLAG_CHUNKS:
+                chunk_size, size = reader.unpack("<QQ")
+                leaf["chunks"] = {"chunkSize": chunk_size, "size": size, "levels": reader.levels()}
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise ValueError("Binary Merkle tree is truncated or malformed")
+    if reader.offset != len(data):
+        raise ValueError("Binary Merkle tree has trailing data")
+
+    tree = {
+        "algorithm": header.get("algorithm", "SHA-256"),
+        "rootHash": header["rootHash"],
+        "leafCount": header.get("leafCount", leaf_count),
+        "leaves": leaves,
+        "levels": levels,
+    }
+    if "chunkSize" in header:
+        tree["chunkSize"] = header["chunkSize"]
+    return tree
+
+
+def write_binary_merkle_tree(tree_path: Path, tree: dict) -> None:
+    """Write `tree` as a binary sidecar plus its JSON header at `tree_path`."""
+    binary_path = binary_path_for(tree_path)
+    data = encode_merkle_tree(tree)
+    with open_atomic(binary_path) as f:
+        f.write(data)
+    header = {
+        "algorithm": tree.get("algorithm", "SHA-256"),
+        "rootHash": tree["rootHash"],
+        "leafCount": tree["leafCount"],
+        "format": BINARY_FORMAT,
+        "binary": {
+            "file": binary_path.name,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        },
+    }
+    if "chunkSize" in tree:
+        header["chunkSize"] = tree["chunkSize"]
+    write_json_atomic(tree_path, header)
+
+
+def read_binary_merkle_tree(tree_path: Path, header: Dict[str, Any]) -> dict:
+    """Load the tree whose JSON header (already parsed) is at `tree_path`.
+
+    Raises ValueError if the sidecar does not match the header or is malformed.
+    """
+    binary = header.get("binary") or {}
+    binary_path = Path(tree_path).with_name(binary.get("file") or binary_path_for(tree_path).name)
+    with open(binary_path, "rb") as f:
+        data = f.read()
+    if len(data) != binary.get("size") or hashlib.sha256(data).hexdigest() != binary.get("sha256"):
+        raise ValueError(f"{binary_path.name} does not match the Merkle tree header in {Path(tree_path).name}")
+    tree = decode_merkle_tree(data, header)
+    if tree["levels"][-1] != [tree["rootHash"]]:
+        raise ValueError(f"{binary_path.name} does not lead to the rootHash in its header")
+    return tree
@@ -1,3 +1,25 @@
+"""JSON serialization layer shared by every metadata writer.
+
+All RO-Crate metadata, sidecars and build artifacts are encoded through
+`encode_json` / `write_json_atomic` so output format and speed are decided in
+one place:
+
+* Backend: orjson when it is installed (`pip install fairscape-cli[fast]`,
+  several times faster to encode), otherwise the stdlib `json` module.
+  `FAIRSCAPE_JSON_BACKEND=json` forces the stdlib. The stdlib backend writes
+  exactly what `json.dump(..., indent=2, ensure_ascii=...)` always has
+  (`ensure_ascii=True` unless a writer asks otherwise). orjson keeps the
+  same layout but differs in a few spellings: non-ASCII text is always
+  written as UTF-8, never as `\\uXXXX` escapes, float exponents drop the
+  `+` and leading zero (`1e-7`, `1e16` rather than `1e-07`, `1e+16`), and
+  NaN/Infinity become `null`. Both are the same JSON
+  to any reader, but the bytes (and so file digests) depend on the backend.
+* None-pruning: `prune=True` drops None values while encoding. Subtrees
+  without a None are handed to the encoder as-is instead of being copied,
+  so an already-clean graph is encoded without a second in-memory copy.
+* Compact mode: `fairscape --compact ...`, `FAIRSCAPE_JSON_COMPACT=1` or
+  `set_compact_output(True)` writes JSON without indentation or spaces.
+"""
 from __future__ import annotations
 
 import contextlib
@@ -5,10 +27,24 @@ import json
 import os
 import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterator, Optional
 
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+JSON_BACKEND_ENV_VAR = "FAIRSCAPE_JSON_BACKEND"
+JSON_COMPACT_ENV_VAR = "FAIRSCAPE_JSON_COMPACT"
+
+# Process-wide compact override set by `fairscape --compact`; None defers to the env var.
+_compact_output: Optional[bool] = None
+
+_DROP = object()
+
 
 def prune_none(value: Any) -> Any:
     """Recursively remove None values while preserving defaults and empty containers."""
@@ -36,19 +72,153 @@ def model_dump_pruned(model: BaseModel, **kwargs: Any) -> dict[str, Any]:
     return prune_none(model.model_dump(**kwargs))
 
 
-def write_json_atomic(path: Path | str, data: Any, indent: int = 2) -> None:
-    """Write JSON to ``path`` atomically.
+def _prune_shared(value: Any) -> Any:
+    """Like `prune_none`, but returns `value` itself when nothing is pruned.
 
-    Writes to a temp file in the same directory and renames it into place, so a
-    failure mid-write never leaves a truncated/corrupt file behind.
+    Only containers that actually hold a None (directly or below) are
+    rebuilt; the result shares everything else with the input and must be
+    treated as read-only. Used for encoding, where no caller sees it.
+    """
+    if isinstance(value, BaseModel):
+        return prune_none(value)
+
+    if isinstance(value, dict):
+        pruned = None
+        for index, (key, item) in enumerate(value.items()):
+            new_item = _DROP if item is None else _prune_shared(item)
+            if pruned is None:
+                if new_item is item:
+                    continue
+                pruned = dict(list(value.items())[:index])
+            if new_item is not _DROP:
+                pruned[key] = new_item
+        return value if pruned is None else pruned
+
+    if isinstance(value, (list, tuple)):
+        pruned = None
+        for index, item in enumerate(value):
+            new_item = _DROP if item is None else _prune_shared(item)
+            if pruned is None:
+                if new_item is item:
+                    continue
+                pruned = list(value[:index])
+            if new_item is not _DROP:
+                pruned.append(new_item)
+        return value if pruned is None else pruned
+
+    return value
+
+
+def json_backend() -> str:
+    """Name of the encoder in use: 'orjson' or 'json'."""
+    requested = os.environ.get(JSON_BACKEND_ENV_VAR, "auto").strip().lower()
+    if requested in ("json", "stdlib") or orjson is None:
+        return "json"
+    return "orjson"
+
+
+def set_compact_output(compact: Optional[bool]) -> None:
+    """Force compact (True) or indented (False) output; None restores the env default."""
+    global _compact_output
+    _compact_output = compact
+
+
+def compact_output() -> bool:
+    if _compact_output is not None:
+        return _compact_output
+    return os.environ.get(JSON_COMPACT_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def encode_json(
+    data: Any,
+    indent: Optional[int] = 2,
+    prune: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    sort_keys: bool = False,
+    ensure_ascii: bool = True,
+) -> bytes:
+    """Encode `data` to UTF-8 JSON bytes.
+
+    `indent=None` always produces compact output; an indented request is
+    made compact when compact mode is on. `ensure_ascii` is passed to the
+    stdlib encoder; orjson always writes UTF-8. Values orjson cannot encode
+    (e.g. integers beyond 64 bits) fall back to the stdlib encoder.
+    """
+    if prune:
+        data = _prune_shared(data)
+    if indent is not None and compact_output():
+        indent = None
+
+    if json_backend() == "orjson" and indent in (None, 2):
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(data, default=default, option=option)
+        except orjson.JSONEncodeError:
+            # A value orjson rejected keeps orjson's UTF-8 output.
+            ensure_ascii = False
+
+    separators = (",", ":") if indent is None else (",", ": ")
+    return json.dumps(
+        data,
+        indent=indent,
+        separators=separators,
+        ensure_ascii=ensure_ascii,
+        default=default,
+        sort_keys=sort_keys,
+    ).encode("utf-8")
+
+
+def dumps_json(data: Any, indent: Optional[int] = 2, **kwargs: Any) -> str:
+    """`encode_json` as a str, e.g. for JSONL records (pass `indent=None`)."""
+    return encode_json(data, indent=indent, **kwargs).decode("utf-8")
+
+
+def _new_file_mode(path: Path) -> int:
+    """Keep an existing file's permissions; otherwise honour the umask."""
+    with contextlib.suppress(OSError):
+        return path.stat().st_mode & 0o7777
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+@contextlib.contextmanager
+def open_atomic(path: Path | str) -> Iterator[BinaryIO]:
+    """Yield a binary handle whose contents replace ``path`` on success.
+
+    Writes go to a temp file in the same directory that is renamed into
+    place, so a failure mid-write never leaves a truncated/corrupt file.
     """
     path = Path(path)
     fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=indent)
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.chmod(tmp_path, _new_file_mode(path))
         os.replace(tmp_path, path)
     except BaseException:
         with contextlib.suppress(OSError):
             os.unlink(tmp_path)
         raise
+
+
+def write_json_atomic(
+    path: Path | str,
+    data: Any,
+    indent: Optional[int] = 2,
+    prune: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    ensure_ascii: bool = True,
+) -> None:
+    """Write JSON to ``path`` atomically through `encode_json`."""
+    payload = encode_json(data, indent=indent, prune=prune, default=default, ensure_ascii=ensure_ascii)
+    with open_atomic(path) as f:
+        f.write(payload)
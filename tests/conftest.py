@@ -4,4 +4,74 @@ from click.testing import CliRunner
 @pytest.fixture(scope="session")
 def runner():
     """Provides a click.testing.CliRunner instance to invoke CLI commands."""
-    return CliRunner()
\ No newline at end of file
+    return CliRunner()
+
+@pytest.fixture(autouse=True)
+def isolated_hash_cache(tmp_path_factory, monkeypatch):
+    """Keep the checksum cache out of the user's home directory during tests."""
+    from fairscape_cli.utils import hash_cache
+
+    cache_file = tmp_path_factory.mktemp("hash-cache") / "hash-cache.sqlite3"
+    monkeypatch.setenv(hash_cache.HASH_CACHE_PATH_ENV_VAR, str(cache_file))
+    yield
+    hash_cache.set_hash_cache_enabled(None)
+
+@pytest.fixture(autouse=True)
+def isolated_ontology_cache(tmp_path_factory, monkeypatch):
+    """Keep compiled ontology tables out of the user's home directory during tests."""
+    from fairscape_cli.entailments import inverse
+
+    monkeypatch.setenv(inverse.ONTOLOGY_CACHE_DIR_ENV_VAR, str(tmp_path_factory.mktemp("ontology-cache")))
+    monkeypatch.setattr(inverse, "_inverse_tables", {})
+
+def _make_dataset(name, guid, **fields):
+    from fairscape_cli.models.dataset import GenerateDataset
+
+    return GenerateDataset(**{
+        "guid": guid,
+        "name": name,
+        "author": "Tester",
+        "version": "1.0",
+        "description": f"Test dataset named {name}",
+        "keywords": ["test"],
+        "format": "csv",
+        "datePublished": "2024-01-01",
+        **fields,
+    })
+
+@pytest.fixture
+def make_dataset():
+    """Factory for a minimal valid Dataset: make_dataset(name, guid, **fields)."""
+    return _make_dataset
+
+@pytest.fixture
+def make_crate(tmp_path):
+    """Factory for an RO-Crate: make_crate(path="crate", guid=..., datasets=()).
+
+    A relative `path` is created under tmp_path; `datasets` are entity
+    models appended to the new crate.
+    """
+    from fairscape_cli.models.rocrate import AppendCrate, GenerateROCrate
+
+    def make(path="crate", guid="ark:59852/rocrate-test", datasets=()):
+        path = tmp_path / path
+        GenerateROCrate(
+            path=path,
+            guid=guid,
+            name=path.name,
+            description="Crate used by the test suite",
+            keywords=["test"],
+            author="Tester",
+            version="1.0",
+        )
+        datasets = list(datasets)
+        if datasets:
+            AppendCrate(path, datasets)
+        return path
+
+    return make
+
+@pytest.fixture
+def crate_dir(make_crate):
+    """An empty RO-Crate at tmp_path / "crate"."""
+    return make_crate()
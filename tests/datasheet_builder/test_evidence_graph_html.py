@@ -5,6 +5,7 @@ import pytest
 
 from fairscape_cli.datasheet_builder.evidence_graph.html_builder import (
     generate_evidence_graph_html,
+    shared_asset_names,
 )
 
 
@@ -95,3 +96,35 @@ class TestEvidenceGraphHtml:
         expected = graph_json_file.with_suffix(".html")
         assert result == str(expected)
         assert expected.exists()
+
+
+class TestSharedAssets:
+    def test_pages_load_shared_scripts(self, graph_json_file, tmp_path):
+        release = tmp_path / "release"
+        outputs = [release / name / "ro-crate-prov-graph.html" for name in ("a", "b")]
+        for output in outputs:
+            assert generate_evidence_graph_html(str(graph_json_file), str(output), shared_assets_dir=release)
+
+        names = shared_asset_names()
+        assets = sorted(path.name for path in release.glob("evidence-graph-*.js"))
+        assert assets == sorted(names.values())
+        assert "@license React" in (release / names["vendor"]).read_text()
+
+        html = outputs[0].read_text()
+        assert f'<script src="../{names["vendor"]}"></script>' in html
+        assert f'<script src="../{names["app"]}"></script>' in html
+        assert "@license React" not in html
+        assert "ark:59852/dataset-test" in html
+        assert html.count("</script>") == 3
+
+    def test_existing_assets_are_not_rewritten(self, graph_json_file, tmp_path):
+        generate_evidence_graph_html(str(graph_json_file), str(tmp_path / "one.html"), shared_assets_dir=tmp_path)
+        vendor = tmp_path / shared_asset_names()["vendor"]
+        stamp = vendor.stat().st_mtime_ns
+        generate_evidence_graph_html(str(graph_json_file), str(tmp_path / "two.html"), shared_assets_dir=tmp_path)
+        assert vendor.stat().st_mtime_ns == stamp
+
+    def test_inline_output_is_stable(self, graph_json_file, tmp_path):
+        first = generate_evidence_graph_html(str(graph_json_file), str(tmp_path / "first.html"))
+        second = generate_evidence_graph_html(str(graph_json_file), str(tmp_path / "second.html"))
+        assert pathlib.Path(first).read_text() == pathlib.Path(second).read_text()
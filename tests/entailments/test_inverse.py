@@ -0,0 +1,226 @@
+"""Tests for the compiled owl:inverseOf table used by link-inverses."""
+
+import copy
+import json
+import pathlib
+import random
+import shutil
+
+import pytest
+from rdflib import URIRef
+
+from fairscape_cli.entailments import inverse
+from fairscape_cli.entailments.inverse import (
+    EVI_NAMESPACE,
+    add_or_update_json_link,
+    augment_rocrate_with_inverses,
+    compiled_inverse_pairs,
+    get_json_key_from_uri,
+    link_inverses_in_graph,
+    load_inverse_pairs,
+    ontology_cache_dir,
+)
+from fairscape_cli.utils.serialization import prune_none
+
+EVI_ONTOLOGY = pathlib.Path(inverse.__file__).parent / "evi.xml"
+
+
+@pytest.fixture
+def ontology(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "evi.xml"
+    shutil.copyfile(EVI_ONTOLOGY, path)
+    return path
+
+
+def _count_parses(monkeypatch) -> list:
+    parsed = []
+    monkeypatch.setattr(inverse, "load_inverse_pairs",
+                        lambda path: parsed.append(path) or load_inverse_pairs(path))
+    return parsed
+
+
+class TestCompiledInversePairs:
+    def test_matches_parsed_ontology(self, ontology):
+        assert list(compiled_inverse_pairs(ontology)) == load_inverse_pairs(ontology)
+
+    def test_compiled_once_per_content(self, ontology, tmp_path, monkeypatch):
+        parsed = _count_parses(monkeypatch)
+        table = compiled_inverse_pairs(ontology)
+        assert compiled_inverse_pairs(ontology) is table
+
+        # A fresh process finds the table on disk, also for a copy of the same ontology.
+        monkeypatch.setattr(inverse, "_inverse_tables", {})
+        copy = tmp_path / "copy.xml"
+        shutil.copyfile(ontology, copy)
+        assert compiled_inverse_pairs(copy) == table
+        assert parsed == [ontology]
+        assert len(list(ontology_cache_dir().glob("inverse-pairs-*.json"))) == 1
+
+    def test_edited_ontology_is_recompiled(self, ontology, monkeypatch):
+        parsed = _count_parses(monkeypatch)
+        table = compiled_inverse_pairs(ontology)
+        text = ontology.read_text()
+        ontology.write_text(text.replace("<owl:inverseOf", "<owl:equivalentProperty", 1))
+        assert len(compiled_inverse_pairs(ontology)) == len(table) - 1
+        assert len(parsed) == 2
+
+    def test_corrupt_cache_entry_is_replaced(self, ontology, monkeypatch):
+        table = compiled_inverse_pairs(ontology)
+        (cache_file,) = ontology_cache_dir().glob("inverse-pairs-*.json")
+        cache_file.write_text("{")
+        monkeypatch.setattr(inverse, "_inverse_tables", {})
+        assert compiled_inverse_pairs(ontology) == table
+        assert json.loads(cache_file.read_text())["inversePairs"]
+
+    def test_unwritable_cache_still_returns_table(self, ontology, tmp_path, monkeypatch):
+        blocker = tmp_path / "not-a-directory"
+        blocker.write_text("")
+        monkeypatch.setenv(inverse.ONTOLOGY_CACHE_DIR_ENV_VAR, str(blocker / "cache"))
+        assert list(compiled_inverse_pairs(ontology)) == load_inverse_pairs(ontology)
+
+
+def test_augment_parses_ontology_once_for_many_crates(ontology, tmp_path, monkeypatch):
+    parsed = _count_parses(monkeypatch)
+    for index in range(3):
+        crate = tmp_path / f"crate{index}"
+        crate.mkdir()
+        graph = [
+            {"@id": "ro-crate-metadata.json", "@type": "CreativeWork", "about": {"@id": f"ark:59852/crate{index}"}},
+            {"@id": f"ark:59852/crate{index}", "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"], "name": "c"},
+        ]
+        (crate / "ro-crate-metadata.json").write_text(json.dumps({"@context": {}, "@graph": graph}))
+        assert augment_rocrate_with_inverses(crate, ontology)
+    assert len(parsed) == 1
+
+
+def _computation_crate(crate: pathlib.Path) -> None:
+    # A Computation without dateCreated, which the schema requires.
+    graph = [
+        {"@id": "ro-crate-metadata.json", "@type": "CreativeWork", "about": {"@id": "ark:59852/crate"}},
+        {"@id": "ark:59852/crate", "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"], "name": "c"},
+        {"@id": "ark:59852/run", "@type": "https://w3id.org/EVI#Computation", "name": "run",
+         "generated": [{"@id": "ark:59852/out"}]},
+        {"@id": "ark:59852/out", "@type": "https://w3id.org/EVI#Dataset", "name": "out"},
+    ]
+    (crate / "ro-crate-metadata.json").write_text(json.dumps({"@context": {}, "@graph": graph}))
+
+
+def test_standalone_augment_does_not_validate(ontology, tmp_path):
+    _computation_crate(tmp_path)
+    assert augment_rocrate_with_inverses(tmp_path, ontology)
+    by_id = {entity["@id"]: entity for entity in json.loads((tmp_path / "ro-crate-metadata.json").read_text())["@graph"]}
+    assert by_id["ark:59852/out"]["generatedBy"] == [{"@id": "ark:59852/run"}]
+
+
+def test_augment_in_open_session_is_validated_on_flush(ontology, tmp_path):
+    from fairscape_cli.models.crate_document import CrateDocument
+
+    _computation_crate(tmp_path)
+    with pytest.raises(ValueError):
+        with CrateDocument(tmp_path):
+            assert augment_rocrate_with_inverses(tmp_path, ontology)
+
+
+def test_augment_writes_baseline_bytes(ontology, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAIRSCAPE_JSON_BACKEND", "json")
+    graph = [
+        {"@id": "ro-crate-metadata.json", "@type": "CreativeWork", "about": {"@id": "ark:59852/crate"}},
+        {"@id": "ark:59852/crate", "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"], "name": "Café crate",
+         "hasPart": [{"@id": "ark:59852/run"}, {"@id": "ark:59852/input"}, {"@id": "ark:59852/output"}]},
+        {"@id": "ark:59852/run", "@type": "CreativeWork", "name": "Run by José",
+         "usedDataset": [{"@id": "ark:59852/input"}], "generated": {"@id": "ark:59852/output"}},
+        {"@id": "ark:59852/input", "@type": "CreativeWork", "name": "naïve ☃ input",
+         "threshold": 1e-07, "scale": 1e16, "ratio": 0.1, "note": None},
+        {"@id": "ark:59852/output", "@type": "CreativeWork", "name": "Ñandú output", "weights": [0.5, None, 2.5e-05]},
+    ]
+    metadata = {"@context": {"@vocab": "https://schema.org/"}, "@graph": graph}
+    (tmp_path / "ro-crate-metadata.json").write_text(json.dumps(metadata, indent=2))
+
+    expected = copy.deepcopy(metadata)
+    assert _scan_link_inverses(expected["@graph"], load_inverse_pairs(ontology))[0] == 2
+    assert augment_rocrate_with_inverses(tmp_path, ontology)
+    # What link-inverses wrote before the shared serializer.
+    baseline = json.dumps(prune_none(expected), indent=2, ensure_ascii=False).encode("utf-8")
+    assert (tmp_path / "ro-crate-metadata.json").read_bytes() == baseline
+
+
+def _scan_link_inverses(graph, inverse_pairs):
+    """The pair x entity x value scan link_inverses_in_graph must stay identical to."""
+    entity_map = {entity["@id"]: entity for entity in graph if isinstance(entity, dict) and "@id" in entity}
+    modified_count = 0
+    modified_ids = set()
+
+    def link(source_id, values, inverse_key):
+        nonlocal modified_count
+        if not isinstance(values, list):
+            values = [values]
+        for val_obj in values:
+            if isinstance(val_obj, dict) and "@id" in val_obj and val_obj["@id"] in entity_map:
+                target = entity_map[val_obj["@id"]]
+                before = json.dumps(target.get(inverse_key), sort_keys=True)
+                add_or_update_json_link(target, inverse_key, source_id)
+                if json.dumps(target.get(inverse_key), sort_keys=True) != before:
+                    modified_count += 1
+                    modified_ids.add(val_obj["@id"])
+
+    for prop1, prop2 in inverse_pairs:
+        key1, key2 = get_json_key_from_uri(prop1), get_json_key_from_uri(prop2)
+        for source in list(entity_map.values()):
+            if not source.get("@id"):
+                continue
+            if key1 in source:
+                link(source["@id"], source[key1], key2)
+            if key2 in source:
+                link(source["@id"], source[key2], key1)
+    return modified_count, modified_ids
+
+
+def _random_graph(rng, keys, size=40):
+    ids = [f"ark:59852/e{index}" for index in range(size)] + [""]
+
+    def value():
+        shape = rng.randrange(7)
+        if shape == 0:
+            return {"@id": rng.choice(ids + ["ark:59852/missing"])}
+        if shape == 1:
+            return "plain string"
+        if shape == 2:
+            return None
+        if shape == 3:
+            return [{"@id": rng.choice(ids)}, "text", {"name": "no id"}]
+        return [{"@id": rng.choice(ids)} for _ in range(rng.randrange(4))]
+
+    graph = []
+    for entity_id in ids + [ids[3]]:
+        entity = {"@id": entity_id}
+        for key in rng.sample(keys, rng.randrange(len(keys))):
+            entity[key] = value()
+        graph.append(entity)
+    return graph
+
+
+class TestLinkInversesInGraph:
+    def test_matches_entity_scan(self):
+        pairs = [(URIRef(EVI_NAMESPACE + a), URIRef(EVI_NAMESPACE + b)) for a, b in [
+            ("generated", "generatedBy"), ("used", "usedBy"), ("usedBy", "derivedTo"), ("sameAs", "sameAs"),
+        ]]
+        keys = ["generated", "generatedBy", "used", "usedBy", "derivedTo", "sameAs", "name"]
+        rng = random.Random(20241017)
+        for _ in range(200):
+            graph = _random_graph(rng, keys)
+            expected_graph = copy.deepcopy(graph)
+            expected = _scan_link_inverses(expected_graph, pairs)
+            assert link_inverses_in_graph(graph, pairs) == expected
+            assert json.dumps(graph) == json.dumps(expected_graph)
+
+    def test_second_run_changes_nothing(self):
+        pairs = load_inverse_pairs(EVI_ONTOLOGY)
+        graph = [
+            {"@id": "ark:59852/c", "usedDataset": [{"@id": "ark:59852/d"}], "generated": {"@id": "ark:59852/o"}},
+            {"@id": "ark:59852/d"},
+            {"@id": "ark:59852/o", "generatedBy": "ark:59852/c"},
+        ]
+        assert link_inverses_in_graph(graph, pairs) == (2, {"ark:59852/d", "ark:59852/o"})
+        assert graph[2]["generatedBy"] == [{"@id": "ark:59852/c"}]
+        assert graph[1]["datasetUsedBy"] == [{"@id": "ark:59852/c"}]
+        assert link_inverses_in_graph(graph, pairs) == (0, set())
@@ -0,0 +1,160 @@
+"""Tests for the release-wide entity index behind build release's evidence graphs."""
+
+import copy
+import json
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+
+from fairscape_graph_tools.evidence_graph_builder import EvidenceGraphBuilder
+
+from fairscape_cli.interpret import release_index as release_index_module
+from fairscape_cli.interpret.local_graph import LocalGraphSource
+from fairscape_cli.interpret.local_sink import LocalResultSink
+from fairscape_cli.interpret.release_index import ReleaseGraphIndex
+from fairscape_cli.models.computation import GenerateComputation
+from fairscape_cli.models.crate_document import CrateDocument
+from fairscape_cli.models.rocrate import AppendCrate
+
+
+def _add_stats(path: pathlib.Path, stats_for):
+    metadata_file = path / "ro-crate-metadata.json"
+    metadata = json.loads(metadata_file.read_text())
+    for entity in metadata["@graph"]:
+        if entity["@id"] in stats_for:
+            entity["descriptiveStatistics"] = {"rows": len(path.name)}
+    metadata_file.write_text(json.dumps(metadata, indent=2))
+
+
+def _datasets(make_dataset, path: pathlib.Path, guids):
+    return [make_dataset(f"{path.name} {guid}", guid) for guid in guids]
+
+
+@pytest.fixture
+def crates(tmp_path: pathlib.Path, make_crate, make_dataset):
+    release = tmp_path / "release"
+    paths = [release / name for name in ("alpha", "beta", "gamma")]
+    make_crate(paths[0], "ark:59852/alpha",
+               _datasets(make_dataset, paths[0], ["ark:59852/shared-data", "ark:59852/alpha-data"]))
+    _add_stats(paths[0], {"ark:59852/alpha-data"})
+    make_crate(paths[1], "ark:59852/beta",
+               _datasets(make_dataset, paths[1], ["ark:59852/shared-data", "ark:59852/beta-data"]))
+    _add_stats(paths[1], {"ark:59852/shared-data"})
+    make_crate(paths[2], "ark:59852/gamma", _datasets(make_dataset, paths[2], ["ark:59852/gamma-data"]))
+    return paths
+
+
+def _snapshot(source: LocalGraphSource):
+    return (
+        list(source._index.items()),
+        list(source._crate_dir.items()),
+        list(source._dataset_stats.items()),
+        source.primary_root_id,
+        source.primary_root_name,
+        source.find_entity("ark:59852/betadata"),
+        source.find_many(["ark:59852/shared-data", "ark:59852/gamma-data", "ark:59852/missing"]),
+        source.find_dataset_stats(["ark:59852/shared-data", "ark:59852/alpha-data"]),
+        source.build_full_graph(source.primary_root_id),
+        source.crate_dir_for("ark:59852/shared-data"),
+    )
+
+
+class TestReleaseGraphIndex:
+    def test_sources_match_reference_paths(self, crates):
+        index = ReleaseGraphIndex(crates)
+        for crate in crates:
+            others = [other for other in crates if other != crate]
+            expected = LocalGraphSource(crate / "ro-crate-metadata.json", others)
+            indexed = LocalGraphSource(crate / "ro-crate-metadata.json", release_index=index)
+            assert _snapshot(indexed) == _snapshot(expected)
+
+    def test_each_crate_is_read_once(self, crates):
+        index = ReleaseGraphIndex(crates)
+        for crate in crates:
+            LocalGraphSource(crate, release_index=index)
+        assert index.loads == len(crates)
+
+    def test_rewritten_crate_is_read_again(self, crates, make_dataset):
+        index = ReleaseGraphIndex(crates)
+        LocalGraphSource(crates[0], release_index=index)
+        AppendCrate(crates[2], [make_dataset("late", "ark:59852/late-data")])
+
+        source = LocalGraphSource(crates[0], release_index=index)
+        assert index.loads == len(crates) + 1
+        assert source.find_entity("ark:59852/late-data")["name"] == "late"
+        assert source.crate_dir_for("ark:59852/late-data") == crates[2]
+
+    def test_primary_is_read_from_open_session(self, crates, make_dataset):
+        index = ReleaseGraphIndex(crates)
+        with CrateDocument.open(crates[1], journal=False) as crate:
+            crate.append([make_dataset("pending", "ark:59852/pending-data")])
+            source = LocalGraphSource(crates[1], release_index=index)
+            assert source.find_entity("ark:59852/pending-data")["name"] == "pending"
+            # The primary's own copy in the index does not shadow its session.
+            assert source.find_dataset_stats(["ark:59852/shared-data"]) == {
+                "ark:59852/shared-data": {"descriptiveStatistics": {"rows": 4}, "splitStatistics": {}}
+            }
+
+    def test_shared_index_per_process(self, crates, monkeypatch):
+        monkeypatch.setattr(release_index_module, "_shared", None)
+        index = ReleaseGraphIndex.shared(crates)
+        assert ReleaseGraphIndex.shared(list(crates)) is index
+        assert ReleaseGraphIndex.shared(crates[:2]) is not index
+
+    def test_reference_paths_and_index_are_exclusive(self, crates):
+        with pytest.raises(ValueError):
+            LocalGraphSource(crates[0], crates[1:], release_index=ReleaseGraphIndex(crates))
+
+    def test_flexible_lookup_copies_only_the_match(self, crates, monkeypatch):
+        source = LocalGraphSource(crates[0], release_index=ReleaseGraphIndex(crates))
+        copied = []
+        monkeypatch.setattr(release_index_module, "copy", SimpleNamespace(
+            deepcopy=lambda node: copied.append(node["@id"]) or copy.deepcopy(node)
+        ))
+
+        assert source.find_entity("ark:59852/nothing-like-it") is None
+        assert copied == []
+        assert source.find_entity("ark:59852/gammadata")["@id"] == "ark:59852/gamma-data"
+        assert copied == ["ark:59852/gamma-data"]
+
+    def test_evidence_graphs_leave_index_nodes_intact(self, tmp_path, make_crate, make_dataset):
+        # A computation in one crate consumes more same-signature datasets
+        # than the condensation threshold; condensing it for the first
+        # sub-crate's graph must not change what the next sub-crate sees.
+        release = tmp_path / "release"
+        inputs, alpha, beta = (release / name for name in ("inputs", "alpha", "beta"))
+        input_ids = [f"ark:59852/input-{i}" for i in range(6)]
+        computation_id = "ark:59852/shared-computation"
+        make_crate(inputs, "ark:59852/inputs", _datasets(make_dataset, inputs, input_ids))
+        AppendCrate(inputs, [GenerateComputation(
+            guid=computation_id,
+            name="shared computation",
+            runBy="Tester",
+            dateCreated="2024-01-01",
+            description="Computation consuming every input dataset",
+            keywords=["test"],
+            usedDataset=input_ids,
+        )])
+        for crate in (alpha, beta):
+            make_crate(crate, f"ark:59852/{crate.name}")
+            output = make_dataset(f"{crate.name} output", f"ark:59852/{crate.name}-output")
+            output.generatedBy = [{"@id": computation_id}]
+            AppendCrate(crate, [output])
+
+        index = ReleaseGraphIndex([inputs, alpha, beta])
+        graphs = {}
+        for crate in (alpha, beta):
+            output_json = crate / "ro-crate-prov-graph.json"
+            source = LocalGraphSource(crate, release_index=index)
+            EvidenceGraphBuilder(source, LocalResultSink(output_path=output_json)).build(
+                f"ark:59852/{crate.name}-output", owner_email="tester@example.org"
+            )
+            graphs[crate.name] = json.loads(output_json.read_text())
+
+        cached = index.holder(computation_id).nodes[computation_id]
+        assert [ref["@id"] for ref in cached["usedDataset"]] == input_ids
+        assert index.loads == 3
+        assert json.dumps(graphs["alpha"]).count("DatasetGroup") > 0
+        assert (json.dumps(graphs["beta"]).replace("beta", "alpha")
+                == json.dumps(graphs["alpha"]))
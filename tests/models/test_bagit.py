@@ -0,0 +1,112 @@
+"""Tests for building BagIt bags from an RO-Crate."""
+
+import hashlib
+import json
+import os
+import pathlib
+
+import pytest
+
+from fairscape_cli.models import bagit
+from fairscape_cli.models.bagit import BagIt
+from fairscape_cli.models.crate_document import JOURNAL_FILENAME
+from fairscape_cli.utils.crate_lock import crate_lock, lock_path_for
+from fairscape_cli.utils.hashing import hash_files
+
+ALGORITHMS = ("md5", "sha256", "sha512")
+
+
+@pytest.fixture
+def bag(tmp_path: pathlib.Path) -> BagIt:
+    crate = tmp_path / "crate"
+    (crate / "nested").mkdir(parents=True)
+    (crate / "ro-crate-metadata.json").write_text('{"@graph": []}')
+    (crate / "data.csv").write_bytes(b"a,b\n1,2\n")
+    (crate / "nested" / "blob.bin").write_bytes(bytes(range(256)) * 1000)
+    return BagIt(
+        rocrate_path=crate, bagit_path=tmp_path / "bag",
+        source_organization="o", organization_address="a", contact_name="n",
+        contact_phone="p", contact_email="e", external_description="d",
+        bagging_date="2024-01-01", bag_size=None, payload_Oxum=None,
+    )
+
+
+def _manifest(path: pathlib.Path) -> dict:
+    entries = {}
+    for line in path.read_text().splitlines():
+        digest, name = line.split(" ", 1)
+        entries[name] = digest
+    return entries
+
+
+def _expected(bag_dir: pathlib.Path, names, algorithm: str) -> dict:
+    return {name: hashlib.new(algorithm, (bag_dir / name).read_bytes()).hexdigest() for name in names}
+
+
+def test_manifests_match_hashlib(bag):
+    bag.create_bag(jobs=2)
+    bag_dir = bag.bagit_path
+    payload = ["data/data.csv", "data/nested/blob.bin", "data/ro-crate-metadata.json"]
+    tags = ["bag-info.txt", "bagit.txt"] + [f"manifest-{algorithm}.txt" for algorithm in ALGORITHMS]
+    for algorithm in ALGORITHMS:
+        assert _manifest(bag_dir / f"manifest-{algorithm}.txt") == _expected(bag_dir, payload, algorithm)
+        assert _manifest(bag_dir / f"tagmanifest-{algorithm}.txt") == _expected(bag_dir, tags, algorithm)
+
+
+def test_each_file_is_hashed_once_for_all_algorithms(bag, monkeypatch):
+    calls = []
+
+    def recording_hash_files(filepaths, algorithms, **kwargs):
+        filepaths = list(filepaths)
+        calls.append((len(filepaths), tuple(algorithms)))
+        return hash_files(filepaths, algorithms, **kwargs)
+
+    monkeypatch.setattr(bagit, "hash_files", recording_hash_files)
+    bag.create_bag()
+    # One payload pass and one tag pass, each computing every algorithm.
+    assert calls == [(3, ALGORITHMS), (5, ALGORITHMS)]
+
+
+def test_single_algorithm_manifest_matches_bag(bag):
+    bag.create_bag()
+    expected = (bag.bagit_path / "manifest-sha256.txt").read_text()
+    (bag.bagit_path / "manifest-sha256.txt").unlink()
+    bag.create_payload_manifest_sha256()
+    assert (bag.bagit_path / "manifest-sha256.txt").read_text() == expected
+
+
+def test_lock_sidecar_is_not_payload(bag):
+    with crate_lock(bag.rocrate_path):
+        pass
+    assert lock_path_for(bag.rocrate_path).exists()
+    bag.create_bag()
+    assert not (bag.bagit_path / "data" / lock_path_for(bag.rocrate_path).name).exists()
+    assert "metadata.lock" not in (bag.bagit_path / "manifest-sha256.txt").read_text()
+
+
+def test_pending_journal_is_compacted_into_payload(bag):
+    journal = bag.rocrate_path / JOURNAL_FILENAME
+    journal.write_text(json.dumps({"op": "append", "entity": {"@id": "ark:59852/tracked", "name": "tracked"}}) + "\n")
+    bag.create_bag()
+    payload = bag.bagit_path / "data"
+    graph = json.loads((payload / "ro-crate-metadata.json").read_text())["@graph"]
+    assert [entity["@id"] for entity in graph] == ["ark:59852/tracked"]
+    assert not (payload / JOURNAL_FILENAME).exists() and not journal.exists()
+    assert "journal" not in (bag.bagit_path / "manifest-sha256.txt").read_text()
+
+
+def test_payload_manifest_hashes_the_bag_copy(bag, monkeypatch):
+    # A payload copy that differs from the crate file (size and mtime
+    # preserved) must be described as it is in the bag.
+    original_copytree = bagit.shutil.copytree
+
+    def corrupting_copytree(*args, **kwargs):
+        result = original_copytree(*args, **kwargs)
+        (bag.bagit_path / "data" / "data.csv").write_bytes(b"x,y\n9,9\n")
+        source_stat = (bag.rocrate_path / "data.csv").stat()
+        os.utime(bag.bagit_path / "data" / "data.csv", ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        return result
+
+    monkeypatch.setattr(bagit.shutil, "copytree", corrupting_copytree)
+    bag.create_bag()
+    assert _manifest(bag.bagit_path / "manifest-sha256.txt")["data/data.csv"] == hashlib.sha256(b"x,y\n9,9\n").hexdigest()
@@ -0,0 +1,272 @@
+"""Tests for the load-once/write-once CrateDocument session."""
+
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from fairscape_cli.models.crate_document import (
+    CrateDocument,
+    JOURNAL_FILENAME,
+    active_crate_document,
+    compact_crate_journal,
+)
+from fairscape_cli.models.rocrate import (
+    AppendCrate,
+    UpdateCrate,
+    ReadROCrateMetadata,
+)
+
+
+class _NoScanList(list):
+    def __iter__(self):
+        raise AssertionError("@graph was scanned")
+
+
+def _read(crate_dir: pathlib.Path) -> dict:
+    with open(crate_dir / "ro-crate-metadata.json") as f:
+        return json.load(f)
+
+
+class TestCrateDocument:
+    def test_append_outside_session_writes_immediately(self, crate_dir, make_dataset):
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        metadata = _read(crate_dir)
+        ids = [e["@id"] for e in metadata["@graph"]]
+        assert "ark:59852/dataset-a" in ids
+        root = metadata["@graph"][1]
+        assert {"@id": "ark:59852/dataset-a"} in root["hasPart"]
+
+    def test_session_defers_write_until_exit(self, crate_dir, make_dataset):
+        before = (crate_dir / "ro-crate-metadata.json").read_text()
+        with CrateDocument(crate_dir) as crate:
+            for i in range(5):
+                AppendCrate(crate_dir, [make_dataset(f"d{i}", f"ark:59852/dataset-{i}")])
+            assert (crate_dir / "ro-crate-metadata.json").read_text() == before
+            assert "ark:59852/dataset-3" in crate
+            assert crate.get("ark:59852/dataset-3")["name"] == "d3"
+        metadata = _read(crate_dir)
+        assert len(metadata["@graph"]) == 7
+        assert len(metadata["@graph"][1]["hasPart"]) == 5
+
+    def test_read_inside_session_sees_pending_entities(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir):
+            AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+            metadata = ReadROCrateMetadata(crate_dir)
+            guids = [getattr(e, "guid", None) for e in metadata["@graph"]]
+            assert "ark:59852/dataset-a" in guids
+
+    def test_has_part_is_not_duplicated(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir) as crate:
+            crate.append([make_dataset("a", "ark:59852/dataset-a")])
+            crate.append([make_dataset("again", "ark:59852/dataset-a")])
+            assert crate.has_part_ids == {"ark:59852/dataset-a"}
+            assert crate.root["hasPart"] == [{"@id": "ark:59852/dataset-a"}]
+            crate.replace_graph(crate.graph[:-1])
+
+    def test_update_replaces_entity(self, crate_dir, make_dataset):
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        UpdateCrate(crate_dir, make_dataset("renamed", "ark:59852/dataset-a"))
+        entity = next(e for e in _read(crate_dir)["@graph"] if e["@id"] == "ark:59852/dataset-a")
+        assert entity["name"] == "renamed"
+
+    def test_updates_keep_graph_positions(self, crate_dir, monkeypatch, make_dataset):
+        with CrateDocument(crate_dir) as crate:
+            crate.append([make_dataset(f"d{i}", f"ark:59852/dataset-{i}") for i in range(4)])
+            order = [e["@id"] for e in crate.graph]
+            # Updates go through the position map, not a scan of the graph.
+            monkeypatch.setattr(crate, "metadata", {**crate.metadata, "@graph": _NoScanList(crate.graph)})
+            for i in (2, 0, 3):
+                assert crate.update(make_dataset(f"renamed-{i}", f"ark:59852/dataset-{i}"))
+            monkeypatch.setattr(crate, "metadata", {**crate.metadata, "@graph": crate.graph[:]})
+            assert [e["@id"] for e in crate.graph] == order
+        graph = _read(crate_dir)["@graph"]
+        assert [e["@id"] for e in graph] == order
+        assert graph[order.index("ark:59852/dataset-2")]["name"] == "renamed-2"
+
+    def test_update_after_external_graph_edit(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir) as crate:
+            crate.append([make_dataset("a", "ark:59852/dataset-a"), make_dataset("b", "ark:59852/dataset-b")])
+            # An in-place edit of the list shifts the stored positions.
+            crate.graph.insert(0, crate.graph.pop(crate.graph.index(crate.get("ark:59852/dataset-b"))))
+            crate.mark_dirty("ark:59852/dataset-b")
+            assert crate.update(make_dataset("renamed", "ark:59852/dataset-b"))
+            assert crate.graph[0]["name"] == "renamed"
+            assert sum(e["@id"] == "ark:59852/dataset-b" for e in crate.graph) == 1
+
+    def test_nested_open_reuses_active_document(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir) as outer:
+            assert active_crate_document(crate_dir) is outer
+            with CrateDocument.open(crate_dir) as inner:
+                assert inner is outer
+                inner.append([make_dataset("a", "ark:59852/dataset-a")])
+            # Inner exit must not flush the shared document.
+            assert outer.dirty
+        assert active_crate_document(crate_dir) is None
+        assert not outer.dirty
+
+    def test_exception_discards_pending_changes(self, crate_dir, make_dataset):
+        before = (crate_dir / "ro-crate-metadata.json").read_text()
+        with pytest.raises(RuntimeError):
+            with CrateDocument(crate_dir):
+                AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+                raise RuntimeError("boom")
+        assert (crate_dir / "ro-crate-metadata.json").read_text() == before
+
+
+def _inject_invalid_entity(crate_dir: pathlib.Path) -> None:
+    """Write a Dataset missing required fields straight into the file."""
+    metadata = _read(crate_dir)
+    metadata["@graph"].append({"@id": "ark:59852/dataset-broken", "@type": "Dataset", "name": "broken"})
+    with open(crate_dir / "ro-crate-metadata.json", "w") as f:
+        json.dump(metadata, f)
+
+
+class TestIncrementalValidation:
+    def test_untouched_entities_are_not_revalidated(self, crate_dir, make_dataset):
+        _inject_invalid_entity(crate_dir)
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        ids = [e["@id"] for e in _read(crate_dir)["@graph"]]
+        assert "ark:59852/dataset-a" in ids
+
+    def test_full_mode_validates_whole_graph(self, crate_dir, make_dataset):
+        _inject_invalid_entity(crate_dir)
+        with pytest.raises(Exception):
+            with CrateDocument(crate_dir, validation="full") as crate:
+                crate.append([make_dataset("a", "ark:59852/dataset-a")])
+
+    def test_explicit_full_flush(self, crate_dir, make_dataset):
+        _inject_invalid_entity(crate_dir)
+        crate = CrateDocument(crate_dir)
+        crate.load()
+        crate.append([make_dataset("a", "ark:59852/dataset-a")])
+        with pytest.raises(Exception):
+            crate.flush(full=True)
+
+    def test_invalid_appended_entity_is_rejected(self, crate_dir):
+        with pytest.raises(Exception):
+            with CrateDocument(crate_dir) as crate:
+                crate.append([{"@id": "ark:59852/dataset-x", "@type": "Dataset", "name": "x"}])
+
+    def test_duplicate_id_is_rejected(self, crate_dir, make_dataset):
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        with pytest.raises(ValueError, match="Duplicate @id"):
+            AppendCrate(crate_dir, [make_dataset("again", "ark:59852/dataset-a")])
+
+    def test_in_place_edit_is_validated(self, crate_dir, make_dataset):
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        with pytest.raises(Exception):
+            with CrateDocument(crate_dir) as crate:
+                del crate.get("ark:59852/dataset-a")["author"]
+                crate.mark_dirty("ark:59852/dataset-a")
+
+
+class TestSharedModel:
+    def test_validated_graph_is_cached_until_a_change(self, crate_dir, make_dataset):
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        with CrateDocument(crate_dir) as crate:
+            graph = crate.validated_graph()
+            assert crate.validated_graph() is graph
+            assert all(a is b for a, b in zip(ReadROCrateMetadata(crate_dir)["@graph"], graph))
+            model = crate.model()
+            assert crate.model() is model
+
+            crate.get("ark:59852/dataset-a")["name"] = "renamed"
+            crate.mark_dirty("ark:59852/dataset-a")
+            assert crate.validated_graph() is not graph
+            renamed = next(e for e in crate.model().metadataGraph if e.guid == "ark:59852/dataset-a")
+            assert renamed.name == "renamed"
+
+    def test_model_matches_full_validation(self, crate_dir, make_dataset):
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        with CrateDocument(crate_dir) as crate:
+            assert crate.model().model_dump() == crate.validate().model_dump()
+
+    def test_flush_skips_entities_the_model_validated(self, crate_dir, monkeypatch, make_dataset):
+        import fairscape_cli.models.crate_document as crate_document
+        validated = []
+        original = crate_document.validate_entities
+        monkeypatch.setattr(crate_document, "validate_entities",
+                            lambda entities: original(validated.extend(e["@id"] for e in entities) or []))
+
+        with CrateDocument(crate_dir) as crate:
+            crate.append([make_dataset("a", "ark:59852/dataset-a"), make_dataset("b", "ark:59852/dataset-b")])
+            crate.validated_graph()
+            crate.get("ark:59852/dataset-b")["name"] = "edited"
+            crate.mark_dirty("ark:59852/dataset-b")
+        assert validated == ["ark:59852/dataset-b"]
+
+
+class TestCrateJournal:
+    def test_journal_append_leaves_metadata_file_untouched(self, crate_dir, make_dataset):
+        before = (crate_dir / "ro-crate-metadata.json").read_text()
+        with CrateDocument(crate_dir, journal=True):
+            AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+
+        assert (crate_dir / "ro-crate-metadata.json").read_text() == before
+        records = (crate_dir / JOURNAL_FILENAME).read_text().splitlines()
+        assert [json.loads(r)["op"] for r in records] == ["append"]
+
+        metadata = ReadROCrateMetadata(crate_dir)
+        assert "ark:59852/dataset-a" in [e.guid for e in metadata["@graph"]]
+
+    def test_existing_journal_keeps_crate_in_journal_mode(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir, journal=True):
+            AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        AppendCrate(crate_dir, [make_dataset("b", "ark:59852/dataset-b")])
+
+        assert len((crate_dir / JOURNAL_FILENAME).read_text().splitlines()) == 2
+        assert "ark:59852/dataset-b" not in json.dumps(_read(crate_dir))
+
+    def test_env_var_enables_journal(self, crate_dir, monkeypatch, make_dataset):
+        monkeypatch.setenv("FAIRSCAPE_CRATE_JOURNAL", "1")
+        AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        assert (crate_dir / JOURNAL_FILENAME).exists()
+
+    def test_compact_matches_direct_write(self, crate_dir, tmp_path, make_dataset):
+        direct = tmp_path / "direct"
+        shutil.copytree(crate_dir, direct)
+
+        for path, journal in ((crate_dir, True), (direct, False)):
+            with CrateDocument(path, journal=journal):
+                AppendCrate(path, [make_dataset("a", "ark:59852/dataset-a")])
+                UpdateCrate(path, make_dataset("a2", "ark:59852/dataset-a"))
+                AppendCrate(path, [make_dataset("b", "ark:59852/dataset-b")])
+
+        assert compact_crate_journal(crate_dir) == 2
+        assert not (crate_dir / JOURNAL_FILENAME).exists()
+        assert _read(crate_dir) == _read(direct)
+        assert compact_crate_journal(crate_dir) == 0
+
+    def test_replay_is_idempotent(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir, journal=True):
+            AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        journal = (crate_dir / JOURNAL_FILENAME).read_text()
+        compact_crate_journal(crate_dir)
+        # Simulate a compaction interrupted before the journal was removed.
+        (crate_dir / JOURNAL_FILENAME).write_text(journal)
+        compact_crate_journal(crate_dir)
+
+        metadata = _read(crate_dir)
+        ids = [e["@id"] for e in metadata["@graph"]]
+        assert ids.count("ark:59852/dataset-a") == 1
+        assert metadata["@graph"][1]["hasPart"].count({"@id": "ark:59852/dataset-a"}) == 1
+
+    def test_truncated_last_record_is_ignored(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir, journal=True):
+            AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        with open(crate_dir / JOURNAL_FILENAME, "a") as f:
+            f.write('{"op": "append", "entity": {"@id": "ark:59852/da')
+
+        metadata = ReadROCrateMetadata(crate_dir)
+        assert "ark:59852/dataset-a" in [e.guid for e in metadata["@graph"]]
+
+    def test_bulk_rewrite_folds_journal(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir, journal=True):
+            AppendCrate(crate_dir, [make_dataset("a", "ark:59852/dataset-a")])
+        with CrateDocument(crate_dir) as crate:
+            crate.replace_graph(list(crate.graph))
+
+        assert not (crate_dir / JOURNAL_FILENAME).exists()
+        assert "ark:59852/dataset-a" in [e["@id"] for e in _read(crate_dir)["@graph"]]
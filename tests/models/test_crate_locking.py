@@ -0,0 +1,150 @@
+"""Tests for concurrent writers: advisory locking and optimistic rebasing."""
+
+import json
+import multiprocessing
+import pathlib
+import threading
+
+import pytest
+
+from fairscape_cli.models import crate_document
+from fairscape_cli.models.crate_document import CrateConflictError, CrateDocument
+from fairscape_cli.models.rocrate import AppendCrate
+from fairscape_cli.utils.crate_lock import LOCKING_ENV_VAR, crate_lock, lock_path_for
+
+fcntl = pytest.importorskip("fcntl")
+
+
+def _ids(crate_dir: pathlib.Path) -> set:
+    with open(crate_dir / "ro-crate-metadata.json") as f:
+        metadata = json.load(f)
+    root = metadata["@graph"][1]
+    graph_ids = {entity["@id"] for entity in metadata["@graph"]}
+    has_part = {part["@id"] for part in root.get("hasPart", [])}
+    return graph_ids & has_part
+
+
+def _worker(crate_dir, make_dataset, locking, worker, count):
+    import os
+    os.environ[LOCKING_ENV_VAR] = locking
+    for i in range(count):
+        AppendCrate(crate_dir, [make_dataset(f"w{worker}-{i}", f"ark:59852/w{worker}-{i}")])
+
+
+def _append_elsewhere(crate_dir, dataset):
+    """Append from another process, as a concurrent `rocrate register` would."""
+    process = multiprocessing.get_context("fork").Process(
+        target=AppendCrate, args=(crate_dir, [dataset])
+    )
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+
+
+class TestCrateLock:
+    def test_reentrant_within_process(self, crate_dir):
+        with crate_lock(crate_dir):
+            with crate_lock(crate_dir / "ro-crate-metadata.json"):
+                pass
+        assert lock_path_for(crate_dir).exists()
+
+    def test_excludes_other_processes(self, crate_dir):
+        with crate_lock(crate_dir):
+            with open(lock_path_for(crate_dir), "r") as handle:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with open(lock_path_for(crate_dir), "r") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def test_session_holds_lock_by_default(self, crate_dir):
+        acquired = threading.Event()
+
+        def other_writer():
+            with open(lock_path_for(crate_dir), "r") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                acquired.set()
+
+        with CrateDocument(crate_dir):
+            thread = threading.Thread(target=other_writer)
+            thread.start()
+            assert not acquired.wait(0.2)
+        thread.join(5)
+        assert acquired.is_set()
+
+
+class TestOptimisticSession:
+    def test_concurrent_append_is_rebased(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir, locking="optimistic") as crate:
+            crate.append([make_dataset("mine", "ark:59852/mine")])
+            # Another writer lands while this session is open.
+            _append_elsewhere(crate_dir, make_dataset("theirs", "ark:59852/theirs"))
+        assert crate.rebased == 1
+        assert {"ark:59852/mine", "ark:59852/theirs"} <= _ids(crate_dir)
+
+    def test_root_update_keeps_concurrent_has_part(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir, locking="optimistic") as crate:
+            crate.root["keywords"] = ["changed"]
+            crate.mark_dirty(crate.root["@id"])
+            _append_elsewhere(crate_dir, make_dataset("theirs", "ark:59852/theirs"))
+        with open(crate_dir / "ro-crate-metadata.json") as f:
+            root = json.load(f)["@graph"][1]
+        assert root["keywords"] == ["changed"]
+        assert "ark:59852/theirs" in _ids(crate_dir)
+
+    def test_bulk_edit_conflict_raises(self, crate_dir, make_dataset):
+        with pytest.raises(CrateConflictError):
+            with CrateDocument(crate_dir, locking="optimistic") as crate:
+                crate.replace_graph(list(crate.graph))
+                _append_elsewhere(crate_dir, make_dataset("theirs", "ark:59852/theirs"))
+        assert "ark:59852/theirs" in _ids(crate_dir)
+
+    def test_unchanged_crate_is_not_rebased(self, crate_dir, make_dataset):
+        with CrateDocument(crate_dir, locking="optimistic") as crate:
+            crate.append([make_dataset("mine", "ark:59852/mine")])
+        assert crate.rebased == 0
+
+    def test_flush_fingerprints_written_bytes(self, crate_dir, monkeypatch, make_dataset):
+        hashed = []
+        original = crate_document.hash_file
+        monkeypatch.setattr(crate_document, "hash_file", lambda path: hashed.append(path) or original(path))
+        crate = CrateDocument(crate_dir, locking="optimistic")
+        crate.load()
+        crate.append([make_dataset("mine", "ark:59852/mine")])
+        crate.flush()
+        # Only the pre-write change check reads the (freshly created) file;
+        # the new fingerprint comes from the bytes just written.
+        assert len(hashed) == 1
+        # A later flush of the same document still sees a concurrent writer.
+        crate.append([make_dataset("again", "ark:59852/again")])
+        _append_elsewhere(crate_dir, make_dataset("theirs", "ark:59852/theirs"))
+        crate.flush()
+        assert crate.rebased == 1
+        assert {"ark:59852/mine", "ark:59852/again", "ark:59852/theirs"} <= _ids(crate_dir)
+
+
+def _no_rehash(*args, **kwargs):
+    raise AssertionError("metadata file was fingerprinted")
+
+
+def test_locked_flush_does_not_fingerprint(crate_dir, monkeypatch, make_dataset):
+    with CrateDocument(crate_dir) as crate:
+        crate.append([make_dataset("mine", "ark:59852/mine")])
+        monkeypatch.setattr(crate_document, "hash_file", _no_rehash)
+        monkeypatch.setattr(crate_document, "_file_fingerprint", _no_rehash)
+    assert "ark:59852/mine" in _ids(crate_dir)
+
+
+@pytest.mark.parametrize("locking", ["lock", "optimistic"])
+def test_parallel_processes_lose_nothing(crate_dir, locking, make_dataset):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_worker, args=(crate_dir, make_dataset, locking, worker, 5))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+    expected = {f"ark:59852/w{worker}-{i}" for worker in range(4) for i in range(5)}
+    assert expected <= _ids(crate_dir)
@@ -0,0 +1,258 @@
+"""Tests for the single-walk ReleaseScan over a release's sub-crates."""
+
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from fairscape_cli.models import release_scan
+from fairscape_cli.models.release_scan import (
+    METRICS_SIDECAR_FILENAME,
+    ReleaseScan,
+    _write_sidecar,
+    read_subcrate,
+)
+from fairscape_cli.utils.hash_cache import file_digest
+from fairscape_cli.models.rocrate import (
+    AggregatedMetrics,
+    GenerateROCrate,
+    LinkSubcrates,
+    ReadROCrateMetadata,
+    _accumulate_entity_metrics,
+    _crate_size_info,
+    collect_subcrate_metadata,
+)
+
+DATA_RELEASE = pathlib.Path(__file__).parents[1] / "data" / "cm4ai-release"
+
+
+def _write_crate(directory: pathlib.Path, root_id: str, entities=(), content_size=None,
+                 author="Tester", keywords=("test",)):
+    directory.mkdir(parents=True, exist_ok=True)
+    root = {
+        "@id": root_id,
+        "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"],
+        "name": root_id,
+        "description": "Sub-crate used to exercise ReleaseScan",
+        "keywords": list(keywords),
+        "author": author,
+        "version": "1.0",
+        "hasPart": [],
+    }
+    if content_size:
+        root["contentSize"] = content_size
+    graph = [
+        {"@id": "ro-crate-metadata.json", "@type": "CreativeWork", "about": {"@id": root_id}},
+        root,
+        *entities,
+    ]
+    (directory / "ro-crate-metadata.json").write_text(json.dumps({"@context": {}, "@graph": graph}))
+
+
+def _sized(entity_id: str, content_size: str) -> dict:
+    return {"@id": entity_id, "@type": "Dataset", "contentSize": content_size}
+
+
+@pytest.fixture
+def release_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    release = tmp_path / "release"
+    _write_crate(release / "a", "ark:59852/a",
+                 entities=[_sized("ark:59852/a-file", "2 KB"), _sized("ark:59852/a-nested", "7 KB")],
+                 author="Ann, Bob", keywords=("alpha",))
+    _write_crate(release / "a" / "data" / "nested", "ark:59852/a-nested",
+                 entities=[_sized("ark:59852/nested-file", "5 KB")], author=["Cy"])
+    _write_crate(release / "group" / "b", "ark:59852/b", content_size="1 MB", keywords=("beta", "alpha"))
+    (release / "empty").mkdir()
+    return release
+
+
+class TestReleaseScan:
+    def test_hierarchy(self, release_dir):
+        scan = ReleaseScan(release_dir)
+        assert sorted(p.relative_to(release_dir).as_posix() for p in scan.subcrate_paths) == [
+            "a", "a/data/nested", "group/b"
+        ]
+        by_name = {info.path.name: info for info in scan}
+        assert sorted(info.path.name for info in scan.top_level) == ["a", "b"]
+        assert by_name["nested"].parent is by_name["a"]
+        assert by_name["a"].children == [by_name["nested"]]
+
+    def test_sizes_match_recursive_roll_up(self, release_dir):
+        scan = ReleaseScan(release_dir, collect_metrics=False).parse()
+        for info in scan:
+            assert (info.root_id, info.size_bytes) == _crate_size_info(info.metadata_file)
+        # a: own file (2 KB) + nested crate (5 KB, its root entry in a is not double counted); b: declared.
+        assert scan.total_content_size_bytes() == 2000 + 5000 + 1000000
+
+    def test_authors_and_keywords(self, release_dir):
+        assert collect_subcrate_metadata(release_dir) == {
+            "authors": ["Ann", "Bob", "Cy", "Tester"],
+            "keywords": ["alpha", "beta", "test"],
+        }
+
+    def test_parse_is_lazy_and_refreshable(self, release_dir):
+        scan = ReleaseScan(release_dir, collect_metrics=False)
+        _write_crate(release_dir / "group" / "b", "ark:59852/b", content_size="3 MB")
+        assert scan.total_content_size_bytes() == 3007000
+
+        _write_crate(release_dir / "group" / "b", "ark:59852/b", content_size="4 MB")
+        assert scan.total_content_size_bytes() == 3007000
+        assert scan.refresh().total_content_size_bytes() == 4007000
+
+    def test_unreadable_subcrate_is_reported_and_skipped(self, release_dir, capsys):
+        (release_dir / "group" / "b" / "ro-crate-metadata.json").write_text("{not json")
+        scan = ReleaseScan(release_dir, collect_metrics=False).parse()
+        broken = next(info for info in scan if info.path.name == "b")
+        assert broken.error and broken.size_bytes == 0
+        assert "Error reading subcrate metadata" in capsys.readouterr().out
+        assert scan.total_content_size_bytes() == 7000
+
+    def test_parallel_parse_matches_serial(self, release_dir):
+        for index in range(6):
+            _write_crate(release_dir / "many" / f"c{index}", f"ark:59852/c{index}",
+                         entities=[_sized(f"ark:59852/c{index}-file", f"{index + 1} KB")])
+        (release_dir / "many" / "c3" / "ro-crate-metadata.json").write_text("[")
+
+        def snapshot(scan):
+            return [(info.path, info.root_id, info.root, info.size_bytes, info.error is None) for info in scan]
+
+        serial = ReleaseScan(release_dir, collect_metrics=False).parse()
+        parallel = ReleaseScan(release_dir, collect_metrics=False, jobs=3).parse()
+        assert snapshot(parallel) == snapshot(serial)
+        assert parallel.total_content_size_bytes() == serial.total_content_size_bytes()
+        assert parallel.subcrate_metadata() == serial.subcrate_metadata()
+
+    def test_link_subcrates_with_scan_matches_walk(self, release_dir, tmp_path):
+        copy = tmp_path / "copy"
+        shutil.copytree(release_dir, copy)
+        for directory in (release_dir, copy):
+            GenerateROCrate(
+                path=directory,
+                guid="ark:59852/release",
+                name="Release",
+                description="Release crate linking its sub-crates",
+                keywords=["release"],
+                author="Tester",
+                version="1.0",
+                license="https://creativecommons.org/licenses/by/4.0/",
+            )
+
+        walked = LinkSubcrates(release_dir)
+        scanned = LinkSubcrates(copy, scan=ReleaseScan(copy, collect_metrics=False))
+        assert sorted(walked) == sorted(scanned) == ["ark:59852/a", "ark:59852/b"]
+        for metadata_file in release_dir.rglob("ro-crate-metadata.json"):
+            assert metadata_file.read_bytes() == (copy / metadata_file.relative_to(release_dir)).read_bytes()
+
+
+def _baseline_metric_entities(release: pathlib.Path):
+    """The entity dicts roll-ups accumulated when they read validated crates."""
+    for directory in release.iterdir():
+        if not directory.is_dir():
+            continue
+        for metadata_file in directory.glob("**/ro-crate-metadata.json"):
+            for entity in ReadROCrateMetadata(metadata_file)["@graph"]:
+                if hasattr(entity, "model_dump"):
+                    entity = entity.model_dump(by_alias=True)
+                if entity.get("@id") != "ro-crate-metadata.json":
+                    yield entity
+
+
+def _canonical(entities):
+    return sorted(json.dumps(entity, sort_keys=True, default=str) for entity in entities)
+
+
+class TestMetricsParity:
+    def test_scan_accumulates_validated_entities(self, monkeypatch):
+        seen = []
+        monkeypatch.setattr(release_scan, "_accumulate_entity_metrics", lambda metrics, entity: seen.append(entity))
+        ReleaseScan(DATA_RELEASE, use_sidecars=False).aggregated_metrics()
+        expected = list(_baseline_metric_entities(DATA_RELEASE))
+        assert len(seen) == len(expected) > 0
+        # The raw @type forms differ (a bare string on disk, a list after validation).
+        assert any(isinstance(entity.get("@type"), list) for entity in seen)
+        assert _canonical(seen) == _canonical(expected)
+
+    def test_aggregated_metrics_match_validated_read(self):
+        pytest.importorskip("fairscape_models.conversion.mapping.aiready_extract")
+        expected = AggregatedMetrics()
+        for entity in _baseline_metric_entities(DATA_RELEASE):
+            _accumulate_entity_metrics(expected, entity)
+        metrics = ReleaseScan(DATA_RELEASE, use_sidecars=False).aggregated_metrics()
+        metrics.total_content_size_bytes = expected.total_content_size_bytes
+        assert metrics == expected
+
+
+def test_aggregated_metrics_merge():
+    first = AggregatedMetrics(dataset_count=2, formats={"csv"}, schemas=[{"@id": "s1"}])
+    second = AggregatedMetrics(dataset_count=1, software_count=3, formats={"tsv", "csv"},
+                               schemas=[{"@id": "s2"}], distribution_protocols={"https"})
+    merged = AggregatedMetrics().merge(first).merge(second)
+    assert merged.dataset_count == 3
+    assert merged.software_count == 3
+    assert merged.formats == {"csv", "tsv"}
+    assert merged.schemas == [{"@id": "s1"}, {"@id": "s2"}]
+    assert merged.distribution_protocols == {"https"}
+    assert first.formats == {"csv"}
+
+
+class TestMetricsSidecar:
+    @pytest.fixture
+    def crate_with_sidecar(self, tmp_path):
+        release = tmp_path / "release"
+        crate = release / "a"
+        _write_crate(crate, "ark:59852/a", entities=[_sized("ark:59852/a-file", "2 KB")])
+        metadata_file = crate / "ro-crate-metadata.json"
+        read = read_subcrate(metadata_file, set(), collect_metrics=False)._replace(
+            metrics=AggregatedMetrics(dataset_count=4, formats={"csv"})
+        )
+        _write_sidecar(crate / METRICS_SIDECAR_FILENAME, file_digest(metadata_file, "sha256"), set(), read)
+        return release
+
+    def test_current_sidecar_is_reused(self, crate_with_sidecar):
+        scan = ReleaseScan(crate_with_sidecar)
+        metrics = scan.aggregated_metrics()
+        assert scan.sidecar_hits == 1
+        assert metrics.dataset_count == 4
+        assert metrics.formats == {"csv"}
+        assert metrics.total_content_size_bytes == 2000
+
+    def test_stale_sidecar_is_ignored(self, crate_with_sidecar):
+        _write_crate(crate_with_sidecar / "a", "ark:59852/a", entities=[_sized("ark:59852/a-file", "3 KB")])
+        scan = ReleaseScan(crate_with_sidecar, collect_metrics=False).parse()
+        assert scan.sidecar_hits == 0
+        assert scan.total_content_size_bytes() == 3000
+
+    def test_nested_crates_are_part_of_the_key(self, crate_with_sidecar):
+        _write_crate(crate_with_sidecar / "a" / "nested", "ark:59852/a-nested")
+        scan = ReleaseScan(crate_with_sidecar, collect_metrics=False).parse()
+        assert scan.sidecar_hits == 0
+
+    def test_models_upgrade_invalidates_sidecar(self, crate_with_sidecar, monkeypatch):
+        monkeypatch.setattr(release_scan, "MODELS_VERSION", "0.0.0-other")
+        scan = ReleaseScan(crate_with_sidecar, collect_metrics=False).parse()
+        assert scan.sidecar_hits == 0
+
+    def test_read_only_scan_writes_no_sidecars(self, release_dir, monkeypatch):
+        monkeypatch.setattr(release_scan, "_accumulate_entity_metrics", lambda metrics, entity: None)
+        ReleaseScan(release_dir, write_sidecars=False).aggregated_metrics()
+        assert not list(release_dir.rglob(METRICS_SIDECAR_FILENAME))
+        ReleaseScan(release_dir).aggregated_metrics()
+        assert len(list(release_dir.rglob(METRICS_SIDECAR_FILENAME))) == 3
+        scan = ReleaseScan(release_dir, write_sidecars=False)
+        scan.aggregated_metrics()
+        assert scan.sidecar_hits == 3
+
+    def test_disabled(self, crate_with_sidecar):
+        scan = ReleaseScan(crate_with_sidecar, collect_metrics=False, use_sidecars=False).parse()
+        assert scan.sidecar_hits == 0
+
+    def test_metrics_round_trip(self):
+        metrics = AggregatedMetrics(dataset_count=1, formats={"b", "a"}, schemas=[{"@id": "s"}],
+                                    distribution_protocols={"ftp"})
+        data = json.loads(json.dumps(metrics.to_dict()))
+        assert data["formats"] == ["a", "b"]
+        assert AggregatedMetrics.from_dict(data) == metrics
+        del data["formats"]
+        with pytest.raises(KeyError):
+            AggregatedMetrics.from_dict(data)
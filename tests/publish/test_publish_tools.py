@@ -0,0 +1,52 @@
+"""Tests for preparing a crate for publication."""
+
+import json
+import pathlib
+import zipfile
+
+import pytest
+
+from fairscape_cli.models.crate_document import JOURNAL_FILENAME
+from fairscape_cli.publish.publish_tools import FairscapePublisher, _read_rocrate_root
+from fairscape_cli.utils.crate_lock import LOCK_FILENAME, crate_lock
+
+
+@pytest.fixture
+def crate(tmp_path: pathlib.Path) -> pathlib.Path:
+    crate = tmp_path / "crate"
+    (crate / "sub").mkdir(parents=True)
+    for path, root_id in ((crate, "ark:59852/crate"), (crate / "sub", "ark:59852/sub")):
+        graph = [
+            {"@id": "ro-crate-metadata.json", "@type": "CreativeWork", "about": {"@id": root_id}},
+            {"@id": root_id, "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"], "name": "before"},
+        ]
+        (path / "ro-crate-metadata.json").write_text(json.dumps({"@context": {}, "@graph": graph}))
+        record = {"op": "update", "entity": {**graph[1], "name": "tracked"}}
+        (path / JOURNAL_FILENAME).write_text(json.dumps(record) + "\n")
+    return crate
+
+
+def test_fairscape_zip_carries_compacted_metadata(crate, monkeypatch):
+    publisher = FairscapePublisher()
+    uploaded = {}
+
+    def capture(zip_path, token):
+        with zipfile.ZipFile(zip_path) as archive:
+            uploaded.update({name: archive.read(name) for name in archive.namelist()})
+
+    monkeypatch.setattr(publisher, "_get_auth_token", lambda username, password: "token")
+    monkeypatch.setattr(publisher, "_upload_zip", capture)
+    with crate_lock(crate):
+        pass
+    publisher.publish(crate, username="u", password="p")
+
+    assert sorted(uploaded) == ["ro-crate-metadata.json", "sub/ro-crate-metadata.json"]
+    for name in uploaded:
+        assert json.loads(uploaded[name])["@graph"][1]["name"] == "tracked"
+    assert not list(crate.rglob(JOURNAL_FILENAME)) and (crate / LOCK_FILENAME).exists()
+
+
+def test_root_is_read_after_compaction(crate):
+    assert _read_rocrate_root(crate / "ro-crate-metadata.json")["name"] == "tracked"
+    # Only the crate being published is compacted.
+    assert (crate / "sub" / JOURNAL_FILENAME).exists()
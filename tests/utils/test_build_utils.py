@@ -0,0 +1,283 @@
+"""Tests for sub-crate processing in build_utils."""
+
+import json
+import pathlib
+import shutil
+from collections import Counter
+
+import pytest
+
+from fairscape_cli.models import crate_document
+from fairscape_cli.utils import build_utils
+from fairscape_cli.utils.build_graph import BUILD_MANIFEST_FILENAME, BuildStep, CrateBuild
+from fairscape_cli.utils.build_utils import (
+    _process_listed_subcrate_buffered,
+    process_all_subcrates,
+)
+
+
+def _rewrite_metadata(crate: pathlib.Path, **root_fields) -> None:
+    metadata_file = crate / "ro-crate-metadata.json"
+    metadata = json.loads(metadata_file.read_text())
+    metadata["@graph"][1].update(root_fields)
+    metadata_file.write_text(json.dumps(metadata))
+
+
+@pytest.fixture
+def fake_steps(monkeypatch):
+    """Replace the build step actions with cheap ones that log their calls."""
+    calls = Counter()
+
+    def link_inverses(crate):
+        calls[(crate.name, "link_inverses")] += 1
+        _rewrite_metadata(crate, inverses=True)
+        return True
+
+    def add_io(crate):
+        calls[(crate.name, "add_io")] += 1
+        return True
+
+    def evidence_graph(crate, release_directory, reference_paths=None, force=False, **options):
+        calls[(crate.name, "evidence_graph")] += 1
+        return False
+
+    def croissant(crate):
+        calls[(crate.name, "croissant")] += 1
+        (crate / "ro-crate-croissant.json").write_text("{}")
+        return True
+
+    def preview(crate, published=False):
+        calls[(crate.name, "preview")] += 1
+        (crate / "ro-crate-preview.html").write_text(f"<p>{published}</p>")
+        return True
+
+    def merkle_tree(crate, regenerate=False, chunk_size=None):
+        calls[(crate.name, "merkle_tree")] += 1
+        data = (crate / "data.csv").read_text()
+        (crate / "ro-crate-merkle-tree.json").write_text(json.dumps({"rootHash": data}))
+        _rewrite_metadata(crate, **{"evi:merkleRootHash": data})
+        return True
+
+    monkeypatch.setattr(build_utils, "process_link_inverses", link_inverses)
+    monkeypatch.setattr(build_utils, "process_add_io", add_io)
+    monkeypatch.setattr(build_utils, "process_evidence_graph", evidence_graph)
+    monkeypatch.setattr(build_utils, "process_croissant", croissant)
+    monkeypatch.setattr(build_utils, "process_preview", preview)
+    monkeypatch.setattr(build_utils, "process_merkle_tree", merkle_tree)
+    return calls
+
+
+@pytest.fixture
+def release(tmp_path: pathlib.Path) -> pathlib.Path:
+    release = tmp_path / "release"
+    for index in range(4):
+        crate = release / f"sub{index}"
+        crate.mkdir(parents=True)
+        (crate / "data.csv").write_text(f"a,b\n{index},1\n")
+        graph = [
+            {"@id": "ro-crate-metadata.json", "@type": "CreativeWork", "about": {"@id": f"ark:59852/sub{index}"}},
+            {"@id": f"ark:59852/sub{index}", "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"], "name": f"sub{index}"},
+            {"@id": f"ark:59852/data{index}", "@type": "Dataset", "contentUrl": "data.csv"},
+        ]
+        (crate / "ro-crate-metadata.json").write_text(json.dumps({"@context": {}, "@graph": graph}))
+    return release
+
+
+def _ran(calls: Counter) -> set:
+    ran = set(calls)
+    calls.clear()
+    return ran
+
+
+class TestIncrementalBuild:
+    def test_second_build_skips_everything(self, release, fake_steps):
+        first = process_all_subcrates(release)
+        assert first['skipped'] == 0 and not first['errors']
+        assert len(_ran(fake_steps)) == 4 * 6
+        assert (release / "sub0" / BUILD_MANIFEST_FILENAME).exists()
+
+        second = process_all_subcrates(release)
+        assert second['skipped'] == 4
+        assert not fake_steps
+
+    def test_only_affected_steps_rerun(self, release, fake_steps):
+        process_all_subcrates(release)
+        _ran(fake_steps)
+
+        (release / "sub1" / "data.csv").write_text("changed\n")
+        process_all_subcrates(release)
+        assert _ran(fake_steps) == {("sub1", "merkle_tree")}
+
+        process_all_subcrates(release, published=True)
+        assert _ran(fake_steps) == {(f"sub{i}", "preview") for i in range(4)}
+
+        (release / "sub2" / "ro-crate-croissant.json").unlink()
+        process_all_subcrates(release, published=True)
+        assert _ran(fake_steps) == {("sub2", "croissant")}
+
+    def test_metadata_edit_rebuilds_crate_and_sibling_evidence_graphs(self, release, fake_steps):
+        process_all_subcrates(release)
+        _ran(fake_steps)
+
+        _rewrite_metadata(release / "sub3", description="edited")
+        process_all_subcrates(release)
+        ran = _ran(fake_steps)
+        assert {step for name, step in ran if name == "sub3"} == {
+            "link_inverses", "add_io", "evidence_graph", "croissant", "preview", "merkle_tree"
+        }
+        assert {step for name, step in ran if name != "sub3"} == {"evidence_graph"}
+
+        assert process_all_subcrates(release)['skipped'] == 4
+
+    def test_force_and_explain(self, release, fake_steps, capsys):
+        process_all_subcrates(release)
+        capsys.readouterr()
+
+        process_all_subcrates(release, explain=True)
+        out = capsys.readouterr().out
+        assert "Skipping subcrate: sub0 (up to date)" in out
+        assert "(skip: up to date)" in out
+
+        (release / "sub0" / "ro-crate-preview.html").write_text("tampered")
+        process_all_subcrates(release, explain=True)
+        assert "(run: output modified: ro-crate-preview.html)" in capsys.readouterr().out
+
+        _ran(fake_steps)
+        result = process_all_subcrates(release, force_reprocess=True, explain=True)
+        assert result['skipped'] == 0
+        assert len(_ran(fake_steps)) == 4 * 6
+        assert "(run: forced (--force-reprocess))" in capsys.readouterr().out
+
+    def test_failed_step_is_retried(self, release, fake_steps, monkeypatch):
+        monkeypatch.setattr(build_utils, "process_croissant", lambda crate: False)
+        result = process_all_subcrates(release)
+        assert len(result['errors']) == 4
+
+        retried = []
+        monkeypatch.setattr(build_utils, "process_croissant", lambda crate: retried.append(crate.name) or True)
+        assert not process_all_subcrates(release)['errors']
+        assert sorted(retried) == ["sub0", "sub1", "sub2", "sub3"]
+
+
+class TestCrateBuild:
+    def test_unchanged_metadata_contribution_does_not_cascade(self, release):
+        crate = release / "sub0"
+        writer = BuildStep("writer", writes_metadata=True, metadata_inputs=("shape",))
+        reader = BuildStep("reader")
+
+        build = CrateBuild(crate)
+        for step, inputs in ((writer, {"shape": 1, "other": "a"}), (reader, {})):
+            build.record(build.decide(step, **inputs), True)
+        build.save()
+
+        build = CrateBuild(crate)
+        decision = build.decide(writer, shape=1, other="b")
+        assert decision.reason == "inputs changed: other"
+        build.record(decision, True)
+        assert not build.decide(reader).run
+
+        build = CrateBuild(crate)
+        build.record(build.decide(writer, shape=2, other="b"), True)
+        assert build.decide(reader).reason == "inputs changed: metadata"
+
+
+class TestProcessAllSubcrates:
+    def test_parallel_matches_serial(self, release, fake_steps, capsys):
+        process_all_subcrates(release)
+        capsys.readouterr()
+
+        serial = process_all_subcrates(release)
+        serial_out = capsys.readouterr().out
+        parallel = process_all_subcrates(release, jobs=3)
+        parallel_out = capsys.readouterr().out
+
+        assert parallel == serial
+        assert serial['skipped'] == 4
+        assert sorted(parallel_out.splitlines()) == sorted(serial_out.splitlines())
+
+    def test_worker_output_is_buffered(self, release, fake_steps, capsys):
+        process_all_subcrates(release)
+        capsys.readouterr()
+
+        subcrates = sorted(release.iterdir())
+        outcome = _process_listed_subcrate_buffered(subcrates[0], subcrates, release, False, False)
+        assert capsys.readouterr().out == ""
+        assert outcome['skipped']
+        assert outcome['log'] == "\n  Skipping subcrate: sub0 (up to date)\n"
+
+
+class TestSubcratePipeline:
+    """The real metadata-writing steps, run on a copy of the cancer-cells crate."""
+
+    @pytest.fixture
+    def crate(self, tmp_path):
+        source = pathlib.Path(__file__).parents[1] / "data" / "cm4ai-release" / "mass-spec" / "cancer-cells"
+        crate = tmp_path / "release" / "cancer-cells"
+        shutil.copytree(source, crate)
+        (crate / "data.csv").write_text("a,b\n1,2\n")
+        metadata = json.loads((crate / "ro-crate-metadata.json").read_text())
+        metadata["@graph"][2]["contentUrl"] = "file:///data.csv"
+        (crate / "ro-crate-metadata.json").write_text(json.dumps(metadata, indent=2))
+        return crate
+
+    def test_one_write_and_same_result_as_separate_steps(self, crate, tmp_path, monkeypatch):
+        standalone = tmp_path / "standalone"
+        shutil.copytree(crate, standalone)
+        for step in (build_utils.process_link_inverses, build_utils.process_add_io,
+                     build_utils.process_croissant, build_utils.process_merkle_tree):
+            assert step(standalone)
+
+        writes = []
+        original = crate_document.open_atomic
+        monkeypatch.setattr(crate_document, "open_atomic",
+                            lambda path, *args, **kwargs: writes.append(path) or original(path, *args, **kwargs))
+        monkeypatch.setattr(build_utils, "process_evidence_graph", lambda *args, **kwargs: False)
+        monkeypatch.setattr(build_utils, "process_preview", lambda crate, published=False: True)
+
+        outcome = build_utils._process_listed_subcrate(crate, [crate], crate.parent, False, False)
+        assert not outcome['errors']
+        assert writes == [crate / "ro-crate-metadata.json"]
+        for name in ("ro-crate-metadata.json", "ro-crate-croissant.json", "ro-crate-merkle-tree.json"):
+            assert (crate / name).read_bytes() == (standalone / name).read_bytes()
+
+    def test_invalid_result_is_not_written(self, crate, monkeypatch):
+        def break_entity(subcrate):
+            crate_doc = crate_document.active_crate_document(subcrate)
+            entity = crate_doc.graph[2]
+            del entity["name"]
+            crate_doc.mark_dirty(entity["@id"])
+            return True
+
+        before = (crate / "ro-crate-metadata.json").read_bytes()
+        monkeypatch.setattr(build_utils, "process_link_inverses", break_entity)
+        monkeypatch.setattr(build_utils, "process_evidence_graph", lambda *args, **kwargs: False)
+        monkeypatch.setattr(build_utils, "process_preview", lambda crate, published=False: True)
+
+        outcome = build_utils._process_listed_subcrate(crate, [crate], crate.parent, False, False)
+        assert any("Failed to write metadata" in error for error in outcome['errors'])
+        assert (crate / "ro-crate-metadata.json").read_bytes() == before
+        assert not (crate / BUILD_MANIFEST_FILENAME).exists()
+
+    def test_merkle_tree_follows_content_changes(self, crate):
+        assert build_utils.process_merkle_tree(crate)
+        first = json.loads((crate / "ro-crate-merkle-tree.json").read_text())
+
+        (crate / "data.csv").write_text("a,b\n3,4\n")
+        assert build_utils.process_merkle_tree(crate)
+        tree = json.loads((crate / "ro-crate-merkle-tree.json").read_text())
+        assert tree["rootHash"] != first["rootHash"]
+        metadata = json.loads((crate / "ro-crate-metadata.json").read_text())
+        assert metadata["@graph"][1]["evi:merkleRootHash"] == tree["rootHash"]
+
+    def test_merkle_tree_keeps_its_storage_format(self, crate):
+        from fairscape_cli.utils.merkle import merkle_tree_format, read_merkle_tree, write_merkle_tree
+
+        tree_path = crate / "ro-crate-merkle-tree.json"
+        assert build_utils.process_merkle_tree(crate)
+        write_merkle_tree(tree_path, read_merkle_tree(tree_path), "binary")
+
+        (crate / "data.csv").write_text("a,b\n5,6\n")
+        assert build_utils.process_merkle_tree(crate)
+        assert merkle_tree_format(tree_path) == "binary"
+        metadata = json.loads((crate / "ro-crate-metadata.json").read_text())
+        assert metadata["@graph"][1]["evi:merkleRootHash"] == read_merkle_tree(tree_path)["rootHash"]
@@ -0,0 +1,122 @@
+"""Tests for the ro-crate-metadata.idx byte-offset sidecar."""
+
+import json
+import shutil
+
+import pytest
+
+from fairscape_cli.models.crate_document import CrateDocument, JOURNAL_FILENAME
+from fairscape_cli.models.rocrate import AppendCrate, UpdateCrate
+from fairscape_cli.models.utils import getEntityFromCrate
+from fairscape_cli.utils.crate_index import (
+    build_crate_index,
+    index_path_for,
+    load_crate_index,
+    read_indexed_entity,
+    update_indexed_entity,
+)
+
+
+@pytest.fixture
+def crate_dir(make_crate, make_dataset):
+    return make_crate(datasets=[make_dataset(f"d{i}", f"ark:59852/dataset-{i}") for i in range(5)])
+
+
+def _graph(crate_dir):
+    with open(crate_dir / "ro-crate-metadata.json") as f:
+        return json.load(f)["@graph"]
+
+
+class TestCrateIndex:
+    def test_spans_round_trip(self, crate_dir):
+        index = build_crate_index(crate_dir)
+        graph = _graph(crate_dir)
+        assert set(index["entities"]) == {e["@id"] for e in graph}
+        for entity in graph:
+            assert read_indexed_entity(crate_dir, entity["@id"]) == entity
+            assert index["entities"][entity["@id"]][2] == entity["@type"]
+
+    def test_non_ascii_byte_offsets(self, tmp_path):
+        metadata = {"@graph": [
+            {"@id": "ark:59852/é-one", "@type": "Dataset", "name": "naïve ☃"},
+            {"@id": "ark:59852/two", "@type": "Dataset", "name": "plain"},
+        ]}
+        path = tmp_path / "ro-crate-metadata.json"
+        path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+        index = build_crate_index(path)
+        assert "ark:59852/é-one" in index["entities"]
+        for entity in metadata["@graph"]:
+            assert read_indexed_entity(path, entity["@id"]) == entity
+
+    def test_stale_index_is_ignored(self, crate_dir):
+        build_crate_index(crate_dir)
+        metadata_file = crate_dir / "ro-crate-metadata.json"
+        metadata_file.write_text(metadata_file.read_text().replace("d1", "d1-renamed"))
+        assert load_crate_index(crate_dir) is None
+        assert read_indexed_entity(crate_dir, "ark:59852/dataset-1") is None
+
+    def test_pending_journal_disables_index(self, crate_dir):
+        build_crate_index(crate_dir)
+        (crate_dir / JOURNAL_FILENAME).write_text("")
+        assert load_crate_index(crate_dir) is None
+
+    def test_document_write_refreshes_existing_index(self, crate_dir, make_dataset):
+        build_crate_index(crate_dir)
+        AppendCrate(crate_dir, [make_dataset("new", "ark:59852/dataset-new")])
+        index = load_crate_index(crate_dir)
+        assert index is not None
+        assert read_indexed_entity(crate_dir, "ark:59852/dataset-new")["name"] == "new"
+
+
+class TestIndexedUpdate:
+    def test_splice_matches_full_rewrite(self, crate_dir, tmp_path, make_dataset):
+        reference = tmp_path / "reference"
+        shutil.copytree(crate_dir, reference)
+        build_crate_index(crate_dir)
+
+        updated = make_dataset("a much longer replacement name", "ark:59852/dataset-2")
+        UpdateCrate(crate_dir, updated)
+        with CrateDocument(reference, journal=False) as crate:
+            crate.update(updated)
+
+        assert (crate_dir / "ro-crate-metadata.json").read_bytes() == \
+            (reference / "ro-crate-metadata.json").read_bytes()
+
+    def test_offsets_shift_after_update(self, crate_dir, make_dataset):
+        build_crate_index(crate_dir)
+        UpdateCrate(crate_dir, make_dataset("x", "ark:59852/dataset-1"))
+        assert load_crate_index(crate_dir) is not None
+        for entity in _graph(crate_dir):
+            assert read_indexed_entity(crate_dir, entity["@id"]) == entity
+
+    def test_compact_file_update(self, tmp_path):
+        metadata = {"@graph": [{"@id": "a", "v": 1}, {"@id": "b", "v": 2}]}
+        path = tmp_path / "ro-crate-metadata.json"
+        path.write_text(json.dumps(metadata))
+        build_crate_index(path)
+
+        assert update_indexed_entity(path, {"@id": "a", "v": [1, 2, 3]})
+        assert json.loads(path.read_text()) == {"@graph": [{"@id": "a", "v": [1, 2, 3]}, {"@id": "b", "v": 2}]}
+        assert "\n" not in path.read_text()
+
+    def test_invalid_update_is_rejected_without_writing(self, crate_dir, make_dataset):
+        build_crate_index(crate_dir)
+        before = (crate_dir / "ro-crate-metadata.json").read_bytes()
+        bad = make_dataset("d0", "ark:59852/dataset-0").model_dump(by_alias=True)
+        bad["name"] = None
+        bad["description"] = "x"
+        with pytest.raises(Exception):
+            UpdateCrate(crate_dir, bad)
+        assert (crate_dir / "ro-crate-metadata.json").read_bytes() == before
+
+    def test_unknown_id_is_not_spliced(self, crate_dir):
+        build_crate_index(crate_dir)
+        assert not update_indexed_entity(crate_dir, {"@id": "ark:59852/missing"})
+
+
+def test_get_entity_from_crate_path(crate_dir):
+    assert getEntityFromCrate(crate_dir, "ark:59852/dataset-3")["name"] == "d3"
+    build_crate_index(crate_dir)
+    assert getEntityFromCrate(crate_dir, "ark:59852/dataset-3")["name"] == "d3"
+    assert getEntityFromCrate(crate_dir, "ark:59852/missing") is None
+    assert index_path_for(crate_dir).exists()
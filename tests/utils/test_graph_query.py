@@ -0,0 +1,172 @@
+"""Tests for the in-process MongoDB-style graph query/update engine."""
+
+import copy
+import json
+import pathlib
+
+import pytest
+
+from fairscape_cli.models.crate_document import CrateDocument
+from fairscape_cli.models.rocrate import ApplyGraphUpdates, UpdateEntitiesInGraph
+from fairscape_cli.utils.graph_query import (
+    GraphQueryEngine,
+    GraphQueryError,
+    apply_update,
+    matches,
+)
+
+
+def _graph():
+    return [
+        {"@id": "./", "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"], "name": "root",
+         "hasPart": [{"@id": "ark:a"}, {"@id": "ark:b"}], "keywords": ["x", "y"]},
+        {"@id": "ark:a", "@type": "Dataset", "name": "A data", "keywords": ["x"], "meta": {"k": 1}},
+        {"@id": "ark:b", "@type": "Software", "name": "b tool", "keywords": "y"},
+        {"@id": "ark:c", "@type": ["Dataset", "Thing"], "name": "C"},
+    ]
+
+
+def _ids(engine, query):
+    return [entity["@id"] for entity in engine.find(query)]
+
+
+class TestMatches:
+    def test_array_field_matches_any_element(self):
+        engine = GraphQueryEngine(_graph())
+        assert _ids(engine, {"keywords": "x"}) == ["./", "ark:a"]
+        assert _ids(engine, {"keywords": ["x", "y"]}) == ["./"]
+        assert _ids(engine, {"keywords": {"$nin": ["y"]}}) == ["ark:a", "ark:c"]
+
+    def test_dotted_path_through_array_of_objects(self):
+        engine = GraphQueryEngine(_graph())
+        assert _ids(engine, {"hasPart.@id": "ark:b"}) == ["./"]
+        assert _ids(engine, {"hasPart.@id": {"$exists": True}}) == ["./"]
+        assert _ids(engine, {"meta.k": 1}) == ["ark:a"]
+
+    def test_operators(self):
+        engine = GraphQueryEngine(_graph())
+        assert _ids(engine, {"name": {"$regex": "^a", "$options": "i"}}) == ["ark:a"]
+        assert _ids(engine, {"meta": {"$exists": False}, "@type": "Dataset"}) == ["./", "ark:c"]
+        assert _ids(engine, {"$or": [{"@type": "Software"}, {"name": "C"}]}) == ["ark:b", "ark:c"]
+        assert _ids(engine, {"@id": {"$in": ["ark:c", "ark:a"]}}) == ["ark:a", "ark:c"]
+
+    def test_unsupported_operator(self):
+        with pytest.raises(GraphQueryError):
+            matches({"name": "a"}, {"name": {"$where": "1"}})
+
+
+class TestEngine:
+    def test_indexed_query_does_not_scan(self, monkeypatch):
+        engine = GraphQueryEngine(_graph())
+        seen = []
+        import fairscape_cli.utils.graph_query as graph_query
+        original = graph_query.matches
+        monkeypatch.setattr(graph_query, "matches", lambda e, q: seen.append(e["@id"]) or original(e, q))
+        assert _ids(engine, {"@type": "Software"}) == ["ark:b"]
+        assert seen == ["ark:b"]
+
+    def test_update_many_reports_changed_ids_and_reindexes(self):
+        engine = GraphQueryEngine(_graph())
+        matched, modified = engine.update_many({"@type": "Dataset"}, {"$addToSet": {"keywords": "x"}})
+        assert matched == 3
+        assert modified == ["ark:c"]
+        engine.update_many({"@id": "ark:b"}, {"$set": {"@type": "Dataset"}})
+        assert _ids(engine, {"@type": "Dataset"}) == ["./", "ark:a", "ark:b", "ark:c"]
+        assert _ids(engine, {"@type": "Software"}) == []
+
+    def test_update_operators(self):
+        entity = {"@id": "e", "keywords": ["x"], "old": 1}
+        assert apply_update(entity, {
+            "$set": {"meta.z": 2},
+            "$unset": {"old": ""},
+            "$push": {"keywords": {"$each": ["x", "y"]}},
+        })
+        assert entity == {"@id": "e", "keywords": ["x", "x", "y"], "meta": {"z": 2}}
+        assert not apply_update(entity, {"$addToSet": {"keywords": "y"}})
+
+    def test_failed_update_leaves_entity_unchanged(self):
+        entity = {"@id": "e", "name": "n"}
+        with pytest.raises(GraphQueryError):
+            apply_update(entity, {"$set": {"version": "2"}, "$push": {"name": "x"}})
+        assert entity == {"@id": "e", "name": "n"}
+
+    def test_rollback_restores_entities_in_place(self):
+        graph = _graph()
+        entities = list(graph)
+        engine = GraphQueryEngine(graph)
+        engine.update_many({"@type": "Dataset"}, {"$set": {"license": "MIT"}})
+        engine.update_many({"@id": "ark:b"}, {"$set": {"@type": "Dataset"}})
+        engine.rollback()
+        assert graph == _graph()
+        assert all(a is b for a, b in zip(graph, entities))
+        assert _ids(engine, {"@type": "Software"}) == ["ark:b"]
+
+    @pytest.mark.parametrize("update", [
+        {"$set": {"@id": "other"}},
+        {"$set": {"$bad": 1}},
+        {"$rename": {"a": "b"}},
+        {},
+    ])
+    def test_invalid_updates(self, update):
+        with pytest.raises(GraphQueryError):
+            GraphQueryEngine(_graph()).update_many({}, update)
+
+
+@pytest.fixture
+def crate_dir(make_crate, make_dataset):
+    return make_crate(datasets=[make_dataset(name, f"ark:59852/dataset-{name}") for name in ("a", "b")])
+
+
+def _read(crate_dir: pathlib.Path) -> dict:
+    with open(crate_dir / "ro-crate-metadata.json") as f:
+        return json.load(f)
+
+
+class TestApplyGraphUpdates:
+    def test_batch_sees_earlier_operations(self, crate_dir):
+        success, message = ApplyGraphUpdates(crate_dir, [
+            ({"@id": "ark:59852/dataset-a"}, {"$set": {"license": "MIT"}}),
+            ({"license": "MIT"}, {"$set": {"version": "2.0"}}),
+        ])
+        assert success, message
+        assert "2 operations" in message
+        by_id = {entity["@id"]: entity for entity in _read(crate_dir)["@graph"]}
+        assert by_id["ark:59852/dataset-a"]["version"] == "2.0"
+        assert by_id["ark:59852/dataset-b"]["version"] == "1.0"
+
+    def test_failed_batch_writes_nothing(self, crate_dir):
+        before = (crate_dir / "ro-crate-metadata.json").read_bytes()
+        success, message = ApplyGraphUpdates(crate_dir, [
+            ({"@id": "ark:59852/dataset-a"}, {"$set": {"license": "MIT"}}),
+            ({}, {"$set": {"@id": "ark:other"}}),
+        ])
+        assert not success
+        assert "operation 2" in message
+        assert (crate_dir / "ro-crate-metadata.json").read_bytes() == before
+
+    def test_failed_batch_leaves_shared_session_clean(self, crate_dir):
+        with CrateDocument(crate_dir) as crate:
+            before = copy.deepcopy(crate.graph)
+            success, message = ApplyGraphUpdates(crate_dir, [
+                ({"@id": "ark:59852/dataset-b"}, {"$set": {"license": "MIT"}}),
+                # $set applies before $push fails on the string field.
+                ({"@id": "ark:59852/dataset-a"}, {"$set": {"license": "MIT"}, "$push": {"name": "x"}}),
+            ])
+            assert not success
+            assert crate.graph == before
+            assert not crate.dirty
+
+    def test_writes_non_ascii_as_utf8(self, crate_dir, monkeypatch):
+        monkeypatch.setenv("FAIRSCAPE_JSON_BACKEND", "json")
+        success, message = ApplyGraphUpdates(crate_dir, [
+            ({"@id": "ark:59852/dataset-a"}, {"$set": {"author": "José Café"}}),
+        ])
+        assert success, message
+        written = (crate_dir / "ro-crate-metadata.json").read_bytes()
+        assert "José Café".encode("utf-8") in written
+        assert written == json.dumps(_read(crate_dir), indent=2, ensure_ascii=False).encode("utf-8")
+
+    def test_single_update_no_match(self, crate_dir):
+        success, message = UpdateEntitiesInGraph(crate_dir, {"@id": "ark:missing"}, {"$set": {"a": 1}})
+        assert success
+        assert message == "No entities were modified. Matched: 0, Modified: 0."
@@ -0,0 +1,130 @@
+"""Tests for the streaming @graph reader."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from fairscape_cli.utils.graph_stream import (
+    _iter_raw_graph,
+    entity_type_names,
+    find_root_entity,
+    iter_graph_entities,
+)
+
+
+def _write_crate(crate_dir: Path, graph, indent=2) -> Path:
+    crate_dir.mkdir(parents=True, exist_ok=True)
+    metadata = {
+        "@context": {"@vocab": "https://schema.org/", "EVI": "https://w3id.org/EVI#"},
+        "@graph": graph,
+        "trailer": [1, 2.5, None, "x"],
+    }
+    path = crate_dir / "ro-crate-metadata.json"
+    path.write_text(json.dumps(metadata, indent=indent))
+    return path
+
+
+def _graph():
+    return [
+        {"@id": "ro-crate-metadata.json", "@type": "CreativeWork", "about": {"@id": "ark:59852/root"}},
+        {"@id": "ark:59852/root", "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"], "name": "Root",
+         "hasPart": [{"@id": "ark:59852/d1"}, {"@id": "ark:59852/s1"}]},
+        {"@id": "ark:59852/d1", "@type": "https://w3id.org/EVI#Dataset", "name": "Dataset é \"one\"",
+         "contentUrl": "file:///data/one.csv", "contentSize": 12345},
+        {"@id": "ark:59852/s1", "@type": "https://w3id.org/EVI#Software", "name": "Script",
+         "contentUrl": "file:///code/run.py"},
+    ]
+
+
+class TestIterGraphEntities:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 1024])
+    def test_matches_json_load(self, tmp_path, chunk_size):
+        path = _write_crate(tmp_path / "crate", _graph())
+        assert list(iter_graph_entities(path, chunk_size=chunk_size)) == _graph()
+
+    def test_compact_json_and_directory_path(self, tmp_path):
+        _write_crate(tmp_path / "crate", _graph(), indent=None)
+        assert list(iter_graph_entities(tmp_path / "crate", chunk_size=5)) == _graph()
+
+    def test_empty_graph(self, tmp_path):
+        path = _write_crate(tmp_path / "crate", [])
+        assert list(iter_graph_entities(path)) == []
+
+    def test_type_filter_uses_local_names(self, tmp_path):
+        path = _write_crate(tmp_path / "crate", _graph())
+        ids = [e["@id"] for e in iter_graph_entities(path, types=["Dataset"])]
+        assert ids == ["ark:59852/root", "ark:59852/d1"]
+
+    def test_field_projection(self, tmp_path):
+        path = _write_crate(tmp_path / "crate", _graph())
+        entities = list(iter_graph_entities(path, types=["Software"], fields=["contentUrl"]))
+        assert entities == [
+            {"@id": "ark:59852/s1", "@type": "https://w3id.org/EVI#Software", "contentUrl": "file:///code/run.py"}
+        ]
+
+    def test_truncated_file_raises(self, tmp_path):
+        path = _write_crate(tmp_path / "crate", _graph())
+        path.write_text(path.read_text()[:-40])
+        with pytest.raises(ValueError):
+            list(iter_graph_entities(path, chunk_size=16))
+
+    def test_entity_much_larger_than_chunk(self, tmp_path):
+        graph = _graph()
+        graph[1]["hasPart"] = [{"@id": f"ark:59852/part-{i}"} for i in range(20000)]
+        path = _write_crate(tmp_path / "crate", graph)
+        assert list(iter_graph_entities(path, chunk_size=64)) == graph
+
+        class CountingReader(io.StringIO):
+            reads = 0
+
+            def read(self, size=-1):
+                CountingReader.reads += 1
+                return super().read(size)
+
+        text = path.read_text()
+        assert list(_iter_raw_graph(CountingReader(text), 64)) == graph
+        # Reads grow geometrically while the root stays incomplete, instead
+        # of one 64-character read (and re-decode) per chunk of it.
+        assert len(text) // 64 > 5000
+        assert CountingReader.reads < 100
+
+    def test_validate_rejects_invalid_entity(self, tmp_path):
+        graph = _graph() + [{"@id": "ark:59852/bad", "@type": "https://w3id.org/EVI#Dataset"}]
+        path = _write_crate(tmp_path / "crate", graph)
+        with pytest.raises(Exception):
+            list(iter_graph_entities(path, types=["Dataset"], validate=True))
+
+
+class TestFindRootEntity:
+    def test_descriptor_first(self, tmp_path):
+        path = _write_crate(tmp_path / "crate", _graph())
+        root_id, root = find_root_entity(path, fields=["name"])
+        assert root_id == "ark:59852/root"
+        assert root["name"] == "Root"
+
+    def test_root_before_descriptor(self, tmp_path):
+        graph = _graph()
+        graph[0], graph[1] = graph[1], graph[0]
+        path = _write_crate(tmp_path / "crate", graph)
+        assert find_root_entity(path)[1]["name"] == "Root"
+
+    def test_missing_descriptor(self, tmp_path):
+        path = _write_crate(tmp_path / "crate", _graph()[1:])
+        assert find_root_entity(path) == (None, None)
+
+
+def test_entity_type_names():
+    assert entity_type_names({"@type": ["prov:Entity", "https://w3id.org/EVI#Dataset"]}) == ["Entity", "Dataset"]
+    assert entity_type_names({"metadataType": "https://w3id.org/EVI#Schema"}) == ["Schema"]
+    assert entity_type_names({}) == []
+
+
+def test_pending_journal_is_replayed(tmp_path):
+    path = _write_crate(tmp_path / "crate", _graph())
+    record = {"op": "append", "entity": {"@id": "ark:59852/d2", "@type": "https://w3id.org/EVI#Dataset"}}
+    (path.parent / "ro-crate-metadata.journal.jsonl").write_text(json.dumps(record) + "\n")
+
+    ids = [e["@id"] for e in iter_graph_entities(path, types=["Dataset"])]
+    assert ids == ["ark:59852/root", "ark:59852/d1", "ark:59852/d2"]
@@ -0,0 +1,114 @@
+"""Tests for the persistent file checksum cache."""
+
+import hashlib
+import os
+import sqlite3
+
+import pytest
+
+from fairscape_cli.models.bagit import BagIt
+from fairscape_cli.models.utils import calculate_md5
+from fairscape_cli.utils import hash_cache
+from fairscape_cli.utils.hash_cache import (
+    file_digest,
+    file_digests,
+    hash_cache_path,
+    set_hash_cache_enabled,
+)
+from fairscape_cli.utils.merkle import sha256_file
+
+OLD_NS = 1_600_000_000_000_000_000
+
+
+def _write(path, data: bytes):
+    path.write_bytes(data)
+    # Outside the racy window, so digests are cacheable.
+    os.utime(path, ns=(OLD_NS, OLD_NS))
+    return path
+
+
+def _rows():
+    with sqlite3.connect(hash_cache_path()) as connection:
+        return connection.execute("SELECT algorithm, digest FROM file_digests").fetchall()
+
+
+@pytest.fixture
+def count_reads(monkeypatch):
+    calls = []
+    original = hash_cache.compute_digests
+
+    def counting(filepath, algorithms, progress=None):
+        calls.append((str(filepath), tuple(algorithms)))
+        return original(filepath, algorithms, progress)
+
+    monkeypatch.setattr(hash_cache, "compute_digests", counting)
+    return calls
+
+
+class TestFileDigest:
+    def test_digests_match_hashlib(self, tmp_path):
+        path = _write(tmp_path / "a.bin", b"hello world" * 1000)
+        data = path.read_bytes()
+        assert calculate_md5(path) == hashlib.md5(data).hexdigest()
+        assert sha256_file(path) == hashlib.sha256(data).hexdigest()
+        assert file_digest(path, "sha512") == hashlib.sha512(data).hexdigest()
+
+    def test_md5_miss_also_caches_sha256(self, tmp_path, count_reads):
+        path = _write(tmp_path / "a.bin", b"payload")
+        calculate_md5(path)
+        sha256_file(path)
+        calculate_md5(path)
+        assert count_reads == [(str(path), ("md5", "sha256"))]
+
+    def test_changed_file_is_rehashed(self, tmp_path, count_reads):
+        path = _write(tmp_path / "a.bin", b"one")
+        first = file_digest(path, "md5")
+        _write(path, b"two!")
+        assert file_digest(path, "md5") == hashlib.md5(b"two!").hexdigest() != first
+        assert len(count_reads) == 2
+        # The row for the old version was replaced, not kept alongside.
+        assert len(_rows()) == 2
+
+    def test_recently_modified_file_is_not_cached(self, tmp_path, count_reads):
+        path = tmp_path / "fresh.bin"
+        path.write_bytes(b"fresh")
+        file_digest(path, "md5")
+        file_digest(path, "md5")
+        assert len(count_reads) == 2
+
+    def test_disabled_cache_always_reads(self, tmp_path, count_reads):
+        path = _write(tmp_path / "a.bin", b"payload")
+        set_hash_cache_enabled(False)
+        file_digest(path, "md5")
+        file_digest(path, "md5")
+        assert len(count_reads) == 2
+        assert not hash_cache_path().exists() or _rows() == []
+
+    def test_env_var_disables_cache(self, tmp_path, monkeypatch, count_reads):
+        monkeypatch.setenv(hash_cache.NO_HASH_CACHE_ENV_VAR, "1")
+        path = _write(tmp_path / "a.bin", b"payload")
+        file_digests(path)
+        file_digests(path)
+        assert len(count_reads) == 2
+
+
+def test_bagit_payload_reuses_crate_digests(tmp_path, count_reads):
+    crate = tmp_path / "crate"
+    crate.mkdir()
+    source = _write(crate / "data.csv", b"a,b\n1,2\n")
+    sha256_file(source)
+
+    bag = BagIt(
+        rocrate_path=crate, bagit_path=tmp_path / "bag",
+        source_organization="o", organization_address="a", contact_name="n",
+        contact_phone="p", contact_email="e", external_description="d",
+        bagging_date="2024-01-01", bag_size=None, payload_Oxum=None,
+    )
+    bag.create_bagit_directory()
+    bag.create_payload_directory()
+    bag.create_payload_manifest_sha256()
+
+    expected = hashlib.sha256(source.read_bytes()).hexdigest()
+    manifest = (tmp_path / "bag" / "manifest-sha256.txt").read_text()
+    assert manifest == f"{expected} data/data.csv\n"
+    assert len(count_reads) == 1
@@ -0,0 +1,114 @@
+"""Tests for the multi-digest hashing engine."""
+
+import hashlib
+import json
+import threading
+
+import pytest
+
+from fairscape_cli.utils.hashing import SUPPORTED_ALGORITHMS, hash_file, hash_file_chunks, hash_files
+from fairscape_cli.utils.merkle import generate_merkle_tree
+
+
+def _expected(data: bytes, algorithms):
+    return {name: hashlib.new(name, data).hexdigest() for name in algorithms}
+
+
+class TestHashFile:
+    def test_all_algorithms_in_one_pass(self, tmp_path):
+        data = bytes(range(256)) * 5000
+        path = tmp_path / "f.bin"
+        path.write_bytes(data)
+        assert hash_file(path, SUPPORTED_ALGORITHMS, buffer_size=4096) == _expected(data, SUPPORTED_ALGORITHMS)
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty"
+        path.write_bytes(b"")
+        assert hash_file(path, ("md5",)) == _expected(b"", ("md5",))
+
+    def test_progress_sums_to_size(self, tmp_path):
+        path = tmp_path / "f.bin"
+        path.write_bytes(b"x" * 10_000)
+        seen = []
+        hash_file(path, ("sha256",), progress=lambda p, n: seen.append(n), buffer_size=3000)
+        assert seen == [3000, 3000, 3000, 1000]
+
+    def test_unknown_algorithm(self, tmp_path):
+        path = tmp_path / "f.bin"
+        path.write_bytes(b"x")
+        with pytest.raises(ValueError):
+            hash_file(path, ("crc32",))
+
+
+class TestHashFiles:
+    @pytest.mark.parametrize("use_cache", [True, False])
+    def test_parallel_results_in_input_order(self, tmp_path, use_cache):
+        paths = []
+        for i in range(20):
+            path = tmp_path / f"f{i}.bin"
+            path.write_bytes(str(i).encode() * (i * 1000 + 1))
+            paths.append(path)
+
+        total = []
+        lock = threading.Lock()
+
+        def progress(path, nbytes):
+            with lock:
+                total.append(nbytes)
+
+        results = hash_files(paths, ("md5", "blake2b"), jobs=4, progress=progress, use_cache=use_cache)
+        assert results == [_expected(p.read_bytes(), ("md5", "blake2b")) for p in paths]
+        assert sum(total) == sum(p.stat().st_size for p in paths)
+
+    def test_serial_matches_parallel(self, tmp_path):
+        paths = [tmp_path / f"f{i}" for i in range(5)]
+        for i, path in enumerate(paths):
+            path.write_bytes(bytes([i]) * 100)
+        assert hash_files(paths, jobs=1) == hash_files(paths, jobs=8)
+
+
+class TestHashFileChunks:
+    @pytest.mark.parametrize("size", [0, 1, 999, 1000, 1001, 4567])
+    def test_chunks_cover_the_file(self, tmp_path, size):
+        data = bytes(range(256)) * 20
+        path = tmp_path / "f.bin"
+        path.write_bytes(data[:size])
+        expected = [hashlib.sha256(data[start:min(start + 1000, size)]).hexdigest()
+                    for start in range(0, max(size, 1), 1000)]
+        assert hash_file_chunks(path, 1000, jobs=3, buffer_size=64) == expected
+        assert hash_file_chunks(path, 1000, jobs=1) == expected
+
+    def test_progress_sums_to_size(self, tmp_path):
+        path = tmp_path / "f.bin"
+        path.write_bytes(b"x" * 2500)
+        total = []
+        lock = threading.Lock()
+
+        def progress(_, nbytes):
+            with lock:
+                total.append(nbytes)
+
+        hash_file_chunks(path, 1000, jobs=4, progress=progress)
+        assert sum(total) == 2500
+
+    def test_invalid_arguments(self, tmp_path):
+        path = tmp_path / "f.bin"
+        path.write_bytes(b"x")
+        with pytest.raises(ValueError):
+            hash_file_chunks(path, 0)
+        with pytest.raises(ValueError):
+            hash_file_chunks(path, 10, algorithm="crc32")
+
+
+def test_merkle_tree_uses_engine(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"a")
+    (tmp_path / "b.txt").write_bytes(b"b")
+    metadata = {"@graph": [
+        {"@id": "b", "contentUrl": "file:///b.txt"},
+        {"@id": "a", "contentUrl": ["file:///a.txt", "https://example.org/a"]},
+    ]}
+    (tmp_path / "ro-crate-metadata.json").write_text(json.dumps(metadata))
+
+    tree = generate_merkle_tree(tmp_path, jobs=2)
+    assert [leaf["contentUrl"] for leaf in tree["leaves"]] == ["file:///a.txt", "file:///b.txt"]
+    assert tree["leaves"][0]["sha256"] == hashlib.sha256(b"a").hexdigest()
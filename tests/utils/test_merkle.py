@@ -2,18 +2,35 @@
 
 import hashlib
 import json
+import os
+import random
 import tempfile
 from pathlib import Path
 
 import pytest
 
+from fairscape_cli.utils import merkle
 from fairscape_cli.utils.merkle import (
     sha256_file,
     sha256_concat,
     build_merkle_tree,
+    update_merkle_tree,
+    merkle_levels,
+    changed_byte_ranges,
+    inclusion_proof,
+    verify_inclusion_proof,
+    verify_file,
     resolve_content_url,
     generate_merkle_tree,
+    generate_release_merkle_tree,
+    load_merkle_tree,
+    merkle_tree_format,
+    read_merkle_tree,
+    write_merkle_tree,
+    check_merkle_tree,
+    LeafCheck,
 )
+from fairscape_cli.utils.merkle_binary import binary_path_for
 
 
 class TestSha256File:
@@ -231,3 +248,462 @@ class TestGenerateMerkleTree:
         tree = generate_merkle_tree(tmp_path)
         assert tree is not None
         assert tree["leafCount"] == 1
+
+
+def _leaf(url, content):
+    return {"contentUrl": url, "sha256": hashlib.sha256(content.encode()).hexdigest()}
+
+
+class TestUpdateMerkleTree:
+    @pytest.mark.parametrize("count", [2, 3, 5, 8, 13, 64])
+    def test_matches_full_build(self, count):
+        rng = random.Random(count)
+        leaves = [_leaf(f"f{i:03d}", str(i)) for i in range(count)]
+        previous = build_merkle_tree(leaves)
+        for _ in range(20):
+            leaves = [dict(leaf) for leaf in leaves]
+            for i in rng.sample(range(count), rng.randint(0, count)):
+                leaves[i] = _leaf(leaves[i]["contentUrl"], str(rng.random()))
+            updated = update_merkle_tree(previous, leaves)
+            assert updated == build_merkle_tree(leaves)
+            previous = updated
+
+    def test_rehashes_only_the_changed_path(self, monkeypatch):
+        leaves = [_leaf(f"f{i:03d}", str(i)) for i in range(1024)]
+        previous = build_merkle_tree(leaves)
+        leaves[517] = _leaf("f517", "changed")
+
+        calls = []
+        original = merkle.sha256_concat
+        monkeypatch.setattr(merkle, "sha256_concat", lambda *args: calls.append(args) or original(*args))
+        assert update_merkle_tree(previous, leaves)["rootHash"] == build_merkle_tree(leaves)["rootHash"]
+        assert len(calls) == 10 + 1023  # path to the root, then the reference build
+
+    def test_changed_leaf_set_rebuilds(self):
+        leaves = [_leaf(f"f{i}", str(i)) for i in range(5)]
+        previous = build_merkle_tree(leaves)
+        for new in (leaves[:4], leaves + [_leaf("f9", "9")], [_leaf("a", "a")] + leaves[1:], leaves[:1]):
+            assert update_merkle_tree(previous, new) == build_merkle_tree(new)
+
+    def test_inconsistent_previous_tree_rebuilds(self):
+        leaves = [_leaf(f"f{i}", str(i)) for i in range(4)]
+        previous = build_merkle_tree(leaves)
+        previous["levels"][0][1] = previous["levels"][0][0]
+        assert update_merkle_tree(previous, leaves) == build_merkle_tree(leaves)
+        del previous["levels"][1]
+        assert update_merkle_tree(previous, leaves) == build_merkle_tree(leaves)
+
+
+class TestIncrementalGenerate:
+    OLD_MTIME_NS = 1_600_000_000 * 10**9
+
+    @pytest.fixture
+    def crate(self, tmp_path):
+        entities = []
+        for i in range(6):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text(f"content {i}")
+            os.utime(path, ns=(self.OLD_MTIME_NS, self.OLD_MTIME_NS))
+            entities.append({"@id": f"ark:test/f{i}", "@type": "Dataset", "contentUrl": f"f{i}.txt"})
+        TestGenerateMerkleTree()._make_crate(tmp_path, entities)
+        return tmp_path
+
+    @pytest.fixture
+    def hashed(self, monkeypatch):
+        hashed = []
+        original = merkle.hash_files
+
+        def counting(paths, *args, **kwargs):
+            paths = list(paths)
+            hashed.extend(path.name for path in paths)
+            return original(paths, *args, **kwargs)
+
+        monkeypatch.setattr(merkle, "hash_files", counting)
+        return hashed
+
+    def test_leaves_record_stat(self, crate):
+        tree = generate_merkle_tree(crate)
+        assert tree["leaves"][0]["size"] == len("content 0")
+        assert tree["leaves"][0]["mtimeNs"] == self.OLD_MTIME_NS
+
+    def test_recent_stat_is_not_recorded(self, crate):
+        (crate / "f2.txt").write_text("just written")
+        leaf = generate_merkle_tree(crate)["leaves"][2]
+        assert "size" not in leaf and "mtimeNs" not in leaf
+
+    def _start_in_racy_window(self, monkeypatch):
+        # The first reading is the build's start, inside every file's racy window.
+        readings = [self.OLD_MTIME_NS + 1]
+        monkeypatch.setattr(merkle.time, "time_ns",
+                            lambda: readings.pop() if readings else self.OLD_MTIME_NS + merkle.RACY_WINDOW_NS + 1)
+
+    def test_racy_stat_is_recorded_once_settled(self, crate, hashed, monkeypatch):
+        self._start_in_racy_window(monkeypatch)
+        tree = generate_merkle_tree(crate)
+        assert all(leaf["mtimeNs"] == self.OLD_MTIME_NS for leaf in tree["leaves"])
+        assert sorted(hashed) == sorted([f"f{i}.txt" for i in range(6)] + [f"f{i}.txt" for i in range(6)])
+
+    def test_racy_stat_is_not_recorded_if_the_file_moved(self, crate, monkeypatch):
+        self._start_in_racy_window(monkeypatch)
+        original = merkle.hash_files
+
+        def rewrite_f2_first(paths, *args, **kwargs):
+            digests = original(paths, *args, **kwargs)
+            if kwargs.get("use_cache") is not False:
+                (crate / "f2.txt").write_text("rewritten 2")
+                os.utime(crate / "f2.txt", ns=(self.OLD_MTIME_NS, self.OLD_MTIME_NS))
+            return digests
+
+        monkeypatch.setattr(merkle, "hash_files", rewrite_f2_first)
+        leaves = {leaf["contentUrl"]: leaf for leaf in generate_merkle_tree(crate)["leaves"]}
+        assert "mtimeNs" not in leaves["f2.txt"]
+        assert leaves["f1.txt"]["mtimeNs"] == self.OLD_MTIME_NS
+
+    def test_rehashes_only_stat_changed_files(self, crate, hashed):
+        previous = generate_merkle_tree(crate)
+        hashed.clear()
+        assert generate_merkle_tree(crate, previous=previous) == previous
+        assert hashed == []
+
+        (crate / "f3.txt").write_text("changed 3")
+        os.utime(crate / "f4.txt", ns=(self.OLD_MTIME_NS + 1, self.OLD_MTIME_NS + 1))
+        updated = generate_merkle_tree(crate, previous=previous)
+        assert sorted(hashed) == ["f3.txt", "f4.txt"]
+        assert updated == generate_merkle_tree(crate)
+
+    def test_added_file_is_hashed(self, crate, hashed):
+        previous = generate_merkle_tree(crate)
+        (crate / "new.txt").write_text("new")
+        metadata = json.loads((crate / "ro-crate-metadata.json").read_text())
+        metadata["@graph"].append({"@id": "ark:test/new", "@type": "Dataset", "contentUrl": "new.txt"})
+        (crate / "ro-crate-metadata.json").write_text(json.dumps(metadata))
+        hashed.clear()
+
+        updated = generate_merkle_tree(crate, previous=previous)
+        assert hashed == ["new.txt"]
+        assert updated["leafCount"] == 7
+        assert updated == generate_merkle_tree(crate)
+
+
+class TestChunkedMerkleTree:
+    @pytest.fixture
+    def crate(self, tmp_path):
+        (tmp_path / "big.bin").write_bytes(bytes(range(256)) * 20)  # 5120 bytes
+        (tmp_path / "small.txt").write_bytes(b"small")
+        TestGenerateMerkleTree()._make_crate(tmp_path, [
+            {"@id": "ark:test/big", "@type": "Dataset", "contentUrl": "big.bin"},
+            {"@id": "ark:test/small", "@type": "Dataset", "contentUrl": "small.txt"},
+        ])
+        return tmp_path
+
+    def test_large_files_become_chunk_trees(self, crate):
+        tree = generate_merkle_tree(crate, jobs=3, chunk_size=1024)
+        big, small = tree["leaves"]
+        data = (crate / "big.bin").read_bytes()
+        chunk_hashes = [hashlib.sha256(data[i:i + 1024]).hexdigest() for i in range(0, len(data), 1024)]
+
+        assert tree["chunkSize"] == 1024
+        assert big["chunks"] == {"chunkSize": 1024, "size": 5120, "levels": merkle_levels(chunk_hashes)}
+        assert big["sha256"] == big["chunks"]["levels"][-1][0]
+        assert "chunks" not in small
+        assert small["sha256"] == hashlib.sha256(b"small").hexdigest()
+        assert tree["rootHash"] == sha256_concat(big["sha256"], small["sha256"])
+
+    def test_without_chunk_size_tree_is_unchanged(self, crate):
+        tree = generate_merkle_tree(crate)
+        assert "chunkSize" not in tree
+        assert tree["leaves"][0]["sha256"] == hashlib.sha256((crate / "big.bin").read_bytes()).hexdigest()
+
+    def test_incremental_reuses_chunk_trees_of_the_same_size(self, crate, monkeypatch):
+        old = 1_600_000_000 * 10**9
+        for name in ("big.bin", "small.txt"):
+            os.utime(crate / name, ns=(old, old))
+        previous = generate_merkle_tree(crate, chunk_size=1024)
+
+        chunked = []
+        original = merkle.chunk_tree
+        monkeypatch.setattr(merkle, "chunk_tree",
+                            lambda path, *args, **kwargs: chunked.append(path.name) or original(path, *args, **kwargs))
+        assert generate_merkle_tree(crate, previous=previous, chunk_size=1024) == previous
+        assert chunked == []
+
+        rechunked = generate_merkle_tree(crate, previous=previous, chunk_size=2048)
+        assert chunked == ["big.bin"]
+        assert rechunked == generate_merkle_tree(crate, chunk_size=2048)
+        assert "chunks" not in generate_merkle_tree(crate, previous=previous)["leaves"][0]
+
+    def test_corruption_is_localized(self, crate):
+        stored = generate_merkle_tree(crate, chunk_size=1024)
+        data = bytearray((crate / "big.bin").read_bytes())
+        data[1500] ^= 0xFF
+        data[2100] ^= 0xFF
+        data[4500] ^= 0xFF
+        (crate / "big.bin").write_bytes(bytes(data))
+
+        computed = generate_merkle_tree(crate, chunk_size=1024)
+        assert computed["rootHash"] != stored["rootHash"]
+        assert changed_byte_ranges(stored["leaves"][0], computed["leaves"][0]) == [(1024, 3072), (4096, 5120)]
+
+    def test_changed_byte_ranges_edge_cases(self, crate):
+        stored = generate_merkle_tree(crate, chunk_size=1024)["leaves"][0]
+        (crate / "big.bin").write_bytes((crate / "big.bin").read_bytes() + b"tail")
+        grown = generate_merkle_tree(crate, chunk_size=1024)["leaves"][0]
+        assert changed_byte_ranges(stored, grown) == [(5120, 5124)]
+        assert changed_byte_ranges(grown, stored) == [(5120, 5124)]
+
+        other_size = generate_merkle_tree(crate, chunk_size=2048)["leaves"][0]
+        assert changed_byte_ranges(stored, other_size) is None
+        assert changed_byte_ranges(stored, {"contentUrl": "big.bin", "sha256": "00"}) is None
+
+
+class TestInclusionProof:
+    @pytest.mark.parametrize("count", [1, 2, 3, 7, 8, 17])
+    def test_every_leaf_proves_to_the_root(self, count):
+        tree = build_merkle_tree([_leaf(f"f{i:02d}", str(i)) for i in range(count)])
+        for leaf in tree["leaves"]:
+            proof = inclusion_proof(tree, leaf["contentUrl"])
+            assert proof["leafIndex"] == leaf["index"]
+            assert len(proof["path"]) == len(tree["levels"]) - 1 == (count - 1).bit_length()
+            assert verify_inclusion_proof(proof, leaf["sha256"])
+            assert not verify_inclusion_proof(proof, _leaf("x", "other")["sha256"])
+
+    def test_tampered_path_fails(self):
+        tree = build_merkle_tree([_leaf(f"f{i}", str(i)) for i in range(4)])
+        proof = inclusion_proof(tree, "f2")
+        proof["path"][1]["sibling"] = proof["path"][0]["sibling"]
+        assert not verify_inclusion_proof(proof, tree["leaves"][2]["sha256"])
+
+    def test_content_url_forms(self):
+        tree = build_merkle_tree([_leaf("file:///data/a.csv", "a"), _leaf("b.csv", "b")])
+        assert inclusion_proof(tree, "data/a.csv")["contentUrl"] == "file:///data/a.csv"
+        assert inclusion_proof(tree, "file:///b.csv")["contentUrl"] == "b.csv"
+        with pytest.raises(ValueError, match="No leaf"):
+            inclusion_proof(tree, "c.csv")
+
+    def test_inconsistent_stored_tree_is_rejected(self):
+        tree = build_merkle_tree([_leaf(f"f{i}", str(i)) for i in range(4)])
+        tree["levels"][1][1] = tree["levels"][1][0]
+        with pytest.raises(ValueError, match="rootHash"):
+            inclusion_proof(tree, "f0")
+        tree["levels"] = tree["levels"][:1]
+        with pytest.raises(ValueError):
+            inclusion_proof(tree, "f0")
+
+
+class TestVerifyFile:
+    @pytest.fixture
+    def crate(self, tmp_path):
+        entities = []
+        for i in range(5):
+            (tmp_path / f"f{i}.txt").write_text(f"content {i}")
+            entities.append({"@id": f"ark:test/f{i}", "@type": "Dataset", "contentUrl": f"file:///f{i}.txt"})
+        (tmp_path / "big.bin").write_bytes(bytes(range(256)) * 16)
+        entities.append({"@id": "ark:test/big", "@type": "Dataset", "contentUrl": "big.bin"})
+        TestGenerateMerkleTree()._make_crate(tmp_path, entities)
+        return tmp_path
+
+    def test_hashes_only_the_file(self, crate, monkeypatch):
+        tree = generate_merkle_tree(crate)
+        read = []
+        original = merkle.hash_file
+        monkeypatch.setattr(merkle, "hash_file",
+                            lambda path, *args, **kwargs: read.append(path.name) or original(path, *args, **kwargs))
+        monkeypatch.setattr(merkle, "hash_files", None)
+
+        result = verify_file(crate, tree, "f3.txt")
+        assert result.ok and result.content_url == "file:///f3.txt"
+        assert result.root_hash == tree["rootHash"]
+        assert read == ["f3.txt"]
+
+    def test_changed_and_missing_files_fail(self, crate):
+        tree = generate_merkle_tree(crate)
+        (crate / "f1.txt").write_text("tampered")
+        (crate / "f2.txt").unlink()
+
+        changed = verify_file(crate, tree, "f1.txt")
+        assert not changed.ok
+        assert changed.computed_hash == hashlib.sha256(b"tampered").hexdigest()
+        missing = verify_file(crate, tree, "f2.txt")
+        assert not missing.ok and missing.computed_hash is None
+        assert verify_file(crate, tree, "f0.txt").ok
+
+    def test_chunked_file_reports_byte_ranges(self, crate):
+        tree = generate_merkle_tree(crate, chunk_size=1000)
+        assert verify_file(crate, tree, "big.bin").ok
+
+        data = bytearray((crate / "big.bin").read_bytes())
+        data[2500] ^= 0xFF
+        (crate / "big.bin").write_bytes(bytes(data))
+        result = verify_file(crate, tree, "big.bin")
+        assert not result.ok
+        assert result.byte_ranges == [(2000, 3000)]
+
+
+class TestBinaryFormat:
+    @pytest.fixture
+    def tree(self, tmp_path):
+        old = 1_600_000_000 * 10**9
+        entities = []
+        for i, name in enumerate(["a.txt", "b.txt", "déjà vu.txt", "big.bin"]):
+            (tmp_path / name).write_bytes(bytes(range(256)) * (12 if name == "big.bin" else i + 1))
+            if i < 2:
+                os.utime(tmp_path / name, ns=(old, old))
+            entities.append({"@id": f"ark:test/{i}", "@type": "Dataset", "contentUrl": name})
+        TestGenerateMerkleTree()._make_crate(tmp_path, entities)
+        return generate_merkle_tree(tmp_path, chunk_size=1000)
+
+    @pytest.mark.parametrize("count", [0, 1, 3])
+    def test_round_trip_small_trees(self, tmp_path, count):
+        tree = build_merkle_tree([_leaf(f"f{i}", str(i)) for i in range(count)])
+        path = tmp_path / "ro-crate-merkle-tree.json"
+        write_merkle_tree(path, tree, "binary")
+        assert read_merkle_tree(path) == tree
+
+    def test_round_trip_with_stats_and_chunks(self, tmp_path, tree):
+        assert "size" in tree["leaves"][0] and "chunks" in tree["leaves"][2]
+        path = tmp_path / "ro-crate-merkle-tree.json"
+        write_merkle_tree(path, tree, "binary")
+
+        header = json.loads(path.read_text())
+        assert header["rootHash"] == tree["rootHash"] and header["chunkSize"] == 1000
+        assert "levels" not in header
+        assert merkle_tree_format(path) == "binary"
+        assert read_merkle_tree(path) == tree
+        assert binary_path_for(path).stat().st_size < len(json.dumps(tree))
+
+        write_merkle_tree(path, tree, "json")
+        assert merkle_tree_format(path) == "json"
+        assert not binary_path_for(path).exists()
+        assert read_merkle_tree(path) == tree
+
+    def test_tampered_sidecar_is_rejected(self, tmp_path, tree):
+        path = tmp_path / "ro-crate-merkle-tree.json"
+        write_merkle_tree(path, tree, "binary")
+        data = bytearray(binary_path_for(path).read_bytes())
+        data[40] ^= 0xFF
+        binary_path_for(path).write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="does not match"):
+            read_merkle_tree(path)
+        assert load_merkle_tree(path) is None
+
+        binary_path_for(path).unlink()
+        with pytest.raises(OSError):
+            read_merkle_tree(path)
+        assert merkle_tree_format(tmp_path / "missing.json") is None
+        with pytest.raises(ValueError):
+            write_merkle_tree(path, tree, "xml")
+
+    def test_proofs_and_release_tree_read_binary_trees(self, tmp_path, tree):
+        crate = tmp_path
+        write_merkle_tree(crate / "ro-crate-merkle-tree.json", tree, "binary")
+        stored = read_merkle_tree(crate / "ro-crate-merkle-tree.json")
+        assert verify_file(crate, stored, "a.txt").ok
+        assert verify_file(crate, stored, "big.bin").ok
+
+        release = tmp_path / "release"
+        (release / "sub").mkdir(parents=True)
+        write_merkle_tree(release / "sub" / "ro-crate-merkle-tree.json", tree, "binary")
+        assert generate_release_merkle_tree(release)["leaves"][0]["sha256"] == tree["rootHash"]
+
+
+class TestCheckMerkleTree:
+    OLD_MTIME_NS = 1_600_000_000 * 10**9
+
+    @pytest.fixture
+    def crate(self, tmp_path):
+        entities = []
+        for i in range(10):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text(f"content {i}")
+            os.utime(path, ns=(self.OLD_MTIME_NS, self.OLD_MTIME_NS))
+            entities.append({"@id": f"ark:test/f{i}", "@type": "Dataset", "contentUrl": f"f{i}.txt"})
+        TestGenerateMerkleTree()._make_crate(tmp_path, entities)
+        return tmp_path
+
+    @pytest.fixture
+    def hashed(self, monkeypatch):
+        hashed = []
+        original = merkle.hash_files
+
+        def counting(paths, *args, **kwargs):
+            paths = list(paths)
+            if kwargs.get("use_cache") is False:
+                hashed.extend(path.name for path in paths)
+            return original(paths, *args, **kwargs)
+
+        monkeypatch.setattr(merkle, "hash_files", counting)
+        return hashed
+
+    def test_quick_compares_stats_only(self, crate, hashed):
+        tree = generate_merkle_tree(crate)
+        hashed.clear()
+        (crate / "f1.txt").write_text("edited 1")
+        (crate / "f2.txt").unlink()
+
+        result = check_merkle_tree(crate, tree)
+        assert hashed == []
+        assert not result.ok and result.tree_consistent
+        by_url = {check.content_url: check for check in result.files}
+        assert by_url["f0.txt"] == LeafCheck("f0.txt", "ok", "stat")
+        assert by_url["f1.txt"] == LeafCheck("f1.txt", "changed", "stat")
+        assert by_url["f2.txt"] == LeafCheck("f2.txt", "missing", "stat")
+
+    def test_quick_misses_same_stat_corruption_that_sample_catches(self, crate, hashed):
+        tree = generate_merkle_tree(crate)
+        (crate / "f3.txt").write_text("content X")
+        os.utime(crate / "f3.txt", ns=(self.OLD_MTIME_NS, self.OLD_MTIME_NS))
+
+        assert check_merkle_tree(crate, tree).ok
+        result = check_merkle_tree(crate, tree, sample_percent=100)
+        assert sorted(hashed) == [f"f{i}.txt" for i in range(10)]
+        assert [check for check in result.files if check.status != "ok"] == [LeafCheck("f3.txt", "changed", "sha256")]
+
+    def test_sample_hashes_stat_changed_leaves_plus_a_sample(self, crate, hashed):
+        tree = generate_merkle_tree(crate)
+        os.utime(crate / "f5.txt", ns=(self.OLD_MTIME_NS + 1, self.OLD_MTIME_NS + 1))
+        hashed.clear()
+
+        result = check_merkle_tree(crate, tree, sample_percent=20, rng=random.Random(1))
+        assert "f5.txt" in hashed and len(hashed) == 1 + 2
+        assert result.ok
+        methods = {check.content_url: check.method for check in result.files}
+        assert sorted(url for url, method in methods.items() if method == "sha256") == sorted(hashed)
+        assert sum(method == "stat" for method in methods.values()) == 7
+
+    def test_unrecorded_stats_and_added_files(self, crate, hashed):
+        tree = generate_merkle_tree(crate)
+        del tree["leaves"][4]["size"]
+        (crate / "new.txt").write_text("new")
+        metadata = json.loads((crate / "ro-crate-metadata.json").read_text())
+        metadata["@graph"].append({"@id": "ark:test/new", "@type": "Dataset", "contentUrl": "new.txt"})
+        (crate / "ro-crate-metadata.json").write_text(json.dumps(metadata))
+        hashed.clear()
+
+        quick = {check.content_url: check for check in check_merkle_tree(crate, tree).files}
+        assert quick["f4.txt"] == LeafCheck("f4.txt", "ok", "sha256")
+        assert quick["new.txt"] == LeafCheck("new.txt", "added", "stat")
+        sampled = {check.content_url: check for check in check_merkle_tree(crate, tree, sample_percent=0).files}
+        assert sampled["f4.txt"] == LeafCheck("f4.txt", "ok", "sha256")
+        assert hashed == ["f4.txt", "f4.txt"]
+
+    def test_quick_hashes_leaves_without_a_stat(self, crate):
+        tree = generate_merkle_tree(crate)
+        for leaf in tree["leaves"]:
+            del leaf["size"], leaf["mtimeNs"]
+        (crate / "f6.txt").write_text("edited 6")
+
+        result = check_merkle_tree(crate, tree)
+        assert not result.ok
+        assert [check for check in result.files if check.status != "ok"] == [LeafCheck("f6.txt", "changed", "sha256")]
+
+    def test_edited_tree_is_inconsistent(self, crate):
+        tree = generate_merkle_tree(crate)
+        tree["rootHash"] = "0" * 64
+        result = check_merkle_tree(crate, tree)
+        assert not result.tree_consistent and not result.ok
+
+    def test_chunked_leaves_are_sampled_by_chunk_tree(self, crate):
+        (crate / "f0.txt").write_bytes(bytes(range(256)) * 10)
+        os.utime(crate / "f0.txt", ns=(self.OLD_MTIME_NS, self.OLD_MTIME_NS))
+        tree = generate_merkle_tree(crate, chunk_size=1000)
+        assert check_merkle_tree(crate, tree, sample_percent=100).ok
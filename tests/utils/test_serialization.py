@@ -0,0 +1,132 @@
+"""Tests for the shared JSON serialization layer."""
+
+import datetime
+import json
+import os
+import stat
+
+import pytest
+
+from fairscape_cli.utils import serialization
+from fairscape_cli.utils.serialization import (
+    _prune_shared,
+    dumps_json,
+    encode_json,
+    json_backend,
+    prune_none,
+    set_compact_output,
+    write_json_atomic,
+)
+
+
+SAMPLE = {
+    "@context": {"@vocab": "https://schema.org/"},
+    "@graph": [
+        {"@id": "ark:59852/é", "@type": ["Dataset"], "name": "naïve ☃ \"quoted\"",
+         "contentSize": 12345, "ratio": 0.25, "flags": [True, False], "empty": {}, "none": []},
+        {"@id": "ark:59852/b", "nested": {"deep": [1, {"x": "y"}]}},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_compact():
+    yield
+    set_compact_output(None)
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson" and serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    monkeypatch.setenv("FAIRSCAPE_JSON_BACKEND", request.param)
+    assert json_backend() == request.param
+    return request.param
+
+
+class TestEncodeJson:
+    def test_matches_stdlib_layout(self, backend):
+        # orjson always writes UTF-8; the stdlib backend keeps json.dump's escapes.
+        expected = json.dumps(SAMPLE, indent=2, ensure_ascii=backend == "json").encode("utf-8")
+        assert encode_json(SAMPLE) == expected
+
+    def test_compact_layout(self, backend):
+        expected = json.dumps(SAMPLE, separators=(",", ":"), ensure_ascii=backend == "json").encode("utf-8")
+        assert encode_json(SAMPLE, indent=None) == expected
+
+    def test_stdlib_backend_matches_json_dump(self, monkeypatch):
+        monkeypatch.setenv("FAIRSCAPE_JSON_BACKEND", "json")
+        data = {**SAMPLE, "floats": [1e-07, 1e16, 0.1, float("nan")]}
+        assert encode_json(data) == json.dumps(data, indent=2).encode("ascii")
+
+    def test_stdlib_backend_writes_utf8_on_request(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAIRSCAPE_JSON_BACKEND", "json")
+        expected = json.dumps(SAMPLE, indent=2, ensure_ascii=False).encode("utf-8")
+        assert encode_json(SAMPLE, ensure_ascii=False) == expected
+        write_json_atomic(tmp_path / "out.json", SAMPLE, ensure_ascii=False)
+        assert (tmp_path / "out.json").read_bytes() == expected
+
+    def test_global_compact_mode(self, backend, monkeypatch):
+        set_compact_output(True)
+        assert b"\n" not in encode_json(SAMPLE)
+        set_compact_output(None)
+        monkeypatch.setenv("FAIRSCAPE_JSON_COMPACT", "1")
+        assert b"\n" not in encode_json(SAMPLE)
+        set_compact_output(False)
+        assert b"\n" in encode_json(SAMPLE)
+
+    def test_prune_while_encoding(self, backend):
+        data = {"a": None, "b": [1, None, {"c": None, "d": 2}], "e": ()}
+        assert json.loads(encode_json(data, prune=True)) == {"b": [1, {"d": 2}], "e": []}
+
+    def test_default_hook(self, backend):
+        when = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        assert json.loads(dumps_json({"t": when}, default=str)) == {"t": str(when)}
+        with pytest.raises(TypeError):
+            encode_json({"t": when})
+
+    def test_big_int_falls_back(self, backend):
+        assert json.loads(encode_json({"n": 2 ** 70})) == {"n": 2 ** 70}
+
+
+class TestPruneShared:
+    def test_clean_data_is_not_copied(self):
+        assert _prune_shared(SAMPLE) is SAMPLE
+
+    def test_only_dirty_branches_are_rebuilt(self):
+        clean = {"x": [1, 2]}
+        data = {"clean": clean, "dirty": {"a": None, "b": 1}}
+        pruned = _prune_shared(data)
+        assert pruned == {"clean": clean, "dirty": {"b": 1}}
+        assert pruned["clean"] is clean
+        assert data["dirty"] == {"a": None, "b": 1}
+
+    def test_matches_prune_none(self):
+        data = {"a": [None, {"b": None, "c": [None, 3]}], "d": None, "e": (1, None)}
+        assert _prune_shared(data) == prune_none(data)
+
+
+class TestWriteJsonAtomic:
+    def test_writes_and_honours_umask(self, tmp_path):
+        path = tmp_path / "out.json"
+        write_json_atomic(path, SAMPLE)
+        assert json.loads(path.read_text(encoding="utf-8")) == SAMPLE
+        umask = os.umask(0)
+        os.umask(umask)
+        assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_preserves_existing_mode(self, tmp_path):
+        path = tmp_path / "out.json"
+        path.write_text("{}")
+        path.chmod(0o640)
+        write_json_atomic(path, SAMPLE)
+        assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+    def test_failed_encode_leaves_file_untouched(self, tmp_path):
+        path = tmp_path / "out.json"
+        path.write_text('{"keep": true}')
+        with pytest.raises(TypeError):
+            write_json_atomic(path, {"bad": object()})
+        assert path.read_text() == '{"keep": true}'
+        assert list(tmp_path.iterdir()) == [path]